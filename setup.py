@@ -43,6 +43,11 @@ REQUIREMENTS = [
     'requests'
 ]
 
+EXTRAS = {
+    'async': ['aiohttp'],
+    'prometheus': ['prometheus_client']
+}
+
 with codecs.open('README.rst', 'r', 'utf-8') as handle:
     LONG_DESCRIPTION = handle.read()
 
@@ -57,9 +62,11 @@ setup(
     license=LICENSE,
     url=URL,
     install_requires=REQUIREMENTS,
+    extras_require=EXTRAS,
     zip_safe=True,
     packages=['warthog', 'warthog.packages'],
     entry_points="""
         [console_scripts]
         warthog=warthog.cli:main
+        warthog-bench=warthog.bench:main
     """)
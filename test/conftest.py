@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+import sys
+
+# The asyncio client relies on syntax that isn't available on older
+# versions of Python so there's no point in trying to collect its tests.
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_aio.py')
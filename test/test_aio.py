@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+
+import mock
+import pytest
+
+import warthog.aio
+import warthog.core
+import warthog.exceptions
+import warthog.hooks
+import warthog.transport
+
+SCHEME_HOST = 'https://lb.example.com'
+
+AUTH_SUCCESS = {'authresponse': {'signature': '1234'}}
+
+OK_RESPONSE = {'response': {'status': 'OK'}}
+
+INVALID_SESSION = {
+    'authorizationschema': {
+        'code': 401,
+        'error': 'Invalid admin session.'
+    }
+}
+
+
+def oper(state):
+    return {'server': {'oper': {'state': state}}}
+
+
+def stats(conns):
+    return {'server': {'stats': {'curr-conn': conns}}}
+
+
+def action(name):
+    return {'server': {'action': name}}
+
+
+class FakeTransport(object):
+    """Asynchronous transport that returns canned responses for each path."""
+
+    def __init__(self, responses):
+        self.responses = dict((path, list(values)) for path, values in responses.items())
+        self.requests = []
+        self.closed = False
+
+    async def request(self, method, url, headers=None, json=None):
+        path = url.replace(SCHEME_HOST, '')
+        self.requests.append((method, path))
+        values = self.responses[path]
+        status, body = values.pop(0) if len(values) > 1 else values[0]
+        return warthog.aio.BufferedResponse(status, _encode(body))
+
+    async def get(self, url, headers=None):
+        return await self.request('GET', url, headers=headers)
+
+    async def post(self, url, headers=None, json=None):
+        return await self.request('POST', url, headers=headers, json=json)
+
+    async def close(self):
+        self.closed = True
+
+
+class SlowTransport(FakeTransport):
+    """Asynchronous transport that takes ``delay`` seconds to respond to requests for
+    the given paths.
+    """
+
+    def __init__(self, responses, delays):
+        super(SlowTransport, self).__init__(responses)
+        self.delays = delays
+
+    async def request(self, method, url, headers=None, json=None):
+        await asyncio.sleep(self.delays.get(url.replace(SCHEME_HOST, ''), 0))
+        return await super(SlowTransport, self).request(method, url, headers=headers, json=json)
+
+
+def _encode(body):
+    return json.dumps(body).encode('utf-8')
+
+
+def _client(transport, **kwargs):
+    return warthog.aio.AsyncWarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=warthog.aio.AsyncCommandFactory(transport),
+        **kwargs)
+
+
+def _run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+BASE_RESPONSES = {
+    '/axapi/v3/auth': [(200, AUTH_SUCCESS)],
+    '/axapi/v3/logoff': [(200, OK_RESPONSE)],
+}
+
+
+def test_buffered_response():
+    response = warthog.aio.BufferedResponse(404, _encode(OK_RESPONSE))
+
+    assert not response.ok, 'Expected 404 response to not be ok'
+    assert OK_RESPONSE == response.json(), 'Did not get expected decoded body'
+
+
+def test_get_status():
+    responses = dict(BASE_RESPONSES)
+    responses['/axapi/v3/slb/server/app1.example.com/oper'] = [(200, oper('Down'))]
+    transport = FakeTransport(responses)
+
+    status = _run(_client(transport).get_status('app1.example.com'))
+
+    assert warthog.core.STATUS_DOWN == status, 'Did not get expected status'
+    assert ('POST', '/axapi/v3/logoff') == transport.requests[-1], 'Expected session to be ended'
+
+
+def test_hooks_timed_with_shared_clock(request):
+    request.addfinalizer(warthog.hooks.get_hooks().clear)
+    events = []
+    warthog.hooks.get_hooks().register(events.append)
+    transport = FakeTransport(BASE_RESPONSES)
+    start_cmd = warthog.aio.AsyncCommandFactory(transport).get_session_start(
+        SCHEME_HOST, 'user', 'password')
+
+    with mock.patch('warthog.core.monotonic', side_effect=[10.0, 12.5]):
+        _run(start_cmd.send())
+
+    assert [2.5] == [e.elapsed for e in events], 'Expected requests timed by warthog.core'
+
+
+def test_get_connections_invalid_session():
+    responses = dict(BASE_RESPONSES)
+    responses['/axapi/v3/slb/server/app1.example.com/stats'] = [(401, INVALID_SESSION)]
+    transport = FakeTransport(responses)
+
+    with pytest.raises(warthog.exceptions.WarthogInvalidSessionError):
+        _run(_client(transport).get_connections('app1.example.com'))
+
+
+def test_disable_server_waits_for_connections():
+    responses = dict(BASE_RESPONSES)
+    responses['/axapi/v3/slb/server/app1.example.com'] = [(200, action('disable'))]
+    responses['/axapi/v3/slb/server/app1.example.com/stats'] = [
+        (200, stats(5)), (200, stats(2)), (200, stats(0))]
+    responses['/axapi/v3/slb/server/app1.example.com/oper'] = [(200, oper('Disabled'))]
+    transport = FakeTransport(responses)
+
+    disabled = _run(_client(transport).disable_server('app1.example.com', wait_interval=0.01))
+
+    assert disabled, 'Server did not end up disabled'
+    stats_calls = [r for r in transport.requests if r[1].endswith('/stats')]
+    assert 3 == len(stats_calls), 'Expected to poll connections until zero'
+
+
+def test_enable_server_concurrently():
+    responses = dict(BASE_RESPONSES)
+    for server in ('app1.example.com', 'app2.example.com'):
+        responses['/axapi/v3/slb/server/' + server] = [(200, action('enable'))]
+        responses['/axapi/v3/slb/server/' + server + '/oper'] = [
+            (200, oper('Down')), (200, oper('Up'))]
+    transport = FakeTransport(responses)
+    client = _client(transport)
+
+    async def enable_all():
+        return await asyncio.gather(
+            client.enable_server('app1.example.com', wait_interval=0.01),
+            client.enable_server('app2.example.com', wait_interval=0.01))
+
+    assert [True, True] == _run(enable_all()), 'Expected both servers to be enabled'
+
+
+def test_close_closes_transport():
+    transport = FakeTransport(BASE_RESPONSES)
+
+    async def use_client():
+        async with _client(transport):
+            pass
+
+    _run(use_client())
+
+    assert transport.closed, 'Expected transport to be closed'
+
+
+def test_operation_timeout_during_action():
+    responses = dict(BASE_RESPONSES)
+    responses['/axapi/v3/slb/server/app1.example.com/oper'] = [(200, oper('Up'))]
+    transport = SlowTransport(responses, {'/axapi/v3/slb/server/app1.example.com/oper': 5})
+    client = _client(transport, operation_timeout=0.2)
+
+    with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc_info:
+        _run(client.get_status('app1.example.com'))
+
+    assert warthog.core.PHASE_ACTION == exc_info.value.phase, 'Expected action phase blamed'
+    assert 0.2 == exc_info.value.timeout, 'Expected timeout of the operation in error'
+    assert ('POST', '/axapi/v3/logoff') == transport.requests[-1], 'Expected session to be ended'
+
+
+def test_operation_timeout_per_call_during_auth():
+    transport = SlowTransport(BASE_RESPONSES, {'/axapi/v3/auth': 5})
+
+    with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc_info:
+        _run(_client(transport).get_status('app1.example.com', timeout=0.2))
+
+    assert warthog.core.PHASE_AUTH == exc_info.value.phase, 'Expected auth phase blamed'
+    assert [] == transport.requests, 'Expected no session to be started or ended'
+
+
+def test_operation_timeout_abandons_slow_logoff():
+    responses = dict(BASE_RESPONSES)
+    responses['/axapi/v3/slb/server/app1.example.com/oper'] = [(200, oper('Up'))]
+    transport = SlowTransport(responses, {'/axapi/v3/logoff': 5})
+
+    status = _run(_client(transport, operation_timeout=0.5).get_status('app1.example.com'))
+
+    assert warthog.core.STATUS_ENABLED == status, 'Expected result despite slow logoff'
+
+
+def test_transport_timeout_not_blamed_on_deadline():
+    transport = FakeTransport(BASE_RESPONSES)
+
+    async def timeout(*args, **kwargs):
+        raise asyncio.TimeoutError()
+
+    transport.request = timeout
+
+    with pytest.raises(asyncio.TimeoutError) as exc_info:
+        _run(_client(transport, operation_timeout=30).get_status('app1.example.com'))
+
+    assert not isinstance(exc_info.value, warthog.exceptions.WarthogTimeoutError), \
+        'Expected timeout of the transport to be raised as is'
+
+
+def test_aiohttp_transport_timeouts():
+    with mock.patch('warthog.aio.aiohttp') as aiohttp:
+        transport = warthog.aio.AiohttpTransport(connect_timeout=2.5)
+        transport._get_session()
+
+    aiohttp.ClientTimeout.assert_called_once_with(
+        total=None, connect=2.5, sock_read=warthog.transport.DEFAULT_READ_TIMEOUT)
+    assert aiohttp.ClientTimeout.return_value == \
+        aiohttp.ClientSession.call_args[1]['timeout'], 'Expected timeouts used by session'
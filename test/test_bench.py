@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from click.testing import CliRunner
+
+import warthog.bench
+
+
+def test_get_cases():
+    cases = warthog.bench.get_cases(['status', 'cycle'], [1, 4], [False], [0, 10], [0.0])
+
+    assert 8 == len(cases), 'Expected every combination of settings'
+    assert warthog.bench.BenchmarkCase('status', 1, False, 0, 0.0) == cases[0]
+
+
+def test_run_case_cycle():
+    case = warthog.bench.BenchmarkCase('cycle', 2, True, 4, 0.0)
+    result = warthog.bench.run_case(case, iterations=3)
+
+    assert 6 == result['calls'], 'Expected each worker to run each iteration'
+    assert 0 == result['errors'], 'Expected no errors'
+    assert result['p50_ms'] <= result['p99_ms'], 'Expected p50 to be no more than p99'
+
+
+def test_main_emits_json():
+    runner = CliRunner()
+    result = runner.invoke(warthog.bench.main, args=[
+        '--scenario', 'status', '--concurrency', '2', '--session-reuse', 'off',
+        '--pool-size', '0', '--latency-ms', '0', '--iterations', '2'])
+
+    assert 0 == result.exit_code, 'Expected zero exit code'
+    payload = json.loads(result.output[result.output.index('{'):])
+    assert 1 == len(payload['results']), 'Expected a single benchmark result'
+    assert 4 == payload['results'][0]['calls'], 'Did not get expected number of calls'
+
+
+def test_run_startup_config_path_avoids_heavy_modules():
+    result = warthog.bench.run_startup(iterations=1)
+
+    assert 1 == result['runs'], 'Expected a single run'
+    assert [] == result['heavy_modules'], 'Expected config-path not to import heavy modules'
+
+
+def test_run_startup_status_imports_client():
+    result = warthog.bench.run_startup(['--config', 'nope.ini', 'status', 'app1'], iterations=1)
+
+    assert 'warthog.client' in result['heavy_modules'], 'Expected status to import the client'
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import warthog.breaker
+import warthog.client
+import warthog.exceptions
+import warthog.testing
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return warthog.breaker.CircuitBreaker(
+        'https://lb.example.com', failure_rate=0.5, window=4, min_requests=4,
+        slow_request=1.0, reset_timeout=10.0, clock=clock)
+
+
+def _record(breaker, *outcomes):
+    for failed in outcomes:
+        breaker.before_request()
+        breaker.after_request(0.1, failed)
+
+
+class TestCircuitBreaker(object):
+    def test_stays_closed_below_min_requests(self, breaker):
+        _record(breaker, True, True, True)
+
+        assert warthog.breaker.STATE_CLOSED == breaker.state
+
+    def test_opens_at_failure_rate(self, breaker):
+        _record(breaker, False, True, False, True)
+
+        assert warthog.breaker.STATE_OPEN == breaker.state
+        with pytest.raises(warthog.exceptions.WarthogCircuitOpenError) as exc:
+            breaker.before_request()
+
+        assert 'https://lb.example.com' == exc.value.scheme_host
+        assert 10.0 == exc.value.retry_after
+
+    def test_slow_requests_are_failures(self, breaker):
+        for _ in range(4):
+            breaker.before_request()
+            breaker.after_request(2.0, False)
+
+        assert warthog.breaker.STATE_OPEN == breaker.state, 'Expected slow requests to count'
+
+    def test_half_open_allows_single_trial(self, breaker, clock):
+        _record(breaker, True, True, True, True)
+        clock.now = 10.0
+
+        assert warthog.breaker.STATE_HALF_OPEN == breaker.state
+        breaker.before_request()
+        with pytest.raises(warthog.exceptions.WarthogCircuitOpenError):
+            breaker.before_request()
+
+    def test_half_open_success_closes(self, breaker, clock):
+        _record(breaker, True, True, True, True)
+        clock.now = 10.0
+        _record(breaker, False)
+
+        assert warthog.breaker.STATE_CLOSED == breaker.state
+        _record(breaker, True, True, True)
+        assert warthog.breaker.STATE_CLOSED == breaker.state, 'Expected old failures forgotten'
+
+    def test_half_open_failure_opens_again(self, breaker, clock):
+        _record(breaker, True, True, True, True)
+        clock.now = 10.0
+        _record(breaker, True)
+
+        assert warthog.breaker.STATE_OPEN == breaker.state
+        clock.now = 15.0
+        assert warthog.breaker.STATE_OPEN == breaker.state, 'Expected reset timeout to restart'
+
+    def test_cancel_not_recorded(self, breaker):
+        for _ in range(4):
+            breaker.before_request()
+            breaker.cancel_request()
+
+        assert warthog.breaker.STATE_CLOSED == breaker.state, 'Expected no outcomes recorded'
+
+    def test_cancel_releases_trial(self, breaker, clock):
+        _record(breaker, True, True, True, True)
+        clock.now = 10.0
+        breaker.before_request()
+        breaker.cancel_request()
+
+        breaker.before_request()
+        assert warthog.breaker.STATE_HALF_OPEN == breaker.state, 'Expected another trial'
+
+
+class TestGetCircuitBreaker(object):
+    def test_shared_by_scheme_host(self, request):
+        request.addfinalizer(warthog.breaker.reset_circuit_breakers)
+
+        first = warthog.breaker.get_circuit_breaker('https://LB.example.com:8443')
+        second = warthog.breaker.get_circuit_breaker(
+            'https://lb.example.com:8443/axapi/v3/auth')
+        other = warthog.breaker.get_circuit_breaker('https://lb.example.com')
+
+        assert first is second, 'Expected same breaker for the same load balancer'
+        assert first is not other, 'Expected different breaker for a different port'
+
+
+def test_client_fails_fast_when_open(request):
+    request.addfinalizer(warthog.breaker.reset_circuit_breakers)
+
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        warthog.breaker.get_circuit_breaker(
+            sim.scheme_host, window=4, min_requests=4, reset_timeout=60.0)
+        sim.fail_next(count=4, status_code=503)
+
+        first = warthog.client.WarthogClient(
+            sim.scheme_host, sim.username, sim.password, circuit_breaker=True)
+        second = warthog.client.WarthogClient(
+            sim.scheme_host, sim.username, sim.password, circuit_breaker=True)
+
+        for _ in range(4):
+            with pytest.raises(warthog.exceptions.WarthogApiError):
+                first.get_status('app1.example.com')
+
+        made = sum(sim.requests.values())
+        with pytest.raises(warthog.exceptions.WarthogCircuitOpenError):
+            second.get_status('app1.example.com')
+
+        assert made == sum(sim.requests.values()), 'Expected no requests while open'
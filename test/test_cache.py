@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+import warthog.cache
+import warthog.core
+import warthog.exceptions
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingLoader(object):
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return warthog.cache.ResultCache(5.0, max_size=2, clock=clock)
+
+
+class TestResultCache(object):
+    def test_get_caches_value(self, cache):
+        loader = CountingLoader('enabled')
+
+        assert 'enabled' == cache.get('app1', loader), 'Did not get expected value'
+        assert 'enabled' == cache.get('app1', loader), 'Did not get expected cached value'
+        assert 1 == loader.calls, 'Expected the value to be loaded once'
+
+    def test_get_expired_value_reloaded(self, cache, clock):
+        loader = CountingLoader('enabled')
+        cache.get('app1', loader)
+
+        clock.now = 5.0
+        cache.get('app1', loader)
+
+        assert 2 == loader.calls, 'Expected the expired value to be loaded again'
+
+    def test_get_evicts_least_recently_used(self, cache):
+        loader = CountingLoader('enabled')
+        cache.get('app1', loader)
+        cache.get('app2', loader)
+        cache.get('app1', loader)
+        cache.get('app3', loader)
+
+        assert 2 == len(cache), 'Expected cache to be bounded by max size'
+        cache.get('app1', loader)
+        assert 3 == loader.calls, 'Expected most recently used value to be kept'
+        cache.get('app2', loader)
+        assert 4 == loader.calls, 'Expected least recently used value to be evicted'
+
+    def test_get_errors_not_cached(self, cache):
+        def loader():
+            raise RuntimeError('AHH!')
+
+        with pytest.raises(RuntimeError):
+            cache.get('app1', loader)
+
+        assert 'enabled' == cache.get('app1', CountingLoader('enabled')), \
+            'Expected value to be loaded after an error'
+
+    def test_get_concurrent_misses_coalesced(self, cache):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'enabled'
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(cache.get('app1', loader)))
+        first.start()
+        assert started.wait(5), 'Expected first load to start'
+
+        second = threading.Thread(target=lambda: results.append(cache.get('app1', loader)))
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        assert ['enabled', 'enabled'] == results, 'Did not get expected shared results'
+        assert 1 == len(calls), 'Expected concurrent misses to share a single load'
+
+    def test_get_waiting_limited_by_deadline(self, cache):
+        started = threading.Event()
+        release = threading.Event()
+
+        def loader():
+            started.set()
+            release.wait(5)
+            return 'enabled'
+
+        first = threading.Thread(target=lambda: cache.get('app1', loader))
+        first.start()
+        assert started.wait(5), 'Expected first load to start'
+
+        try:
+            with warthog.core.deadline_context(warthog.core.Deadline(0.05)):
+                with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc:
+                    cache.get('app1', loader)
+        finally:
+            release.set()
+            first.join(5)
+
+        assert warthog.core.PHASE_ACTION == exc.value.phase, 'Expected action phase blamed'
+        assert 'enabled' == cache.get('app1', loader), 'Expected load to still be cached'
+
+    def test_invalidate_discards_value(self, cache):
+        loader = CountingLoader('enabled')
+        cache.get('app1', loader)
+        cache.invalidate('app1')
+        cache.get('app1', loader)
+
+        assert 2 == loader.calls, 'Expected invalidated value to be loaded again'
+
+    def test_invalidate_during_load_not_cached(self, cache):
+        loader = CountingLoader('enabled')
+
+        def invalidating_loader():
+            cache.invalidate('app1')
+            return 'disabled'
+
+        assert 'disabled' == cache.get('app1', invalidating_loader), \
+            'Expected result of load to be returned'
+        assert 'enabled' == cache.get('app1', loader), \
+            'Expected value invalidated during load not to be cached'
+
+    def test_clear(self, cache):
+        cache.get('app1', CountingLoader('enabled'))
+        cache.get('app2', CountingLoader('enabled'))
+        cache.clear()
+
+        assert 0 == len(cache), 'Expected all values to be discarded'
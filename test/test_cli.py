@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import json
+
 from click.testing import CliRunner
 
 import pytest
@@ -7,7 +9,10 @@ import click
 import requests
 
 import warthog.cli
+import warthog.client
+import warthog.daemon
 import warthog.exceptions
+import warthog.testing
 
 
 def test_main_no_command():
@@ -68,3 +73,230 @@ def test_error_wrapper_connection_error():
     with pytest.raises(click.ClickException):
         my_test_func('something')
 
+
+
+def _write_cluster_config(tmpdir, sims):
+    lines = ['[warthog]', 'username = admin', 'password = a10', 'scheme_host = http://unused']
+    for i, sim in enumerate(sims):
+        lines.extend(['[warthog:lb{0}]'.format(i), 'scheme_host = {0}'.format(sim.scheme_host)])
+    path = tmpdir.join('warthog.ini')
+    path.write('\n'.join(lines))
+    return str(path)
+
+
+def test_cluster_status(tmpdir):
+    with warthog.testing.LoadBalancerSimulator() as sim1, \
+            warthog.testing.LoadBalancerSimulator() as sim2:
+        sim1.add_server('app1.example.com')
+        sim2.add_server('app1.example.com', enabled=False)
+        config = _write_cluster_config(tmpdir, [sim1, sim2])
+
+        runner = CliRunner()
+        result = runner.invoke(
+            warthog.cli.main, args=['--config', config, '--cluster', 'status', 'app1.example.com'])
+
+    assert 0 == result.exit_code, 'Expected zero exit code'
+    assert 'lb0: enabled' in result.output, 'Expected status of first LB'
+    assert 'lb1: disabled' in result.output, 'Expected status of second LB'
+
+
+def test_cluster_policy_failure(tmpdir):
+    with warthog.testing.LoadBalancerSimulator() as sim1, \
+            warthog.testing.LoadBalancerSimulator() as sim2:
+        sim1.add_server('app1.example.com')
+        config = _write_cluster_config(tmpdir, [sim1, sim2])
+
+        runner = CliRunner()
+        failed = runner.invoke(
+            warthog.cli.main, args=['--config', config, '--cluster', 'status', 'app1.example.com'])
+        any_ok = runner.invoke(
+            warthog.cli.main, args=['--config', config, '--cluster', '--policy', 'any',
+                                    'status', 'app1.example.com'])
+
+    assert 1 == failed.exit_code, 'Expected non-zero exit code when an LB fails'
+    assert 'lb1: error:' in failed.output, 'Expected error for second LB'
+    assert 0 == any_ok.exit_code, 'Expected zero exit code with the any policy'
+
+
+def test_cluster_no_load_balancers(tmpdir):
+    path = tmpdir.join('warthog.ini')
+    path.write('[warthog]\nscheme_host = http://lb\nusername = a\npassword = b\n')
+
+    runner = CliRunner()
+    result = runner.invoke(
+        warthog.cli.main, args=['--config', str(path), '--cluster', 'status', 'app1.example.com'])
+
+    assert 0 != result.exit_code, 'Expected non-zero exit code'
+    assert 'No load balancers are configured' in result.output
+
+
+def _write_config(tmpdir, sim):
+    path = tmpdir.join('warthog.ini')
+    path.write('\n'.join([
+        '[warthog]', 'scheme_host = {0}'.format(sim.scheme_host),
+        'username = {0}'.format(sim.username), 'password = {0}'.format(sim.password)]))
+    return str(path)
+
+
+def test_roll(tmpdir):
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        sim.add_server('app2.example.com')
+        config = _write_config(tmpdir, sim)
+
+        runner = CliRunner()
+        result = runner.invoke(warthog.cli.main, args=[
+            '--config', config, 'roll', '--wait-interval', '0.01', '--hook', 'exit 0',
+            'app1.example.com', 'app2.example.com'])
+
+    assert 0 == result.exit_code, 'Expected zero exit code'
+    assert 'app1.example.com: done' in result.output
+    assert 'app2.example.com: done' in result.output
+
+
+def test_roll_hook_failure(tmpdir):
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        sim.add_server('app2.example.com')
+        config = _write_config(tmpdir, sim)
+
+        runner = CliRunner()
+        result = runner.invoke(warthog.cli.main, args=[
+            '--config', config, 'roll', '--wait-interval', '0.01', '--hook', 'exit 1',
+            '--max-unavailable', '1', 'app1.example.com', 'app2.example.com'])
+
+    assert 1 == result.exit_code, 'Expected non-zero exit code'
+    assert 'app1.example.com: hook failed' in result.output
+    assert 'app2.example.com: skipped' in result.output
+
+
+def test_watch(tmpdir):
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com', connections=2)
+        sim.add_server('app2.example.com')
+        config = _write_config(tmpdir, sim)
+
+        runner = CliRunner()
+        result = runner.invoke(warthog.cli.main, args=[
+            '--config', config, 'watch', '--interval', '0.01', '--count', '1',
+            'app1.example.com'])
+
+    assert 0 == result.exit_code, 'Expected zero exit code'
+    event = json.loads(result.output)
+    assert 'app1.example.com' == event['server']
+    assert 'enabled' == event['status']
+    assert 2 == event['connections']
+    assert None is event['previous_status']
+
+
+def test_status_many_table(tmpdir):
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        sim.add_server('app2.example.com', enabled=False)
+        config = _write_config(tmpdir, sim)
+
+        runner = CliRunner()
+        result = runner.invoke(warthog.cli.main, args=[
+            '--config', config, 'status', 'app1.example.com', 'app2.example.com'])
+        logins = sim.requests['/axapi/v3/auth']
+
+    assert 0 == result.exit_code, 'Expected zero exit code'
+    lines = result.output.splitlines()
+    assert lines[0].startswith('SERVER'), 'Expected table header'
+    assert lines[1].split() == ['app1.example.com', 'enabled']
+    assert lines[2].split() == ['app2.example.com', 'disabled']
+    assert 1 == logins, 'Expected a single session for every server'
+
+
+def test_connections_from_stdin_json(tmpdir):
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com', connections=4)
+        config = _write_config(tmpdir, sim)
+
+        runner = CliRunner()
+        result = runner.invoke(warthog.cli.main, args=[
+            '--config', config, 'connections', '--servers-from', '-', '--format', 'json',
+            '--parallel', '2'], input='app1.example.com\n\n# comment\nnope.example.com\n')
+
+    assert 1 == result.exit_code, 'Expected non-zero exit code for unknown server'
+    results = json.loads(result.output)
+    assert ['app1.example.com', 'nope.example.com'] == [r['server'] for r in results]
+    assert results[0]['ok'] and 4 == results[0]['value'], 'Expected connections for app1'
+    assert not results[1]['ok'] and results[1]['error'], 'Expected error for unknown server'
+
+
+def test_disable_and_enable_many(tmpdir):
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        sim.add_server('app2.example.com')
+        config = _write_config(tmpdir, sim)
+
+        runner = CliRunner()
+        disabled = runner.invoke(warthog.cli.main, args=[
+            '--config', config, 'disable', 'app1.example.com', 'app2.example.com'])
+        states = [sim.get_server(s).state for s in ('app1.example.com', 'app2.example.com')]
+        enabled = runner.invoke(warthog.cli.main, args=[
+            '--config', config, 'enable', 'app1.example.com', 'app2.example.com'])
+
+    assert 0 == disabled.exit_code, 'Expected zero exit code for disable'
+    assert ['Disabled', 'Disabled'] == states, 'Expected both servers disabled'
+    assert 0 == enabled.exit_code, 'Expected zero exit code for enable'
+    assert 'app2.example.com  enabled' in enabled.output
+
+
+def test_status_no_servers():
+    runner = CliRunner()
+    result = runner.invoke(warthog.cli.main, args=['status'])
+
+    assert 0 != result.exit_code, 'Expected non-zero exit code'
+    assert 'At least one server is required' in result.output
+
+
+def test_cluster_many_servers_not_supported():
+    runner = CliRunner()
+    result = runner.invoke(warthog.cli.main, args=['--cluster', 'status', 'a', 'b'])
+
+    assert 0 != result.exit_code, 'Expected non-zero exit code'
+    assert '--cluster only supports a single server' in result.output
+
+
+def test_forward_to_daemon(tmpdir):
+    socket_path = str(tmpdir.join('warthog.sock'))
+
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com', connections=3)
+        config = _write_config(tmpdir, sim)
+        client = warthog.client.WarthogClient(
+            sim.scheme_host, sim.username, sim.password, session_reuse=True)
+
+        with warthog.daemon.WarthogDaemon(client, path=socket_path, config=config):
+            runner = CliRunner()
+            first = runner.invoke(warthog.cli.main, args=[
+                '--config', config, '--socket', socket_path, 'status', 'app1.example.com'])
+            second = runner.invoke(warthog.cli.main, args=[
+                '--config', config, '--socket', socket_path, 'connections',
+                'app1.example.com', 'nope.example.com'])
+            missing = runner.invoke(warthog.cli.main, args=[
+                '--config', config, '--socket', socket_path, 'status', 'nope.example.com'])
+            logins = sim.requests['/axapi/v3/auth']
+
+    assert 'enabled' == first.output.strip(), 'Expected status from daemon'
+    assert 1 == second.exit_code, 'Expected non-zero exit code for unknown server'
+    assert 'app1.example.com  3' in second.output, 'Expected connections from daemon'
+    assert 0 != missing.exit_code, 'Expected non-zero exit code for unknown server'
+    assert "doesn't appear to be a known node" in missing.output
+    assert 1 == logins, 'Expected every command to use the session of the daemon'
+
+
+def test_no_daemon_falls_back(tmpdir):
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        config = _write_config(tmpdir, sim)
+
+        runner = CliRunner()
+        result = runner.invoke(warthog.cli.main, args=[
+            '--config', config, '--socket', str(tmpdir.join('nope.sock')),
+            'status', 'app1.example.com'])
+
+    assert 0 == result.exit_code, 'Expected zero exit code'
+    assert 'enabled' == result.output.strip(), 'Expected status from load balancer'
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import threading
+
 import mock
 import pytest
 
 import warthog.client
 import warthog.core
 import warthog.exceptions
+import warthog.testing
+import warthog.wait
 
 SCHEME_HOST = 'https://lb.example.com'
 
@@ -17,7 +21,9 @@ def commands(
         status_cmd,
         conn_cmd,
         enable_cmd,
-        disable_cmd):
+        disable_cmd,
+        status_all_cmd,
+        conn_all_cmd):
     factory = mock.Mock(spec=warthog.client.CommandFactory)
     factory.get_session_start.return_value = start_cmd
     factory.get_session_end.return_value = end_cmd
@@ -25,6 +31,8 @@ def commands(
     factory.get_enable_server.return_value = enable_cmd
     factory.get_disable_server.return_value = disable_cmd
     factory.get_active_connections.return_value = conn_cmd
+    factory.get_all_server_status.return_value = status_all_cmd
+    factory.get_all_active_connections.return_value = conn_all_cmd
     return factory
 
 
@@ -48,6 +56,16 @@ def conn_cmd():
     return mock.Mock(spec=warthog.core.NodeActiveConnectionsCommand)
 
 
+@pytest.fixture
+def status_all_cmd():
+    return mock.Mock(spec=warthog.core.NodeStatusListCommand)
+
+
+@pytest.fixture
+def conn_all_cmd():
+    return mock.Mock(spec=warthog.core.NodeActiveConnectionsListCommand)
+
+
 @pytest.fixture
 def enable_cmd():
     return mock.Mock(spec=warthog.core.NodeEnableCommand)
@@ -185,3 +203,363 @@ def test_enable_server(commands, start_cmd, end_cmd, status_cmd, enable_cmd):
 
     assert enabled, 'Server did not end up enabled'
     assert end_cmd.send.called, 'Session end .send() did not get called'
+
+
+def test_close_closes_command_factory(commands):
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands)
+    client.close()
+
+    assert commands.close.called, 'Expected command factory .close() to be called'
+
+
+def test_context_manager_closes_client(commands):
+    with warthog.client.WarthogClient(SCHEME_HOST, 'user', 'password', commands=commands):
+        pass
+
+    assert commands.close.called, 'Expected command factory .close() to be called'
+
+
+def test_command_factory_pooled_transport_shared():
+    factory = warthog.client._get_default_cmd_factory(None, None, None, pooled=True)
+    status = factory.get_server_status(SCHEME_HOST, '1234', 'app1.example.com')
+    conns = factory.get_active_connections(SCHEME_HOST, '1234', 'app1.example.com')
+
+    assert status._transport is conns._transport, 'Expected commands to share a transport'
+
+
+def test_session_reuse_single_session(commands, start_cmd, end_cmd, status_cmd, conn_cmd):
+    start_cmd.send.return_value = '1234'
+    status_cmd.send.return_value = 'enabled'
+    conn_cmd.send.return_value = 42
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands, session_reuse=True)
+
+    client.get_status('app1.example.com')
+    client.get_connections('app1.example.com')
+
+    assert 1 == start_cmd.send.call_count, 'Expected a single session to be started'
+    assert not end_cmd.send.called, 'Did not expect session to be ended before close'
+
+    client.close()
+
+    assert end_cmd.send.called, 'Expected session to be ended on close'
+
+
+def test_get_status_many_single_session(commands, start_cmd, end_cmd, status_cmd):
+    start_cmd.send.return_value = '1234'
+    status_cmd.send.return_value = 'enabled'
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands)
+
+    results = client.get_status_many(['app1.example.com', 'app2.example.com'])
+
+    assert {'app1.example.com', 'app2.example.com'} == set(results)
+    assert all(r.value == 'enabled' for r in results.values()), 'Did not get expected status'
+    assert 1 == start_cmd.send.call_count, 'Expected a single session to be started'
+    assert 1 == end_cmd.send.call_count, 'Expected a single session to be ended'
+
+
+def test_get_connections_many_captures_errors(commands, start_cmd, conn_cmd):
+    start_cmd.send.return_value = '1234'
+    conn_cmd.send.side_effect = [
+        3, warthog.exceptions.WarthogNoSuchNodeError('No such node!', server='bad.example.com')]
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands)
+
+    results = client.get_connections_many(
+        ['app1.example.com', 'bad.example.com'], max_workers=1)
+
+    assert 3 == results['app1.example.com'].value, 'Did not get expected connections'
+    assert isinstance(
+        results['bad.example.com'].error, warthog.exceptions.WarthogNoSuchNodeError)
+
+
+def test_disable_servers(commands, start_cmd, status_cmd, conn_cmd, disable_cmd):
+    start_cmd.send.return_value = '1234'
+    disable_cmd.send.return_value = True
+    conn_cmd.send.return_value = 0
+    status_cmd.send.return_value = 'disabled'
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands)
+
+    results = client.disable_servers(['app1.example.com', 'app2.example.com'])
+
+    assert all(r.value for r in results.values()), 'Expected all servers to be disabled'
+
+
+def test_enable_servers_session_reuse_auth_failure(commands, start_cmd, status_cmd):
+    start_cmd.send.side_effect = warthog.exceptions.WarthogAuthFailureError('Bad password')
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands, session_reuse=True)
+
+    with pytest.raises(warthog.exceptions.WarthogAuthFailureError):
+        client.enable_servers(['app1.example.com', 'app2.example.com'])
+
+    assert 1 == start_cmd.send.call_count, 'Expected a single failed login'
+
+
+def test_drain_servers_single_session(commands, start_cmd, end_cmd, status_cmd, conn_cmd,
+                                      disable_cmd):
+    start_cmd.send.return_value = '1234'
+    disable_cmd.send.return_value = True
+    conn_cmd.send.return_value = 0
+    status_cmd.send.return_value = 'disabled'
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands)
+
+    results = list(client.drain_servers(['app1.example.com', 'app2.example.com']))
+
+    assert 2 == len(results), 'Expected a result for each server'
+    assert 1 == start_cmd.send.call_count, 'Expected a single session to be started'
+    assert 1 == end_cmd.send.call_count, 'Expected a single session to be ended'
+
+
+def test_enable_server_with_wait_strategy(commands, start_cmd, status_cmd, enable_cmd):
+    start_cmd.send.return_value = '1234'
+    enable_cmd.send.return_value = True
+    status_cmd.send.side_effect = ['down', 'down', 'down', 'enabled']
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands)
+
+    wait = warthog.wait.FixedIntervalWait(interval=0.01, max_retries=2)
+    enabled = client.enable_server('app1.example.com', wait=wait)
+
+    assert not enabled, 'Expected wait strategy to give up before server was enabled'
+    assert 3 == status_cmd.send.call_count, 'Expected two retries and a final status check'
+
+
+def test_get_snapshot(commands, start_cmd, end_cmd, status_all_cmd, conn_all_cmd):
+    start_cmd.send.return_value = '1234'
+    status_all_cmd.send.return_value = {
+        'app1.example.com': 'enabled', 'app2.example.com': 'disabled'}
+    conn_all_cmd.send.return_value = {
+        'app1.example.com': 12, 'app2.example.com': 0, 'app3.example.com': 4}
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands)
+
+    snapshot = client.get_snapshot()
+
+    assert ('enabled', 12) == snapshot['app1.example.com']
+    assert ('disabled', 0) == snapshot['app2.example.com']
+    assert (None, 4) == snapshot['app3.example.com']
+    assert 1 == end_cmd.send.call_count, 'Expected a single session to be used'
+
+
+def test_get_snapshot_only_requested_servers(commands, start_cmd, status_all_cmd, conn_all_cmd):
+    start_cmd.send.return_value = '1234'
+    status_all_cmd.send.return_value = {
+        'app1.example.com': 'enabled', 'app2.example.com': 'disabled'}
+    conn_all_cmd.send.return_value = {'app1.example.com': 12, 'app2.example.com': 0}
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands)
+
+    snapshot = client.get_snapshot(['app2.example.com', 'unknown.example.com'])
+
+    assert {'app2.example.com': ('disabled', 0)} == snapshot
+
+
+def test_get_status_cached(commands, start_cmd, status_cmd):
+    start_cmd.send.return_value = '1234'
+    status_cmd.send.return_value = warthog.core.STATUS_ENABLED
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands, status_cache_ttl=60)
+
+    assert warthog.core.STATUS_ENABLED == client.get_status('app1.example.com')
+    assert warthog.core.STATUS_ENABLED == client.get_status('app1.example.com')
+    assert 1 == status_cmd.send.call_count, 'Expected cached status to be used'
+    assert 1 == start_cmd.send.call_count, 'Expected no session for cached status'
+
+
+def test_get_status_cached_wait_limited_by_timeout(commands, start_cmd, status_cmd):
+    start_cmd.send.return_value = '1234'
+    started = threading.Event()
+    release = threading.Event()
+    status_cmd.send.side_effect = lambda: (
+        started.set(), release.wait(5), warthog.core.STATUS_ENABLED)[-1]
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands, status_cache_ttl=60)
+    first = threading.Thread(target=client.get_status, args=('app1.example.com',))
+    first.start()
+    assert started.wait(5), 'Expected first status request to start'
+
+    try:
+        with pytest.raises(warthog.exceptions.WarthogTimeoutError):
+            client.get_status('app1.example.com', timeout=0.05)
+    finally:
+        release.set()
+        first.join(5)
+
+    assert 1 == status_cmd.send.call_count, 'Expected to wait for the first request'
+
+
+def test_get_connections_not_cached_by_default(commands, start_cmd, conn_cmd):
+    start_cmd.send.return_value = '1234'
+    conn_cmd.send.return_value = 3
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands, status_cache_ttl=60)
+
+    client.get_connections('app1.example.com')
+    client.get_connections('app1.example.com')
+    assert 2 == conn_cmd.send.call_count, 'Expected connections not to be cached'
+
+
+def test_disable_server_invalidates_cache(commands, start_cmd, status_cmd, conn_cmd,
+                                          disable_cmd):
+    start_cmd.send.return_value = '1234'
+    status_cmd.send.side_effect = [
+        warthog.core.STATUS_ENABLED, warthog.core.STATUS_DISABLED,
+        warthog.core.STATUS_DISABLED]
+    conn_cmd.send.return_value = 0
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands,
+        status_cache_ttl=60, connections_cache_ttl=60)
+
+    assert warthog.core.STATUS_ENABLED == client.get_status('app1.example.com')
+    assert client.disable_server('app1.example.com'), 'Expected server to be disabled'
+    assert warthog.core.STATUS_DISABLED == client.get_status('app1.example.com'), \
+        'Expected cached status to be discarded after disabling server'
+
+
+def test_get_status_many_uses_cache(commands, start_cmd, status_cmd):
+    start_cmd.send.return_value = '1234'
+    status_cmd.send.return_value = warthog.core.STATUS_ENABLED
+
+    client = warthog.client.WarthogClient(
+        SCHEME_HOST, 'user', 'password', commands=commands, status_cache_ttl=60)
+
+    client.get_status('app1.example.com')
+    results = client.get_status_many(['app1.example.com', 'app2.example.com'], max_workers=1)
+
+    assert warthog.core.STATUS_ENABLED == results['app2.example.com'].get()
+    assert 2 == status_cmd.send.call_count, 'Expected cached status to be used for app1'
+
+
+class TestOperationTimeout(object):
+    def test_deadline_applied_to_operation(self, commands, start_cmd, status_cmd):
+        start_cmd.send.return_value = '1234'
+        status_cmd.send.side_effect = lambda: warthog.core.get_deadline()
+
+        client = warthog.client.WarthogClient(
+            SCHEME_HOST, 'user', 'password', commands=commands, operation_timeout=10.0)
+        deadline = client.get_status('app1.example.com')
+
+        assert deadline is not None, 'Expected operation to run with a deadline'
+        assert 10.0 * (1 - warthog.client.LOGOFF_TIMEOUT_SHARE) == deadline.timeout, \
+            'Expected part of the timeout to be set aside for ending the session'
+        assert None is warthog.core.get_deadline(), 'Expected deadline to be removed'
+
+    def test_deadline_applied_to_session_start(self, commands, start_cmd, end_cmd, status_cmd):
+        deadlines = []
+        start_cmd.send.side_effect = lambda: deadlines.append(
+            warthog.core.get_deadline()) or '1234'
+        end_cmd.send.side_effect = lambda: deadlines.append(warthog.core.get_deadline())
+        status_cmd.send.return_value = 'enabled'
+
+        client = warthog.client.WarthogClient(
+            SCHEME_HOST, 'user', 'password', commands=commands, operation_timeout=10.0)
+        client.get_status('app1.example.com')
+
+        assert 10.0 * (1 - warthog.client.LOGOFF_TIMEOUT_SHARE) == deadlines[0].timeout, \
+            'Expected session to be started within the deadline of the operation'
+        assert 10.0 * warthog.client.LOGOFF_TIMEOUT_SHARE == deadlines[1].timeout, \
+            'Expected session to be ended within the time set aside for it'
+
+    def test_timeout_overrides_client_default(self, commands, start_cmd, status_cmd):
+        start_cmd.send.return_value = '1234'
+        status_cmd.send.side_effect = lambda: warthog.core.get_deadline()
+
+        client = warthog.client.WarthogClient(
+            SCHEME_HOST, 'user', 'password', commands=commands, session_reuse=True,
+            operation_timeout=10.0)
+        deadline = client.get_status('app1.example.com', timeout=2.0)
+
+        assert 2.0 == deadline.timeout, 'Expected entire timeout for shared sessions'
+
+    def test_no_deadline_by_default(self, commands, start_cmd, status_cmd):
+        start_cmd.send.return_value = '1234'
+        status_cmd.send.side_effect = lambda: warthog.core.get_deadline()
+
+        client = warthog.client.WarthogClient(SCHEME_HOST, 'user', 'password', commands=commands)
+
+        assert None is client.get_status('app1.example.com'), 'Expected no deadline'
+
+    def test_polling_past_deadline(self, commands, start_cmd, end_cmd, conn_cmd):
+        start_cmd.send.return_value = '1234'
+        conn_cmd.send.return_value = 42
+
+        client = warthog.client.WarthogClient(
+            SCHEME_HOST, 'user', 'password', commands=commands, operation_timeout=1.0)
+
+        with mock.patch('time.sleep') as sleep:
+            with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc:
+                client.disable_server('app1.example.com', max_retries=5, wait_interval=2.0)
+
+        assert warthog.core.PHASE_POLLING == exc.value.phase, 'Expected polling to time out'
+        assert not sleep.called, 'Expected not to sleep past the deadline'
+        assert end_cmd.send.called, 'Expected session to be ended'
+
+    def test_logoff_timeout_abandons_session(self, commands, start_cmd, end_cmd, status_cmd):
+        start_cmd.send.return_value = '1234'
+        status_cmd.send.return_value = 'enabled'
+        end_cmd.send.side_effect = warthog.exceptions.WarthogTimeoutError(
+            'Too slow', phase=warthog.core.PHASE_LOGOFF)
+
+        client = warthog.client.WarthogClient(
+            SCHEME_HOST, 'user', 'password', commands=commands, operation_timeout=1.0)
+
+        assert 'enabled' == client.get_status('app1.example.com'), \
+            'Expected result even though ending the session timed out'
+
+    def test_snapshot_deadline_in_each_thread(
+            self, commands, start_cmd, status_all_cmd, conn_all_cmd):
+        start_cmd.send.return_value = '1234'
+        deadlines = []
+        status_all_cmd.send.side_effect = lambda: deadlines.append(
+            warthog.core.get_deadline()) or {'app1.example.com': 'enabled'}
+        conn_all_cmd.send.side_effect = lambda: deadlines.append(
+            warthog.core.get_deadline()) or {'app1.example.com': 3}
+
+        client = warthog.client.WarthogClient(
+            SCHEME_HOST, 'user', 'password', commands=commands, operation_timeout=5.0)
+        client.get_snapshot()
+
+        assert 2 == len(deadlines) and None not in deadlines, \
+            'Expected both requests to run with the deadline'
+
+
+class TestSessionPool(object):
+    def test_concurrent_operations_share_pooled_sessions(self):
+        with warthog.testing.LoadBalancerSimulator(latency=0.01) as sim:
+            servers = ['app{0}.example.com'.format(i) for i in range(8)]
+            for server in servers:
+                sim.add_server(server)
+
+            with warthog.client.WarthogClient(
+                    sim.scheme_host, sim.username, sim.password, session_pool_size=2) as client:
+                results = client.get_status_many(servers, max_workers=8)
+                stats = client.get_session_pool_stats()
+                sessions = sim.session_count
+
+        assert all(result.ok for result in results.values()), 'Expected every status'
+        assert sessions <= 2, 'Expected no more sessions than the size of the pool'
+        assert 0 == stats.leased, 'Expected every session to be returned'
+        assert stats.leases > len(servers), 'Expected a lease per operation'
+
+    def test_no_pool_stats_without_pool(self, commands):
+        client = warthog.client.WarthogClient(SCHEME_HOST, 'user', 'password', commands=commands)
+
+        assert client.get_session_pool_stats() is None
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import collections
+
+import mock
+import pytest
+
+import warthog.client
+import warthog.cluster
+import warthog.config
+import warthog.exceptions
+from warthog.concurrency import OperationResult
+
+
+def _clients(*names):
+    return collections.OrderedDict(
+        (name, mock.Mock(spec=warthog.client.WarthogClient)) for name in names)
+
+
+def _result(policy, *results):
+    return warthog.cluster.ClusterResult('op', collections.OrderedDict(
+        ('lb{0}'.format(i), res) for i, res in enumerate(results)), policy)
+
+
+_OK = OperationResult(True, None)
+_FALSE = OperationResult(False, None)
+_ERROR = OperationResult(None, ValueError('broken'))
+
+
+class TestClusterResult(object):
+    def test_all_policy(self):
+        assert _result(warthog.cluster.POLICY_ALL, _OK, _OK).ok, 'Expected success'
+        assert not _result(warthog.cluster.POLICY_ALL, _OK, _ERROR).ok, 'Expected failure'
+        assert not _result(warthog.cluster.POLICY_ALL, _OK, _FALSE).ok, \
+            'Expected False value to be a failure'
+
+    def test_quorum_policy(self):
+        assert _result(warthog.cluster.POLICY_QUORUM, _OK, _OK, _ERROR).ok, 'Expected success'
+        assert not _result(warthog.cluster.POLICY_QUORUM, _OK, _ERROR).ok, \
+            'Expected half to not be a quorum'
+
+    def test_any_policy(self):
+        assert _result(warthog.cluster.POLICY_ANY, _ERROR, _OK).ok, 'Expected success'
+        assert not _result(warthog.cluster.POLICY_ANY, _ERROR, _FALSE).ok, 'Expected failure'
+
+    def test_succeeded_failed_errors(self):
+        res = _result(warthog.cluster.POLICY_ALL, _OK, _FALSE, _ERROR)
+
+        assert ['lb0'] == res.succeeded
+        assert ['lb1', 'lb2'] == res.failed
+        assert {'lb2': _ERROR.error} == dict(res.errors)
+        assert {'lb0': True, 'lb1': False} == dict(res.values)
+
+    def test_check_raises_with_per_lb_errors(self):
+        res = _result(warthog.cluster.POLICY_ALL, _OK, _FALSE, _ERROR)
+
+        with pytest.raises(warthog.exceptions.WarthogClusterError) as exc:
+            res.check()
+
+        assert res.results is exc.value.results, 'Expected results attached to error'
+        assert 'lb1: incomplete' in str(exc.value), 'Expected incomplete LB in message'
+        assert 'lb2: broken' in str(exc.value), 'Expected failed LB in message'
+
+    def test_check_success_returns_self(self):
+        res = _result(warthog.cluster.POLICY_ALL, _OK)
+        assert res is res.check(), 'Expected result to be returned'
+
+
+class TestWarthogClusterClient(object):
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            warthog.cluster.WarthogClusterClient(_clients('a'), policy='most')
+
+    def test_no_clients(self):
+        with pytest.raises(ValueError):
+            warthog.cluster.WarthogClusterClient([])
+
+    def test_disable_server_fans_out(self):
+        clients = _clients('a', 'b')
+        clients['a'].disable_server.return_value = True
+        clients['b'].disable_server.side_effect = ValueError('nope')
+        cluster = warthog.cluster.WarthogClusterClient(clients)
+
+        res = cluster.disable_server('app1.example.com', max_retries=3)
+
+        for client in clients.values():
+            client.disable_server.assert_called_once_with('app1.example.com', max_retries=3)
+        assert ['a'] == res.succeeded, 'Expected first LB to succeed'
+        assert ['b'] == res.failed, 'Expected second LB to fail'
+        assert not res.ok, 'Expected all policy to fail'
+        assert 'disable_server' == res.operation
+
+    def test_get_status_quorum(self):
+        clients = _clients('a', 'b', 'c')
+        clients['a'].get_status.return_value = 'enabled'
+        clients['b'].get_status.return_value = 'enabled'
+        clients['c'].get_status.side_effect = ValueError('nope')
+        cluster = warthog.cluster.WarthogClusterClient(
+            clients, policy=warthog.cluster.POLICY_QUORUM)
+
+        res = cluster.get_status('app1.example.com')
+
+        assert res.ok, 'Expected quorum to succeed'
+        assert ['a', 'b', 'c'] == list(res.results), 'Expected results in LB order'
+        assert {'a': 'enabled', 'b': 'enabled'} == dict(res.values)
+
+    def test_close_closes_every_client(self):
+        clients = _clients('a', 'b')
+
+        with warthog.cluster.WarthogClusterClient(clients):
+            pass
+
+        for client in clients.values():
+            client.close.assert_called_once_with()
+
+
+def test_get_cluster_client():
+    settings = collections.OrderedDict([
+        ('dc1', warthog.config.WarthogConfigSettings(
+            'https://lb1.example.com', 'user', 'pass', True, None)),
+        ('dc2', warthog.config.WarthogConfigSettings(
+            'https://lb2.example.com', 'user', 'pass', False, None)),
+    ])
+
+    with warthog.cluster.get_cluster_client(settings, session_reuse=True) as cluster:
+        assert ['dc1', 'dc2'] == cluster.names, 'Expected a client per load balancer'
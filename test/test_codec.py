@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+import mock
+import pytest
+import requests
+
+import warthog.codec
+import warthog.core
+
+PAYLOAD = {'server': {'name': 'app1.example.com', 'stats': {'curr-conn': 12}}}
+
+
+@pytest.fixture(autouse=True)
+def restore_codec(request):
+    codec = warthog.codec._codec
+    request.addfinalizer(lambda: setattr(warthog.codec, '_codec', codec))
+
+
+def test_stdlib_codec_round_trip():
+    codec = warthog.codec.StdlibCodec()
+
+    assert PAYLOAD == codec.loads(codec.dumps(PAYLOAD)), 'Expected payload to round trip'
+    assert PAYLOAD == codec.loads(json.dumps(PAYLOAD)), 'Expected text to be decoded'
+
+
+def test_orjson_codec_round_trip():
+    pytest.importorskip('orjson')
+    codec = warthog.codec.get_codec_by_name('orjson')
+
+    assert PAYLOAD == codec.loads(codec.dumps(PAYLOAD)), 'Expected payload to round trip'
+
+
+def test_get_codec_by_name_unknown():
+    with pytest.raises(ValueError):
+        warthog.codec.get_codec_by_name('yaml')
+
+
+def test_set_codec_by_name():
+    codec = warthog.codec.set_codec('json')
+
+    assert isinstance(codec, warthog.codec.StdlibCodec), 'Did not get expected codec'
+    assert codec is warthog.codec.get_codec(), 'Expected codec to be used by default'
+
+
+def test_default_codec_falls_back_to_stdlib():
+    with mock.patch.object(warthog.codec, 'DEFAULT_CODECS', ('not-installed', 'json')):
+        with mock.patch.dict(warthog.codec._CODECS, {'not-installed': mock.Mock(
+                side_effect=ImportError)}):
+            codec = warthog.codec.set_codec(None)
+
+    assert isinstance(codec, warthog.codec.StdlibCodec), 'Expected stdlib codec as fallback'
+
+
+def test_commands_decode_with_codec():
+    codec = mock.Mock(spec=warthog.codec.JsonCodec)
+    codec.loads.return_value = PAYLOAD
+    warthog.codec.set_codec(codec)
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(PAYLOAD).encode('utf-8')
+    transport = mock.Mock(spec=requests.Session)
+    transport.get.return_value = response
+
+    cmd = warthog.core.NodeActiveConnectionsCommand(
+        transport, 'https://lb.example.com', '1234', 'app1.example.com')
+
+    assert 12 == cmd.send(), 'Did not get expected active connections'
+    codec.loads.assert_called_once_with(response.content)
+
+
+def test_commands_encode_with_codec():
+    codec = mock.Mock(spec=warthog.codec.JsonCodec)
+    codec.dumps.return_value = b'{"encoded":true}'
+    codec.loads.return_value = {'server': {'action': 'enable'}}
+    warthog.codec.set_codec(codec)
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{}'
+    transport = mock.Mock(spec=requests.Session)
+    transport.post.return_value = response
+
+    cmd = warthog.core.NodeEnableCommand(
+        transport, 'https://lb.example.com', '1234', 'app1.example.com')
+    cmd.send()
+
+    codec.dumps.assert_called_once_with(cmd._params())
+    kwargs = transport.post.call_args[1]
+    assert b'{"encoded":true}' == kwargs['data'], 'Expected body encoded by the codec'
+    assert 'json' not in kwargs, 'Expected body not to be encoded again'
+    assert 'application/json' == kwargs['headers']['Content-Type']
+    assert 'A10 1234' == kwargs['headers']['Authorization'], 'Expected headers to be kept'
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+import warthog.concurrency
+
+
+def test_operation_result_ok():
+    result = warthog.concurrency.OperationResult(42, None)
+
+    assert result.ok, 'Expected result without error to be ok'
+    assert 42 == result.get(), 'Did not get expected value'
+
+
+def test_operation_result_error():
+    result = warthog.concurrency.OperationResult(None, ValueError('Bad!'))
+
+    assert not result.ok, 'Expected result with error to not be ok'
+    with pytest.raises(ValueError):
+        result.get()
+
+
+def test_unique_preserves_order():
+    assert ['b', 'a', 'c'] == warthog.concurrency.unique(['b', 'a', 'b', 'c', 'a'])
+
+
+def test_run_concurrently_preserves_order():
+    results = warthog.concurrency.run_concurrently(lambda x: x * 2, range(20), max_workers=4)
+
+    assert [x * 2 for x in range(20)] == [r.value for r in results]
+
+
+def test_run_concurrently_captures_errors():
+    def func(x):
+        if x == 3:
+            raise ValueError('Three!')
+        return x
+
+    results = warthog.concurrency.run_concurrently(func, range(5), max_workers=2)
+
+    assert isinstance(results[3].error, ValueError), 'Expected error to be captured'
+    assert [0, 1, 2, 4] == [r.value for r in results if r.ok]
+
+
+def test_run_concurrently_bounded_workers():
+    lock = threading.Lock()
+    state = {'active': 0, 'max': 0}
+    barrier = threading.Event()
+
+    def func(_):
+        with lock:
+            state['active'] += 1
+            state['max'] = max(state['max'], state['active'])
+        barrier.wait(0.05)
+        with lock:
+            state['active'] -= 1
+
+    warthog.concurrency.run_concurrently(func, range(12), max_workers=3)
+
+    assert 3 == state['max'], 'Expected at most three concurrent calls'
+
+
+def test_run_concurrently_no_items():
+    assert [] == warthog.concurrency.run_concurrently(lambda x: x, [])
@@ -40,6 +40,65 @@ class TestWarthogConfigLoader(object):
         assert None is settings.ssl_version
 
 
+    def test_get_cluster_settings_not_parsed_yet(self):
+        parser = mock.Mock(spec=warthog.config.WarthogConfigParser)
+        loader = warthog.config.WarthogConfigLoader(config_file='warthog.ini', config_parser=parser)
+
+        with pytest.raises(RuntimeError):
+            loader.get_cluster_settings()
+
+
+_CLUSTER_CONFIG = u'''
+[warthog]
+scheme_host = https://lb.example.com
+username = user
+password = pass
+verify = no
+
+[warthog:dc1]
+scheme_host = https://lb1.example.com
+
+[other]
+scheme_host = https://other.example.com
+
+[warthog:dc2]
+scheme_host = https://lb2.example.com
+username = other
+verify = yes
+'''
+
+
+class TestWarthogConfigParserCluster(object):
+    def _parse(self, tmpdir, contents):
+        path = tmpdir.join('warthog.ini')
+        path.write_text(contents, 'utf-8')
+        parser = warthog.config.WarthogConfigParser(configparser.SafeConfigParser())
+        parser.parse(str(path), 'utf-8', [])
+        return parser.parse_cluster()
+
+    def test_parse_cluster_sections_in_order(self, tmpdir):
+        settings = self._parse(tmpdir, _CLUSTER_CONFIG)
+
+        assert ['dc1', 'dc2'] == list(settings), 'Expected only warthog sections, in order'
+        assert 'https://lb1.example.com' == settings['dc1'].scheme_host
+        assert 'https://lb2.example.com' == settings['dc2'].scheme_host
+
+    def test_parse_cluster_falls_back_to_main_section(self, tmpdir):
+        settings = self._parse(tmpdir, _CLUSTER_CONFIG)
+
+        assert 'user' == settings['dc1'].username, 'Expected username from [warthog]'
+        assert 'pass' == settings['dc1'].password, 'Expected password from [warthog]'
+        assert False is settings['dc1'].verify, 'Expected verify from [warthog]'
+        assert 'other' == settings['dc2'].username, 'Expected username from [warthog:dc2]'
+        assert 'pass' == settings['dc2'].password, 'Expected password from [warthog]'
+        assert True is settings['dc2'].verify, 'Expected verify from [warthog:dc2]'
+
+    def test_parse_cluster_no_sections(self, tmpdir):
+        settings = self._parse(tmpdir, _CLUSTER_CONFIG.split('[warthog:dc1]')[0])
+
+        assert {} == settings, 'Expected no load balancers'
+
+
 class TestWarthogConfigParser(object):
     def test_parse_no_config_file(self):
         parser_impl = mock.Mock(spec=configparser.SafeConfigParser)
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import json
+import logging
+
 import mock
 import pytest
 import requests
@@ -185,6 +188,36 @@ NODE_ALTER = {
     }
 }
 
+NODE_OPER_LIST = {
+    "server-list": [
+        {
+            "oper": {"state": "Up"},
+            "a10-url": "/axapi/v3/slb/server/app1.example.com/oper",
+            "name": "app1.example.com"
+        },
+        {
+            "oper": {"state": "Disabled"},
+            "a10-url": "/axapi/v3/slb/server/app2.example.com/oper",
+            "name": "app2.example.com"
+        }
+    ]
+}
+
+NODE_STATS_LIST = {
+    "server-list": [
+        {
+            "stats": {"curr-conn": 12, "total-conn": 100},
+            "a10-url": "/axapi/v3/slb/server/app1.example.com/stats",
+            "name": "app1.example.com"
+        },
+        {
+            "stats": {"curr-conn": 0, "total-conn": 100},
+            "a10-url": "/axapi/v3/slb/server/app2.example.com/stats",
+            "name": "app2.example.com"
+        }
+    ]
+}
+
 SCHEME_HOST = 'https://lb.example.com'
 
 
@@ -557,3 +590,300 @@ class TestNodeActiveConnectionsCommand(object):
         connections = cmd.send()
         assert 42 == connections, 'Did not get expected active connections'
         assert transport.get.called, 'Expected transport ".get() to be called'
+
+
+class TestNodeStatusListCommand(object):
+    def test_send_invalid_session(self, transport, response):
+        response.text = ''
+        response.status_code = 401
+        response.ok = False
+        response.json.return_value = dict(INVALID_SESSION)
+
+        with pytest.raises(warthog.exceptions.WarthogInvalidSessionError):
+            cmd = warthog.core.NodeStatusListCommand(transport, SCHEME_HOST, '1234')
+            cmd.send()
+
+        assert transport.get.called, 'Expected transport ".get() to be called'
+
+    def test_send_success(self, transport, response):
+        response.text = ''
+        response.status_code = 200
+        response.ok = True
+        response.json.return_value = dict(NODE_OPER_LIST)
+
+        cmd = warthog.core.NodeStatusListCommand(transport, SCHEME_HOST, '1234')
+        status = cmd.send()
+
+        assert {
+            'app1.example.com': warthog.core.STATUS_ENABLED,
+            'app2.example.com': warthog.core.STATUS_DISABLED
+        } == status, 'Did not get expected status of all servers'
+        transport.get.assert_called_once_with(
+            SCHEME_HOST + '/axapi/v3/slb/server/oper', headers={'Authorization': 'A10 1234'})
+
+    def test_send_no_servers(self, transport, response):
+        response.text = ''
+        response.status_code = 200
+        response.ok = True
+        response.json.return_value = {}
+
+        cmd = warthog.core.NodeStatusListCommand(transport, SCHEME_HOST, '1234')
+        assert {} == cmd.send(), 'Expected no servers'
+
+
+class TestNodeActiveConnectionsListCommand(object):
+    def test_send_unknown_error(self, transport, response):
+        response.text = ''
+        response.status_code = 503
+        response.ok = False
+        response.json.return_value = dict(SOME_CRAZY_ERROR)
+
+        with pytest.raises(warthog.exceptions.WarthogApiError):
+            cmd = warthog.core.NodeActiveConnectionsListCommand(transport, SCHEME_HOST, '1234')
+            cmd.send()
+
+        assert transport.get.called, 'Expected transport ".get() to be called'
+
+    def test_send_success(self, transport, response):
+        response.text = ''
+        response.status_code = 200
+        response.ok = True
+        response.json.return_value = dict(NODE_STATS_LIST)
+
+        cmd = warthog.core.NodeActiveConnectionsListCommand(transport, SCHEME_HOST, '1234')
+        connections = cmd.send()
+
+        assert {'app1.example.com': 12, 'app2.example.com': 0} == connections, \
+            'Did not get expected active connections for all servers'
+        transport.get.assert_called_once_with(
+            SCHEME_HOST + '/axapi/v3/slb/server/stats', headers={'Authorization': 'A10 1234'})
+
+
+class TestResponseLogging(object):
+    @pytest.fixture
+    def logger(self, request):
+        logger = warthog.core.get_log()
+        level = logger.level
+        request.addfinalizer(lambda: logger.setLevel(level))
+        request.addfinalizer(lambda: warthog.core.set_log_body_limit(
+            warthog.core.DEFAULT_LOG_BODY_LIMIT))
+        return logger
+
+    @pytest.fixture
+    def records(self, logger, request):
+        records = []
+        handler = logging.Handler(level=logging.DEBUG)
+        handler.emit = records.append
+        logger.addHandler(handler)
+        request.addfinalizer(lambda: logger.removeHandler(handler))
+        return records
+
+    def test_body_not_decoded_when_debug_disabled(self, logger, transport, response):
+        logger.setLevel(logging.INFO)
+        text = mock.PropertyMock(return_value='')
+        type(response).text = text
+        response.status_code = 200
+        response.ok = True
+        response.json.return_value = dict(AUTH_SUCCESS)
+
+        cmd = warthog.core.SessionStartCommand(transport, SCHEME_HOST, 'user', 'password')
+        cmd.send()
+
+        assert not text.called, 'Expected response body not to be decoded'
+
+    def test_signature_redacted(self, logger, records, transport, response):
+        logger.setLevel(logging.DEBUG)
+        response.text = json.dumps(AUTH_SUCCESS)
+        response.status_code = 200
+        response.ok = True
+        response.json.return_value = dict(AUTH_SUCCESS)
+
+        cmd = warthog.core.SessionStartCommand(transport, SCHEME_HOST, 'user', 'password')
+        cmd.send()
+
+        record = [r for r in records if hasattr(r, 'warthog_body')][0]
+        message = record.getMessage()
+        assert 'ad44c3dfbac9440da876e7b3feaf1fc' not in message, 'Expected signature redacted'
+        assert '"signature": "<redacted>"' in message, 'Expected redaction marker'
+        assert 200 == record.warthog_status, 'Expected status code as a structured field'
+        assert 'SessionStartCommand' == record.warthog_command, 'Expected command field'
+
+    def test_body_truncated(self, logger, records, transport, response):
+        logger.setLevel(logging.DEBUG)
+        warthog.core.set_log_body_limit(10)
+        response.text = json.dumps(NODE_STATS_LIST)
+        response.status_code = 200
+        response.ok = True
+        response.json.return_value = dict(NODE_STATS_LIST)
+
+        cmd = warthog.core.NodeActiveConnectionsListCommand(transport, SCHEME_HOST, '1234')
+        cmd.send()
+
+        body = str([r for r in records if hasattr(r, 'warthog_body')][0].warthog_body)
+        assert body.startswith(response.text[:10]), 'Expected start of body to be logged'
+        assert 'more characters' in body, 'Expected body to be truncated'
+
+
+class TestErrorHandlers(object):
+    @pytest.fixture(autouse=True)
+    def restore_handlers(self, request):
+        handlers = warthog.core._error_handlers
+        request.addfinalizer(lambda: setattr(warthog.core, '_error_handlers', handlers))
+
+    def test_error_payload_decoded_once(self, transport, response):
+        response.text = ''
+        response.status_code = 404
+        response.ok = False
+        response.json.return_value = dict(NO_SUCH_SERVER)
+
+        with pytest.raises(warthog.exceptions.WarthogNoSuchNodeError):
+            cmd = warthog.core.NodeStatusCommand(
+                transport, SCHEME_HOST, '1234', 'app1.example.com')
+            cmd.send()
+
+        assert 1 == response.json.call_count, 'Expected payload to be decoded a single time'
+
+    def test_registered_handler_for_api_code(self, transport, response):
+        response.text = ''
+        response.status_code = 503
+        response.ok = False
+        response.json.return_value = dict(SOME_CRAZY_ERROR)
+        calls = []
+
+        def handler(resp, payload, context):
+            calls.append((resp, payload, context))
+            raise warthog.exceptions.WarthogNodeError('Busy', server=context.server)
+
+        warthog.core.register_error_handler(503, 10001, handler)
+
+        with pytest.raises(warthog.exceptions.WarthogNodeError):
+            cmd = warthog.core.NodeDisableCommand(
+                transport, SCHEME_HOST, '1234', 'app1.example.com')
+            cmd.send()
+
+        _, payload, context = calls[0]
+        assert SOME_CRAZY_ERROR == payload, 'Expected decoded payload to be passed to handler'
+        assert warthog.core.ResponseContext(
+            SCHEME_HOST, None, '1234', 'app1.example.com') == context, \
+            'Did not get expected response context'
+
+    def test_registered_handler_can_return_payload(self, transport, response):
+        response.text = ''
+        response.status_code = 400
+        response.ok = False
+        response.json.return_value = dict(SOME_CRAZY_ERROR)
+
+        warthog.core.register_error_handler(
+            400, None, lambda resp, payload, context: {'response': {'status': 'OK'}})
+
+        cmd = warthog.core.SessionEndCommand(transport, SCHEME_HOST, '1234')
+        assert cmd.send(), 'Expected payload returned by handler to be used'
+
+    def test_specific_handler_takes_precedence(self, transport, response):
+        response.text = ''
+        response.status_code = 404
+        response.ok = False
+        response.json.return_value = dict(NO_SUCH_SERVER)
+
+        warthog.core.register_error_handler(404, None, mock.Mock(side_effect=RuntimeError))
+
+        with pytest.raises(warthog.exceptions.WarthogNoSuchNodeError):
+            cmd = warthog.core.NodeStatusCommand(
+                transport, SCHEME_HOST, '1234', 'app1.example.com')
+            cmd.send()
+
+
+class TestDeadline(object):
+    def test_remaining(self):
+        clock = mock.Mock(return_value=10.0)
+        deadline = warthog.core.Deadline(5.0, clock=clock)
+
+        clock.return_value = 12.0
+        assert 3.0 == deadline.remaining()
+        assert not deadline.expired()
+
+        clock.return_value = 16.0
+        assert 0.0 == deadline.remaining()
+        with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc:
+            deadline.check(warthog.core.PHASE_POLLING)
+
+        assert warthog.core.PHASE_POLLING == exc.value.phase
+        assert 5.0 == exc.value.timeout
+
+    def test_context_restores_previous(self):
+        outer = warthog.core.Deadline(10.0)
+        inner = warthog.core.Deadline(1.0)
+
+        with warthog.core.deadline_context(outer):
+            with warthog.core.deadline_context(inner):
+                assert inner is warthog.core.get_deadline()
+            with warthog.core.deadline_context(None):
+                assert outer is warthog.core.get_deadline(), 'Expected deadline to be kept'
+            assert outer is warthog.core.get_deadline()
+
+        assert None is warthog.core.get_deadline()
+
+    def test_request_given_remaining_time(self, transport, response):
+        response.text = ''
+        response.status_code = 200
+        response.ok = True
+        response.json.return_value = dict(NODE_STATS)
+        clock = mock.Mock(return_value=0.0)
+
+        cmd = warthog.core.NodeActiveConnectionsCommand(
+            transport, SCHEME_HOST, '1234', 'app1.example.com')
+        with warthog.core.deadline_context(warthog.core.Deadline(4.0, clock=clock)):
+            clock.return_value = 1.5
+            cmd.send()
+
+        assert 2.5 == transport.get.call_args[1]['timeout'], \
+            'Expected time remaining to be used as the request timeout'
+
+    def test_no_request_after_deadline(self, transport):
+        clock = mock.Mock(return_value=0.0)
+        deadline = warthog.core.Deadline(1.0, clock=clock)
+        clock.return_value = 2.0
+
+        cmd = warthog.core.SessionStartCommand(transport, SCHEME_HOST, 'user', 'password')
+        with warthog.core.deadline_context(deadline, warthog.core.PHASE_ACTION):
+            with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc:
+                cmd.send()
+
+        assert warthog.core.PHASE_AUTH == exc.value.phase, 'Expected phase of the command'
+        assert not transport.post.called, 'Expected no request to be made'
+
+    def test_request_timeout_after_deadline(self, transport):
+        clock = mock.Mock(return_value=0.0)
+        deadline = warthog.core.Deadline(1.0, clock=clock)
+
+        def timeout(*args, **kwargs):
+            clock.return_value = 1.0
+            raise requests.exceptions.ReadTimeout()
+
+        transport.get.side_effect = timeout
+        cmd = warthog.core.NodeStatusCommand(transport, SCHEME_HOST, '1234', 'app1.example.com')
+        with warthog.core.deadline_context(deadline):
+            with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc:
+                cmd.send()
+
+        assert warthog.core.PHASE_ACTION == exc.value.phase
+
+    def test_request_timeout_before_deadline(self, transport):
+        transport.get.side_effect = requests.exceptions.ConnectTimeout()
+
+        cmd = warthog.core.NodeStatusCommand(transport, SCHEME_HOST, '1234', 'app1.example.com')
+        with warthog.core.deadline_context(warthog.core.Deadline(60.0)):
+            with pytest.raises(requests.exceptions.ConnectTimeout):
+                cmd.send()
+
+
+def test_percentile():
+    values = list(range(1, 101))
+
+    assert 50 == warthog.core.percentile(values, 50), 'Did not get expected median'
+    assert 99 == warthog.core.percentile(values, 99), 'Did not get expected p99'
+    assert 100 == warthog.core.percentile(values, 100), 'Did not get expected maximum'
+
+
+def test_percentile_no_values():
+    assert warthog.core.percentile([], 50) is None, 'Expected no percentile without values'
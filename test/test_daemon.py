@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+import os
+import socket
+import stat
+
+import mock
+import pytest
+
+import warthog.client
+import warthog.daemon
+import warthog.exceptions
+from warthog.concurrency import OperationResult
+
+
+@pytest.fixture
+def client():
+    client = mock.Mock(spec=warthog.client.WarthogClient)
+    client.get_status_many.side_effect = lambda servers, **_: dict(
+        (s, OperationResult('enabled', None)) for s in servers)
+    return client
+
+
+@pytest.fixture
+def daemon(request, tmpdir, client):
+    server = warthog.daemon.WarthogDaemon(
+        client, path=str(tmpdir.join('warthog.sock')), config='warthog.ini').start()
+    request.addfinalizer(server.stop)
+    return server
+
+
+class TestWarthogDaemon(object):
+    def test_request_status(self, daemon, client):
+        with warthog.daemon.get_daemon_client(daemon.path, config='warthog.ini') as conn:
+            results = conn.request('status', ['app1.example.com', 'app2.example.com'])
+
+        assert OperationResult('enabled', None) == results['app1.example.com']
+        assert OperationResult('enabled', None) == results['app2.example.com']
+        client.get_status_many.assert_called_once_with(
+            ['app1.example.com', 'app2.example.com'], max_workers=None)
+
+    def test_many_requests_one_connection(self, daemon, client):
+        with warthog.daemon.get_daemon_client(daemon.path, config='warthog.ini') as conn:
+            conn.request('status', ['app1.example.com'])
+            conn.request('status', ['app1.example.com'], max_workers=3)
+
+        assert 2 == client.get_status_many.call_count, 'Expected both requests handled'
+
+    def test_server_error_decoded(self, daemon, client):
+        client.get_connections_many.return_value = {
+            'app1.example.com': OperationResult(None, warthog.exceptions.WarthogNoSuchNodeError(
+                'No such server', server='app1.example.com')),
+        }
+
+        with warthog.daemon.get_daemon_client(daemon.path, config='warthog.ini') as conn:
+            results = conn.request('connections', ['app1.example.com'])
+
+        error = results['app1.example.com'].error
+        assert isinstance(error, warthog.exceptions.WarthogNoSuchNodeError), \
+            'Expected library exception to be rebuilt'
+        assert 'app1.example.com' == error.server
+
+    def test_operation_error_raised(self, daemon, client):
+        client.enable_servers.side_effect = warthog.exceptions.WarthogAuthFailureError('nope')
+
+        with warthog.daemon.get_daemon_client(daemon.path, config='warthog.ini') as conn:
+            with pytest.raises(warthog.exceptions.WarthogAuthFailureError):
+                conn.request('enable', ['app1.example.com'])
+
+    def test_other_error_raised_as_daemon_error(self, daemon, client):
+        client.disable_servers.side_effect = IOError('broken')
+
+        with warthog.daemon.get_daemon_client(daemon.path, config='warthog.ini') as conn:
+            with pytest.raises(warthog.exceptions.WarthogDaemonError) as exc:
+                conn.request('disable', ['app1.example.com'])
+
+        assert 'OSError' == exc.value.error_type or 'IOError' == exc.value.error_type
+
+    def test_socket_only_accessible_by_user(self, daemon):
+        mode = stat.S_IMODE(os.stat(daemon.path).st_mode)
+        assert 0 == mode & 0o077, 'Expected no access for group or others'
+
+    def test_already_listening(self, daemon, client):
+        other = warthog.daemon.WarthogDaemon(client, path=daemon.path)
+
+        with pytest.raises(RuntimeError):
+            other.start()
+
+    def test_stop_removes_socket(self, tmpdir, client):
+        path = str(tmpdir.join('warthog.sock'))
+        with warthog.daemon.WarthogDaemon(client, path=path):
+            assert os.path.exists(path), 'Expected socket to exist'
+
+        assert not os.path.exists(path), 'Expected socket to be removed'
+        client.close.assert_called_once_with()
+
+
+class TestGetDaemonClient(object):
+    def test_no_socket(self, tmpdir):
+        assert None is warthog.daemon.get_daemon_client(str(tmpdir.join('nope.sock')))
+
+    def test_stale_socket(self, tmpdir):
+        path = str(tmpdir.join('stale.sock'))
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+        sock.close()
+
+        assert None is warthog.daemon.get_daemon_client(path), 'Expected no daemon'
+
+    def test_different_config(self, daemon):
+        assert None is warthog.daemon.get_daemon_client(daemon.path, config='other.ini'), \
+            'Expected daemon using another config to be ignored'
+
+
+def test_get_socket_path():
+    with mock.patch.dict(os.environ, {warthog.daemon.SOCKET_ENV_VAR: '/tmp/env.sock'}):
+        assert '/tmp/explicit.sock' == warthog.daemon.get_socket_path('/tmp/explicit.sock')
+        assert '/tmp/env.sock' == warthog.daemon.get_socket_path()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import mock
+
+import warthog.core
+import warthog.drain
+import warthog.exceptions
+import warthog.wait
+
+
+class FakeLoadBalancer(object):
+    """Servers whose number of active connections decreases each time they're checked."""
+
+    def __init__(self, conns):
+        self.conns = dict(conns)
+        self.disabled = []
+        self.checks = []
+
+    def disable(self, server):
+        if server not in self.conns:
+            raise warthog.exceptions.WarthogNoSuchNodeError('No such node', server=server)
+        self.disabled.append(server)
+        return True
+
+    def connections(self, server):
+        self.checks.append(server)
+        current = self.conns[server]
+        self.conns[server] = max(0, current - 1)
+        return current
+
+    def status(self, server):
+        return warthog.core.STATUS_DISABLED if server in self.disabled else \
+            warthog.core.STATUS_ENABLED
+
+
+def _scheduler(lb, sleep, max_retries=5, **kwargs):
+    wait = warthog.wait.FixedIntervalWait(interval=1.0, max_retries=max_retries)
+    return warthog.drain.DrainScheduler(
+        lb.disable, lb.connections, lb.status, wait=wait, sleep=sleep, **kwargs)
+
+
+def test_drain_sleeps_for_slowest_server():
+    lb = FakeLoadBalancer({'app1': 0, 'app2': 2, 'app3': 4})
+    sleep = mock.Mock()
+
+    results = list(_scheduler(lb, sleep).drain(['app1', 'app2', 'app3']))
+
+    assert ['app1', 'app2', 'app3'] == [server for server, _ in results], \
+        'Expected results in the order servers finished draining'
+    assert all(result.value for _, result in results), 'Expected all servers to be disabled'
+    assert 4 == sleep.call_count, 'Expected to sleep only as long as the slowest server'
+
+
+def test_drain_in_waves():
+    lb = FakeLoadBalancer({'app1': 1, 'app2': 1, 'app3': 1})
+    sleep = mock.Mock()
+
+    results = list(_scheduler(lb, sleep, wave_size=2).drain(['app1', 'app2', 'app3']))
+
+    assert 3 == len(results), 'Expected a result for each server'
+    assert 2 == sleep.call_count, 'Expected each wave to be drained in turn'
+
+
+def test_drain_out_of_retries():
+    lb = FakeLoadBalancer({'app1': 10})
+    sleep = mock.Mock()
+
+    results = list(_scheduler(lb, sleep, max_retries=2).drain(['app1']))
+
+    assert [('app1', True)] == [(server, result.value) for server, result in results]
+    assert 2 == sleep.call_count, 'Expected to give up after max retries'
+
+
+def test_drain_captures_disable_errors():
+    lb = FakeLoadBalancer({'app1': 0})
+    sleep = mock.Mock()
+
+    results = dict(_scheduler(lb, sleep).drain(['app1', 'bad']))
+
+    assert results['app1'].value, 'Expected good server to be disabled'
+    assert isinstance(results['bad'].error, warthog.exceptions.WarthogNoSuchNodeError)
+    assert 'bad' not in lb.checks, 'Did not expect connections to be checked for bad server'
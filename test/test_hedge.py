@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import mock
+import pytest
+
+import warthog.client
+import warthog.exceptions
+import warthog.hedge
+import warthog.testing
+
+
+def _client():
+    return mock.Mock(spec=warthog.client.WarthogClient)
+
+
+def _blocked(release, value):
+    """Side effect that doesn't answer until released."""
+    def answer(*args):
+        release.wait(5)
+        return value
+    return answer
+
+
+@pytest.fixture
+def release(request):
+    event = threading.Event()
+    request.addfinalizer(event.set)
+    return event
+
+
+class TestHedgeDelay(object):
+    def test_initial_until_enough_samples(self):
+        delay = warthog.hedge.HedgeDelay(initial=0.25)
+        for _ in range(warthog.hedge.MIN_HEDGE_SAMPLES - 1):
+            delay.record(0.01)
+
+        assert 0.25 == delay.get(), 'Expected initial delay'
+
+    def test_percentile_of_recent_latencies(self):
+        delay = warthog.hedge.HedgeDelay(percentile=90, window=10)
+        for i in range(1, 21):
+            delay.record(i / 100.0)
+
+        assert 0.19 == delay.get(), 'Expected 90th percentile of the last ten latencies'
+
+    def test_invalid_percentile(self):
+        with pytest.raises(ValueError):
+            warthog.hedge.HedgeDelay(percentile=0)
+
+
+class TestHedgedWarthogClient(object):
+    def test_fast_primary_not_hedged(self):
+        primary, secondary = _client(), _client()
+        primary.get_status.return_value = 'enabled'
+
+        client = warthog.hedge.HedgedWarthogClient(
+            primary, secondary, delay=warthog.hedge.HedgeDelay(initial=5.0))
+
+        assert 'enabled' == client.get_status('app1.example.com')
+        assert not secondary.get_status.called, 'Expected read to not be hedged'
+
+    def test_slow_primary_hedged(self, release):
+        primary, secondary = _client(), _client()
+        primary.get_connections.side_effect = _blocked(release, 1)
+        secondary.get_connections.return_value = 2
+
+        client = warthog.hedge.HedgedWarthogClient(
+            primary, secondary, delay=warthog.hedge.HedgeDelay(initial=0.01))
+
+        assert 2 == client.get_connections('app1.example.com'), 'Expected secondary to win'
+        secondary.get_connections.assert_called_once_with('app1.example.com')
+
+    def test_hedged_error_uses_other_answer(self, release):
+        primary, secondary = _client(), _client()
+        primary.get_status.side_effect = _blocked(release, 'disabled')
+        secondary.get_status.side_effect = warthog.exceptions.WarthogApiError('broken')
+
+        client = warthog.hedge.HedgedWarthogClient(
+            primary, secondary, delay=warthog.hedge.HedgeDelay(initial=0.01))
+
+        threading.Timer(0.05, release.set).start()
+        assert 'disabled' == client.get_status('app1.example.com'), \
+            'Expected primary answer when secondary failed'
+
+    def test_both_fail_raises_primary_error(self, release):
+        primary, secondary = _client(), _client()
+        error = warthog.exceptions.WarthogNoSuchNodeError('nope', server='app1.example.com')
+
+        def fail(*args):
+            release.wait(5)
+            raise error
+
+        primary.get_status.side_effect = fail
+        secondary.get_status.side_effect = warthog.exceptions.WarthogApiError('broken')
+
+        client = warthog.hedge.HedgedWarthogClient(
+            primary, secondary, delay=warthog.hedge.HedgeDelay(initial=0.01))
+
+        threading.Timer(0.05, release.set).start()
+        with pytest.raises(warthog.exceptions.WarthogNoSuchNodeError):
+            client.get_status('app1.example.com')
+
+    def test_primary_latency_recorded(self):
+        primary, secondary = _client(), _client()
+        delay = mock.Mock(spec=warthog.hedge.HedgeDelay)
+        delay.get.return_value = 5.0
+
+        client = warthog.hedge.HedgedWarthogClient(primary, secondary, delay=delay)
+        client.get_snapshot(['app1.example.com'])
+
+        assert delay.record.called, 'Expected latency of primary to be recorded'
+        primary.get_snapshot.assert_called_once_with(['app1.example.com'])
+
+    def test_writes_never_hedged(self):
+        primary, secondary = _client(), _client()
+        client = warthog.hedge.HedgedWarthogClient(
+            primary, secondary, delay=warthog.hedge.HedgeDelay(initial=0.0))
+
+        client.disable_server('app1.example.com', max_retries=0)
+        client.enable_server('app1.example.com')
+
+        primary.disable_server.assert_called_once_with('app1.example.com', max_retries=0)
+        primary.enable_server.assert_called_once_with('app1.example.com')
+        assert not secondary.method_calls, 'Expected no calls to the secondary'
+
+    def test_close_closes_both(self):
+        primary, secondary = _client(), _client()
+        with warthog.hedge.HedgedWarthogClient(primary, secondary):
+            pass
+
+        assert primary.close.called and secondary.close.called, 'Expected both closed'
+
+
+def test_get_hedged_client_against_simulators():
+    with warthog.testing.LoadBalancerSimulator() as primary:
+        with warthog.testing.LoadBalancerSimulator() as secondary:
+            for sim in (primary, secondary):
+                sim.add_server('app1.example.com', connections=4)
+
+            with warthog.hedge.get_hedged_client(
+                    primary.scheme_host, secondary.scheme_host, primary.username,
+                    primary.password, initial_delay=5.0) as client:
+                assert 4 == client.get_connections('app1.example.com')
+                assert 4 == client.get_connections('app1.example.com')
+
+            assert 1 == primary.requests['/axapi/v3/auth'], 'Expected session to be reused'
+            assert 0 == secondary.requests['/axapi/v3/auth'], 'Expected no hedged reads'
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+import json
+import sys
+
+import mock
+import pytest
+import requests
+
+import warthog.core
+import warthog.exceptions
+import warthog.hooks
+
+SCHEME_HOST = 'https://lb.example.com'
+
+NODE_OPER = {'server': {'oper': {'state': 'Up'}, 'name': 'app1.example.com'}}
+
+
+def _event(**kwargs):
+    values = dict(
+        command='NodeStatusCommand', server='app1.example.com', method='GET',
+        path='/axapi/v3/slb/server/app1.example.com/oper', status_code=200, bytes=64,
+        elapsed=0.25, server_time=0.2, retries=0, error=None, queue_wait=0.0)
+    values.update(kwargs)
+    return warthog.hooks.RequestEvent(**values)
+
+
+@pytest.fixture
+def registry(request):
+    registry = warthog.hooks.get_hooks()
+    registry.clear()
+    request.addfinalizer(registry.clear)
+    return registry
+
+
+@pytest.fixture
+def response():
+    response = mock.Mock(spec=requests.Response)
+    response.text = ''
+    response.content = b'{"server": {}}'
+    response.elapsed = datetime.timedelta(milliseconds=20)
+    response.raw = mock.Mock()
+    response.raw.retries.history = (mock.Mock(),)
+    return response
+
+
+@pytest.fixture
+def transport(response):
+    transport = mock.Mock(spec=requests.Session)
+    transport.get.return_value = response
+    transport.post.return_value = response
+    return transport
+
+
+class TestHookRegistry(object):
+    def test_emit_calls_hooks_in_order(self):
+        registry = warthog.hooks.HookRegistry()
+        calls = []
+        registry.register(lambda e: calls.append(('first', e)))
+        registry.register(lambda e: calls.append(('second', e)))
+
+        event = _event()
+        registry.emit(event)
+
+        assert [('first', event), ('second', event)] == calls, 'Expected hooks called in order'
+
+    def test_unregister(self):
+        registry = warthog.hooks.HookRegistry()
+        hook = mock.Mock()
+        registry.register(hook)
+        registry.unregister(hook)
+        registry.emit(_event())
+
+        assert not hook.called, 'Expected unregistered hook not to be called'
+        assert 0 == len(registry), 'Expected no hooks to be registered'
+
+    def test_emit_hook_errors_ignored(self):
+        registry = warthog.hooks.HookRegistry()
+        hook = mock.Mock()
+        registry.register(mock.Mock(side_effect=RuntimeError('AHH!')))
+        registry.register(hook)
+        registry.emit(_event())
+
+        assert hook.called, 'Expected hooks after a failing hook to be called'
+
+
+class TestCommandEvents(object):
+    def test_success_event(self, registry, transport, response):
+        response.status_code = 200
+        response.ok = True
+        response.content = json.dumps(NODE_OPER).encode('utf-8')
+        events = []
+        registry.register(events.append)
+
+        cmd = warthog.core.NodeStatusCommand(transport, SCHEME_HOST, '1234', 'app1.example.com')
+        cmd.send()
+
+        assert 1 == len(events), 'Expected a single event'
+        event = events[0]
+        assert 'NodeStatusCommand' == event.command, 'Did not get expected command'
+        assert 'app1.example.com' == event.server, 'Did not get expected server'
+        assert 'GET' == event.method, 'Did not get expected method'
+        assert '/axapi/v3/slb/server/app1.example.com/oper' == event.path
+        assert 200 == event.status_code, 'Did not get expected status code'
+        assert len(response.content) == event.bytes, 'Did not get expected size'
+        assert 0.02 == event.server_time, 'Did not get expected server time'
+        assert 1 == event.retries, 'Did not get expected retries'
+        assert event.error is None, 'Expected no error'
+
+    def test_transport_error_event(self, registry, transport):
+        transport.post.side_effect = requests.ConnectionError('Nope')
+        events = []
+        registry.register(events.append)
+
+        cmd = warthog.core.SessionStartCommand(transport, SCHEME_HOST, 'user', 'password')
+        with pytest.raises(requests.ConnectionError):
+            cmd.send()
+
+        assert 'ConnectionError' == events[0].error, 'Did not get expected error'
+        assert events[0].status_code is None, 'Expected no status code'
+
+    def test_api_error_event(self, registry, transport, response):
+        response.status_code = 401
+        response.ok = False
+        response.content = json.dumps({
+            'authorizationschema': {'code': 401, 'error': 'Invalid admin session.'}
+        }).encode('utf-8')
+        events = []
+        registry.register(events.append)
+
+        cmd = warthog.core.NodeActiveConnectionsCommand(
+            transport, SCHEME_HOST, '1234', 'app1.example.com')
+        with pytest.raises(warthog.exceptions.WarthogInvalidSessionError):
+            cmd.send()
+
+        assert 401 == events[0].status_code, 'Did not get expected status code'
+        assert 'WarthogInvalidSessionError' == events[0].error, 'Did not get expected error'
+
+
+class TestStatsdHook(object):
+    def test_sends_timer_and_status(self):
+        sock = mock.Mock()
+        hook = warthog.hooks.StatsdHook('statsd.example.com', 8125, prefix='lb', sock=sock)
+        hook(_event())
+
+        data, address = sock.sendto.call_args[0]
+        assert ('statsd.example.com', 8125) == address, 'Did not get expected address'
+        assert b'lb.NodeStatusCommand.time:250.000|ms\n' \
+               b'lb.NodeStatusCommand.status.200:1|c' == data, 'Did not get expected metrics'
+
+    def test_sends_error_without_response(self):
+        sock = mock.Mock()
+        hook = warthog.hooks.StatsdHook(sock=sock)
+        hook(_event(status_code=None, error='ConnectionError'))
+
+        data, _ = sock.sendto.call_args[0]
+        assert b'warthog.NodeStatusCommand.status.ConnectionError:1|c' in data
+
+    def test_sends_queue_wait(self):
+        sock = mock.Mock()
+        hook = warthog.hooks.StatsdHook(prefix='lb', sock=sock)
+        hook(_event(queue_wait=0.5))
+
+        data, _ = sock.sendto.call_args[0]
+        assert data.endswith(b'\nlb.NodeStatusCommand.queue_wait:500.000|ms'), \
+            'Expected queue wait timer for queued requests'
+
+
+class TestPrometheusHook(object):
+    def test_observes_elapsed_time(self):
+        prometheus_client = pytest.importorskip('prometheus_client')
+        registry = prometheus_client.CollectorRegistry()
+        hook = warthog.hooks.PrometheusHook(registry=registry)
+        hook(_event())
+
+        count = registry.get_sample_value(
+            'warthog_request_duration_seconds_count',
+            {'command': 'NodeStatusCommand', 'method': 'GET', 'status': '200'})
+        assert 1 == count, 'Expected a single observation'
+
+    def test_observes_only_queued_requests(self):
+        prometheus_client = mock.Mock()
+        prometheus_client.Histogram.side_effect = lambda *args, **kwargs: mock.Mock()
+        with mock.patch.dict(sys.modules, {'prometheus_client': prometheus_client}):
+            hook = warthog.hooks.PrometheusHook()
+        hook(_event())
+        hook(_event(queue_wait=0.5))
+
+        assert [mock.call(0.5)] == hook.queue_wait.labels.return_value.observe.call_args_list, \
+            'Expected queue wait observed only for queued requests'
+
+    def test_requires_prometheus_client(self):
+        with mock.patch.dict(sys.modules, {'prometheus_client': None}):
+            with pytest.raises(ImportError) as exc:
+                warthog.hooks.PrometheusHook()
+
+        assert 'warthog[prometheus]' in str(exc.value), 'Expected extra to install in error'
+
+    def test_prometheus_client_not_imported_with_module(self):
+        assert not hasattr(warthog.hooks, 'prometheus_client'), \
+            'Expected prometheus_client to only be imported by the hook'
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import warthog.client
+import warthog.core
+import warthog.exceptions
+import warthog.hooks
+import warthog.ratelimit
+import warthog.testing
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestGetRequestKind(object):
+    def test_auth(self):
+        assert warthog.ratelimit.KIND_AUTH == warthog.ratelimit.get_request_kind(
+            'POST', 'https://lb.example.com/axapi/v3/auth')
+
+    def test_read(self):
+        assert warthog.ratelimit.KIND_READ == warthog.ratelimit.get_request_kind(
+            'GET', 'https://lb.example.com/axapi/v3/slb/server/app1/oper')
+
+    def test_write(self):
+        assert warthog.ratelimit.KIND_WRITE == warthog.ratelimit.get_request_kind(
+            'POST', 'https://lb.example.com/axapi/v3/slb/server/app1')
+        assert warthog.ratelimit.KIND_WRITE == warthog.ratelimit.get_request_kind(
+            'POST', 'https://lb.example.com/axapi/v3/logoff')
+
+
+class TestTokenBucket(object):
+    def test_burst_without_waiting(self, clock):
+        bucket = warthog.ratelimit.TokenBucket(2.0, 3, clock=clock)
+
+        assert [0.0, 0.0, 0.0] == [bucket.reserve() for _ in range(3)]
+
+    def test_queued_in_order(self, clock):
+        bucket = warthog.ratelimit.TokenBucket(2.0, 1, clock=clock)
+
+        waits = [bucket.reserve() for _ in range(4)]
+        assert [0.0, 0.5, 1.0, 1.5] == waits, 'Expected each caller to wait behind the last'
+
+    def test_refills_over_time(self, clock):
+        bucket = warthog.ratelimit.TokenBucket(2.0, 2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        clock.now = 0.5
+        assert 0.0 == bucket.reserve()
+        assert 0.5 == bucket.reserve()
+
+    def test_refill_limited_to_burst(self, clock):
+        bucket = warthog.ratelimit.TokenBucket(2.0, 2, clock=clock)
+        clock.now = 100.0
+
+        assert [0.0, 0.0, 0.5] == [bucket.reserve() for _ in range(3)]
+
+    def test_release_gives_token_back(self, clock):
+        bucket = warthog.ratelimit.TokenBucket(2.0, 1, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+        bucket.release()
+
+        assert 0.5 == bucket.reserve(), 'Expected released token to be reused'
+
+    def test_release_limited_to_burst(self, clock):
+        bucket = warthog.ratelimit.TokenBucket(2.0, 1, clock=clock)
+        bucket.release()
+
+        assert [0.0, 0.5] == [bucket.reserve() for _ in range(2)]
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            warthog.ratelimit.TokenBucket(0, 1)
+        with pytest.raises(ValueError):
+            warthog.ratelimit.TokenBucket(1.0, 0)
+
+
+class TestRateLimiter(object):
+    def test_auth_limited_separately(self, clock):
+        limiter = warthog.ratelimit.RateLimiter(
+            'https://lb.example.com', rate=100.0, burst=100, clock=clock, sleep=clock.sleep)
+
+        assert 0.0 == limiter.acquire(warthog.ratelimit.KIND_AUTH)
+        for _ in range(warthog.ratelimit.DEFAULT_AUTH_BURST - 1):
+            limiter.acquire(warthog.ratelimit.KIND_AUTH)
+
+        assert 0.5 == limiter.acquire(warthog.ratelimit.KIND_AUTH)
+        assert 0.0 == limiter.acquire(warthog.ratelimit.KIND_READ), \
+            'Expected reads not to wait behind session starts'
+        assert [0.5] == clock.sleeps
+
+    def test_overall_limit_applies_to_every_kind(self, clock):
+        limiter = warthog.ratelimit.RateLimiter(
+            'https://lb.example.com', rate=1.0, burst=1, limits={}, clock=clock,
+            sleep=clock.sleep)
+
+        assert 0.0 == limiter.acquire(warthog.ratelimit.KIND_READ)
+        assert 1.0 == limiter.acquire(warthog.ratelimit.KIND_WRITE)
+        assert 2.0 == limiter.acquire(warthog.ratelimit.KIND_AUTH)
+
+    def test_per_kind_limits(self, clock):
+        limiter = warthog.ratelimit.RateLimiter(
+            'https://lb.example.com', rate=100.0, burst=100,
+            limits={warthog.ratelimit.KIND_WRITE: (4.0, 1)}, clock=clock, sleep=clock.sleep)
+
+        limiter.acquire(warthog.ratelimit.KIND_WRITE)
+        assert 0.25 == limiter.acquire(warthog.ratelimit.KIND_WRITE)
+        assert 0.0 == limiter.acquire(warthog.ratelimit.KIND_AUTH), \
+            'Expected no limit on session starts when limits are given'
+
+
+    def test_wait_longer_than_timeout(self, clock):
+        limiter = warthog.ratelimit.RateLimiter(
+            'https://lb.example.com', rate=100.0, burst=100,
+            limits={warthog.ratelimit.KIND_WRITE: (1.0, 1)}, clock=clock, sleep=clock.sleep)
+        limiter.acquire(warthog.ratelimit.KIND_WRITE)
+
+        with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc_info:
+            limiter.acquire(warthog.ratelimit.KIND_WRITE, timeout=0.5)
+
+        assert 0.5 == exc_info.value.timeout, 'Expected timeout in error'
+        assert [] == clock.sleeps, 'Expected no waiting past the timeout'
+        assert 1.0 == limiter.acquire(warthog.ratelimit.KIND_WRITE, timeout=1.0), \
+            'Expected tokens of the rejected request to be given back'
+
+    def test_wait_within_timeout(self, clock):
+        limiter = warthog.ratelimit.RateLimiter(
+            'https://lb.example.com', rate=1.0, burst=1, limits={}, clock=clock,
+            sleep=clock.sleep)
+        limiter.acquire(warthog.ratelimit.KIND_READ)
+
+        assert 1.0 == limiter.acquire(warthog.ratelimit.KIND_READ, timeout=1.0)
+        assert [1.0] == clock.sleeps
+
+
+class TestGetRateLimiter(object):
+    def test_shared_by_scheme_host(self, request):
+        request.addfinalizer(warthog.ratelimit.reset_rate_limiters)
+
+        first = warthog.ratelimit.get_rate_limiter('https://LB.example.com:8443')
+        second = warthog.ratelimit.get_rate_limiter(
+            'https://lb.example.com:8443/axapi/v3/auth')
+        other = warthog.ratelimit.get_rate_limiter('https://lb.example.com')
+
+        assert first is second, 'Expected same limiter for the same load balancer'
+        assert first is not other, 'Expected different limiter for a different port'
+
+    def test_set_rate_limiter_replaces(self, request):
+        request.addfinalizer(warthog.ratelimit.reset_rate_limiters)
+
+        warthog.ratelimit.get_rate_limiter('https://lb.example.com')
+        limiter = warthog.ratelimit.RateLimiter('https://LB.example.com')
+        warthog.ratelimit.set_rate_limiter(limiter)
+
+        assert limiter is warthog.ratelimit.get_rate_limiter('https://lb.example.com/axapi'), \
+            'Expected limiter set to be used for its load balancer'
+
+
+def test_pop_queue_wait_forgets():
+    warthog.ratelimit.set_queue_wait(1.5)
+
+    assert 1.5 == warthog.ratelimit.pop_queue_wait()
+    assert 0.0 == warthog.ratelimit.pop_queue_wait()
+
+
+def test_client_queues_and_reports_wait(request, clock):
+    request.addfinalizer(warthog.ratelimit.reset_rate_limiters)
+    request.addfinalizer(warthog.hooks.get_hooks().clear)
+
+    events = []
+    warthog.hooks.get_hooks().register(events.append)
+
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        warthog.ratelimit.get_rate_limiter(
+            sim.scheme_host, rate=100.0, burst=100,
+            limits={warthog.ratelimit.KIND_AUTH: (1.0, 1)}, clock=clock, sleep=clock.sleep)
+
+        client = warthog.client.WarthogClient(
+            sim.scheme_host, sim.username, sim.password, rate_limit=True)
+        client.get_status('app1.example.com')
+        client.get_status('app1.example.com')
+
+    assert [1.0] == clock.sleeps, 'Expected the second session start to be queued'
+    waits = [(e.command, e.queue_wait) for e in events if e.queue_wait]
+    assert [('SessionStartCommand', 1.0)] == waits, 'Expected queue wait reported to hooks'
+
+
+def test_client_queue_past_deadline(request, clock):
+    request.addfinalizer(warthog.ratelimit.reset_rate_limiters)
+
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        warthog.ratelimit.get_rate_limiter(
+            sim.scheme_host, rate=100.0, burst=100,
+            limits={warthog.ratelimit.KIND_AUTH: (0.01, 1)}, clock=clock, sleep=clock.sleep)
+
+        client = warthog.client.WarthogClient(
+            sim.scheme_host, sim.username, sim.password, rate_limit=True)
+        client.get_status('app1.example.com')
+
+        with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc_info:
+            client.get_status('app1.example.com', timeout=5)
+
+    assert warthog.core.PHASE_AUTH == exc_info.value.phase, 'Expected auth phase blamed'
+    assert [] == clock.sleeps, 'Expected no waiting past the deadline'
+
+
+def test_client_rate_limiter_instance(request, clock):
+    request.addfinalizer(warthog.ratelimit.reset_rate_limiters)
+
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        limiter = warthog.ratelimit.RateLimiter(
+            sim.scheme_host, rate=100.0, burst=100,
+            limits={warthog.ratelimit.KIND_AUTH: (1.0, 1)}, clock=clock, sleep=clock.sleep)
+
+        client = warthog.client.WarthogClient(
+            sim.scheme_host, sim.username, sim.password, rate_limit=limiter)
+        client.get_status('app1.example.com')
+        client.get_status('app1.example.com')
+        shared = warthog.ratelimit.get_rate_limiter(sim.scheme_host)
+
+    assert [1.0] == clock.sleeps, 'Expected limits of the given rate limiter to be used'
+    assert limiter is not shared, 'Expected shared rate limiter to be left alone'
+
+
+def test_client_rate_limit_settings(request):
+    request.addfinalizer(warthog.ratelimit.reset_rate_limiters)
+
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com')
+        client = warthog.client.WarthogClient(
+            sim.scheme_host, sim.username, sim.password,
+            rate_limit={'rate': 100.0, 'burst': 100, 'limits': {}})
+        client.get_status('app1.example.com')
+
+        limiter = warthog.ratelimit.get_rate_limiter(sim.scheme_host)
+
+    assert 100.0 == limiter._overall._rate, 'Expected given settings for the rate limiter'
+    assert {} == limiter._buckets, 'Expected given limits for each kind of request'
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import threading
+
+import mock
+import pytest
+
+import warthog.client
+import warthog.rolling
+import warthog.testing
+import warthog.wait
+from warthog.concurrency import OperationResult
+
+
+def _client():
+    client = mock.Mock(spec=warthog.client.WarthogClient)
+    client.drain_servers.side_effect = lambda servers, **_: iter(
+        [(s, OperationResult(True, None)) for s in servers])
+    client.enable_servers.side_effect = lambda servers, **_: dict(
+        (s, OperationResult(True, None)) for s in servers)
+    return client
+
+
+class TestResolveCount(object):
+    def test_number(self):
+        assert 3 == warthog.rolling.resolve_count(3, 10)
+        assert 3 == warthog.rolling.resolve_count('3', 10)
+
+    def test_percentage(self):
+        assert 5 == warthog.rolling.resolve_count('50%', 10)
+        assert 1 == warthog.rolling.resolve_count('1%', 10), 'Expected at least one server'
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            warthog.rolling.resolve_count(0, 10)
+        with pytest.raises(ValueError):
+            warthog.rolling.resolve_count('0%', 10)
+        with pytest.raises(ValueError):
+            warthog.rolling.resolve_count('many', 10)
+
+
+class TestRollingOperation(object):
+    def test_max_unavailable_less_than_batch(self):
+        with pytest.raises(ValueError):
+            warthog.rolling.RollingOperation(
+                _client(), ['a', 'b'], batch_size=2, max_unavailable=1)
+
+    def test_every_server_done_in_batches(self):
+        client = _client()
+        hooked = []
+        op = warthog.rolling.RollingOperation(
+            client, ['a', 'b', 'c'], hook=hooked.append, batch_size=2)
+
+        results = list(op.run())
+
+        assert all(r.ok for r in results), 'Expected every server to be done'
+        assert ['a', 'b', 'c'] == sorted(r.server for r in results)
+        assert ['a', 'b', 'c'] == sorted(hooked), 'Expected hook to run for each server'
+        assert [mock.call(['a', 'b'], wait=None, max_workers=None),
+                mock.call(['c'], wait=None, max_workers=None)] == \
+            client.drain_servers.call_args_list, 'Expected servers drained in batches'
+
+    def test_next_batch_drains_while_hook_runs(self):
+        client = _client()
+        second_drain = threading.Event()
+
+        def drain(servers, **_):
+            if servers == ['b']:
+                second_drain.set()
+            return iter([(s, OperationResult(True, None)) for s in servers])
+
+        client.drain_servers.side_effect = drain
+
+        # The hook for the first server only succeeds if the second batch starts
+        # draining while it is still running.
+        def hook(server):
+            return server != 'a' or second_drain.wait(5)
+
+        op = warthog.rolling.RollingOperation(
+            client, ['a', 'b'], hook=hook, batch_size=1, max_unavailable=2)
+
+        assert all(r.ok for r in op.run()), 'Expected drain to be pipelined with hook'
+
+    def test_pipelined_by_default(self):
+        client = _client()
+        overlapped = []
+        drains = [threading.Event() for _ in range(3)]
+
+        def drain(servers, **_):
+            drains[len(client.drain_servers.call_args_list) - 1].set()
+            return iter([(s, OperationResult(True, None)) for s in servers])
+
+        client.drain_servers.side_effect = drain
+
+        # Hooks for each batch record whether the next batch started draining while
+        # they were still running.
+        def hook(server):
+            index = ['a', 'b', 'c'].index(server)
+            overlapped.append(index == 2 or drains[index + 1].wait(5))
+            return True
+
+        op = warthog.rolling.RollingOperation(client, ['a', 'b', 'c'], hook=hook)
+
+        assert all(r.ok for r in op.run()), 'Expected every server to be done'
+        assert [True, True, True] == overlapped, 'Expected drains pipelined with hooks'
+
+    def test_default_max_unavailable_limited_to_servers(self):
+        op = warthog.rolling.RollingOperation(_client(), ['a', 'b', 'c'], batch_size=2)
+
+        assert 3 == op._max_unavailable, 'Expected no more than the number of servers'
+
+    def test_no_pipelining_beyond_max_unavailable(self):
+        client = _client()
+        drained = []
+
+        def hook(server):
+            drained.append(len(client.drain_servers.call_args_list))
+            return True
+
+        op = warthog.rolling.RollingOperation(
+            client, ['a', 'b', 'c'], hook=hook, max_unavailable=1)
+
+        assert all(r.ok for r in op.run()), 'Expected every server to be done'
+        assert [1, 2, 3] == drained, 'Expected a single server out of service at a time'
+
+    def test_hook_failure_stops_later_batches(self):
+        client = _client()
+        op = warthog.rolling.RollingOperation(
+            client, ['a', 'b', 'c'], hook=lambda server: server != 'a', max_unavailable=1)
+
+        results = dict((r.server, r) for r in op.run())
+
+        assert warthog.rolling.STAGE_HOOK == results['a'].stage, 'Expected hook failure'
+        assert warthog.rolling.STAGE_SKIPPED == results['b'].stage, 'Expected b skipped'
+        assert warthog.rolling.STAGE_SKIPPED == results['c'].stage, 'Expected c skipped'
+        assert not client.enable_servers.called, 'Expected failed server left disabled'
+
+    def test_hook_failure_finishes_batch_in_flight(self):
+        client = _client()
+        second_drain = threading.Event()
+        failure_reported = threading.Event()
+
+        def drain(servers, **_):
+            if servers == ['b']:
+                second_drain.set()
+            return iter([(s, OperationResult(True, None)) for s in servers])
+
+        # Enabling the batch in flight only finishes once the failure has been reported,
+        # so that it can't make room for another batch before the operation is stopped.
+        def enable(servers, **_):
+            failure_reported.wait(5)
+            return dict((s, OperationResult(True, None)) for s in servers)
+
+        client.drain_servers.side_effect = drain
+        client.enable_servers.side_effect = enable
+
+        # The hook for the first server fails only once the next batch is draining.
+        def hook(server):
+            second_drain.wait(5)
+            return server != 'a'
+
+        op = warthog.rolling.RollingOperation(client, ['a', 'b', 'c'], hook=hook)
+        results = {}
+        for result in op.run():
+            results[result.server] = result
+            if result.server == 'a':
+                failure_reported.set()
+
+        assert warthog.rolling.STAGE_HOOK == results['a'].stage, 'Expected hook failure'
+        assert warthog.rolling.STAGE_DONE == results['b'].stage, \
+            'Expected batch already draining to be finished'
+        assert warthog.rolling.STAGE_SKIPPED == results['c'].stage, 'Expected c skipped'
+        assert [mock.call(['b'], wait=None, max_workers=None)] == \
+            client.enable_servers.call_args_list, 'Expected failed server left disabled'
+
+    def test_hook_exception(self):
+        error = ValueError('nope')
+
+        def hook(_):
+            raise error
+
+        results = list(warthog.rolling.RollingOperation(_client(), ['a'], hook=hook).run())
+
+        assert [warthog.rolling.RollResult('a', warthog.rolling.STAGE_HOOK, error)] == results
+
+    def test_drain_failure(self):
+        client = _client()
+        client.drain_servers.side_effect = lambda servers, **_: iter(
+            [(s, OperationResult(False, None)) for s in servers])
+
+        results = list(warthog.rolling.RollingOperation(client, ['a', 'b']).run())
+
+        assert [warthog.rolling.STAGE_DISABLE, warthog.rolling.STAGE_SKIPPED] == \
+            [r.stage for r in results]
+
+    def test_enable_error(self):
+        client = _client()
+        client.enable_servers.side_effect = RuntimeError('auth')
+
+        results = list(warthog.rolling.RollingOperation(client, ['a']).run())
+
+        assert warthog.rolling.STAGE_ENABLE == results[0].stage, 'Expected enable failure'
+
+
+def test_command_hook():
+    hook = warthog.rolling.command_hook(
+        '"{0}" -c "import os, sys; sys.exit(os.environ[\'WARTHOG_SERVER\'] != sys.argv[1])" '
+        '{{server}}'.format(sys.executable))
+
+    assert hook('app1.example.com'), 'Expected command to see the server'
+
+
+def test_roll_against_simulator():
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        for i in range(4):
+            sim.add_server('app{0}.example.com'.format(i), connections=5, drain_rate=1000.0)
+        wait = warthog.wait.FixedIntervalWait(interval=0.01, max_retries=50)
+        client = warthog.client.WarthogClient(
+            sim.scheme_host, sim.username, sim.password, session_reuse=True)
+
+        with client:
+            op = warthog.rolling.RollingOperation(
+                client, ['app{0}.example.com'.format(i) for i in range(4)],
+                batch_size='50%', max_unavailable=4, disable_wait=wait, enable_wait=wait)
+            results = list(op.run())
+
+        assert all(r.ok for r in results), 'Expected every server to be rolled'
+        assert all(sim.get_server(r.server).state == 'Up' for r in results), \
+            'Expected every server to be enabled again'
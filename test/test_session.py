@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import mock
+import pytest
+import requests
+
+import warthog.client
+import warthog.core
+import warthog.exceptions
+import warthog.session
+
+SCHEME_HOST = 'https://lb.example.com'
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def start_cmd():
+    cmd = mock.Mock(spec=warthog.core.SessionStartCommand)
+    cmd.send.side_effect = ['session1', 'session2', 'session3']
+    return cmd
+
+
+@pytest.fixture
+def end_cmd():
+    return mock.Mock(spec=warthog.core.SessionEndCommand)
+
+
+@pytest.fixture
+def commands(start_cmd, end_cmd):
+    factory = mock.Mock(spec=warthog.client.CommandFactory)
+    factory.get_session_start.return_value = start_cmd
+    factory.get_session_end.return_value = end_cmd
+    return factory
+
+
+@pytest.fixture
+def cached(commands, clock):
+    return warthog.session.CachedSession(
+        commands, SCHEME_HOST, 'user', 'password', max_idle=60, clock=clock)
+
+
+class TestCachedSession(object):
+    def test_run_reuses_session(self, cached, start_cmd):
+        first = cached.run(lambda session: session)
+        second = cached.run(lambda session: session)
+
+        assert 'session1' == first, 'Did not get expected session ID'
+        assert 'session1' == second, 'Expected the session to be reused'
+        assert 1 == start_cmd.send.call_count, 'Expected a single session to be started'
+
+    def test_run_passes_extra_args(self, cached):
+        result = cached.run(lambda session, server: (session, server), 'app1.example.com')
+
+        assert ('session1', 'app1.example.com') == result, 'Did not get expected arguments'
+
+    def test_run_reauthenticates_invalid_session(self, cached):
+        operation = mock.Mock(side_effect=[
+            warthog.exceptions.WarthogInvalidSessionError('Invalid session'), 'ok'])
+
+        result = cached.run(operation)
+
+        assert 'ok' == result, 'Did not get expected result from retried operation'
+        operation.assert_called_with('session2')
+
+    def test_run_invalid_session_retried_once(self, cached):
+        operation = mock.Mock(
+            side_effect=warthog.exceptions.WarthogInvalidSessionError('Invalid session'))
+
+        with pytest.raises(warthog.exceptions.WarthogInvalidSessionError):
+            cached.run(operation)
+
+        assert 2 == operation.call_count, 'Expected operation to be tried twice'
+
+    def test_run_replaces_idle_session(self, cached, clock, end_cmd):
+        cached.run(lambda session: session)
+        clock.now = 61.0
+        session = cached.run(lambda session: session)
+
+        assert 'session2' == session, 'Expected idle session to be replaced'
+        assert end_cmd.send.called, 'Expected idle session to be ended'
+
+    def test_run_replaces_idle_session_already_expired(self, cached, clock, end_cmd):
+        end_cmd.send.side_effect = warthog.exceptions.WarthogInvalidSessionError('Expired')
+
+        cached.run(lambda session: session)
+        clock.now = 61.0
+        session = cached.run(lambda session: session)
+
+        assert 'session2' == session, 'Expected idle session to be replaced'
+
+    def test_run_keeps_session_in_use_past_max_idle(self, cached, clock, end_cmd):
+        def _long_operation(session):
+            clock.now = 61
+            return session, cached.run(lambda other: other)
+
+        assert ('session1', 'session1') == cached.run(_long_operation), \
+            'Expected the session in use not to be replaced'
+        assert not end_cmd.send.called, 'Did not expect a session in use to be ended'
+
+    def test_run_ends_idle_session_without_lock(self, cached, clock, end_cmd):
+        cached.run(lambda session: session)
+        clock.now = 61
+
+        def _end():
+            assert cached._lock.acquire(False), 'Expected the lock to be free'
+            cached._lock.release()
+            raise requests.ConnectionError('Connection refused')
+
+        end_cmd.send.side_effect = _end
+
+        assert 'session2' == cached.run(lambda session: session), \
+            'Expected a new session even though ending the old one failed'
+        assert end_cmd.send.called, 'Expected the idle session to be ended'
+
+    def test_close_ends_session(self, cached, commands, end_cmd):
+        cached.run(lambda session: session)
+        cached.close()
+
+        commands.get_session_end.assert_called_once_with(SCHEME_HOST, 'session1')
+        assert end_cmd.send.called, 'Expected session to be ended'
+
+    def test_close_no_session(self, cached, end_cmd):
+        cached.close()
+
+        assert not end_cmd.send.called, 'Did not expect a session to be ended'
+
+
+@pytest.fixture
+def pool(commands, clock):
+    return warthog.session.SessionPool(
+        commands, SCHEME_HOST, 'user', 'password', max_sessions=2, lease_timeout=0,
+        max_idle=60, clock=clock)
+
+
+class TestSessionPool(object):
+    def test_run_reuses_idle_session(self, pool, start_cmd):
+        first = pool.run(lambda session: session)
+        second = pool.run(lambda session: session)
+
+        assert 'session1' == first, 'Did not get expected session ID'
+        assert 'session1' == second, 'Expected the idle session to be reused'
+        assert 1 == start_cmd.send.call_count, 'Expected a single session to be started'
+
+    def test_run_starts_session_per_concurrent_operation(self, pool):
+        inner = pool.run(lambda outer: (outer, pool.run(lambda session: session)))
+
+        assert ('session1', 'session2') == inner, 'Expected a second session to be leased'
+        assert 2 == pool.stats().idle, 'Expected both sessions to be returned to the pool'
+
+    def test_run_fails_fast_when_exhausted(self, pool):
+        def _nested(outer):
+            return pool.run(lambda middle: pool.run(lambda inner: inner))
+
+        with pytest.raises(warthog.exceptions.WarthogSessionPoolExhaustedError) as exc:
+            pool.run(_nested)
+
+        assert 2 == exc.value.max_sessions
+        assert 1 == pool.stats().exhausted, 'Expected exhausted lease to be counted'
+        assert 0 == pool.stats().leased, 'Expected every session to be returned'
+
+    def test_run_waits_for_returned_session(self, commands):
+        pool = warthog.session.SessionPool(
+            commands, SCHEME_HOST, 'user', 'password', max_sessions=1, lease_timeout=5.0)
+        leased = threading.Event()
+        finish = threading.Event()
+
+        def _hold(session):
+            leased.set()
+            finish.wait(5.0)
+            return session
+
+        thread = threading.Thread(target=pool.run, args=(_hold,))
+        thread.start()
+        leased.wait(5.0)
+
+        timer = threading.Timer(0.05, finish.set)
+        timer.start()
+        result = pool.run(lambda session: session)
+        thread.join()
+
+        stats = pool.stats()
+        assert 'session1' == result, 'Expected the returned session to be leased'
+        assert 1 == stats.open, 'Expected no more sessions than the pool size'
+        assert 1 == stats.waits, 'Expected the lease to have waited'
+        assert stats.max_wait > 0, 'Expected wait time to be recorded'
+
+    def test_run_gives_up_at_deadline(self, commands):
+        pool = warthog.session.SessionPool(
+            commands, SCHEME_HOST, 'user', 'password', max_sessions=1)
+
+        def _nested(session):
+            with warthog.core.deadline_context(warthog.core.Deadline(0.01)):
+                return pool.run(lambda inner: inner)
+
+        with pytest.raises(warthog.exceptions.WarthogTimeoutError) as exc:
+            pool.run(_nested)
+
+        assert warthog.core.PHASE_AUTH == exc.value.phase
+
+    def test_run_recycles_invalid_session(self, pool):
+        operation = mock.Mock(side_effect=[
+            warthog.exceptions.WarthogInvalidSessionError('Invalid session'), 'ok'])
+
+        result = pool.run(operation)
+
+        assert 'ok' == result, 'Did not get expected result from retried operation'
+        operation.assert_called_with('session2')
+        stats = pool.stats()
+        assert (1, 1) == (stats.open, stats.idle), 'Expected invalid session to be dropped'
+
+    def test_run_ends_idle_session(self, pool, clock, commands):
+        pool.run(lambda session: session)
+        clock.now = 61
+
+        session = pool.run(lambda session: session)
+
+        assert 'session2' == session, 'Expected idle session to be replaced'
+        commands.get_session_end.assert_called_once_with(SCHEME_HOST, 'session1')
+
+    def test_failed_end_of_idle_session_keeps_room(self, pool, clock, start_cmd, end_cmd):
+        start_cmd.send.side_effect = ['session1', 'session2', 'session3', 'session4']
+        end_cmd.send.side_effect = requests.ConnectionError('Connection refused')
+        pool.run(lambda outer: pool.run(lambda session: session))
+        clock.now = 61
+
+        session = pool.run(lambda session: session)
+
+        stats = pool.stats()
+        assert 'session3' == session, 'Expected idle sessions to be replaced'
+        assert (1, 0) == (stats.open, stats.leased), 'Expected no room in the pool to be lost'
+        assert ('session3', 'session4') == pool.run(
+            lambda outer: (outer, pool.run(lambda inner: inner))), \
+            'Expected every session in the pool to still be available'
+
+    def test_failed_start_frees_room(self, pool, start_cmd):
+        start_cmd.send.side_effect = [
+            warthog.exceptions.WarthogAuthFailureError('Bad credentials'), 'session1']
+
+        with pytest.raises(warthog.exceptions.WarthogAuthFailureError):
+            pool.run(lambda session: session)
+
+        assert 0 == pool.stats().open, 'Expected failed session start to free its room'
+        assert 'session1' == pool.run(lambda session: session)
+
+    def test_close_ends_idle_sessions(self, pool, commands):
+        pool.run(lambda outer: pool.run(lambda session: session))
+        pool.close()
+
+        assert 2 == commands.get_session_end.call_count, 'Expected both sessions to be ended'
+        assert 0 == pool.stats().open
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import warthog.client
+import warthog.core
+import warthog.exceptions
+import warthog.testing
+import warthog.wait
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sim(clock):
+    simulator = warthog.testing.LoadBalancerSimulator(session_ttl=60, clock=clock)
+    simulator.add_server('app1.example.com', connections=10, drain_rate=2.0)
+    return simulator
+
+
+def _login(sim):
+    status, payload = sim.handle_request('POST', '/axapi/v3/auth', body={
+        'credentials': {'username': sim.username, 'password': sim.password}})
+    assert 200 == status, 'Expected login to succeed'
+    return 'A10 ' + payload['authresponse']['signature']
+
+
+class TestSimulatedServer(object):
+    def test_connections_decay_while_disabled(self, clock):
+        server = warthog.testing.SimulatedServer(
+            'app1.example.com', connections=10, drain_rate=2.0, clock=clock)
+        server.set_enabled(False)
+        clock.now = 2.5
+
+        assert 5 == server.connections, 'Expected connections to drain while disabled'
+        clock.now = 10.0
+        assert 0 == server.connections, 'Expected connections to stop at zero'
+
+    def test_connections_constant_while_enabled(self, clock):
+        server = warthog.testing.SimulatedServer(
+            'app1.example.com', connections=10, drain_rate=2.0, clock=clock)
+        clock.now = 5.0
+
+        assert 10 == server.connections, 'Expected connections not to drain while enabled'
+
+    def test_state(self, clock):
+        server = warthog.testing.SimulatedServer('app1.example.com', healthy=False, clock=clock)
+        assert 'Down' == server.state, 'Expected unhealthy server to be down'
+        server.set_enabled(False)
+        assert 'Disabled' == server.state, 'Expected disabled server to be disabled'
+
+
+class TestLoadBalancerSimulator(object):
+    def test_auth_bad_credentials(self, sim):
+        status, payload = sim.handle_request('POST', '/axapi/v3/auth', body={
+            'credentials': {'username': 'nope', 'password': 'nope'}})
+
+        assert 403 == status, 'Expected login to be forbidden'
+        assert 403 == payload['authorizationschema']['code'], 'Did not get expected error code'
+
+    def test_session_expires_when_idle(self, sim, clock):
+        auth = _login(sim)
+        clock.now = 60.0
+
+        status, _ = sim.handle_request('GET', '/axapi/v3/slb/server/app1.example.com/oper', auth)
+        assert 401 == status, 'Expected idle session to be expired'
+
+    def test_expire_sessions(self, sim):
+        auth = _login(sim)
+        sim.expire_sessions()
+
+        status, _ = sim.handle_request('GET', '/axapi/v3/slb/server/oper', auth)
+        assert 401 == status, 'Expected session to be expired'
+
+    def test_no_such_server(self, sim):
+        auth = _login(sim)
+        status, payload = sim.handle_request(
+            'GET', '/axapi/v3/slb/server/app2.example.com/stats', auth)
+
+        assert 404 == status, 'Expected unknown server to be not found'
+        assert warthog.core.ERROR_CODE_NO_SUCH_SERVER == payload['response']['err']['code']
+
+    def test_fail_next_matching_path(self, sim):
+        auth = _login(sim)
+        sim.fail_next(status_code=400, code=warthog.core.ERROR_CODE_BAD_PERMISSION, path='/stats')
+
+        status, _ = sim.handle_request('GET', '/axapi/v3/slb/server/app1.example.com/oper', auth)
+        assert 200 == status, 'Expected request for other path to succeed'
+        status, _ = sim.handle_request('GET', '/axapi/v3/slb/server/app1.example.com/stats', auth)
+        assert 400 == status, 'Expected injected failure'
+        status, _ = sim.handle_request('GET', '/axapi/v3/slb/server/app1.example.com/stats', auth)
+        assert 200 == status, 'Expected only a single injected failure'
+
+    def test_request_counts(self, sim):
+        auth = _login(sim)
+        sim.handle_request('GET', '/axapi/v3/slb/server/oper', auth)
+        sim.handle_request('POST', '/axapi/v3/logoff', auth)
+
+        assert 1 == sim.requests['/axapi/v3/auth'], 'Expected a single login'
+        assert 1 == sim.requests['/axapi/v3/slb/server/oper'], 'Expected a single list request'
+        assert 0 == sim.session_count, 'Expected session to be ended by logoff'
+
+
+class TestClientAgainstSimulator(object):
+    def test_disable_and_enable_server(self):
+        with warthog.testing.LoadBalancerSimulator() as sim:
+            sim.add_server('app1.example.com', connections=5, drain_rate=1000.0)
+            client = warthog.client.WarthogClient(sim.scheme_host, sim.username, sim.password)
+            wait = warthog.wait.FixedIntervalWait(interval=0.01, max_retries=50)
+
+            assert client.disable_server('app1.example.com', wait=wait), \
+                'Expected server to be disabled'
+            assert 0 == client.get_connections('app1.example.com'), 'Expected server to drain'
+            assert client.enable_server('app1.example.com', wait=wait), \
+                'Expected server to be enabled'
+            assert 0 == sim.session_count, 'Expected every session to be ended'
+
+    def test_bad_credentials(self):
+        with warthog.testing.LoadBalancerSimulator() as sim:
+            client = warthog.client.WarthogClient(sim.scheme_host, 'nope', 'nope')
+
+            with pytest.raises(warthog.exceptions.WarthogAuthFailureError):
+                client.get_status('app1.example.com')
+
+    def test_snapshot(self):
+        with warthog.testing.LoadBalancerSimulator() as sim:
+            sim.add_server('app1.example.com', connections=3)
+            sim.add_server('app2.example.com', enabled=False)
+            client = warthog.client.WarthogClient(sim.scheme_host, sim.username, sim.password)
+
+            snapshot = client.get_snapshot()
+
+        assert warthog.client.NodeSnapshot(warthog.core.STATUS_ENABLED, 3) == \
+            snapshot['app1.example.com'], 'Did not get expected snapshot for app1'
+        assert warthog.client.NodeSnapshot(warthog.core.STATUS_DISABLED, 0) == \
+            snapshot['app2.example.com'], 'Did not get expected snapshot for app2'
+
+    def test_watch_yields_changes(self):
+        with warthog.testing.LoadBalancerSimulator() as sim:
+            sim.add_server('app1.example.com')
+            sim.add_server('app2.example.com')
+            client = warthog.client.WarthogClient(
+                sim.scheme_host, sim.username, sim.password, pooled=True)
+
+            with client:
+                events = client.watch(interval=0.01)
+                first = [next(events), next(events)]
+
+                sim.get_server('app2.example.com').set_enabled(False)
+                changed = next(events)
+                events.close()
+
+            assert ['app1.example.com', 'app2.example.com'] == [e.server for e in first], \
+                'Expected an event for each server when first seen'
+            assert 'app2.example.com' == changed.server, 'Expected change for app2'
+            assert warthog.core.STATUS_DISABLED == changed.status
+            assert warthog.core.STATUS_ENABLED == changed.previous_status
+            assert 1 == sim.requests['/axapi/v3/auth'], 'Expected a single session'
+            assert 0 == sim.session_count, 'Expected session to be ended'
+
+    def test_watch_status_only(self):
+        with warthog.testing.LoadBalancerSimulator() as sim:
+            sim.add_server('app1.example.com', connections=3)
+            client = warthog.client.WarthogClient(sim.scheme_host, sim.username, sim.password)
+
+            events = client.watch(['app1.example.com'], connections=False)
+            event = next(events)
+            events.close()
+
+            assert None is event.connections, 'Expected connections not to be checked'
+            assert 0 == sim.requests['/axapi/v3/slb/server/stats'], \
+                'Expected no connection requests'
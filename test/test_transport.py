@@ -1,5 +1,13 @@
 # -*- coding: utf-8 -*-
 
+import threading
+
+import mock
+import pytest
+import requests
+
+import warthog.breaker
+import warthog.ratelimit
 import warthog.ssl
 import warthog.transport
 
@@ -30,3 +38,171 @@ def test_get_transport_factory_with_defaults():
     assert warthog.transport.DEFAULT_SSL_VERSION == adapter.ssl_version, 'Did not get default TLS version'
     assert warthog.transport.DEFAULT_CERT_VERIFY == session.verify, 'Did not get default verify setting'
 
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_shared_transport_factory_returns_same_session():
+    factory = warthog.transport.get_pooled_transport_factory()
+
+    assert factory() is factory(), 'Expected the same session for each call'
+
+
+def test_shared_transport_factory_pool_size():
+    factory = warthog.transport.get_pooled_transport_factory(pool_size=25)
+    adapter = factory().get_adapter('https://lb.example.com')
+
+    assert 25 == adapter._pool_maxsize, 'Did not get expected pool size'
+
+
+def test_shared_transport_factory_replaced_when_idle():
+    clock = FakeClock()
+    factory = warthog.transport.SharedTransportFactory(
+        mock.Mock(side_effect=lambda: mock.Mock()), idle_timeout=10, max_lifetime=100, clock=clock)
+
+    first = factory()
+    clock.now = 5.0
+    assert first is factory(), 'Expected session to be reused before idle timeout'
+
+    clock.now = 16.0
+    second = factory()
+    assert first is not second, 'Expected session to be replaced after idle timeout'
+    assert first.close.called, 'Expected idle session to be closed'
+
+
+def test_shared_transport_factory_replaced_after_max_lifetime():
+    clock = FakeClock()
+    factory = warthog.transport.SharedTransportFactory(
+        mock.Mock(side_effect=lambda: mock.Mock()), idle_timeout=10, max_lifetime=20, clock=clock)
+
+    first = factory()
+    for now in (8.0, 16.0):
+        clock.now = now
+        assert first is factory(), 'Expected session to be reused before max lifetime'
+
+    clock.now = 24.0
+    assert first is not factory(), 'Expected session to be replaced after max lifetime'
+
+
+def test_shared_transport_factory_replaced_while_in_use():
+    clock = FakeClock()
+    factory = warthog.transport.SharedTransportFactory(
+        mock.Mock(side_effect=lambda: mock.Mock()), idle_timeout=10, max_lifetime=100, clock=clock)
+    started = threading.Event()
+    finish = threading.Event()
+
+    first = factory()
+    first._session.request.side_effect = lambda *args, **kwargs: (
+        started.set(), finish.wait(5))
+    thread = threading.Thread(target=first.get, args=('https://lb.example.com/axapi/v3',))
+    thread.start()
+    started.wait(5)
+
+    clock.now = 16.0
+    second = factory()
+    second.get('https://lb.example.com/axapi/v3')
+
+    assert first is not second, 'Expected session to be replaced after idle timeout'
+    assert not first.close.called, 'Expected session in use not to be closed'
+
+    finish.set()
+    thread.join(5)
+    assert first.close.called, 'Expected replaced session closed by its last request'
+    assert not second.close.called, 'Expected current session to stay open'
+
+
+def test_shared_transport_factory_close():
+    transport = mock.Mock()
+    factory = warthog.transport.SharedTransportFactory(mock.Mock(return_value=transport))
+
+    factory()
+    factory.close()
+
+    assert transport.close.called, 'Expected shared session to be closed'
+
+
+def test_get_transport_factory_default_timeouts():
+    session = warthog.transport.get_transport_factory()()
+
+    for url in ('https://lb.example.com', 'http://lb.example.com'):
+        adapter = session.get_adapter(url)
+        assert (warthog.transport.DEFAULT_CONNECT_TIMEOUT,
+                warthog.transport.DEFAULT_READ_TIMEOUT) == adapter.timeout, \
+            'Did not get expected default timeouts'
+
+
+def test_get_transport_factory_timeouts():
+    session = warthog.transport.get_transport_factory(connect_timeout=1.5, read_timeout=3.0)()
+    adapter = session.get_adapter('https://lb.example.com')
+
+    assert (1.5, 3.0) == adapter.timeout, 'Did not get expected timeouts'
+
+
+def test_timeout_adapter_uses_own_timeouts():
+    adapter = warthog.transport.TimeoutHTTPAdapter(timeout=(2.0, 5.0))
+
+    with mock.patch.object(warthog.transport.HTTPAdapter, 'send') as send:
+        adapter.send(mock.Mock(), timeout=None)
+
+    assert (2.0, 5.0) == send.call_args[1]['timeout'], 'Expected adapter timeouts to be used'
+
+
+def test_timeout_adapter_only_shortens_timeouts():
+    adapter = warthog.transport.TimeoutHTTPAdapter(timeout=(2.0, 5.0))
+
+    with mock.patch.object(warthog.transport.HTTPAdapter, 'send') as send:
+        adapter.send(mock.Mock(), timeout=3.0)
+        adapter.send(mock.Mock(), timeout=1.0)
+
+    assert [(2.0, 3.0), (1.0, 1.0)] == [c[1]['timeout'] for c in send.call_args_list], \
+        'Expected timeouts to be limited by the requested timeout'
+
+
+def test_timeout_adapter_breaker_ignores_shortened_timeout():
+    adapter = warthog.transport.TimeoutHTTPAdapter(timeout=(2.0, 5.0), circuit_breaker=True)
+    breaker = mock.Mock()
+
+    with mock.patch.object(warthog.breaker, 'get_circuit_breaker', return_value=breaker), \
+            mock.patch.object(warthog.transport.HTTPAdapter, 'send') as send:
+        send.side_effect = requests.exceptions.ReadTimeout()
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            adapter.send(mock.Mock(), timeout=1.0)
+
+    assert breaker.cancel_request.called, 'Expected request cut short by deadline cancelled'
+    assert not breaker.after_request.called, 'Expected no failure recorded'
+
+
+def test_timeout_adapter_breaker_records_configured_timeout():
+    adapter = warthog.transport.TimeoutHTTPAdapter(timeout=(2.0, 5.0), circuit_breaker=True)
+    breaker = mock.Mock()
+
+    with mock.patch.object(warthog.breaker, 'get_circuit_breaker', return_value=breaker), \
+            mock.patch.object(warthog.transport.HTTPAdapter, 'send') as send:
+        send.side_effect = requests.exceptions.ReadTimeout()
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            adapter.send(mock.Mock(), timeout=30.0)
+
+    assert not breaker.cancel_request.called, 'Expected configured timeouts to count'
+    assert breaker.after_request.call_args[0][1], 'Expected failure recorded'
+
+
+def test_timeout_adapter_queue_wait_shortens_timeout():
+    adapter = warthog.transport.TimeoutHTTPAdapter(timeout=(2.0, 5.0), rate_limit=True)
+    request = mock.Mock(method='GET', url='https://lb.example.com/axapi/v3/slb/server/oper')
+    limiter = mock.Mock()
+    limiter.acquire.return_value = 0.5
+
+    with mock.patch.object(warthog.ratelimit, 'get_rate_limiter', return_value=limiter), \
+            mock.patch.object(warthog.transport.HTTPAdapter, 'send') as send:
+        adapter.send(request, timeout=3.0)
+
+    limiter.acquire.assert_called_once_with(warthog.ratelimit.KIND_READ, timeout=3.0)
+    assert (2.0, 2.5) == send.call_args[1]['timeout'], \
+        'Expected time spent queued to count against the requested timeout'
+    assert 0.5 == warthog.ratelimit.pop_queue_wait(), 'Expected queue wait to be recorded'
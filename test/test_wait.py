@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import random
+
+import pytest
+
+import warthog.wait
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_get_wait_strategy_explicit():
+    wait = warthog.wait.ExponentialBackoffWait()
+    assert wait is warthog.wait.get_wait_strategy(wait, 5, 2.0)
+
+
+def test_get_wait_strategy_default():
+    wait = warthog.wait.get_wait_strategy(None, 3, 1.5)
+
+    assert 3 == wait.max_retries, 'Did not get expected max retries'
+    assert 1.5 == wait.interval, 'Did not get expected interval'
+    assert wait.deadline is None, 'Did not expect a deadline with max retries'
+
+
+def test_default_deadline_when_no_limits():
+    wait = warthog.wait.FixedIntervalWait()
+    assert warthog.wait.DEFAULT_WAIT_DEADLINE == wait.deadline
+
+
+def test_fixed_interval_max_retries():
+    waiter = warthog.wait.FixedIntervalWait(interval=2.0, max_retries=2).start()
+
+    assert not waiter.expired(), 'Did not expect new wait to be expired'
+    assert 2.0 == waiter.next_delay(10)
+    assert 2.0 == waiter.next_delay(5)
+    assert waiter.expired(), 'Expected wait to be expired after max retries'
+
+
+def test_fixed_interval_zero_retries():
+    waiter = warthog.wait.FixedIntervalWait(interval=2.0, max_retries=0).start()
+    assert waiter.expired(), 'Expected wait with zero retries to be expired immediately'
+
+
+def test_deadline_clamps_delay(clock):
+    waiter = warthog.wait.FixedIntervalWait(interval=2.0, deadline=3.0, clock=clock).start()
+
+    assert 2.0 == waiter.next_delay(10)
+    clock.now = 2.0
+    assert 1.0 == waiter.next_delay(10), 'Expected delay to be clamped to the deadline'
+    clock.now = 3.0
+    assert waiter.expired(), 'Expected wait to be expired after the deadline'
+
+
+def test_exponential_backoff_grows_and_caps():
+    wait = warthog.wait.ExponentialBackoffWait(
+        initial=0.5, maximum=3.0, multiplier=2.0, jitter=0.0, max_retries=10)
+    waiter = wait.start()
+
+    delays = [waiter.next_delay(1) for _ in range(5)]
+    assert [0.5, 1.0, 2.0, 3.0, 3.0] == delays
+
+
+def test_exponential_backoff_jitter():
+    wait = warthog.wait.ExponentialBackoffWait(
+        initial=2.0, jitter=0.5, max_retries=10, rand=random.Random(42))
+
+    delay = wait.start().next_delay(1)
+    assert 1.0 <= delay <= 2.0, 'Expected jittered delay between half and full delay'
+
+
+def test_connection_rate_predicts_time_to_zero(clock):
+    wait = warthog.wait.ConnectionRateWait(
+        initial=1.0, minimum=0.1, maximum=30.0, smoothing=1.0, deadline=60.0, clock=clock)
+    waiter = wait.start()
+
+    assert 1.0 == waiter.next_delay(100), 'Expected initial delay without a rate'
+    clock.now = 1.0
+    # Dropped 20 connections in one second, 80 left means four more seconds
+    assert 4.0 == waiter.next_delay(80)
+
+
+def test_connection_rate_resets_when_connections_increase(clock):
+    wait = warthog.wait.ConnectionRateWait(initial=1.0, deadline=60.0, clock=clock)
+    waiter = wait.start()
+
+    waiter.next_delay(100)
+    clock.now = 1.0
+    waiter.next_delay(50)
+    clock.now = 2.0
+    assert 1.0 == waiter.next_delay(70), 'Expected initial delay after connections increase'
+
+
+def test_connection_rate_non_numeric_observation(clock):
+    wait = warthog.wait.ConnectionRateWait(initial=0.5, deadline=60.0, clock=clock)
+    waiter = wait.start()
+
+    assert 0.5 == waiter.next_delay('down')
+    clock.now = 1.0
+    assert 0.5 == waiter.next_delay('down')
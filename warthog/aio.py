@@ -0,0 +1,569 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.aio
+~~~~~~~~~~~
+
+Native :mod:`asyncio` versions of the Warthog client and the commands it uses.
+
+This module requires Python 3.5 or newer. The default transport additionally
+requires the optional `aiohttp <https://aiohttp.readthedocs.io/>`_ library which
+can be installed along with Warthog via ``pip install warthog[async]``.
+"""
+
+import asyncio
+import json
+import ssl
+
+import warthog.client
+import warthog.core
+import warthog.exceptions
+import warthog.hooks
+import warthog.ssl
+import warthog.transport
+import warthog.wait
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Mapping of Warthog SSL/TLS protocol constants to the name of the equivalent
+# :class:`ssl.TLSVersion` value, used to pin the version of TLS that is used.
+_TLS_VERSIONS = {
+    warthog.ssl.PROTOCOL_TLSv1: 'TLSv1',
+    warthog.ssl.PROTOCOL_TLSv1_1: 'TLSv1_1',
+    warthog.ssl.PROTOCOL_TLSv1_2: 'TLSv1_2',
+}
+
+
+def _get_ssl_context(verify, ssl_version):
+    """Get an :class:`ssl.SSLContext` using the given cert verification policy and
+    pinned to the given version of TLS, if possible.
+    """
+    verify = verify if verify is not None else warthog.transport.DEFAULT_CERT_VERIFY
+    ssl_version = ssl_version if ssl_version is not None else \
+        warthog.transport.DEFAULT_SSL_VERSION
+
+    context = ssl.create_default_context()
+    version = _TLS_VERSIONS.get(ssl_version)
+    if version is not None and hasattr(ssl, 'TLSVersion'):
+        context.minimum_version = getattr(ssl.TLSVersion, version)
+        context.maximum_version = getattr(ssl.TLSVersion, version)
+
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    return context
+
+
+class BufferedResponse(object):
+    """Completely read HTTP response that provides the subset of the :class:`requests.Response`
+    interface used by the :mod:`warthog.core` commands.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, status_code, content, encoding='utf-8'):
+        """Set the HTTP status code and body of the response.
+
+        :param int status_code: HTTP status code of the response.
+        :param bytes content: Raw body of the response.
+        :param str encoding: Encoding of the body of the response.
+        """
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def ok(self):
+        """``True`` if the status code of the response is less than 400."""
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        """Body of the response decoded as text."""
+        return self.content.decode(self.encoding, 'replace')
+
+    def json(self):
+        """Body of the response decoded as JSON."""
+        return json.loads(self.text)
+
+
+class AiohttpTransport(object):
+    """Asynchronous transport for interacting with the load balancer API over HTTP or
+    HTTPS using a single, pooled :class:`aiohttp.ClientSession`.
+
+    The underlying session is created lazily the first time a request is made since
+    it must be created while an event loop is running.
+
+    Every request gives up if a connection can't be established within ``connect_timeout``
+    seconds or the load balancer stops sending a response for ``read_timeout`` seconds,
+    the same as the default synchronous transport.
+
+    .. versionadded:: 2.1.0
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, verify=None, ssl_version=None, pool_size=None, connect_timeout=None,
+                 read_timeout=None):
+        """Set the cert verification policy, SSL/TLS version, maximum number of
+        connections, and timeouts to use.
+
+        :param bool|None verify: Should SSL certificates by verified when connecting
+            over HTTPS? Default is ``True``.
+        :param int|None ssl_version: Explicit version of SSL to use for HTTPS connections
+            to an A10 load balancer. The default is TLSv1.2.
+        :param int|None pool_size: The maximum number of connections to keep open to the
+            load balancer. Default is 10.
+        :param float|None connect_timeout: The maximum number of seconds to wait for a
+            connection to the load balancer to be established. Default is 10 seconds.
+        :param float|None read_timeout: The maximum number of seconds to wait for the load
+            balancer to send any part of a response. Default is 60 seconds.
+        :raises ImportError: If the ``aiohttp`` library is not installed.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "The aiohttp library is required for the default asynchronous transport. "
+                "Install it with 'pip install warthog[async]'")
+
+        self._ssl = _get_ssl_context(verify, ssl_version)
+        self._pool_size = pool_size if pool_size is not None else \
+            warthog.transport.DEFAULT_POOL_SIZE
+        # No limit on the total time of a request, the deadline of an operation (if any)
+        # is applied by the client instead.
+        self._timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=connect_timeout if connect_timeout is not None else
+            warthog.transport.DEFAULT_CONNECT_TIMEOUT,
+            sock_read=read_timeout if read_timeout is not None else
+            warthog.transport.DEFAULT_READ_TIMEOUT)
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._pool_size, ssl=self._ssl),
+                timeout=self._timeout)
+        return self._session
+
+    async def request(self, method, url, headers=None, json=None):
+        """Make an HTTP request, read the entire response, and return it.
+
+        :param str method: HTTP method to use.
+        :param str url: URL to make the request to.
+        :param dict|None headers: Extra HTTP headers to send.
+        :param dict|None json: Object to send as JSON in the body of the request.
+        :return: The completely read response.
+        :rtype: BufferedResponse
+        """
+        # pylint: disable=redefined-outer-name
+        async with self._get_session().request(
+                method, url, headers=headers, json=json) as response:
+            content = await response.read()
+            return BufferedResponse(response.status, content)
+
+    async def get(self, url, headers=None):
+        """Make an HTTP GET request. See :meth:`request`."""
+        return await self.request('GET', url, headers=headers)
+
+    async def post(self, url, headers=None, json=None):
+        """Make an HTTP POST request. See :meth:`request`."""
+        # pylint: disable=redefined-outer-name
+        return await self.request('POST', url, headers=headers, json=json)
+
+    async def close(self):
+        """Close the underlying session and all connections held by it."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class _AsyncRequestMixin(object):
+    """Mixin class for making requests to the load balancer with an asynchronous
+    transport, extracting the payload of responses, and notifying registered hooks.
+    """
+
+    async def _request_async(self, method, url, **kwargs):
+        """Make a GET or POST request and return the payload of the response."""
+        send = self._transport.get if method == 'GET' else self._transport.post
+
+        hooks = warthog.hooks.get_hooks()
+        if not hooks:
+            return self._handle_response(await send(url, **kwargs))
+
+        start = warthog.core.monotonic()
+        response = error = None
+        try:
+            response = await send(url, **kwargs)
+            return self._handle_response(response)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            hooks.emit(self._get_event(
+                method, url, response, error, warthog.core.monotonic() - start))
+
+
+class AsyncSessionStartCommand(_AsyncRequestMixin, warthog.core.SessionStartCommand):
+    """Asynchronous version of :class:`warthog.core.SessionStartCommand`.
+
+    .. versionadded:: 2.1.0
+    """
+
+    async def send(self):
+        """See :meth:`warthog.core.SessionStartCommand.send`."""
+        url = self._url()
+
+        self._logger.debug('Making session start POST request to %s', url)
+        payload = await self._request_async('POST', url, json=self._params())
+
+        return self._parse(payload)
+
+
+class AsyncSessionEndCommand(_AsyncRequestMixin, warthog.core.SessionEndCommand):
+    """Asynchronous version of :class:`warthog.core.SessionEndCommand`.
+
+    .. versionadded:: 2.1.0
+    """
+
+    async def send(self):
+        """See :meth:`warthog.core.SessionEndCommand.send`."""
+        url = self._url()
+
+        self._logger.debug('Making session close POST request to %s', url)
+        payload = await self._request_async('POST', url, headers=self._auth_header())
+
+        return self._parse(payload)
+
+
+class AsyncNodeEnableCommand(_AsyncRequestMixin, warthog.core.NodeEnableCommand):
+    """Asynchronous version of :class:`warthog.core.NodeEnableCommand`.
+
+    .. versionadded:: 2.1.0
+    """
+
+    async def send(self):
+        """See :meth:`warthog.core.NodeEnableCommand.send`."""
+        self._logger.debug('Making node enable POST request for %s', self._server)
+        payload = await self._request_async(
+            'POST', self._url(), headers=self._auth_header(), json=self._params())
+
+        return self._parse(payload)
+
+
+class AsyncNodeDisableCommand(_AsyncRequestMixin, warthog.core.NodeDisableCommand):
+    """Asynchronous version of :class:`warthog.core.NodeDisableCommand`.
+
+    .. versionadded:: 2.1.0
+    """
+
+    async def send(self):
+        """See :meth:`warthog.core.NodeDisableCommand.send`."""
+        self._logger.debug('Making node disable POST request for %s', self._server)
+        payload = await self._request_async(
+            'POST', self._url(), headers=self._auth_header(), json=self._params())
+
+        return self._parse(payload)
+
+
+class AsyncNodeStatusCommand(_AsyncRequestMixin, warthog.core.NodeStatusCommand):
+    """Asynchronous version of :class:`warthog.core.NodeStatusCommand`.
+
+    .. versionadded:: 2.1.0
+    """
+
+    async def send(self):
+        """See :meth:`warthog.core.NodeStatusCommand.send`."""
+        self._logger.debug('Making node status GET request for %s', self._server)
+        payload = await self._request_async('GET', self._url(), headers=self._auth_header())
+
+        return self._parse(payload)
+
+
+class AsyncNodeActiveConnectionsCommand(
+        _AsyncRequestMixin, warthog.core.NodeActiveConnectionsCommand):
+    """Asynchronous version of :class:`warthog.core.NodeActiveConnectionsCommand`.
+
+    .. versionadded:: 2.1.0
+    """
+
+    async def send(self):
+        """See :meth:`warthog.core.NodeActiveConnectionsCommand.send`."""
+        self._logger.debug('Making active connection count GET request for %s', self._server)
+        payload = await self._request_async('GET', self._url(), headers=self._auth_header())
+
+        return self._parse(payload)
+
+
+class AsyncCommandFactory(object):
+    """Factory for getting new asynchronous command instances that each perform some
+    type of request against the load balancer API using a single, shared asynchronous
+    transport.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, transport):
+        """Set the asynchronous transport to be used for executing commands.
+
+        :param AiohttpTransport transport: Asynchronous transport shared by all commands.
+        """
+        self._transport = transport
+
+    def get_session_start(self, scheme_host, username, password):
+        """Get a new command instance to start a session.
+
+        :rtype: AsyncSessionStartCommand
+        """
+        return AsyncSessionStartCommand(self._transport, scheme_host, username, password)
+
+    def get_session_end(self, scheme_host, session_id):
+        """Get a new command instance to close an existing session.
+
+        :rtype: AsyncSessionEndCommand
+        """
+        return AsyncSessionEndCommand(self._transport, scheme_host, session_id)
+
+    def get_server_status(self, scheme_host, session_id, server):
+        """Get a new command to get the status (enabled / disabled) of a server.
+
+        :rtype: AsyncNodeStatusCommand
+        """
+        return AsyncNodeStatusCommand(self._transport, scheme_host, session_id, server)
+
+    def get_enable_server(self, scheme_host, session_id, server):
+        """Get a new command to enable a server at the node level.
+
+        :rtype: AsyncNodeEnableCommand
+        """
+        return AsyncNodeEnableCommand(self._transport, scheme_host, session_id, server)
+
+    def get_disable_server(self, scheme_host, session_id, server):
+        """Get a new command to disable a server at the node level.
+
+        :rtype: AsyncNodeDisableCommand
+        """
+        return AsyncNodeDisableCommand(self._transport, scheme_host, session_id, server)
+
+    def get_active_connections(self, scheme_host, session_id, server):
+        """Get a new command to get the number of active connections to a server.
+
+        :rtype: AsyncNodeActiveConnectionsCommand
+        """
+        return AsyncNodeActiveConnectionsCommand(
+            self._transport, scheme_host, session_id, server)
+
+    async def close(self):
+        """Close the shared transport and all connections held by it."""
+        close = getattr(self._transport, 'close', None)
+        if close is not None:
+            await close()
+
+
+class AsyncWarthogClient(object):
+    """Asynchronous client for interacting with an A10 load balancer to get the status
+    of nodes managed by it, enable them, and disable them.
+
+    This client has the same interface as :class:`warthog.client.WarthogClient` except
+    that each method is a coroutine. Waiting for servers to drain or become enabled is
+    done with :func:`asyncio.sleep` so that many operations may run concurrently on a
+    single event loop.
+
+    .. versionadded:: 2.1.0
+    """
+    _logger = warthog.core.get_log()
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, scheme_host, username, password,
+                 verify=None,
+                 ssl_version=None,
+                 pool_size=None,
+                 commands=None,
+                 connect_timeout=None,
+                 read_timeout=None,
+                 operation_timeout=None):
+        """Set the load balancer scheme/host/port combination, username and password
+        to use for connecting and authenticating with the load balancer.
+
+        :param basestring scheme_host: Scheme, host, and port combination of the load balancer.
+        :param basestring username: Name of the user to authenticate with.
+        :param basestring password: Password for the user to authenticate with.
+        :param bool|None verify: ``True`` to verify certificates when using HTTPS, ``False``
+            to skip verification, ``None`` to use the library default.
+        :param int|None ssl_version: :mod:`ssl` module constant for specifying which version of
+            SSL or TLS to use when connecting to the load balancer over HTTPS, ``None`` to use
+            the library default.
+        :param int|None pool_size: Maximum number of connections to keep open to the load
+            balancer, ``None`` to use the library default.
+        :param AsyncCommandFactory commands: Factory instance for creating new commands. It
+            is typically only necessary to override this for unit testing purposes.
+        :param float|None connect_timeout: Number of seconds to wait for a connection to the
+            load balancer to be established, ``None`` to use the library default.
+        :param float|None read_timeout: Number of seconds to wait for the load balancer to
+            send a response, ``None`` to use the library default.
+        :param float|None operation_timeout: Number of seconds each operation must complete
+            within, including starting a session and waiting for a server to drain or become
+            enabled, ``None`` to not limit how long operations take beyond the timeouts of
+            each request. Part of this time is set aside for ending the session, the same
+            as :class:`warthog.client.WarthogClient`.
+        """
+        self._scheme_host = scheme_host
+        self._username = username
+        self._password = password
+        self._commands = commands if commands is not None else AsyncCommandFactory(
+            AiohttpTransport(
+                verify=verify, ssl_version=ssl_version, pool_size=pool_size,
+                connect_timeout=connect_timeout, read_timeout=read_timeout))
+        self._operation_timeout = operation_timeout
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Release any resources, such as pooled connections, held by this client."""
+        await self._commands.close()
+
+    async def _call(self, timeout, operation, *args):
+        """Start an authenticated session, run the operation with it, and then close
+        the session afterwards, all within ``timeout`` seconds (or the default timeout
+        for operations).
+
+        :raises warthog.exceptions.WarthogTimeoutError: If the operation didn't complete
+            in time.
+        """
+        timeout = timeout if timeout is not None else self._operation_timeout
+        deadline = warthog.core.Deadline(timeout) if timeout is not None else None
+        logoff_timeout = timeout * warthog.client.LOGOFF_TIMEOUT_SHARE \
+            if timeout is not None else None
+
+        self._logger.debug('Creating new session context for %s', self._scheme_host)
+        phase = [warthog.core.PHASE_AUTH]
+        session = []
+
+        async def _run():
+            start_cmd = self._commands.get_session_start(
+                self._scheme_host, self._username, self._password)
+            session.append(await start_cmd.send())
+            phase[0] = warthog.core.PHASE_ACTION
+            return await operation(session[0], *args)
+
+        try:
+            return await asyncio.wait_for(
+                _run(), deadline.remaining() - logoff_timeout if deadline is not None else None)
+        except asyncio.TimeoutError:
+            # The transport's own timeouts raise the same error, only blame the deadline
+            # if it was actually what stopped the operation.
+            if deadline is None or deadline.remaining() > logoff_timeout:
+                raise
+            raise deadline.error(phase[0])
+        finally:
+            if session:
+                await self._end_session(session[0], logoff_timeout)
+
+    async def _end_session(self, session, timeout):
+        """Close a session, giving up on it if that takes longer than ``timeout`` seconds."""
+        end_cmd = self._commands.get_session_end(self._scheme_host, session)
+        try:
+            await asyncio.wait_for(end_cmd.send(), timeout)
+        except asyncio.TimeoutError:
+            self._logger.warning(
+                'Abandoning session with %s: logoff did not complete within %s seconds',
+                self._scheme_host, timeout)
+
+    async def get_status(self, server, timeout=None):
+        """Get the current status of the given server, at the node level.
+
+        See :meth:`warthog.client.WarthogClient.get_status`.
+        """
+        return await self._call(timeout, self._get_status, server)
+
+    async def _get_status(self, session, server):
+        """Get the status of a server using an existing session."""
+        cmd = self._commands.get_server_status(self._scheme_host, session, server)
+        return await cmd.send()
+
+    async def get_connections(self, server, timeout=None):
+        """Get the current number of active connections to a server, at the node level.
+
+        See :meth:`warthog.client.WarthogClient.get_connections`.
+        """
+        return await self._call(timeout, self._get_connections, server)
+
+    async def _get_connections(self, session, server):
+        """Get active connections to a server using an existing session."""
+        cmd = self._commands.get_active_connections(self._scheme_host, session, server)
+        return await cmd.send()
+
+    async def disable_server(self, server, max_retries=5, wait_interval=2.0, wait=None,
+                             timeout=None):
+        """Disable a server at the node level, waiting for the number of active
+        connections to the server to reach zero.
+
+        See :meth:`warthog.client.WarthogClient.disable_server`.
+        """
+        wait = warthog.wait.get_wait_strategy(wait, max_retries, wait_interval)
+        return await self._call(timeout, self._disable_server, server, wait)
+
+    async def _disable_server(self, session, server, wait):
+        """Disable a server and wait for it to drain using an existing session."""
+        disable = self._commands.get_disable_server(self._scheme_host, session, server)
+        await disable.send()
+
+        active = self._commands.get_active_connections(self._scheme_host, session, server)
+        waiter = wait.start()
+
+        while not waiter.expired():
+            conns = await active.send()
+            if conns == 0:
+                break
+
+            interval = waiter.next_delay(conns)
+            self._logger.debug(
+                "Connections still active: %s, sleeping for %s seconds...", conns, interval)
+            await asyncio.sleep(interval)
+
+        status = self._commands.get_server_status(self._scheme_host, session, server)
+        return warthog.core.STATUS_DISABLED == await status.send()
+
+    async def enable_server(self, server, max_retries=5, wait_interval=2.0, wait=None,
+                            timeout=None):
+        """Enable a server at the node level, waiting for the server to enter the
+        expected, enabled state.
+
+        See :meth:`warthog.client.WarthogClient.enable_server`.
+        """
+        wait = warthog.wait.get_wait_strategy(wait, max_retries, wait_interval)
+        return await self._call(timeout, self._enable_server, server, wait)
+
+    async def _enable_server(self, session, server, wait):
+        """Enable a server and wait for it to be enabled using an existing session."""
+        enable = self._commands.get_enable_server(self._scheme_host, session, server)
+        await enable.send()
+
+        status = self._commands.get_server_status(self._scheme_host, session, server)
+        waiter = wait.start()
+
+        while not waiter.expired():
+            current = await status.send()
+            if current == warthog.core.STATUS_ENABLED:
+                break
+
+            interval = waiter.next_delay(current)
+            self._logger.debug(
+                "Server is not yet enabled (%s), sleeping for %s seconds...",
+                current, interval)
+            await asyncio.sleep(interval)
+
+        return warthog.core.STATUS_ENABLED == await status.send()
@@ -15,13 +15,29 @@ Publicly importable API for the Warthog client and library.
 """
 
 from .core import (
+    register_error_handler,
+    ResponseContext,
+    set_log_body_limit,
     STATUS_DISABLED,
     STATUS_DOWN,
     STATUS_ENABLED)
 
+from .breaker import (
+    get_circuit_breaker,
+    CircuitBreaker)
+
 from .client import (
     CommandFactory,
-    WarthogClient)
+    NodeSnapshot,
+    WarthogClient,
+    WatchEvent)
+
+from .cluster import (
+    get_cluster_client,
+    ClusterResult,
+    WarthogClusterClient)
+
+from .concurrency import OperationResult
 
 from .config import (
     WarthogConfigLoader,
@@ -29,7 +45,51 @@ from .config import (
     DEFAULT_CONFIG_ENCODING,
     DEFAULT_CONFIG_LOCATIONS)
 
-from .transport import get_transport_factory
+from .daemon import (
+    get_daemon_client,
+    DaemonClient,
+    WarthogDaemon)
+
+from .hedge import (
+    get_hedged_client,
+    HedgeDelay,
+    HedgedWarthogClient)
+
+from .hooks import (
+    get_hooks,
+    PrometheusHook,
+    RequestEvent,
+    StatsdHook)
+
+from .ratelimit import (
+    get_rate_limiter,
+    set_rate_limiter,
+    RateLimiter)
+
+from .rolling import (
+    command_hook,
+    resolve_count,
+    RollingOperation,
+    RollResult,
+    STAGE_DISABLE,
+    STAGE_DONE,
+    STAGE_ENABLE,
+    STAGE_HOOK,
+    STAGE_SKIPPED)
+
+from .session import (
+    SessionPool,
+    SessionPoolStats)
+
+from .transport import (
+    get_pooled_transport_factory,
+    get_transport_factory)
+
+from .wait import (
+    ConnectionRateWait,
+    ExponentialBackoffWait,
+    FixedIntervalWait,
+    WaitStrategy)
 
 from .exceptions import (
     WarthogError,
@@ -40,6 +100,11 @@ from .exceptions import (
     WarthogNodeStatusError,
     WarthogNoSuchNodeError,
     WarthogPermissionError,
+    WarthogTimeoutError,
+    WarthogCircuitOpenError,
+    WarthogSessionPoolExhaustedError,
+    WarthogClusterError,
+    WarthogDaemonError,
     WarthogConfigError,
     WarthogMalformedConfigFileError,
     WarthogNoConfigFileError)
@@ -47,13 +112,30 @@ from .exceptions import (
 
 __all__ = [
     # warthog.core
+    'register_error_handler',
+    'ResponseContext',
+    'set_log_body_limit',
     'STATUS_DISABLED',
     'STATUS_DOWN',
     'STATUS_ENABLED',
 
+    # warthog.breaker
+    'get_circuit_breaker',
+    'CircuitBreaker',
+
     # warthog.client
     'CommandFactory',
+    'NodeSnapshot',
     'WarthogClient',
+    'WatchEvent',
+
+    # warthog.cluster
+    'get_cluster_client',
+    'ClusterResult',
+    'WarthogClusterClient',
+
+    # warthog.concurrency
+    'OperationResult',
 
     # warthog.config
     'WarthogConfigLoader',
@@ -61,9 +143,52 @@ __all__ = [
     'DEFAULT_CONFIG_ENCODING',
     'DEFAULT_CONFIG_LOCATIONS',
 
+    # warthog.daemon
+    'get_daemon_client',
+    'DaemonClient',
+    'WarthogDaemon',
+
+    # warthog.hedge
+    'get_hedged_client',
+    'HedgeDelay',
+    'HedgedWarthogClient',
+
+    # warthog.hooks
+    'get_hooks',
+    'PrometheusHook',
+    'RequestEvent',
+    'StatsdHook',
+
+    # warthog.ratelimit
+    'get_rate_limiter',
+    'set_rate_limiter',
+    'RateLimiter',
+
+    # warthog.rolling
+    'command_hook',
+    'resolve_count',
+    'RollingOperation',
+    'RollResult',
+    'STAGE_DISABLE',
+    'STAGE_DONE',
+    'STAGE_ENABLE',
+    'STAGE_HOOK',
+    'STAGE_SKIPPED',
+
+    # warthog.session
+    'SessionPool',
+    'SessionPoolStats',
+
     # warthog.transport
+    'get_pooled_transport_factory',
     'get_transport_factory',
 
+    # warthog.wait
+    'ConnectionRateWait',
+    'ExponentialBackoffWait',
+    'FixedIntervalWait',
+    'WaitStrategy',
+
     # warthog.exceptions
     'WarthogError',
     'WarthogApiError',
@@ -73,6 +198,11 @@ __all__ = [
     'WarthogNodeStatusError',
     'WarthogNoSuchNodeError',
     'WarthogPermissionError',
+    'WarthogTimeoutError',
+    'WarthogCircuitOpenError',
+    'WarthogSessionPoolExhaustedError',
+    'WarthogClusterError',
+    'WarthogDaemonError',
     'WarthogConfigError',
     'WarthogMalformedConfigFileError',
     'WarthogNoConfigFileError'
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.bench
+~~~~~~~~~~~~~
+
+Benchmarks for the most frequently used client operations, run against the simulated
+load balancer from :mod:`warthog.testing`.
+
+Results are emitted as JSON so that they can be compared between releases. Run the
+``warthog-bench`` command for available options.
+"""
+
+import collections
+import datetime
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+import click
+
+import warthog
+import warthog.client
+import warthog.codec
+import warthog.core
+import warthog.testing
+import warthog.wait
+
+# Operations that can be benchmarked.
+SCENARIO_STATUS = 'status'
+SCENARIO_CONNECTIONS = 'connections'
+SCENARIO_CYCLE = 'cycle'
+
+SCENARIOS = (SCENARIO_STATUS, SCENARIO_CONNECTIONS, SCENARIO_CYCLE)
+
+# Default number of times each worker runs the operation being benchmarked.
+DEFAULT_ITERATIONS = 100
+
+# Default number of times to start the CLI when benchmarking startup time.
+DEFAULT_STARTUP_ITERATIONS = 20
+
+# Modules that take the longest to import and which CLI commands that don't talk to
+# the load balancer should never need.
+HEAVY_MODULES = ('requests', 'urllib3', 'warthog.client', 'warthog.core', 'warthog.transport')
+
+_MODULES_MARKER = 'warthog-bench-modules: '
+
+# Start the CLI the same way the installed ``warthog`` script does and report which
+# of the heavy modules ended up imported.
+_STARTUP_SCRIPT = '''
+import json, sys
+import warthog.cli
+try:
+    warthog.cli.main(args=sys.argv[1:], prog_name='warthog', standalone_mode=False)
+finally:
+    sys.stderr.write('\\n%s' + json.dumps([m for m in %r if m in sys.modules]) + '\\n')
+''' % (_MODULES_MARKER, HEAVY_MODULES)
+
+# Servers in the simulator never have active connections during benchmarks so
+# that a single check is enough to see that a server has drained.
+_CYCLE_WAIT = warthog.wait.FixedIntervalWait(interval=0.001, max_retries=100)
+
+
+# Combination of settings that a single benchmark is run with. A pool size of zero
+# means that connections are not pooled and latency is in seconds.
+BenchmarkCase = collections.namedtuple(
+    'BenchmarkCase', ['scenario', 'concurrency', 'session_reuse', 'pool_size', 'latency'])
+
+
+def _get_operation(client, scenario, server):
+    """Get a callable that runs a single iteration of the given scenario."""
+    if scenario == SCENARIO_STATUS:
+        return lambda: client.get_status(server)
+    if scenario == SCENARIO_CONNECTIONS:
+        return lambda: client.get_connections(server)
+    if scenario == SCENARIO_CYCLE:
+        def cycle():
+            client.disable_server(server, wait=_CYCLE_WAIT)
+            client.enable_server(server, wait=_CYCLE_WAIT)
+        return cycle
+
+    raise ValueError('Unknown scenario: {0}'.format(scenario))
+
+
+def _worker(operation, iterations, latencies, errors):
+    """Run an operation a number of times, recording how long each call took."""
+    for _ in range(iterations):
+        start = warthog.core.monotonic()
+        try:
+            operation()
+        except Exception:  # pylint: disable=broad-except
+            errors.append(1)
+        latencies.append(warthog.core.monotonic() - start)
+
+
+def run_case(case, iterations=None):
+    """Run a single benchmark against a newly started simulated load balancer.
+
+    Each of the ``concurrency`` workers uses a separate server so that enable and
+    disable cycles don't interfere with each other, but all workers share one client.
+
+    :param BenchmarkCase case: Settings to run the benchmark with.
+    :param int|None iterations: Number of times each worker runs the operation,
+        ``None`` to use the default.
+    :return: Summary of the benchmark suitable for serializing as JSON.
+    :rtype: dict
+    """
+    iterations = iterations if iterations is not None else DEFAULT_ITERATIONS
+    latencies = []
+    errors = []
+
+    with warthog.testing.LoadBalancerSimulator(latency=case.latency) as sim:
+        servers = ['bench{0}.example.com'.format(i) for i in range(case.concurrency)]
+        for server in servers:
+            sim.add_server(server)
+
+        client = warthog.client.WarthogClient(
+            sim.scheme_host, sim.username, sim.password,
+            pooled=case.pool_size > 0,
+            pool_size=case.pool_size or None,
+            session_reuse=case.session_reuse)
+
+        with client:
+            threads = [
+                threading.Thread(target=_worker, args=(
+                    _get_operation(client, case.scenario, server),
+                    iterations, latencies, errors))
+                for server in servers]
+
+            start = warthog.core.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = warthog.core.monotonic() - start
+
+        requests = sum(sim.requests.values())
+
+    result = case._asdict()
+    result.update({
+        'calls': len(latencies),
+        'errors': len(errors),
+        'requests': requests,
+        'seconds': elapsed,
+        'calls_per_sec': len(latencies) / elapsed if elapsed > 0 else None,
+        'p50_ms': _to_ms(warthog.core.percentile(latencies, 50)),
+        'p99_ms': _to_ms(warthog.core.percentile(latencies, 99)),
+    })
+    return result
+
+
+def run_startup(args=None, iterations=None):
+    """Measure how long it takes to start a new Python process, run a CLI command,
+    and exit, along with which slow to import modules the command imported.
+
+    :param list|None args: Arguments for the ``warthog`` command, ``None`` to run the
+        ``config-path`` command, which doesn't need to talk to a load balancer.
+    :param int|None iterations: Number of times to run the command, ``None`` to use
+        the default.
+    :return: Summary of the benchmark suitable for serializing as JSON.
+    :rtype: dict
+    """
+    args = list(args) if args is not None else ['config-path']
+    iterations = iterations if iterations is not None else DEFAULT_STARTUP_ITERATIONS
+    latencies = []
+    imported = []
+
+    for _ in range(iterations):
+        start = warthog.core.monotonic()
+        proc = subprocess.Popen(
+            [sys.executable, '-c', _STARTUP_SCRIPT] + args,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        _, err = proc.communicate()
+        latencies.append(warthog.core.monotonic() - start)
+
+        for line in err.decode('utf-8').splitlines():
+            if line.startswith(_MODULES_MARKER):
+                imported = json.loads(line[len(_MODULES_MARKER):])
+
+    return {
+        'command': args,
+        'runs': iterations,
+        'p50_ms': _to_ms(warthog.core.percentile(latencies, 50)),
+        'p99_ms': _to_ms(warthog.core.percentile(latencies, 99)),
+        'heavy_modules': imported,
+    }
+
+
+def _to_ms(seconds):
+    return seconds * 1000.0 if seconds is not None else None
+
+
+def get_cases(scenarios, concurrency, session_reuse, pool_sizes, latencies):
+    """Get every combination of the given settings as benchmark cases.
+
+    :rtype: list
+    """
+    return [BenchmarkCase(*values) for values in itertools.product(
+        scenarios, concurrency, session_reuse, pool_sizes, latencies)]
+
+
+def run_suite(cases, iterations=None, progress=None):
+    """Run each of the given benchmark cases and collect the results along with
+    information about the environment they were run in.
+
+    :param list cases: Benchmark cases to run.
+    :param int|None iterations: Number of times each worker runs each operation,
+        ``None`` to use the default.
+    :param callable progress: Callable invoked with each case before it is run.
+    :return: Results of the benchmarks suitable for serializing as JSON.
+    :rtype: dict
+    """
+    results = []
+    for case in cases:
+        if progress is not None:
+            progress(case)
+        results.append(run_case(case, iterations=iterations))
+
+    return {
+        'warthog_version': warthog.__version__,
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'json_codec': warthog.codec.get_codec().name,
+        'timestamp': datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'iterations': iterations if iterations is not None else DEFAULT_ITERATIONS,
+        'results': results,
+    }
+
+
+@click.command()
+@click.version_option(version=warthog.__version__)
+@click.option(
+    '--scenario', 'scenarios', multiple=True, type=click.Choice(SCENARIOS),
+    help='Operation to benchmark, may be given multiple times. Default is all operations.')
+@click.option(
+    '--concurrency', multiple=True, type=click.IntRange(min=1),
+    help='Number of threads making calls at the same time, may be given multiple times.')
+@click.option(
+    '--session-reuse', multiple=True, type=click.Choice(['on', 'off']),
+    help='Whether to reuse a single session, may be given multiple times.')
+@click.option(
+    '--pool-size', multiple=True, type=click.IntRange(min=0),
+    help='Size of the shared connection pool, zero for no pooling. May be given multiple times.')
+@click.option(
+    '--latency-ms', multiple=True, type=click.FloatRange(min=0),
+    help='Latency added to each simulated API response, may be given multiple times.')
+@click.option(
+    '--iterations', default=DEFAULT_ITERATIONS, type=click.IntRange(min=1),
+    help='Number of times each thread runs the operation.')
+@click.option(
+    '--output', type=click.File('w'), default='-',
+    help='File to write JSON results to. Default is standard output.')
+@click.option(
+    '--startup', is_flag=True,
+    help=('Benchmark how long the warthog command takes to start and run config-path '
+          'instead of benchmarking client operations.'))
+# pylint: disable=too-many-arguments
+def main(scenarios, concurrency, session_reuse, pool_size, latency_ms, iterations, output,
+         startup):
+    """Benchmark the Warthog client against a simulated load balancer."""
+    if startup:
+        results = {
+            'warthog_version': warthog.__version__,
+            'python_version': platform.python_version(),
+            'startup': run_startup(iterations=min(iterations, DEFAULT_STARTUP_ITERATIONS)),
+        }
+        output.write(json.dumps(results, indent=2, sort_keys=True))
+        output.write('\n')
+        return
+
+    cases = get_cases(
+        scenarios or SCENARIOS,
+        concurrency or (1, 8),
+        [value == 'on' for value in (session_reuse or ('off', 'on'))],
+        pool_size or (0, 10),
+        [value / 1000.0 for value in (latency_ms or (0.0, 5.0))])
+
+    # pylint: disable=missing-docstring
+    def progress(case):
+        click.echo('Running {0}'.format(', '.join(
+            '{0}={1}'.format(k, v) for k, v in case._asdict().items())), err=True)
+
+    results = run_suite(cases, iterations=iterations, progress=progress)
+    output.write(json.dumps(results, indent=2, sort_keys=True))
+    output.write('\n')
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.breaker
+~~~~~~~~~~~~~~~
+
+Circuit breakers that stop requests from being made to a load balancer that is
+failing so that callers fail fast instead of waiting through timeouts and retries.
+"""
+
+import collections
+import threading
+
+import warthog.core
+import warthog.exceptions
+# pylint: disable=import-error,no-name-in-module
+from .packages.six.moves import urllib
+
+# Requests are made normally and their outcomes are tracked.
+STATE_CLOSED = 'closed'
+
+# Requests fail immediately without being made.
+STATE_OPEN = 'open'
+
+# A single trial request is allowed to decide if the breaker should close again.
+STATE_HALF_OPEN = 'half-open'
+
+# Default fraction of recent requests that must fail for the breaker to open.
+DEFAULT_FAILURE_RATE = 0.5
+
+# Default number of the most recent requests used to compute the failure rate.
+DEFAULT_WINDOW = 20
+
+# Default number of requests that must have been made before the failure rate is
+# considered, so that a single failure doesn't open the breaker.
+DEFAULT_MIN_REQUESTS = 5
+
+# Default number of seconds after which a request that succeeded is still counted as
+# a failure. A management plane that takes this long to answer is not healthy.
+DEFAULT_SLOW_REQUEST = 10.0
+
+# Default number of seconds the breaker stays open before allowing a trial request.
+DEFAULT_RESET_TIMEOUT = 30.0
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_scheme_host(url):
+    """Get the normalized scheme, host, and port of a URL that breakers are keyed by.
+
+    .. versionadded:: 2.1.0
+
+    :param basestring url: URL or scheme and host of a load balancer.
+    :return: Lowercase scheme and host (including the port, if any).
+    :rtype: basestring
+    """
+    parts = urllib.parse.urlsplit(url)
+    return '{0}://{1}'.format(parts.scheme.lower(), parts.netloc.lower())
+
+
+def get_circuit_breaker(scheme_host, **kwargs):
+    """Get the circuit breaker for a load balancer, shared by every client in this process
+    that makes requests to it, creating it if it doesn't exist yet.
+
+    Settings given are only used when the breaker is created. To use settings other than
+    the defaults for a load balancer, call this before making any requests to it.
+
+    .. versionadded:: 2.1.0
+
+    :param basestring scheme_host: Scheme, host, and port combination of the load balancer.
+    :param kwargs: Keyword arguments for :class:`CircuitBreaker`.
+    :return: The circuit breaker for the load balancer.
+    :rtype: CircuitBreaker
+    """
+    key = get_scheme_host(scheme_host)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key, **kwargs)
+        return breaker
+
+
+def reset_circuit_breakers():
+    """Discard the circuit breaker for every load balancer.
+
+    .. versionadded:: 2.1.0
+    """
+    with _breakers_lock:
+        _breakers.clear()
+
+
+class CircuitBreaker(object):
+    """Track the outcome of recent requests to a load balancer and stop making requests
+    to it when too many fail.
+
+    The breaker starts closed. When at least ``failure_rate`` of the most recent ``window``
+    requests have failed (raised an exception such as a connection error or timeout,
+    received a server error response, or took longer than ``slow_request`` seconds) the
+    breaker opens and requests fail immediately with a
+    :class:`warthog.exceptions.WarthogCircuitOpenError`. After ``reset_timeout`` seconds
+    the breaker is half-open and a single trial request is allowed. If it succeeds the
+    breaker closes, otherwise it opens again.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    _logger = warthog.core.get_log()
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, scheme_host, failure_rate=None, window=None, min_requests=None,
+                 slow_request=None, reset_timeout=None, clock=None):
+        """Set the load balancer the breaker is for and when it should open and close.
+
+        :param basestring scheme_host: Scheme, host, and port combination of the load balancer.
+        :param float|None failure_rate: Fraction of recent requests that must fail for the
+            breaker to open, ``None`` to use the default of half.
+        :param int|None window: Number of the most recent requests to compute the failure
+            rate from, ``None`` to use the default of 20.
+        :param int|None min_requests: Number of requests that must have been made before the
+            breaker may open, ``None`` to use the default of 5.
+        :param float|None slow_request: Number of seconds after which a request counts as a
+            failure even if it succeeded, ``None`` to use the default of 10 seconds.
+        :param float|None reset_timeout: Number of seconds to stay open before allowing a
+            trial request, ``None`` to use the default of 30 seconds.
+        :param callable clock: Callable that returns the current time in seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        self.scheme_host = scheme_host
+        self._failure_rate = failure_rate if failure_rate is not None else DEFAULT_FAILURE_RATE
+        self._min_requests = min_requests if min_requests is not None else DEFAULT_MIN_REQUESTS
+        self._slow_request = slow_request if slow_request is not None else DEFAULT_SLOW_REQUEST
+        self._reset_timeout = reset_timeout if reset_timeout is not None else \
+            DEFAULT_RESET_TIMEOUT
+        self._clock = clock if clock is not None else warthog.core.monotonic
+
+        self._lock = threading.Lock()
+        self._outcomes = collections.deque(maxlen=window if window is not None else DEFAULT_WINDOW)
+        self._state = STATE_CLOSED
+        self._opened = None
+        self._trial = False
+
+    @property
+    def state(self):
+        """Current state of the breaker: ``closed``, ``open``, or ``half-open``."""
+        with self._lock:
+            return self._get_state(self._clock())
+
+    def _get_state(self, now):
+        if self._state == STATE_OPEN and now - self._opened >= self._reset_timeout:
+            self._state = STATE_HALF_OPEN
+            self._trial = False
+        return self._state
+
+    def before_request(self):
+        """Check that a request may be made, reserving the trial request if half-open.
+
+        Every call that doesn't raise must be followed by a call to :meth:`after_request`
+        or :meth:`cancel_request`.
+
+        :raises warthog.exceptions.WarthogCircuitOpenError: If requests to the load
+            balancer are not being made.
+        """
+        with self._lock:
+            now = self._clock()
+            state = self._get_state(now)
+            if state == STATE_CLOSED:
+                return
+            if state == STATE_HALF_OPEN and not self._trial:
+                self._trial = True
+                return
+
+            retry_after = max(0.0, self._reset_timeout - (now - self._opened))
+
+        raise warthog.exceptions.WarthogCircuitOpenError(
+            'Not making requests to {0}, too many recent requests failed'.format(
+                self.scheme_host),
+            scheme_host=self.scheme_host, retry_after=retry_after)
+
+    def after_request(self, elapsed, failed):
+        """Record the outcome of a request.
+
+        :param float elapsed: Number of seconds the request took.
+        :param bool failed: ``True`` if the request failed.
+        """
+        failed = failed or elapsed > self._slow_request
+        with self._lock:
+            now = self._clock()
+            if self._get_state(now) == STATE_HALF_OPEN:
+                if failed:
+                    self._open(now)
+                else:
+                    self._logger.info('Closing circuit breaker for %s', self.scheme_host)
+                    self._state = STATE_CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append(failed)
+            if self._state == STATE_CLOSED and self._should_open():
+                self._open(now)
+
+    def cancel_request(self):
+        """Finish a request without recording its outcome, for requests that failed
+        because of the caller (such as running out of time for the operation making them)
+        rather than the load balancer.
+
+        Every call to :meth:`before_request` that doesn't raise must be followed by a call
+        to either this method or :meth:`after_request`. If half-open, the trial request is
+        released so that another request may be the trial.
+        """
+        with self._lock:
+            if self._get_state(self._clock()) == STATE_HALF_OPEN:
+                self._trial = False
+
+    def _should_open(self):
+        count = len(self._outcomes)
+        if count < self._min_requests:
+            return False
+        return sum(self._outcomes) >= self._failure_rate * count
+
+    def _open(self, now):
+        self._logger.warning(
+            'Opening circuit breaker for %s for %s seconds', self.scheme_host,
+            self._reset_timeout)
+        self._state = STATE_OPEN
+        self._opened = now
+        self._trial = False
+        self._outcomes.clear()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.cache
+~~~~~~~~~~~~~
+
+Short lived, in-process caching of results from the load balancer.
+"""
+
+import collections
+import sys
+import threading
+
+import warthog.core
+
+from .packages import six
+
+# Default maximum number of entries to keep in a cache before the least
+# recently used entries are evicted.
+DEFAULT_CACHE_SIZE = 1024
+
+
+class _Pending(object):
+    """Result of a load that is currently in progress, shared by every caller
+    that asked for the same key while it was loading.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def get(self):
+        # Don't wait on another thread's load for longer than the caller has left.
+        deadline = warthog.core.get_deadline()
+        if not self.done.wait(deadline.remaining() if deadline is not None else None):
+            raise deadline.error(warthog.core.PHASE_ACTION)
+        if self.error is not None:
+            six.reraise(*self.error)
+        return self.value
+
+
+class ResultCache(object):
+    """Cache of results that expire a fixed number of seconds after being loaded, with
+    a bounded number of entries (evicting the least recently used) and coalescing of
+    concurrent loads of the same key.
+
+    When multiple threads ask for the same key at the same time and it isn't cached, only
+    one of them loads it and the rest wait for and share that result. Errors raised while
+    loading a key are passed on to every thread waiting for it but are not cached. Threads
+    with a deadline (see :func:`warthog.core.deadline_context`) only wait until it passes.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, ttl, max_size=None, clock=None):
+        """Set how long results are cached for and how many results may be cached.
+
+        :param float ttl: Number of seconds a result is cached for after being loaded.
+        :param int|None max_size: Maximum number of results to cache, ``None`` to use
+            the default.
+        :param callable clock: Callable that returns the current time in seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        self._ttl = ttl
+        self._max_size = max_size if max_size is not None else DEFAULT_CACHE_SIZE
+        self._clock = clock if clock is not None else warthog.core.monotonic
+
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._loading = {}
+
+    def _lookup(self, key, now):
+        """Get the unexpired value for a key, marking it as recently used, or raise KeyError."""
+        expires, value = self._entries[key]
+        if expires <= now:
+            del self._entries[key]
+            raise KeyError(key)
+
+        # Move the entry to the end to mark it as most recently used.
+        del self._entries[key]
+        self._entries[key] = expires, value
+        return value
+
+    def _store(self, key, value, now):
+        self._entries.pop(key, None)
+        self._entries[key] = now + self._ttl, value
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, key, loader):
+        """Get the cached value for a key, calling the loader to get it if it isn't cached
+        or has expired (or waiting for another thread that is already loading it).
+
+        :param key: Key of the value to get.
+        :param callable loader: Callable that takes no arguments and returns the value.
+        :return: The cached or newly loaded value.
+        :raises warthog.exceptions.WarthogTimeoutError: If the deadline of the current
+            thread passed while waiting for another thread to load the value.
+        """
+        with self._lock:
+            try:
+                return self._lookup(key, self._clock())
+            except KeyError:
+                pass
+
+            pending = self._loading.get(key)
+            if pending is not None:
+                owner = False
+            else:
+                pending = self._loading[key] = _Pending()
+                owner = True
+
+        if not owner:
+            return pending.get()
+
+        try:
+            pending.value = loader()
+        except Exception:  # pylint: disable=broad-except
+            pending.error = sys.exc_info()
+
+        with self._lock:
+            # Only cache the result if the key wasn't invalidated while we were loading it.
+            if self._loading.get(key) is pending:
+                del self._loading[key]
+                if pending.error is None:
+                    self._store(key, pending.value, self._clock())
+
+        pending.done.set()
+        return pending.get()
+
+    def invalidate(self, key):
+        """Discard the cached value for a key, if any.
+
+        Any load of the key that is in progress will not be cached when it completes.
+
+        :param key: Key of the value to discard.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._loading.pop(key, None)
+
+    def clear(self):
+        """Discard all cached values."""
+        with self._lock:
+            self._entries.clear()
+            self._loading.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
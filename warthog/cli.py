@@ -13,18 +13,32 @@ warthog.cli
 
 CLI interface for interacting with a load balancer using the Warthog client.
 """
+import collections
 import functools
+import json
 import os
 import os.path
+import signal
+import sys
 
 import click
-import requests
 
 import warthog
-import warthog.api
+import warthog.exceptions
 from .packages import six
 
 
+def _api():
+    """Get the :mod:`warthog.api` module, importing it the first time a command needs it.
+
+    Importing the library API imports ``requests`` and ``urllib3`` which take much longer
+    than everything else the CLI needs. Deferring the import means commands that don't talk
+    to the load balancer, like ``config-path``, start quickly.
+    """
+    import warthog.api  # pylint: disable=redefined-outer-name
+    return warthog.api
+
+
 def error_wrapper(func):
     """Decorator that coverts possible errors raised by the WarthogClient
     into instances of ClickExceptions so that they may be rendered automatically
@@ -35,18 +49,32 @@ def error_wrapper(func):
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
-        except warthog.api.WarthogNoSuchNodeError as e:
+        except warthog.exceptions.WarthogNoSuchNodeError as e:
             raise click.BadParameter("{0} doesn't appear to be a known node".format(e.server))
-        except warthog.api.WarthogAuthFailureError as e:
+        except warthog.exceptions.WarthogAuthFailureError as e:
             raise click.ClickException(
                 "Authentication with the load balancer failed. The error was: {0}".format(e))
-        except requests.ConnectionError as e:
+        except warthog.exceptions.WarthogDaemonError as e:
+            raise click.ClickException(
+                "The daemon was unable to complete the request. The error was: {0}".format(e))
+        except Exception as e:  # pylint: disable=broad-except
+            if not _is_connection_error(e):
+                raise
             raise click.ClickException(
                 "Connecting to the load balancer failed. The error was {0}".format(e))
 
     return wrapper
 
 
+def _is_connection_error(error):
+    """Determine if an error was a failure to connect to the load balancer."""
+    # Requests is only imported once a client has been created, and if it hasn't
+    # been imported it can't have raised anything. This avoids importing it when
+    # commands are forwarded to a daemon.
+    requests = sys.modules.get('requests')
+    return requests is not None and isinstance(error, requests.ConnectionError)
+
+
 class WarthogClientFacade(object):
     """Wrapper around a :class:`warthog.client.WarthogClient` that coverts
     exceptions encountered into exceptions that click will handle automatically.
@@ -87,47 +115,109 @@ class WarthogClientFacade(object):
     help=('Enable warnings from underlying libraries when running on older Python '
           'versions known to cause intermittent failures of SSL/TLS connections.'),
     is_flag=True)
-# pylint: disable=unused-argument
-def main(config, enable_platform_warning):
+@click.option(
+    '--cluster',
+    help=('Run commands against every load balancer configured by a [warthog:<name>] '
+          'section of the configuration file instead of a single load balancer.'),
+    is_flag=True)
+@click.option(
+    '--policy',
+    help=('How many load balancers must complete a command for it to succeed when '
+          'using --cluster. Default is all of them.'),
+    type=click.Choice(['all', 'quorum', 'any']),
+    default='all')
+@click.option(
+    '--socket', 'socket_path',
+    help=('Path of the socket of a warthog daemon to forward commands to if it is running. '
+          'Default is $WARTHOG_SOCKET if set, otherwise ~/.warthog.sock.'),
+    type=click.Path(dir_okay=False))
+@click.option(
+    '--no-daemon',
+    help='Always talk to the load balancer directly, even if a daemon is running.',
+    is_flag=True)
+# pylint: disable=unused-argument,too-many-arguments
+def main(config, enable_platform_warning, cluster, policy, socket_path, no_daemon):
     """Interact with a load balancer using the Warthog client."""
     # We don't actually do anything with the config file argument at this point.
     # The idea here is that we shouldn't be parsing the config file until we really
     # need it (like when we're creating a client instance). This allows us to display
     # help for subcommands without requiring the user to set up a config file first
-    # (which would be really annoying).
+    # (which would be really annoying). The same goes for the platform warning, which
+    # is only disabled once we're about to create a client since doing so requires
+    # importing urllib3.
+
 
+def _get_loader(config):
+    """Construct a new config loader that has parsed the specified config file."""
     # Unless the user has specifically asked for this warning, we disable it because
     # it makes the CLI unusable on Python 2.6 or Python 2.7 < 2.7.9 (which is what CentOS
     # runs ATM).
-    if not enable_platform_warning:
+    ctx = click.get_current_context(silent=True)
+    if ctx is None or not ctx.find_root().params.get('enable_platform_warning'):
         disable_platform_warning()
 
-
-def get_client(config):
-    """Construct a new wrapped client based on the specified config file."""
     # Passing the config file unconditionally here since if the user hasn't
     # specified one it'll be None and the config loader will use the default
     # locations.
-    loader = warthog.api.WarthogConfigLoader(config_file=config)
+    loader = _api().WarthogConfigLoader(config_file=config)
 
     try:
         # Expected errors that might be raised during parsing. These will
         # already have nice user-facing messages so we just reraise them as
         # BadParameter exceptions with the same message.
         loader.initialize()
-    except warthog.api.WarthogConfigError as e:
+    except warthog.exceptions.WarthogConfigError as e:
         raise click.ClickException(six.text_type(e))
 
-    settings = loader.get_settings()
+    return loader
 
-    # Wrap the client in a facade that translates expected errors into
-    # exceptions that click will render as error messages for the user.
-    return WarthogClientFacade(warthog.api.WarthogClient(
+
+def _new_client(config, **kwargs):
+    """Construct a new client based on the specified config file."""
+    settings = _get_loader(config).get_settings()
+    return _api().WarthogClient(
         settings.scheme_host,
         settings.username,
         settings.password,
         ssl_version=settings.ssl_version,
-        verify=settings.verify))
+        verify=settings.verify,
+        **kwargs)
+
+
+def get_client(config):
+    """Construct a new wrapped client based on the specified config file."""
+    # Wrap the client in a facade that translates expected errors into
+    # exceptions that click will render as error messages for the user.
+    return WarthogClientFacade(_new_client(config))
+
+
+def get_cluster_client(config, policy):
+    """Construct a new cluster client for every load balancer in the specified config file."""
+    settings = _get_loader(config).get_cluster_settings()
+    if not settings:
+        raise click.ClickException(
+            "No load balancers are configured for --cluster. Add a [warthog:<name>] "
+            "section to the configuration file for each load balancer")
+
+    return _api().get_cluster_client(settings, policy=policy)
+
+
+def _run_cluster(ctx, operation, describe):
+    """Run an operation against each configured load balancer, print the outcome
+    for each, and exit with a non-zero code if the policy wasn't satisfied.
+    """
+    params = ctx.parent.params
+    with get_cluster_client(params['config'], params['policy']) as client:
+        result = operation(client)
+
+    for name, res in result.results.items():
+        if res.ok:
+            click.echo('{0}: {1}'.format(name, describe(res.value)))
+        else:
+            click.echo('{0}: error: {1}'.format(name, res.error))
+
+    if not result.ok:
+        ctx.exit(1)
 
 
 def disable_platform_warning():
@@ -143,44 +233,334 @@ def disable_platform_warning():
     warnings.filterwarnings("ignore", category=SNIMissingWarning)
 
 
+def _batch_options(func):
+    """Add the arguments and options shared by commands that operate on many servers."""
+    decorators = [
+        click.argument('servers', nargs=-1),
+        click.option(
+            '--servers-from', type=click.File('r'),
+            help='File to read server hostnames from, one per line. Use - for standard input.'),
+        click.option(
+            '--parallel', type=click.IntRange(min=1),
+            help='Maximum number of servers to operate on at the same time.'),
+        click.option(
+            '--format', 'output_format', type=click.Choice(['table', 'json']),
+            help='Format to print results in. Default is a table when there are many servers.'),
+    ]
+    for decorator in reversed(decorators):
+        func = decorator(func)
+    return func
+
+
+def _get_servers(servers, servers_from):
+    """Get the unique servers given as arguments or read from a file, in order."""
+    out = list(servers)
+    if servers_from is not None:
+        for line in servers_from:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                out.append(line)
+
+    if not out:
+        raise click.UsageError('At least one server is required')
+    return list(collections.OrderedDict.fromkeys(out))
+
+
+def _is_single(servers, servers_from, output_format):
+    """Determine if a command was run for a single server in the original, plain style."""
+    return len(servers) == 1 and servers_from is None and output_format is None
+
+
+def _get_single_server(servers):
+    """Get the only server given, for commands that don't support many servers."""
+    if len(servers) != 1:
+        raise click.UsageError('--cluster only supports a single server')
+    return servers[0]
+
+
+def _forward(ctx, op, servers, parallel):
+    """Run an operation using a running daemon if there is one using the same config
+    file, returning the result for each server or ``None`` if there is no such daemon.
+    """
+    params = ctx.find_root().params
+    if params['no_daemon']:
+        return None
+
+    import warthog.daemon  # pylint: disable=redefined-outer-name
+    client = warthog.daemon.get_daemon_client(params['socket_path'], params['config'])
+    if client is None:
+        return None
+
+    with client:
+        return error_wrapper(client.request)(op, servers, max_workers=parallel)
+
+
+def _run_single(ctx, op, server, operation):
+    """Run an operation for a single server using a daemon if possible and a new
+    wrapped client otherwise, returning the result.
+    """
+    results = _forward(ctx, op, [server], None)
+    if results is not None:
+        return error_wrapper(results[server].get)()
+    return operation(get_client(ctx.parent.params['config']))
+
+
+# pylint: disable=too-many-arguments
+def _run_batch(ctx, op, operation, servers, parallel, output_format, describe):
+    """Run an operation for many servers using a daemon if possible and a single new
+    client otherwise, print the result for each, and exit with a non-zero code if any
+    of them failed.
+    """
+    results = _forward(ctx, op, servers, parallel)
+    if results is None:
+        with _new_client(ctx.parent.params['config']) as client:
+            results = error_wrapper(operation)(client)
+
+    rows = []
+    for server in servers:
+        res = results[server]
+        rows.append((server, res, res.ok and res.value is not False))
+
+    if output_format == 'json':
+        click.echo(json.dumps([{
+            'server': server,
+            'ok': ok,
+            'value': res.value,
+            'error': six.text_type(res.error) if res.error is not None else None,
+        } for server, res, ok in rows], indent=2))
+    else:
+        width = max(len(server) for server in servers)
+        click.echo('{0:<{1}}  {2}'.format('SERVER', width, 'RESULT'))
+        for server, res, _ in rows:
+            text = describe(res.value) if res.ok else 'error: {0}'.format(res.error)
+            click.echo('{0:<{1}}  {2}'.format(server, width, text))
+
+    if not all(ok for _, _, ok in rows):
+        ctx.exit(1)
+
+
+def _describe_enabled(enabled):
+    return 'enabled' if enabled else 'could not be enabled'
+
+
+def _describe_disabled(disabled):
+    return 'disabled' if disabled else 'could not be disabled'
+
+
 @click.command()
-@click.argument('server')
+@_batch_options
 @click.pass_context
-def enable(ctx, server):
-    """Enable a server by hostname."""
-    client = get_client(ctx.parent.params['config'])
-    if not client.enable_server(server):
-        click.echo('{0} could not be enabled'.format(server))
-        ctx.exit(1)
+def enable(ctx, servers, servers_from, parallel, output_format):
+    """Enable servers by hostname."""
+    servers = _get_servers(servers, servers_from)
+
+    if ctx.parent.params['cluster']:
+        server = _get_single_server(servers)
+        _run_cluster(ctx, lambda c: c.enable_server(server), _describe_enabled)
+        return
+
+    if _is_single(servers, servers_from, output_format):
+        if not _run_single(ctx, 'enable', servers[0], lambda c: c.enable_server(servers[0])):
+            click.echo('{0} could not be enabled'.format(servers[0]))
+            ctx.exit(1)
+        return
+
+    _run_batch(
+        ctx, 'enable', lambda c: c.enable_servers(servers, max_workers=parallel),
+        servers, parallel, output_format, _describe_enabled)
+
+
+@click.command()
+@_batch_options
+@click.pass_context
+def disable(ctx, servers, servers_from, parallel, output_format):
+    """Disable servers by hostname."""
+    servers = _get_servers(servers, servers_from)
+
+    if ctx.parent.params['cluster']:
+        server = _get_single_server(servers)
+        _run_cluster(ctx, lambda c: c.disable_server(server), _describe_disabled)
+        return
+
+    if _is_single(servers, servers_from, output_format):
+        if not _run_single(ctx, 'disable', servers[0], lambda c: c.disable_server(servers[0])):
+            click.echo('{0} could not be disabled'.format(servers[0]))
+            ctx.exit(1)
+        return
+
+    _run_batch(
+        ctx, 'disable', lambda c: c.disable_servers(servers, max_workers=parallel),
+        servers, parallel, output_format, _describe_disabled)
+
+
+@click.command()
+@_batch_options
+@click.pass_context
+def status(ctx, servers, servers_from, parallel, output_format):
+    """Get the status of servers by hostname."""
+    servers = _get_servers(servers, servers_from)
+
+    if ctx.parent.params['cluster']:
+        server = _get_single_server(servers)
+        _run_cluster(ctx, lambda c: c.get_status(server), six.text_type)
+        return
+
+    if _is_single(servers, servers_from, output_format):
+        click.echo(_run_single(ctx, 'status', servers[0], lambda c: c.get_status(servers[0])))
+        return
+
+    _run_batch(
+        ctx, 'status', lambda c: c.get_status_many(servers, max_workers=parallel),
+        servers, parallel, output_format, six.text_type)
 
 
 @click.command()
-@click.argument('server')
+@_batch_options
 @click.pass_context
-def disable(ctx, server):
-    """Disable a server by hostname."""
-    client = get_client(ctx.parent.params['config'])
-    if not client.disable_server(server):
-        click.echo('{0} could not be disabled'.format(server))
+def connections(ctx, servers, servers_from, parallel, output_format):
+    """Get active connections to servers by hostname."""
+    servers = _get_servers(servers, servers_from)
+
+    if ctx.parent.params['cluster']:
+        server = _get_single_server(servers)
+        _run_cluster(ctx, lambda c: c.get_connections(server), six.text_type)
+        return
+
+    if _is_single(servers, servers_from, output_format):
+        click.echo(_run_single(
+            ctx, 'connections', servers[0], lambda c: c.get_connections(servers[0])))
+        return
+
+    _run_batch(
+        ctx, 'connections', lambda c: c.get_connections_many(servers, max_workers=parallel),
+        servers, parallel, output_format, six.text_type)
+
+
+@click.command()
+@click.argument('servers', nargs=-1, required=True)
+@click.option(
+    '--batch-size', default='1',
+    help='Number or percentage (e.g. 25%) of servers to operate on at once.')
+@click.option(
+    '--max-unavailable',
+    help=('Maximum number or percentage of servers that may be disabled at once. At least '
+          'twice the batch size lets the next batch drain while hooks run, the batch size '
+          'only ever has a single batch out of service. Default is twice the batch size '
+          '(at most the number of servers), so if a hook fails the next batch may already be '
+          'draining; it is finished (hooks run and servers enabled) before stopping.'))
+@click.option(
+    '--hook',
+    help=('Shell command to run for each server once it has drained. Any {server} in the '
+          'command is replaced with the hostname of the server.'))
+@click.option(
+    '--max-retries', default=5, type=click.IntRange(min=0),
+    help='Maximum number of checks while waiting for a server to drain or be enabled.')
+@click.option(
+    '--wait-interval', default=2.0, type=click.FloatRange(min=0),
+    help='Seconds to wait between checks while waiting for a server to drain or be enabled.')
+@click.pass_context
+# pylint: disable=too-many-arguments
+def roll(ctx, servers, batch_size, max_unavailable, hook, max_retries, wait_interval):
+    """Disable, drain, run a hook for, and enable servers in batches."""
+    if ctx.parent.params['cluster']:
+        raise click.UsageError('The roll command does not support --cluster')
+
+    wait = _api().FixedIntervalWait(interval=wait_interval, max_retries=max_retries)
+    with _new_client(ctx.parent.params['config'], session_reuse=True) as client:
+        try:
+            operation = _api().RollingOperation(
+                client, servers,
+                hook=_api().command_hook(hook) if hook else None,
+                batch_size=batch_size,
+                max_unavailable=max_unavailable,
+                disable_wait=wait,
+                enable_wait=wait)
+        except ValueError as e:
+            raise click.BadParameter(six.text_type(e))
+
+        failed = False
+        for result in operation.run():
+            if result.ok:
+                click.echo('{0}: done'.format(result.server))
+                continue
+
+            failed = True
+            if result.error is not None:
+                click.echo('{0}: {1} failed: {2}'.format(result.server, result.stage, result.error))
+            else:
+                click.echo('{0}: {1}'.format(
+                    result.server,
+                    'skipped' if result.stage == _api().STAGE_SKIPPED else
+                    '{0} failed'.format(result.stage)))
+
+    if failed:
         ctx.exit(1)
 
 
 @click.command()
-@click.argument('server')
+@click.argument('servers', nargs=-1)
+@click.option(
+    '--interval', default=1.0, type=click.FloatRange(min=0),
+    help='Seconds to wait between each check of the load balancer.')
+@click.option(
+    '--connections/--no-connections', default=True,
+    help='Whether to watch active connections as well as the status of servers.')
+@click.option(
+    '--count', type=click.IntRange(min=1),
+    help='Stop after printing this many changes. Default is to run until interrupted.')
 @click.pass_context
-def status(ctx, server):
-    """Get the status of a server by hostname."""
-    client = get_client(ctx.parent.params['config'])
-    click.echo(client.get_status(server))
+def watch(ctx, servers, interval, connections, count):
+    """Print changes to the status or active connections of servers as JSON lines."""
+    if ctx.parent.params['cluster']:
+        raise click.UsageError('The watch command does not support --cluster')
+
+    client = _new_client(ctx.parent.params['config'], pooled=True, session_reuse=True)
+    events = client.watch(servers or None, interval=interval, connections=connections)
+
+    try:
+        _print_events(events, count)
+    finally:
+        events.close()
+        client.close()
+
+
+@error_wrapper
+def _print_events(events, count):
+    """Print each event as a line of JSON, stopping after ``count`` events if given."""
+    for index, event in enumerate(events, 1):
+        click.echo(json.dumps(event._asdict(), sort_keys=True))
+        if count is not None and index >= count:
+            return
 
 
 @click.command()
-@click.argument('server')
+@click.option(
+    '--cache-ttl', default=0.0, type=click.FloatRange(min=0),
+    help=('Seconds to cache the status of and connections to servers for. Default is '
+          'to not cache them.'))
 @click.pass_context
-def connections(ctx, server):
-    """Get active connections to a server by hostname."""
-    client = get_client(ctx.parent.params['config'])
-    click.echo(client.get_connections(server))
+def daemon(ctx, cache_ttl):
+    """Keep a warm client for other commands to forward requests to."""
+    import warthog.daemon  # pylint: disable=redefined-outer-name
+
+    params = ctx.parent.params
+    ttl = cache_ttl or None
+    client = _new_client(
+        params['config'], pooled=True, session_reuse=True,
+        status_cache_ttl=ttl, connections_cache_ttl=ttl)
+    server = warthog.daemon.WarthogDaemon(
+        client, path=params['socket_path'], config=params['config'])
+
+    # Make sure the socket is removed when we're asked to stop.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    click.echo('Listening on {0}'.format(server.path), err=True)
+
+    try:
+        server.serve_forever()
+    except RuntimeError as e:
+        raise click.ClickException(six.text_type(e))
+    except KeyboardInterrupt:
+        pass
 
 
 @click.command('default-config')
@@ -192,19 +572,30 @@ def default_config():
         'username = username',
         'password = password',
         'verify = yes',
-        'ssl_version = TLSv1_2'
+        'ssl_version = TLSv1_2',
+        '',
+        '# Optional: load balancers to use with --cluster. Options not given',
+        '# in these sections are taken from the [warthog] section.',
+        '# [warthog:primary]',
+        '# scheme_host = https://lb1.example.com',
+        '# [warthog:standby]',
+        '# scheme_host = https://lb2.example.com'
     ]))
 
 
 @click.command('config-path')
 def config_path():
     """Print the config file search PATH."""
-    click.echo(os.linesep.join(warthog.api.DEFAULT_CONFIG_LOCATIONS))
+    import warthog.config  # pylint: disable=redefined-outer-name
+    click.echo(os.linesep.join(warthog.config.DEFAULT_CONFIG_LOCATIONS))
 
 
 main.add_command(enable)
 main.add_command(disable)
 main.add_command(status)
 main.add_command(connections)
+main.add_command(roll)
+main.add_command(watch)
+main.add_command(daemon)
 main.add_command(default_config)
 main.add_command(config_path)
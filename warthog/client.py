@@ -14,12 +14,24 @@ warthog.client
 Simple interface for a load balancer with retry logic and intelligent draining of nodes.
 """
 
+import collections
 import contextlib
+import functools
 import time
 
+import warthog.cache
+import warthog.concurrency
 import warthog.core
+import warthog.drain
 import warthog.exceptions
+import warthog.session
 import warthog.transport
+import warthog.wait
+
+# Fraction of the timeout of an operation that is set aside for ending the session
+# it used, so that an operation that runs out of time doesn't also leave a session
+# open on the load balancer. The rest is shared by every other phase of the operation.
+LOGOFF_TIMEOUT_SHARE = 0.1
 
 
 class CommandFactory(object):
@@ -119,10 +131,65 @@ class CommandFactory(object):
         return warthog.core.NodeActiveConnectionsCommand(
             self._transport_factory(), scheme_host, session_id, server)
 
+    def get_all_server_status(self, scheme_host, session_id):
+        """Get a new command to get the status of every server with a single request.
+
+        .. versionadded:: 2.1.0
+
+        :param basestring scheme_host: Scheme, host, and port combination of
+            the load balancer.
+        :param basestring session_id: Previously authenticated session ID.
+        :return: A new command to get the status of every server.
+        :rtype: warthog.core.NodeStatusListCommand
+        """
+        return warthog.core.NodeStatusListCommand(
+            self._transport_factory(), scheme_host, session_id)
+
+    def get_all_active_connections(self, scheme_host, session_id):
+        """Get a new command to get the number of active connections to every server
+        with a single request.
+
+        .. versionadded:: 2.1.0
+
+        :param basestring scheme_host: Scheme, host, and port combination of
+            the load balancer.
+        :param basestring session_id: Previously authenticated session ID.
+        :return: A new command to get active connections to every server.
+        :rtype: warthog.core.NodeActiveConnectionsListCommand
+        """
+        return warthog.core.NodeActiveConnectionsListCommand(
+            self._transport_factory(), scheme_host, session_id)
+
+    def close(self):
+        """Release any resources, such as pooled connections, held by the transport
+        factory used by this command factory.
+
+        .. versionadded:: 2.1.0
+        """
+        close = getattr(self._transport_factory, 'close', None)
+        if close is not None:
+            close()
+
+
+# Simple immutable struct to hold the status of and number of active connections to a
+# server at a single point in time.
+NodeSnapshot = collections.namedtuple('NodeSnapshot', ['status', 'connections'])
 
-def _get_default_cmd_factory(verify, ssl_version, retries):
+# Simple immutable struct to hold a change in the status of or number of active connections
+# to a server seen while watching servers. Previous values are ``None`` the first time a
+# server is seen, current values are ``None`` when a server is no longer reported.
+WatchEvent = collections.namedtuple('WatchEvent', [
+    'timestamp', 'server', 'status', 'connections', 'previous_status', 'previous_connections'])
+
+
+# pylint: disable=too-many-arguments
+def _get_default_cmd_factory(verify, ssl_version, retries, pooled=False, pool_size=None,
+                             pool_idle_timeout=None, pool_max_lifetime=None,
+                             connect_timeout=None, read_timeout=None, circuit_breaker=False,
+                             rate_limit=False):
     """Get a :class:`CommandFactory` instance configured to use the provided TLS
-    version and cert verification policy
+    version and cert verification policy, optionally sharing a single pool of
+    connections between all commands created.
 
     :param bool verify: ``True`` to perform certificate validation when using HTTPS,
         ``False`` otherwise, ``None`` to use the default.
@@ -131,12 +198,39 @@ def _get_default_cmd_factory(verify, ssl_version, retries):
         to use the default.
     :param int retries: The maximum number of times to retry operations on transient
         network errors.
+    :param bool pooled: ``True`` to share a single, long-lived pool of connections between
+        all commands created, ``False`` to use a new pool for each command.
+    :param int pool_size: The maximum number of connections to keep open to the load
+        balancer, ``None`` to use the default.
+    :param float pool_idle_timeout: Number of seconds a shared pool may go unused before
+        it is replaced, ``None`` to use the default.
+    :param float pool_max_lifetime: Number of seconds a shared pool may be used before it
+        is replaced, ``None`` to use the default.
+    :param float connect_timeout: Number of seconds to wait for a connection to be
+        established, ``None`` to use the default.
+    :param float read_timeout: Number of seconds to wait for a response, ``None`` to use
+        the default.
+    :param bool circuit_breaker: ``True`` to stop making requests to a load balancer that
+        is failing, ``False`` to always make requests.
+    :param bool|dict|warthog.ratelimit.RateLimiter rate_limit: ``True``, settings for, or
+        a rate limiter to queue requests that would exceed the rate limits for a load
+        balancer, ``False`` to make requests as soon as possible.
     :return: Default command factory for building new commands to interact
         with the A10 load balancer.
     :rtype: WarthogCommandFactory
     """
+    if pooled:
+        return CommandFactory(warthog.transport.get_pooled_transport_factory(
+            verify=verify, ssl_version=ssl_version, retries=retries, pool_size=pool_size,
+            idle_timeout=pool_idle_timeout, max_lifetime=pool_max_lifetime,
+            connect_timeout=connect_timeout, read_timeout=read_timeout,
+            circuit_breaker=circuit_breaker, rate_limit=rate_limit
+        ))
+
     return CommandFactory(warthog.transport.get_transport_factory(
-        verify=verify, ssl_version=ssl_version, retries=retries
+        verify=verify, ssl_version=ssl_version, retries=retries, pool_size=pool_size,
+        connect_timeout=connect_timeout, read_timeout=read_timeout,
+        circuit_breaker=circuit_breaker, rate_limit=rate_limit
     ))
 
 
@@ -156,7 +250,23 @@ class WarthogClient(object):
                  verify=None,
                  ssl_version=None,
                  network_retries=None,
-                 commands=None):
+                 commands=None,
+                 pooled=False,
+                 pool_size=None,
+                 pool_idle_timeout=None,
+                 pool_max_lifetime=None,
+                 session_reuse=False,
+                 session_max_idle=None,
+                 status_cache_ttl=None,
+                 connections_cache_ttl=None,
+                 cache_size=None,
+                 connect_timeout=None,
+                 read_timeout=None,
+                 operation_timeout=None,
+                 circuit_breaker=False,
+                 rate_limit=False,
+                 session_pool_size=None,
+                 session_pool_timeout=None):
         """Set the load balancer scheme/host/port combination, username and password
         to use for connecting and authenticating with the load balancer.
 
@@ -175,6 +285,63 @@ class WarthogClient(object):
         to be used by each command. It is typically only necessary to override this for
         unit testing purposes.
 
+        By default, each command uses a new connection to the load balancer. If ``pooled``
+        is ``True`` a single pool of keep-alive connections is shared by all commands that
+        the client creates instead. The pool holds at most ``pool_size`` connections and is
+        replaced after going unused for ``pool_idle_timeout`` seconds or after being used
+        for ``pool_max_lifetime`` seconds. Clients using a pool should be closed via the
+        :meth:`close` method (or by using the client as a context manager) when they are
+        no longer needed.
+
+        By default, each operation starts a new authenticated session with the load balancer
+        and ends it when the operation is complete. If ``session_reuse`` is ``True`` a single
+        session is kept alive and shared by all operations instead. The shared session is
+        replaced when the load balancer reports that it is no longer valid or after it has
+        gone unused for ``session_max_idle`` seconds. The shared session is ended when the
+        client is closed.
+
+        By default, every call to :meth:`get_status` or :meth:`get_connections` makes a
+        request to the load balancer. If ``status_cache_ttl`` or ``connections_cache_ttl``
+        is given, results are cached for that many seconds instead, keeping at most
+        ``cache_size`` results of each kind. Concurrent calls for a server that isn't cached
+        share a single request. Cached results for a server are discarded whenever the
+        client enables or disables it.
+
+        Each request to the load balancer gives up if a connection can't be established
+        within ``connect_timeout`` seconds or the load balancer stops sending a response for
+        ``read_timeout`` seconds. If ``operation_timeout`` is given, :meth:`get_status`,
+        :meth:`get_connections`, :meth:`disable_server`, :meth:`enable_server`, and
+        :meth:`get_snapshot` must also complete within that many seconds overall, including
+        starting a session and waiting for a server to drain or become enabled, or raise a
+        :class:`warthog.exceptions.WarthogTimeoutError`. A small part of this time is set
+        aside for ending the session so that it isn't left open on the load balancer.
+
+        If ``circuit_breaker`` is ``True``, requests to the load balancer stop being made for
+        a while when too many recent requests to it have failed or been too slow, and
+        operations fail immediately with a :class:`warthog.exceptions.WarthogCircuitOpenError`
+        instead. The circuit breaker for a load balancer is shared by every client in the
+        process using it. See :mod:`warthog.breaker` for details.
+
+        If ``rate_limit`` is ``True``, requests that would exceed the rate limits for the
+        load balancer wait until they may be made instead of being made right away. Requests
+        that start a session are limited separately since they are the most expensive for
+        the load balancer. The rate limiter for a load balancer is shared by every client in
+        the process using it. See :mod:`warthog.ratelimit` for details. To use limits other
+        than the defaults, pass a dictionary of ``rate``, ``burst``, and ``limits`` settings
+        (used if the shared rate limiter doesn't exist yet), or a
+        :class:`warthog.ratelimit.RateLimiter` to be used by this client only. The shared
+        rate limiter used by other clients is left as it is.
+
+        If ``session_pool_size`` is given, operations lease sessions from a pool of up to that
+        many authenticated sessions instead of sharing a single session (or starting a new one
+        each time). This keeps the number of concurrent admin sessions under the limit the load
+        balancer enforces for each user when many operations are run at once. When every
+        session is in use, operations wait for one for up to ``session_pool_timeout`` seconds
+        (zero to not wait at all) and then fail with a
+        :class:`warthog.exceptions.WarthogSessionPoolExhaustedError`. Sessions that go unused
+        for ``session_max_idle`` seconds are replaced. The occupancy of the pool and time spent
+        waiting for sessions is available from :meth:`get_session_pool_stats`.
+
         .. versionchanged:: 0.9.0
             Added the optional ``verify`` parameter to make use of self-signed certs
             easier.
@@ -193,6 +360,30 @@ class WarthogClient(object):
             Removed the optional ``wait_interval`` parameter. This is now passed directly
             as an argument to :meth:`enable_node` or :meth:`disable_node` methods.
 
+        .. versionchanged:: 2.1.0
+            Added the optional ``pooled``, ``pool_size``, ``pool_idle_timeout``, and
+            ``pool_max_lifetime`` parameters.
+
+        .. versionchanged:: 2.1.0
+            Added the optional ``session_reuse`` and ``session_max_idle`` parameters.
+
+        .. versionchanged:: 2.1.0
+            Added the optional ``status_cache_ttl``, ``connections_cache_ttl``, and
+            ``cache_size`` parameters.
+
+        .. versionchanged:: 2.1.0
+            Added the optional ``connect_timeout``, ``read_timeout``, and
+            ``operation_timeout`` parameters.
+
+        .. versionchanged:: 2.1.0
+            Added the optional ``circuit_breaker`` parameter.
+
+        .. versionchanged:: 2.1.0
+            Added the optional ``rate_limit`` parameter.
+
+        .. versionchanged:: 2.1.0
+            Added the optional ``session_pool_size`` and ``session_pool_timeout`` parameters.
+
         :param basestring scheme_host: Scheme, host, and port combination of the load balancer.
         :param basestring username: Name of the user to authenticate with.
         :param basestring password: Password for the user to authenticate with.
@@ -207,18 +398,138 @@ class WarthogClient(object):
             of times.
         :param CommandFactory commands: Factory instance for creating new commands for
             starting and ending sessions with the load balancer.
+        :param bool pooled: ``True`` to share a single pool of keep-alive connections
+            between all commands, ``False`` to use new connections for each command. The
+            default is to use new connections for each command.
+        :param int|None pool_size: Maximum number of connections to keep open to the load
+            balancer, ``None`` to use the library default.
+        :param float|None pool_idle_timeout: Number of seconds a shared pool of connections
+            may go unused before it is replaced, ``None`` to use the library default.
+        :param float|None pool_max_lifetime: Number of seconds a shared pool of connections
+            may be used before it is replaced, ``None`` to use the library default.
+        :param bool session_reuse: ``True`` to share a single authenticated session between
+            all operations, ``False`` to start a new session for each operation. The default
+            is to start a new session for each operation.
+        :param float|None session_max_idle: Number of seconds a shared session may go unused
+            before it is replaced, ``None`` to use the library default.
+        :param float|None status_cache_ttl: Number of seconds to cache the status of
+            servers for, ``None`` to not cache the status of servers. The default is to
+            not cache the status of servers.
+        :param float|None connections_cache_ttl: Number of seconds to cache the number of
+            active connections to servers for, ``None`` to not cache active connections.
+            The default is to not cache active connections.
+        :param int|None cache_size: Maximum number of results of each kind to cache,
+            ``None`` to use the library default.
+        :param float|None connect_timeout: Number of seconds to wait for a connection to the
+            load balancer to be established, ``None`` to use the library default.
+        :param float|None read_timeout: Number of seconds to wait for the load balancer to
+            send a response, ``None`` to use the library default.
+        :param float|None operation_timeout: Number of seconds each operation on a single
+            server must complete within, ``None`` to not limit how long operations take
+            beyond the timeouts of each request. The default is to not limit operations.
+        :param bool circuit_breaker: ``True`` to stop making requests to the load balancer
+            while it is failing, ``False`` to always make requests. The default is to always
+            make requests.
+        :param bool|dict|warthog.ratelimit.RateLimiter rate_limit: ``True`` to queue requests
+            that would exceed the rate limits for the load balancer, a dictionary of keyword
+            arguments for :class:`warthog.ratelimit.RateLimiter` to use when the shared rate
+            limiter is created, or a rate limiter to queue them with (used by this client only,
+            not shared), ``False`` to make requests as soon as possible. The default is to make
+            requests as soon as possible.
+        :param int|None session_pool_size: Maximum number of sessions to lease to operations
+            from a pool, ``None`` to not use a pool of sessions. The default is to not use a
+            pool of sessions.
+        :param float|None session_pool_timeout: Number of seconds to wait for a session when
+            every session in the pool is in use, zero to not wait, ``None`` to wait as long as
+            it takes.
         """
         self._scheme_host = scheme_host
         self._username = username
         self._password = password
         self._commands = commands if commands is not None else \
-            _get_default_cmd_factory(verify, ssl_version, network_retries)
+            _get_default_cmd_factory(
+                verify, ssl_version, network_retries, pooled=pooled, pool_size=pool_size,
+                pool_idle_timeout=pool_idle_timeout, pool_max_lifetime=pool_max_lifetime,
+                connect_timeout=connect_timeout, read_timeout=read_timeout,
+                circuit_breaker=circuit_breaker, rate_limit=rate_limit)
+        self._sessions = None
+        if session_pool_size is not None:
+            self._sessions = warthog.session.SessionPool(
+                self._commands, scheme_host, username, password, max_sessions=session_pool_size,
+                lease_timeout=session_pool_timeout, max_idle=session_max_idle)
+        elif session_reuse:
+            self._sessions = warthog.session.CachedSession(
+                self._commands, scheme_host, username, password, max_idle=session_max_idle)
+        self._status_cache = None if status_cache_ttl is None else \
+            warthog.cache.ResultCache(status_cache_ttl, max_size=cache_size)
+        self._connections_cache = None if connections_cache_ttl is None else \
+            warthog.cache.ResultCache(connections_cache_ttl, max_size=cache_size)
+        self._operation_timeout = operation_timeout
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release any resources, such as pooled connections or shared sessions, held
+        by this client.
+
+        The client should not be used after it has been closed.
+
+        .. versionadded:: 2.1.0
+        """
+        try:
+            if self._sessions is not None:
+                self._sessions.close()
+        finally:
+            self.invalidate_cache()
+            self._commands.close()
+
+    def get_session_pool_stats(self):
+        """Get the occupancy of the pool of sessions used by this client and how long
+        operations have waited for sessions from it.
+
+        .. versionadded:: 2.1.0
+
+        :return: Snapshot of the state of the pool, ``None`` if this client doesn't use a
+            pool of sessions.
+        :rtype: warthog.session.SessionPoolStats|None
+        """
+        if not isinstance(self._sessions, warthog.session.SessionPool):
+            return None
+        return self._sessions.stats()
+
+    def invalidate_cache(self, server=None):
+        """Discard cached status and active connections for the given server, or for
+        every server if no server is given.
+
+        This is done automatically for servers that this client enables or disables. It
+        is only necessary to call this method when servers may have been changed some
+        other way, such as by another process.
+
+        .. versionadded:: 2.1.0
+
+        :param basestring|None server: Hostname of the server to discard cached results
+            for, ``None`` to discard cached results for every server.
+        """
+        for cache in (self._status_cache, self._connections_cache):
+            if cache is None:
+                continue
+            if server is None:
+                cache.clear()
+            else:
+                cache.invalidate(server)
 
     @contextlib.contextmanager
-    def _session_context(self):
+    def _session_context(self, logoff_timeout=None):
         """Context manager that makes a request to start an authenticated session, yields the
         session ID, and then closes the session afterwards.
 
+        :param float|None logoff_timeout: Number of seconds that closing the session must
+            complete within, ``None`` for no limit. If closing the session takes longer it
+            is left for the load balancer to expire.
         :return: The session ID of the newly established session.
         """
         self._logger.debug('Creating new session context for %s', self._scheme_host)
@@ -231,16 +542,133 @@ class WarthogClient(object):
             yield session
         finally:
             if session is not None:
-                end_cmd = self._commands.get_session_end(self._scheme_host, session)
+                self._end_session(session, logoff_timeout)
+
+    def _end_session(self, session, timeout):
+        """Close a session, giving up on it if that takes longer than ``timeout`` seconds."""
+        end_cmd = self._commands.get_session_end(self._scheme_host, session)
+        if timeout is None:
+            end_cmd.send()
+            return
+
+        try:
+            with warthog.core.deadline_context(
+                    warthog.core.Deadline(timeout), warthog.core.PHASE_LOGOFF):
                 end_cmd.send()
+        except warthog.exceptions.WarthogTimeoutError as e:
+            self._logger.warning('Abandoning session with %s: %s', self._scheme_host, e)
+
+    def _call(self, operation, *args):
+        """Run an operation with an authenticated session, either a new session that is
+        ended afterwards, the session shared by all operations if session reuse is enabled,
+        or a session leased from the pool if a pool of sessions is used.
 
-    def get_status(self, server):
+        :param callable operation: Callable that accepts a session ID as its first argument
+            followed by ``args``.
+        :return: The result of the operation.
+        """
+        return self._call_within(None, operation, *args)
+
+    def _call_within(self, timeout, operation, *args):
+        """Run an operation with an authenticated session like :meth:`_call`, making sure
+        it completes within ``timeout`` seconds (or the default timeout for operations).
+
+        :param float|None timeout: Number of seconds the operation must complete within,
+            ``None`` to use the default timeout for operations.
+        :param callable operation: Callable that accepts a session ID as its first argument
+            followed by ``args``.
+        :return: The result of the operation.
+        :raises warthog.exceptions.WarthogTimeoutError: If the operation didn't complete
+            in time.
+        """
+        timeout = timeout if timeout is not None else self._operation_timeout
+        if timeout is None:
+            if self._sessions is not None:
+                return self._sessions.run(operation, *args)
+
+            with self._session_context() as session:
+                return operation(session, *args)
+
+        if self._sessions is not None:
+            # Shared and pooled sessions aren't ended after each operation, there is nothing
+            # to set aside.
+            with warthog.core.deadline_context(warthog.core.Deadline(timeout)):
+                return self._sessions.run(operation, *args)
+
+        logoff_timeout = timeout * LOGOFF_TIMEOUT_SHARE
+        deadline = warthog.core.Deadline(timeout - logoff_timeout)
+        # Starting the session is part of the operation, ending it has its own deadline.
+        with warthog.core.deadline_context(deadline):
+            with self._session_context(logoff_timeout=logoff_timeout) as session:
+                return operation(session, *args)
+
+    def _call_cached(self, cache, timeout, operation, server):
+        """Get the result of an operation for a server from a cache, running the operation
+        like :meth:`_call_within` if it isn't cached. Waiting for another thread that is
+        already running the operation is limited to ``timeout`` seconds as well.
+        """
+        timeout = timeout if timeout is not None else self._operation_timeout
+        deadline = warthog.core.Deadline(timeout) if timeout is not None else None
+        with warthog.core.deadline_context(deadline):
+            return cache.get(
+                server, functools.partial(self._call_within, timeout, operation, server))
+
+    @contextlib.contextmanager
+    def _session_runner(self):
+        """Context manager that yields a callable for running many operations with a single
+        authenticated session, either a new session that is ended afterwards, the session
+        shared by all operations if session reuse is enabled, or sessions leased from the pool
+        for each operation if a pool of sessions is used.
+
+        The callable yielded accepts an operation followed by any extra arguments for it. The
+        operation must accept a session ID as its first argument followed by the extra arguments.
+
+        :return: Callable for running operations with an authenticated session.
+        """
+        if self._sessions is not None:
+            # Make sure we're able to authenticate before running anything so that bad
+            # credentials result in a single failed login instead of one per operation.
+            self._sessions.run(_no_op)
+            yield self._sessions.run
+            return
+
+        with self._session_context() as session:
+            yield functools.partial(_run_with_session, session)
+
+    def _call_many(self, operation, servers, max_workers, *args):
+        """Run an operation for each of the given servers concurrently, using a single
+        authenticated session for all of them.
+
+        :param callable operation: Callable that accepts a session ID and server as its
+            first arguments followed by ``args``.
+        :param iterable servers: Hostnames of servers to run the operation for.
+        :param int|None max_workers: Maximum number of operations to run at the same time.
+        :return: Map of server hostname to :class:`warthog.concurrency.OperationResult`.
+        :rtype: dict
+        """
+        servers = warthog.concurrency.unique(servers)
+        if not servers:
+            return {}
+
+        with self._session_runner() as run:
+            results = warthog.concurrency.run_concurrently(
+                functools.partial(_run_for_server, run, operation, args),
+                servers, max_workers=max_workers)
+
+        return dict(zip(servers, results))
+
+    def get_status(self, server, timeout=None):
         """Get the current status of the given server, at the node level.
 
         The status will be one of the constants :data:`warthog.core.STATUS_ENABLED`
         :data:`warthog.core.STATUS_DISABLED`, or :data:`warthog.core.STATUS_DOWN`.
 
+        .. versionchanged:: 2.1.0
+            Added the optional ``timeout`` parameter.
+
         :param basestring server: Hostname of the server to get the status of.
+        :param float|None timeout: Number of seconds the operation must complete within,
+            ``None`` to use the ``operation_timeout`` of the client.
         :return: The current status of the server, enabled, disabled, or down.
         :rtype: basestring
         :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
@@ -248,20 +676,39 @@ class WarthogClient(object):
             operation.
         :raises warthog.exceptions.WarthogNoSuchNodeError: If the load balancer does
             not recognize the given hostname.
+        :raises warthog.exceptions.WarthogTimeoutError: If the operation didn't complete
+            within the timeout.
         :raises warthog.exceptions.WarthogApiError: If there are any other
             problems getting the status of the given server.
         """
-        with self._session_context() as session:
-            cmd = self._commands.get_server_status(self._scheme_host, session, server)
-            return cmd.send()
-
-    def get_connections(self, server):
+        if self._status_cache is None:
+            return self._call_within(timeout, self._get_status, server)
+        return self._call_cached(self._status_cache, timeout, self._get_status, server)
+
+    def _get_status_cached(self, session, server):
+        """Get the status of a server using the cache, if enabled, or an existing session."""
+        if self._status_cache is None:
+            return self._get_status(session, server)
+        return self._status_cache.get(
+            server, functools.partial(self._get_status, session, server))
+
+    def _get_status(self, session, server):
+        """Get the status of a server using an existing session."""
+        cmd = self._commands.get_server_status(self._scheme_host, session, server)
+        return cmd.send()
+
+    def get_connections(self, server, timeout=None):
         """Get the current number of active connections to a server, at the node level.
 
         The number of connections will be 0 or a positive integer.
 
+        .. versionchanged:: 2.1.0
+            Added the optional ``timeout`` parameter.
+
         :param basestring server: Hostname of the server to get the number of active
             connections for.
+        :param float|None timeout: Number of seconds the operation must complete within,
+            ``None`` to use the ``operation_timeout`` of the client.
         :return: The number of active connections total for the node, across all groups
             the server is in.
         :rtype: int
@@ -270,16 +717,32 @@ class WarthogClient(object):
             operation.
         :raises warthog.exceptions.WarthogNoSuchNodeError: If the load balancer does
             not recognize the given hostname.
+        :raises warthog.exceptions.WarthogTimeoutError: If the operation didn't complete
+            within the timeout.
         :raises warthog.exceptions.WarthogApiError: If there are any other
             problems getting the active connections for the given server.
 
         .. versionadded:: 0.4.0
         """
-        with self._session_context() as session:
-            cmd = self._commands.get_active_connections(self._scheme_host, session, server)
-            return cmd.send()
+        if self._connections_cache is None:
+            return self._call_within(timeout, self._get_connections, server)
+        return self._call_cached(self._connections_cache, timeout, self._get_connections, server)
+
+    def _get_connections_cached(self, session, server):
+        """Get active connections to a server using the cache, if enabled, or an
+        existing session.
+        """
+        if self._connections_cache is None:
+            return self._get_connections(session, server)
+        return self._connections_cache.get(
+            server, functools.partial(self._get_connections, session, server))
+
+    def _get_connections(self, session, server):
+        """Get active connections to a server using an existing session."""
+        cmd = self._commands.get_active_connections(self._scheme_host, session, server)
+        return cmd.send()
 
-    def disable_server(self, server, max_retries=5, wait_interval=2.0):
+    def disable_server(self, server, max_retries=5, wait_interval=2.0, wait=None, timeout=None):
         """Disable a server at the node level, optionally retrying when there are transient
         errors and waiting for the number of active connections to the server to reach zero.
 
@@ -287,14 +750,27 @@ class WarthogClient(object):
         connections to the server, the method will try a single time to disable the server and
         then return immediately.
 
+        If a ``wait`` strategy is given, it is used to decide how long to wait between each
+        check of the number of active connections and when to give up instead of ``max_retries``
+        and ``wait_interval``. See :mod:`warthog.wait` for the available strategies.
+
         .. versionchanged:: 2.0.0
             Added the optional ``wait_interval`` parameter.
 
+        .. versionchanged:: 2.1.0
+            Added the optional ``wait`` and ``timeout`` parameters.
+
         :param basestring server: Hostname of the server to disable
         :param int max_retries: Max number of times to sleep and retry while waiting for
             the number of active connections to a server to reach zero.
         :param float wait_interval: How long (in seconds) to wait between each check to
             see if the number of active connections to a server has reached zero.
+        :param warthog.wait.WaitStrategy|None wait: Strategy for deciding how long to wait
+            between checks and when to give up, ``None`` to use ``max_retries`` and
+            ``wait_interval``.
+        :param float|None timeout: Number of seconds the entire operation, including waiting
+            for the server to drain, must complete within, ``None`` to use the
+            ``operation_timeout`` of the client.
         :return: True if the server was disabled, false otherwise.
         :rtype: bool
         :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
@@ -302,36 +778,51 @@ class WarthogClient(object):
             operation.
         :raises warthog.exceptions.WarthogNoSuchNodeError: If the load balancer does
             not recognize the given hostname.
+        :raises warthog.exceptions.WarthogTimeoutError: If the operation didn't complete
+            within the timeout.
         :raises warthog.exceptions.WarthogApiError: If there are any other
             problems disabling the given server.
         """
-        with self._session_context() as session:
-            disable = self._commands.get_disable_server(self._scheme_host, session, server)
-            disable.send()
+        wait = warthog.wait.get_wait_strategy(wait, max_retries, wait_interval)
+        return self._call_within(timeout, self._disable_server, server, wait)
 
-            active = self._commands.get_active_connections(self._scheme_host, session, server)
-            self._wait_for_connections(active.send, max_retries, wait_interval)
+    def _disable_server(self, session, server, wait):
+        """Disable a server and wait for it to drain using an existing session."""
+        self._send_disable(session, server)
 
-            status = self._commands.get_server_status(self._scheme_host, session, server)
-            return warthog.core.STATUS_DISABLED == status.send()
+        active = self._commands.get_active_connections(self._scheme_host, session, server)
+        self._wait_for_connections(active.send, wait)
 
-    def _wait_for_connections(self, conn_method, max_retries, interval):
+        status = self._commands.get_server_status(self._scheme_host, session, server)
+        return warthog.core.STATUS_DISABLED == status.send()
+
+    def _send_disable(self, session, server):
+        """Disable a server, without waiting for it to drain, using an existing session."""
+        disable = self._commands.get_disable_server(self._scheme_host, session, server)
+        try:
+            return disable.send()
+        finally:
+            self.invalidate_cache(server)
+
+    def _wait_for_connections(self, conn_method, wait):
         """Repeatedly execute a command to get the number of active connections until
         the number of active connections drops to zero or we run out of retries.
         """
-        retries = 0
+        waiter = wait.start()
+        deadline = warthog.core.get_deadline()
 
-        while retries < max_retries:
-            conns = conn_method()
-            if conns == 0:
-                break
+        with warthog.core.deadline_context(deadline, warthog.core.PHASE_POLLING):
+            while not waiter.expired():
+                conns = conn_method()
+                if conns == 0:
+                    break
 
-            self._logger.debug(
-                "Connections still active: %s, sleeping for %s seconds...", conns, interval)
-            time.sleep(interval)
-            retries += 1
+                interval = waiter.next_delay(conns)
+                self._logger.debug(
+                    "Connections still active: %s, sleeping for %s seconds...", conns, interval)
+                _sleep_within(deadline, interval)
 
-    def enable_server(self, server, max_retries=5, wait_interval=2.0):
+    def enable_server(self, server, max_retries=5, wait_interval=2.0, wait=None, timeout=None):
         """Enable a server at the node level, optionally retrying when there are transient
         errors and waiting for the server to enter the expected, enabled state.
 
@@ -339,14 +830,27 @@ class WarthogClient(object):
         the expected, enabled state, the method will try a single time to enable the server
         then return immediately.
 
+        If a ``wait`` strategy is given, it is used to decide how long to wait between each
+        check of the status of the server and when to give up instead of ``max_retries`` and
+        ``wait_interval``. See :mod:`warthog.wait` for the available strategies.
+
         .. versionchanged:: 2.0.0
             Added the optional ``wait_interval`` parameter.
 
+        .. versionchanged:: 2.1.0
+            Added the optional ``wait`` and ``timeout`` parameters.
+
         :param basestring server: Hostname of the server to enable
         :param int max_retries: Max number of times to sleep and retry while waiting for
             the server to enter the "enabled" state.
         :param float wait_interval: How long (in seconds) to wait between each check to
             see if the server has entered the "enabled" state.
+        :param warthog.wait.WaitStrategy|None wait: Strategy for deciding how long to wait
+            between checks and when to give up, ``None`` to use ``max_retries`` and
+            ``wait_interval``.
+        :param float|None timeout: Number of seconds the entire operation, including waiting
+            for the server to become enabled, must complete within, ``None`` to use the
+            ``operation_timeout`` of the client.
         :return: True if the server was enabled, false otherwise
         :rtype: bool
         :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
@@ -354,31 +858,353 @@ class WarthogClient(object):
             operation.
         :raises warthog.exceptions.WarthogNoSuchNodeError: If the load balancer does
             not recognize the given hostname.
+        :raises warthog.exceptions.WarthogTimeoutError: If the operation didn't complete
+            within the timeout.
         :raises warthog.exceptions.WarthogApiError: If there are any other
             problems enabling the given server.
         """
-        with self._session_context() as session:
-            enable = self._commands.get_enable_server(self._scheme_host, session, server)
+        wait = warthog.wait.get_wait_strategy(wait, max_retries, wait_interval)
+        return self._call_within(timeout, self._enable_server, server, wait)
+
+    def _enable_server(self, session, server, wait):
+        """Enable a server and wait for it to be enabled using an existing session."""
+        enable = self._commands.get_enable_server(self._scheme_host, session, server)
+        try:
             enable.send()
+        finally:
+            self.invalidate_cache(server)
 
-            status = self._commands.get_server_status(self._scheme_host, session, server)
-            self._wait_for_enable(status.send, max_retries, wait_interval)
+        status = self._commands.get_server_status(self._scheme_host, session, server)
+        self._wait_for_enable(status.send, wait)
 
-            return warthog.core.STATUS_ENABLED == status.send()
+        return warthog.core.STATUS_ENABLED == status.send()
 
-    def _wait_for_enable(self, status_method, max_retries, interval):
+    def _wait_for_enable(self, status_method, wait):
         """Repeatedly execute a command to get the status of a node until the node
         becomes enabled or we run out of retries.
         """
-        retries = 0
+        waiter = wait.start()
+        deadline = warthog.core.get_deadline()
+
+        with warthog.core.deadline_context(deadline, warthog.core.PHASE_POLLING):
+            while not waiter.expired():
+                status = status_method()
+                if status == warthog.core.STATUS_ENABLED:
+                    break
+
+                interval = waiter.next_delay(status)
+                self._logger.debug(
+                    "Server is not yet enabled (%s), sleeping for %s seconds...",
+                    status, interval)
+                _sleep_within(deadline, interval)
+
+    def get_snapshot(self, servers=None, timeout=None):
+        """Get the current status of and number of active connections to every server (or
+        only the given servers) using two requests, regardless of the number of servers.
+
+        Servers that the load balancer doesn't know about are not included in the result.
+        If the load balancer only reports the status or connections for a server (but not
+        both) the missing value will be ``None``.
+
+        .. versionadded:: 2.1.0
+
+        :param iterable|None servers: Hostnames of servers to include, ``None`` to include
+            every server known to the load balancer.
+        :param float|None timeout: Number of seconds the operation must complete within,
+            ``None`` to use the ``operation_timeout`` of the client.
+        :return: Map of server hostname to :class:`NodeSnapshot`, a ``(status, connections)``
+            named tuple.
+        :rtype: dict
+        :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
+            the load balancer failed when trying to establish a new session for this
+            operation.
+        :raises warthog.exceptions.WarthogNodeStatusError: If the status of any server
+            was not a recognized status.
+        :raises warthog.exceptions.WarthogTimeoutError: If the operation didn't complete
+            within the timeout.
+        :raises warthog.exceptions.WarthogApiError: If there are any other
+            problems getting the status or connections of the servers.
+        """
+        status, conns = self._call_within(timeout, self._get_all)
+
+        names = set(status) | set(conns)
+        if servers is not None:
+            names &= set(servers)
+
+        return dict(
+            (name, NodeSnapshot(status.get(name), conns.get(name))) for name in names)
+
+    def watch(self, servers=None, interval=1.0, connections=True):
+        """Watch the status of and number of active connections to every server (or only
+        the given servers), yielding an event each time either of them changes.
+
+        An event is yielded for each server the first time it is seen. After that, the
+        status and connections of every server are checked every ``interval`` seconds using
+        two requests (or one, if ``connections`` is ``False``), regardless of the number of
+        servers, and events are only yielded for servers that have changed.
+
+        A single authenticated session is used for the entire watch (the shared session if
+        session reuse is enabled) and is replaced if the load balancer expires it. For the
+        connection to the load balancer to be kept open between checks as well, the client
+        should be created with ``pooled=True``. The watch runs until the generator is closed.
+
+        .. versionadded:: 2.1.0
+
+        :param iterable|None servers: Hostnames of servers to watch, ``None`` to watch every
+            server known to the load balancer.
+        :param float interval: How long (in seconds) to wait between each check.
+        :param bool connections: ``True`` to watch the number of active connections as well as
+            the status of servers, ``False`` to only watch the status of servers.
+        :return: Generator of :class:`WatchEvent` instances.
+        :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
+            the load balancer failed when trying to establish a new session.
+        :raises warthog.exceptions.WarthogApiError: If there are any other
+            problems getting the status or connections of the servers.
+        """
+        wanted = set(servers) if servers is not None else None
+        operation = self._get_all if connections else self._get_all_status
+        sessions = self._sessions if self._sessions is not None else \
+            warthog.session.CachedSession(
+                self._commands, self._scheme_host, self._username, self._password)
+
+        previous = {}
+        try:
+            while True:
+                started = warthog.core.monotonic()
+                status, conns = sessions.run(operation)
+
+                names = set(status) | set(conns)
+                if wanted is not None:
+                    names &= wanted
+
+                current = dict(
+                    (name, NodeSnapshot(status.get(name), conns.get(name))) for name in names)
+                for event in _get_changes(previous, current, time.time()):
+                    yield event
+
+                previous = current
+                time.sleep(max(0.0, interval - (warthog.core.monotonic() - started)))
+        finally:
+            if sessions is not self._sessions:
+                sessions.close()
+
+    def _get_all_status(self, session):
+        """Get the status of every server, and no connections, using an existing session."""
+        status = self._commands.get_all_server_status(self._scheme_host, session)
+        return status.send(), {}
+
+    def _get_all(self, session):
+        """Get the status and connections of every server using an existing session."""
+        status = self._commands.get_all_server_status(self._scheme_host, session)
+        conns = self._commands.get_all_active_connections(self._scheme_host, session)
+
+        results = warthog.concurrency.run_concurrently(
+            functools.partial(_send_within, warthog.core.get_deadline()), [status, conns],
+            max_workers=2)
+        return tuple(result.get() for result in results)
+
+    def get_status_many(self, servers, max_workers=None):
+        """Get the current status of each of the given servers, at the node level,
+        using a single session and a bounded number of concurrent requests.
+
+        Errors getting the status of individual servers are captured in the result
+        for that server instead of aborting the entire batch.
+
+        .. versionadded:: 2.1.0
+
+        :param iterable servers: Hostnames of the servers to get the status of.
+        :param int|None max_workers: Maximum number of requests to make at the same
+            time, ``None`` to use the library default.
+        :return: Map of server hostname to :class:`warthog.concurrency.OperationResult`
+            with the status of the server as the value.
+        :rtype: dict
+        :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
+            the load balancer failed when trying to establish a new session for this
+            operation.
+        """
+        return self._call_many(self._get_status_cached, servers, max_workers)
+
+    def get_connections_many(self, servers, max_workers=None):
+        """Get the current number of active connections to each of the given servers,
+        at the node level, using a single session and a bounded number of concurrent requests.
+
+        Errors getting the connections of individual servers are captured in the result
+        for that server instead of aborting the entire batch.
+
+        .. versionadded:: 2.1.0
+
+        :param iterable servers: Hostnames of the servers to get active connections for.
+        :param int|None max_workers: Maximum number of requests to make at the same
+            time, ``None`` to use the library default.
+        :return: Map of server hostname to :class:`warthog.concurrency.OperationResult`
+            with the number of active connections as the value.
+        :rtype: dict
+        :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
+            the load balancer failed when trying to establish a new session for this
+            operation.
+        """
+        return self._call_many(self._get_connections_cached, servers, max_workers)
+
+    # pylint: disable=too-many-arguments
+    def disable_servers(self, servers, max_retries=5, wait_interval=2.0, wave_size=None,
+                        max_workers=None, wait=None):
+        """Disable each of the given servers at the node level, waiting for the number of
+        active connections to each to reach zero, using a single session.
+
+        All servers are disabled and drained at the same time (or in waves of ``wave_size``
+        servers) so that disabling a group of servers takes about as long as the slowest
+        server to drain. See :meth:`drain_servers` for more information.
+
+        Errors disabling individual servers are captured in the result for that server
+        instead of aborting the entire batch.
+
+        .. versionadded:: 2.1.0
+
+        :param iterable servers: Hostnames of the servers to disable.
+        :param int max_retries: Max number of times to sleep and retry while waiting for
+            the number of active connections to each server to reach zero.
+        :param float wait_interval: How long (in seconds) to wait between each check to
+            see if the number of active connections to a server has reached zero.
+        :param int|None wave_size: Maximum number of servers to disable and drain at the
+            same time, ``None`` to disable and drain all of them at the same time.
+        :param int|None max_workers: Maximum number of requests to make at the same
+            time, ``None`` to use the library default.
+        :param warthog.wait.WaitStrategy|None wait: Strategy for deciding how long to wait
+            between checks and when to give up, ``None`` to use ``max_retries`` and
+            ``wait_interval``.
+        :return: Map of server hostname to :class:`warthog.concurrency.OperationResult`
+            with ``True`` as the value if the server was disabled, ``False`` otherwise.
+        :rtype: dict
+        :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
+            the load balancer failed when trying to establish a new session for this
+            operation.
+        """
+        return dict(self.drain_servers(
+            servers, max_retries=max_retries, wait_interval=wait_interval,
+            wave_size=wave_size, max_workers=max_workers, wait=wait))
+
+    # pylint: disable=too-many-arguments
+    def drain_servers(self, servers, max_retries=5, wait_interval=2.0, wave_size=None,
+                      max_workers=None, wait=None):
+        """Disable each of the given servers at the node level and wait for the number of
+        active connections to each to reach zero, yielding the result for each server as
+        soon as it has finished draining.
+
+        Servers are all disabled up front (or in waves of ``wave_size`` servers, each wave
+        starting once the previous wave has finished draining). The number of active
+        connections to every server that is still draining is then checked every
+        ``wait_interval`` seconds, up to ``max_retries`` times (or as decided by the ``wait``
+        strategy, if given), from a single loop.
+
+        A single session is used for the entire operation. The session is started when
+        the first result is requested and ended once all results have been consumed (or
+        the generator is closed).
+
+        .. versionadded:: 2.1.0
+
+        :param iterable servers: Hostnames of the servers to disable.
+        :param int max_retries: Max number of times to sleep and retry while waiting for
+            the number of active connections to the servers to reach zero.
+        :param float wait_interval: How long (in seconds) to wait between each check to
+            see if the number of active connections to the servers has reached zero.
+        :param int|None wave_size: Maximum number of servers to disable and drain at the
+            same time, ``None`` to disable and drain all of them at the same time.
+        :param int|None max_workers: Maximum number of requests to make at the same
+            time, ``None`` to use the library default.
+        :param warthog.wait.WaitStrategy|None wait: Strategy for deciding how long to wait
+            between checks and when to give up, ``None`` to use ``max_retries`` and
+            ``wait_interval``.
+        :return: Generator of ``(server, result)`` tuples where ``result`` is an
+            :class:`warthog.concurrency.OperationResult` with ``True`` as the value if the
+            server was disabled, ``False`` otherwise.
+        :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
+            the load balancer failed when trying to establish a new session for this
+            operation.
+        """
+        wait = warthog.wait.get_wait_strategy(wait, max_retries, wait_interval)
+
+        with self._session_runner() as run:
+            scheduler = warthog.drain.DrainScheduler(
+                functools.partial(run, self._send_disable),
+                functools.partial(run, self._get_connections),
+                functools.partial(run, self._get_status),
+                wait=wait,
+                wave_size=wave_size,
+                max_workers=max_workers)
+
+            for result in scheduler.drain(servers):
+                yield result
+
+    # pylint: disable=too-many-arguments
+    def enable_servers(self, servers, max_retries=5, wait_interval=2.0, max_workers=None,
+                       wait=None):
+        """Enable each of the given servers at the node level, waiting for each to enter
+        the expected, enabled state, using a single session and a bounded number of
+        concurrent operations.
+
+        See :meth:`enable_server` for the meaning of ``max_retries`` and ``wait_interval``.
+        Errors enabling individual servers are captured in the result for that server
+        instead of aborting the entire batch.
+
+        .. versionadded:: 2.1.0
+
+        :param iterable servers: Hostnames of the servers to enable.
+        :param int max_retries: Max number of times to sleep and retry while waiting for
+            each server to enter the "enabled" state.
+        :param float wait_interval: How long (in seconds) to wait between each check to
+            see if a server has entered the "enabled" state.
+        :param int|None max_workers: Maximum number of servers to enable at the same
+            time, ``None`` to use the library default.
+        :param warthog.wait.WaitStrategy|None wait: Strategy for deciding how long to wait
+            between checks and when to give up, ``None`` to use ``max_retries`` and
+            ``wait_interval``.
+        :return: Map of server hostname to :class:`warthog.concurrency.OperationResult`
+            with ``True`` as the value if the server was enabled, ``False`` otherwise.
+        :rtype: dict
+        :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
+            the load balancer failed when trying to establish a new session for this
+            operation.
+        """
+        wait = warthog.wait.get_wait_strategy(wait, max_retries, wait_interval)
+        return self._call_many(self._enable_server, servers, max_workers, wait)
+
+
+def _get_changes(previous, current, timestamp):
+    """Get an event for each server that has changed between two snapshots."""
+    empty = NodeSnapshot(None, None)
+    for name in sorted(set(previous) | set(current)):
+        before = previous.get(name, empty)
+        after = current.get(name, empty)
+        if before != after:
+            yield WatchEvent(
+                timestamp, name, after.status, after.connections, before.status,
+                before.connections)
+
+
+def _sleep_within(deadline, interval):
+    """Sleep for the given number of seconds, raising an exception instead if doing so
+    would go past the deadline.
+    """
+    if deadline is not None and interval >= deadline.remaining():
+        raise deadline.error(warthog.core.PHASE_POLLING)
+    time.sleep(interval)
+
+
+def _send_within(deadline, cmd):
+    """Send a command from any thread, by the deadline of the thread that created it."""
+    with warthog.core.deadline_context(deadline):
+        return cmd.send()
+
+
+def _no_op(_):
+    """Operation that does nothing with the session it is given."""
+
+
+def _run_with_session(session, operation, *args):
+    """Run an operation with the given session."""
+    return operation(session, *args)
 
-        while retries < max_retries:
-            status = status_method()
-            if status == warthog.core.STATUS_ENABLED:
-                break
 
-            self._logger.debug(
-                "Server is not yet enabled (%s), sleeping for %s seconds...",
-                status, interval)
-            time.sleep(interval)
-            retries += 1
+def _run_for_server(run, operation, args, server):
+    """Run an operation for a single server using the given session runner."""
+    return run(operation, server, *args)
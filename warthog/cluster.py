@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.cluster
+~~~~~~~~~~~~~~~
+
+Client for applying the same operation to several load balancers at once, such as
+both members of a high availability pair or load balancers in several datacenters.
+"""
+
+import collections
+
+import warthog.client
+import warthog.concurrency
+import warthog.core
+import warthog.exceptions
+
+# Every load balancer must complete an operation for it to be successful.
+POLICY_ALL = 'all'
+
+# More than half of the load balancers must complete an operation for it to be successful.
+POLICY_QUORUM = 'quorum'
+
+# At least one load balancer must complete an operation for it to be successful.
+POLICY_ANY = 'any'
+
+POLICIES = (POLICY_ALL, POLICY_QUORUM, POLICY_ANY)
+
+DEFAULT_POLICY = POLICY_ALL
+
+
+def _is_success(result):
+    """Determine if an operation against a single load balancer completed, treating
+    a ``False`` result (e.g. a server that didn't become enabled) as a failure.
+    """
+    return result.ok and result.value is not False
+
+
+class ClusterResult(object):
+    """Results of running an operation against each load balancer in a cluster.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, operation, results, policy):
+        """Set the results of the operation for each load balancer.
+
+        :param basestring operation: Name of the operation that was run.
+        :param collections.OrderedDict results: Map of load balancer name to
+            :class:`warthog.concurrency.OperationResult` for that load balancer.
+        :param basestring policy: Policy used to decide if the operation as a
+            whole was successful.
+        """
+        self.operation = operation
+        self.results = results
+        self.policy = policy
+
+    @property
+    def succeeded(self):
+        """Names of load balancers that completed the operation."""
+        return [name for name, res in self.results.items() if _is_success(res)]
+
+    @property
+    def failed(self):
+        """Names of load balancers that did not complete the operation."""
+        return [name for name, res in self.results.items() if not _is_success(res)]
+
+    @property
+    def values(self):
+        """Map of load balancer name to the value returned for it, for each load
+        balancer where the operation didn't raise an exception.
+        """
+        return collections.OrderedDict(
+            (name, res.value) for name, res in self.results.items() if res.ok)
+
+    @property
+    def errors(self):
+        """Map of load balancer name to the exception raised for it, for each load
+        balancer where the operation raised an exception.
+        """
+        return collections.OrderedDict(
+            (name, res.error) for name, res in self.results.items() if not res.ok)
+
+    @property
+    def ok(self):
+        """``True`` if enough load balancers completed the operation to satisfy the policy."""
+        succeeded = len(self.succeeded)
+        if self.policy == POLICY_ALL:
+            return succeeded == len(self.results)
+        if self.policy == POLICY_QUORUM:
+            return succeeded > len(self.results) // 2
+        return succeeded > 0
+
+    def check(self):
+        """Raise an exception if the policy wasn't satisfied.
+
+        :return: This result, to allow chaining.
+        :rtype: ClusterResult
+        :raises warthog.exceptions.WarthogClusterError: If not enough load balancers
+            completed the operation to satisfy the policy.
+        """
+        if not self.ok:
+            raise warthog.exceptions.WarthogClusterError(
+                "Operation {0} failed for {1} of {2} load balancers with policy '{3}'".format(
+                    self.operation, len(self.failed), len(self.results), self.policy),
+                results=self.results)
+        return self
+
+    def __repr__(self):
+        return '<ClusterResult {0} ok={1} succeeded={2} failed={3}>'.format(
+            self.operation, self.ok, self.succeeded, self.failed)
+
+
+class WarthogClusterClient(object):
+    """Client for running the same operations against several load balancers
+    concurrently, each using its own :class:`warthog.client.WarthogClient`.
+
+    Each operation returns a :class:`ClusterResult` with the result or error from
+    each load balancer. Whether an operation is considered successful overall is
+    determined by a policy: all load balancers must complete it, a quorum of load
+    balancers must complete it, or any single load balancer must complete it.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    _logger = warthog.core.get_log()
+
+    def __init__(self, clients, policy=None, max_workers=None):
+        """Set the clients for each load balancer and the policy for deciding
+        if operations are successful.
+
+        :param collections.Mapping|list clients: Ordered mapping of load balancer name to
+            the client to use for that load balancer, or a list of ``(name, client)`` pairs.
+        :param basestring|None policy: One of ``all``, ``quorum``, or ``any``, ``None``
+            to use the default. The default is that all load balancers must complete
+            each operation.
+        :param int|None max_workers: Maximum number of load balancers to run an
+            operation against at the same time, ``None`` to run it against all of
+            them at the same time.
+        :raises ValueError: If the policy is unknown or there are no clients.
+        """
+        self._clients = collections.OrderedDict(clients)
+        self._policy = policy if policy is not None else DEFAULT_POLICY
+        self._max_workers = max_workers if max_workers is not None else len(self._clients)
+
+        if self._policy not in POLICIES:
+            raise ValueError('Unknown policy {0}, expected one of {1}'.format(
+                self._policy, ', '.join(POLICIES)))
+        if not self._clients:
+            raise ValueError('At least one load balancer client is required')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def names(self):
+        """Names of each load balancer, in order."""
+        return list(self._clients)
+
+    def close(self):
+        """Close the client for each load balancer."""
+        for client in self._clients.values():
+            client.close()
+
+    def run(self, operation, name=None):
+        """Call a function with the client for each load balancer concurrently.
+
+        :param callable operation: Function that accepts a single
+            :class:`warthog.client.WarthogClient`.
+        :param basestring|None name: Name of the operation for error messages.
+        :return: The result for each load balancer.
+        :rtype: ClusterResult
+        """
+        names = self.names
+        results = warthog.concurrency.run_concurrently(
+            lambda lb: operation(self._clients[lb]), names, max_workers=self._max_workers)
+
+        out = collections.OrderedDict(zip(names, results))
+        for lb, res in out.items():
+            if not res.ok:
+                self._logger.warning(
+                    'Operation %s failed for load balancer %s: %s', name, lb, res.error)
+        return ClusterResult(name or getattr(operation, '__name__', 'unknown'), out, self._policy)
+
+    def get_status(self, server):
+        """Get the status of a server on each load balancer.
+
+        :param basestring server: Hostname of the server to get the status of.
+        :return: Status of the server from each load balancer.
+        :rtype: ClusterResult
+        """
+        return self.run(lambda client: client.get_status(server), name='get_status')
+
+    def get_connections(self, server):
+        """Get the number of active connections to a server on each load balancer.
+
+        :param basestring server: Hostname of the server to get active connections of.
+        :return: Number of active connections from each load balancer.
+        :rtype: ClusterResult
+        """
+        return self.run(lambda client: client.get_connections(server), name='get_connections')
+
+    def disable_server(self, server, **kwargs):
+        """Disable a server on each load balancer, waiting for its active connections
+        to drain on each one.
+
+        :param basestring server: Hostname of the server to disable.
+        :param kwargs: Keyword arguments for :meth:`warthog.client.WarthogClient.disable_server`.
+        :return: Whether the server was disabled by each load balancer.
+        :rtype: ClusterResult
+        """
+        return self.run(
+            lambda client: client.disable_server(server, **kwargs), name='disable_server')
+
+    def enable_server(self, server, **kwargs):
+        """Enable a server on each load balancer, waiting for it to become enabled
+        on each one.
+
+        :param basestring server: Hostname of the server to enable.
+        :param kwargs: Keyword arguments for :meth:`warthog.client.WarthogClient.enable_server`.
+        :return: Whether the server was enabled by each load balancer.
+        :rtype: ClusterResult
+        """
+        return self.run(
+            lambda client: client.enable_server(server, **kwargs), name='enable_server')
+
+
+def get_cluster_client(settings, policy=None, max_workers=None, **kwargs):
+    """Get a new cluster client with a client for each of the given load balancers.
+
+    .. versionadded:: 2.1.0
+
+    :param collections.Mapping settings: Ordered mapping of load balancer name to
+        :class:`warthog.config.WarthogConfigSettings` for that load balancer, as
+        returned by :meth:`warthog.config.WarthogConfigLoader.get_cluster_settings`.
+    :param basestring|None policy: One of ``all``, ``quorum``, or ``any``, ``None``
+        to use the default.
+    :param int|None max_workers: Maximum number of load balancers to run an operation
+        against at the same time, ``None`` for all of them.
+    :param kwargs: Additional keyword arguments for each
+        :class:`warthog.client.WarthogClient`.
+    :return: New cluster client.
+    :rtype: WarthogClusterClient
+    """
+    clients = [
+        (name, warthog.client.WarthogClient(
+            s.scheme_host, s.username, s.password,
+            verify=s.verify, ssl_version=s.ssl_version, **kwargs))
+        for name, s in settings.items()]
+    return WarthogClusterClient(clients, policy=policy, max_workers=max_workers)
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.codec
+~~~~~~~~~~~~~
+
+Pluggable JSON encoding and decoding of load balancer API payloads. Bodies of requests
+made by :mod:`warthog.core` commands are encoded and bodies of responses decoded with the
+codec returned by :func:`get_codec`.
+
+By default the fastest available codec is used: `orjson <https://github.com/ijl/orjson>`_
+if it is installed, then `ujson <https://github.com/ultrajson/ultrajson>`_, and finally the
+:mod:`json` module from the standard library.
+"""
+
+import json
+
+from .packages import six
+
+# Names of codecs to try, in order, when picking the default codec.
+DEFAULT_CODECS = ('orjson', 'ujson', 'json')
+
+
+class JsonCodec(object):
+    """Base for codecs that encode and decode JSON payloads.
+
+    .. versionadded:: 2.1.0
+    """
+    name = None
+
+    def loads(self, data):
+        """Decode a UTF-8 encoded JSON document.
+
+        :param bytes|unicode data: JSON document to decode.
+        :return: The decoded document.
+        :raises ValueError: If the document is not valid JSON.
+        """
+        raise NotImplementedError()
+
+    def dumps(self, obj):
+        """Encode an object as a UTF-8 encoded JSON document.
+
+        :param obj: Object to encode.
+        :return: The encoded document.
+        :rtype: bytes
+        """
+        raise NotImplementedError()
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(type(self).__name__, self.name)
+
+
+class StdlibCodec(JsonCodec):
+    """Codec that uses the :mod:`json` module from the standard library.
+
+    .. versionadded:: 2.1.0
+    """
+    name = 'json'
+
+    def loads(self, data):
+        # Older versions of Python 3 only accept text.
+        if isinstance(data, six.binary_type) and not six.PY2:
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonCodec(JsonCodec):
+    """Codec that uses the ``orjson`` library.
+
+    .. versionadded:: 2.1.0
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson  # pylint: disable=import-error
+        self._orjson = orjson
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj)
+
+
+class UjsonCodec(JsonCodec):
+    """Codec that uses the ``ujson`` library.
+
+    .. versionadded:: 2.1.0
+    """
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson  # pylint: disable=import-error
+        self._ujson = ujson
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj).encode('utf-8')
+
+
+_CODECS = {
+    StdlibCodec.name: StdlibCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+}
+
+_codec = None
+
+
+def get_codec_by_name(name):
+    """Get a new instance of the codec with the given name.
+
+    .. versionadded:: 2.1.0
+
+    :param basestring name: One of ``orjson``, ``ujson``, or ``json``.
+    :return: New codec instance.
+    :rtype: JsonCodec
+    :raises ValueError: If there is no codec with the given name.
+    :raises ImportError: If the library needed by the codec is not installed.
+    """
+    try:
+        cls = _CODECS[name]
+    except KeyError:
+        raise ValueError('Unknown JSON codec {0}, expected one of {1}'.format(
+            name, ', '.join(sorted(_CODECS))))
+    return cls()
+
+
+def _get_default_codec():
+    for name in DEFAULT_CODECS:
+        try:
+            return get_codec_by_name(name)
+        except ImportError:
+            pass
+    return StdlibCodec()
+
+
+def get_codec():
+    """Get the codec used to encode requests to and decode responses from the load
+    balancer API, picking the fastest available codec the first time this is called if
+    one hasn't been set.
+
+    .. versionadded:: 2.1.0
+
+    :rtype: JsonCodec
+    """
+    codec = _codec
+    if codec is not None:
+        return codec
+
+    return set_codec(None)
+
+
+def set_codec(codec):
+    """Set the codec used to encode requests to and decode responses from the load
+    balancer API.
+
+    .. versionadded:: 2.1.0
+
+    :param JsonCodec|basestring|None codec: Codec instance, name of a codec, or ``None``
+        to use the fastest available codec.
+    :return: The codec that will be used.
+    :rtype: JsonCodec
+    :raises ValueError: If there is no codec with the given name.
+    :raises ImportError: If the library needed by the named codec is not installed.
+    """
+    global _codec  # pylint: disable=global-statement
+
+    if codec is None:
+        codec = _get_default_codec()
+    elif isinstance(codec, six.string_types):
+        codec = get_codec_by_name(codec)
+
+    _codec = codec
+    return codec
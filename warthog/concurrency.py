@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.concurrency
+~~~~~~~~~~~~~~~~~~~
+
+Helpers for running operations against many servers concurrently.
+"""
+
+import collections
+import sys
+import threading
+
+# pylint: disable=import-error
+from .packages.six.moves import queue
+
+# Default maximum number of operations to run against the load balancer at
+# the same time. This is deliberately modest since the management interface
+# of the load balancer doesn't deal well with large numbers of requests.
+DEFAULT_MAX_WORKERS = 8
+
+
+class OperationResult(collections.namedtuple('OperationResult', ['value', 'error'])):
+    """Result of a single operation that was run as part of a batch of operations.
+
+    Exactly one of ``value`` or ``error`` is meaningful: if the operation raised an
+    exception ``error`` is the exception, otherwise ``error`` is ``None`` and ``value``
+    is whatever the operation returned.
+
+    .. versionadded:: 2.1.0
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """``True`` if the operation completed without raising an exception."""
+        return self.error is None
+
+    def get(self):
+        """Get the value of the operation or raise the exception it raised.
+
+        :return: The value returned by the operation.
+        :raises Exception: The exception raised by the operation, if any.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def unique(items):
+    """Get a list of the unique items in the given iterable, preserving their order.
+
+    :param iterable items: Items that may contain duplicates.
+    :return: List of unique items in the order they were first seen.
+    :rtype: list
+    """
+    seen = set()
+    out = []
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            out.append(item)
+    return out
+
+
+def _capture(func, item):
+    """Call the function with the item, capturing any exception raised."""
+    try:
+        return OperationResult(func(item), None)
+    except Exception:  # pylint: disable=broad-except
+        return OperationResult(None, sys.exc_info()[1])
+
+
+def run_concurrently(func, items, max_workers=None):
+    """Call the given function once for each item using a bounded number of threads,
+    capturing the result or exception of each call.
+
+    :param callable func: Function that accepts a single item.
+    :param list items: Items to call the function with.
+    :param int|None max_workers: Maximum number of calls to run at the same time,
+        ``None`` to use the default.
+    :return: List of :class:`OperationResult` instances in the same order as ``items``.
+    :rtype: list
+    """
+    items = list(items)
+    max_workers = max_workers if max_workers is not None else DEFAULT_MAX_WORKERS
+    results = [None] * len(items)
+
+    # Don't bother with threads when they wouldn't buy us anything.
+    if max_workers <= 1 or len(items) <= 1:
+        return [_capture(func, item) for item in items]
+
+    pending = queue.Queue()
+    for index, item in enumerate(items):
+        pending.put((index, item))
+
+    # pylint: disable=missing-docstring
+    def worker():
+        while True:
+            try:
+                index, item = pending.get_nowait()
+            except queue.Empty:
+                return
+            results[index] = _capture(func, item)
+
+    threads = [threading.Thread(target=worker) for _ in range(min(max_workers, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
@@ -43,6 +43,10 @@ DEFAULT_CONFIG_LOCATIONS = [
 # the caller indicates it is in some other encoding.
 DEFAULT_CONFIG_ENCODING = 'utf-8'
 
+# Prefix of the names of INI sections that each configure one load balancer in a
+# group of load balancers, e.g. [warthog:dc1-primary].
+CLUSTER_SECTION_PREFIX = 'warthog:'
+
 # Simple immutable struct to hold configuration information for a WarthogClient
 WarthogConfigSettings = collections.namedtuple(
     'WarthogConfigSettings', ['scheme_host', 'username', 'password', 'verify', 'ssl_version'])
@@ -112,6 +116,7 @@ class WarthogConfigLoader(object):
 
         self._lock = threading.RLock()
         self._settings = None
+        self._cluster_settings = None
 
     def initialize(self):
         """Load and parse a configuration an INI-style configuration file.
@@ -140,6 +145,7 @@ class WarthogConfigLoader(object):
         with self._lock:
             config_file, checked = self._path_resolver(self._config_file)
             self._settings = self._parser.parse(config_file, self._encoding, checked)
+            self._cluster_settings = self._parser.parse_cluster()
         return self
 
     def get_settings(self):
@@ -160,6 +166,29 @@ class WarthogConfigLoader(object):
                     "settings can be used (via the .initialize() method)")
             return self._settings
 
+    def get_cluster_settings(self):
+        """Get previously loaded and parsed configuration settings for each load balancer
+        in a group of load balancers, raise an exception if the settings have not already
+        been loaded and parsed.
+
+        Each load balancer is configured by a section named ``warthog:<name>``. Any options
+        not given in such a section are taken from the ``warthog`` section.
+
+        .. versionadded:: 2.1.0
+
+        :return: Ordered map of load balancer name to configuration settings, empty if the
+            configuration file doesn't configure a group of load balancers.
+        :rtype: collections.OrderedDict
+        :raises RuntimeError: If a configuration file has not already been loaded and
+            parsed.
+        """
+        with self._lock:
+            if self._cluster_settings is None:
+                raise RuntimeError(
+                    "Configuration file must be loaded and parsed before "
+                    "settings can be used (via the .initialize() method)")
+            return self._cluster_settings
+
 
 def parse_ssl_version(version_str, ssl_module=None):
     """Get the :mod:`warthog.ssl` protocol constant that represents the given version
@@ -296,14 +325,29 @@ class WarthogConfigParser(object):
             return self._parser_impl.getboolean(section, option)
         return None
 
+    def _get_section(self, section, option):
+        """Get the section to read an option from, falling back to the main section."""
+        if section != 'warthog' and not self._parser_impl.has_option(section, option):
+            return 'warthog'
+        return section
+
+    def _parse_section(self, section):
+        """Parse a single section of the opened configuration file as a namedtuple."""
+        def get(option):
+            return self._parser_impl.get(self._get_section(section, option), option)
+
+        return WarthogConfigSettings(
+            scheme_host=get('scheme_host'),
+            username=get('username'),
+            password=get('password'),
+            verify=self._get_verify(self._get_section(section, 'verify'), 'verify'),
+            ssl_version=self._get_ssl_version(
+                self._get_section(section, 'ssl_version'), 'ssl_version'))
+
     def _parse_file(self):
         """Parse the opened configuration file and return the results as a namedtuple."""
         try:
-            scheme_host = self._parser_impl.get('warthog', 'scheme_host')
-            username = self._parser_impl.get('warthog', 'username')
-            password = self._parser_impl.get('warthog', 'password')
-            verify = self._get_verify('warthog', 'verify')
-            ssl_version = self._get_ssl_version('warthog', 'ssl_version')
+            return self._parse_section('warthog')
         except configparser.NoSectionError as e:
             raise warthog.exceptions.WarthogMalformedConfigFileError(
                 "The configuration file seems to be missing a '{0}' section. Please "
@@ -313,13 +357,6 @@ class WarthogConfigParser(object):
                 "The configuration file seems to be missing the '{0}' option. Please "
                 "make sure this option exists".format(e.option), missing_option=e.option)
 
-        return WarthogConfigSettings(
-            scheme_host=scheme_host,
-            username=username,
-            password=password,
-            verify=verify,
-            ssl_version=ssl_version)
-
     def parse(self, path, encoding, checked):
         """Attempt to open and parse the configuration file at the given
         path.
@@ -334,3 +371,33 @@ class WarthogConfigParser(object):
 
         self._load_file(path, encoding, checked)
         return self._parse_file()
+
+    def parse_cluster(self):
+        """Parse the settings for each load balancer in a group of load balancers from
+        the configuration file previously opened by :meth:`parse`.
+
+        Each load balancer is configured by a section named ``warthog:<name>``. Any options
+        not given in such a section are taken from the ``warthog`` section.
+
+        .. versionadded:: 2.1.0
+
+        :return: Ordered map of load balancer name to the configuration settings to use for
+            creating a client for it, in the order the sections appear in the file.
+        :rtype: collections.OrderedDict
+        :raises warthog.exceptions.WarthogMalformedConfigFileError: If any of the required
+            options are missing from both a load balancer section and the ``warthog`` section.
+        """
+        out = collections.OrderedDict()
+        for section in self._parser_impl.sections():
+            if not section.startswith(CLUSTER_SECTION_PREFIX):
+                continue
+
+            name = section[len(CLUSTER_SECTION_PREFIX):]
+            try:
+                out[name] = self._parse_section(section)
+            except configparser.NoOptionError as e:
+                raise warthog.exceptions.WarthogMalformedConfigFileError(
+                    "The configuration file seems to be missing the '{0}' option for load "
+                    "balancer '{1}'. Please make sure this option exists in the '{2}' or "
+                    "'warthog' section".format(e.option, name, section), missing_option=e.option)
+        return out
@@ -14,13 +14,25 @@ warthog.core
 Basic building blocks for authentication and interaction with a load balancer.
 """
 
+import collections
+import contextlib
+import datetime
+import functools
 import logging
+import math
+import re
+import threading
+import time
 
 import requests
 
+import warthog.codec
 import warthog.exceptions
+import warthog.hooks
+import warthog.ratelimit
 # pylint: disable=import-error,no-name-in-module
 from .packages.six.moves import urllib
+from .packages import six
 
 STATUS_ENABLED = 'enabled'
 
@@ -42,6 +54,53 @@ _PATH_STATUS = '/axapi/v3/slb/server/{server}/oper'
 
 _PATH_CONNS = '/axapi/v3/slb/server/{server}/stats'
 
+_PATH_STATUS_ALL = '/axapi/v3/slb/server/oper'
+
+_PATH_CONNS_ALL = '/axapi/v3/slb/server/stats'
+
+# Clock used by the library for measuring elapsed time and scheduling work. This
+# isn't affected by changes to the system time when possible.
+monotonic = getattr(time, 'monotonic', time.time)
+
+# Default maximum number of characters of each response body to include when
+# logging responses. The bulk status and stats endpoints can return very large
+# bodies that aren't useful to log in full.
+DEFAULT_LOG_BODY_LIMIT = 2048
+
+# Values of these fields in response bodies are secrets and never logged.
+_REDACTED_FIELDS = re.compile(r'("(?:signature|password)"\s*:\s*)"[^"]*"')
+
+_log_body_limit = DEFAULT_LOG_BODY_LIMIT
+
+# Phases of an operation that may run out of time before its deadline. Starting a
+# session, the requests that make up the operation itself, waiting for a server to
+# drain or become enabled, and ending the session.
+PHASE_AUTH = 'auth'
+PHASE_ACTION = 'action'
+PHASE_POLLING = 'polling'
+PHASE_LOGOFF = 'logoff'
+
+# Deadline (and the phase of the operation) that requests made by the current thread
+# must complete by, set by deadline_context().
+_deadlines = threading.local()
+
+
+def percentile(values, pct):
+    """Get the given percentile of a list of values using the nearest-rank method.
+
+    .. versionadded:: 2.1.0
+
+    :param list values: Values to get the percentile of.
+    :param float pct: Percentile to get, between 0 and 100.
+    :return: The value at the given percentile or ``None`` if there are no values.
+    """
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    rank = max(1, int(math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
 
 def get_log():
     """Get the :class:`logging.Logger` instance used by the Warthog library.
@@ -52,175 +111,447 @@ def get_log():
     return logging.getLogger('warthog')
 
 
-# pylint: disable=invalid-name,missing-docstring
-def _extract_auth_error_from_payload(payload):
-    err = payload['authorizationschema']['error'].strip()
-    code = payload['authorizationschema']['code']
-    return err, code
+def set_log_body_limit(limit):
+    """Set the maximum number of characters of each response body to include when
+    logging responses at the ``DEBUG`` level.
 
+    .. versionadded:: 2.1.0
 
-# pylint: disable=invalid-name,missing-docstring
-def _extract_other_error_from_payload(payload):
-    err = payload['response']['err']['msg'].strip()
-    code = payload['response']['err']['code']
-    return err, code
+    :param int|None limit: Maximum number of characters to log, ``None`` to log
+        entire response bodies.
+    """
+    global _log_body_limit  # pylint: disable=global-statement
+    _log_body_limit = limit
 
 
-class _AuthErrorHandler(object):
-    def __init__(self, host, user):
-        self._host = host
-        self._user = user
+class _LazyBody(object):
+    """Body of a response that is only decoded, redacted, and truncated if it
+    is actually formatted as part of a log message.
+    """
+    __slots__ = ('_response', '_limit')
 
-    # pylint: disable=no-self-use
-    def can_handle(self, response):
-        # pylint: disable=no-member
-        return response.status_code == requests.codes.forbidden
+    def __init__(self, response, limit):
+        self._response = response
+        self._limit = limit
 
-    def handle(self, response):
-        payload = response.json()
-        err, code = _extract_auth_error_from_payload(payload)
+    def _format(self):
+        text = _REDACTED_FIELDS.sub(r'\1"<redacted>"', self._response.text)
+        if self._limit is not None and len(text) > self._limit:
+            return u'{0}... ({1} more characters)'.format(
+                text[:self._limit], len(text) - self._limit)
+        return text
 
-        raise warthog.exceptions.WarthogAuthFailureError(
-            'Authentication failure using user "{0}" with {1}'.format(self._user, self._host),
-            api_msg=err, api_code=code
-        )
+    def __unicode__(self):
+        return self._format()
 
+    def __str__(self):
+        text = self._format()
+        return text.encode('utf-8') if six.PY2 else text
 
-class _SessionErrorHandler(object):
-    def __init__(self, token):
-        self._token = token
 
-    # pylint: disable=no-self-use
-    def can_handle(self, response):
-        # pylint: disable=no-member
-        return response.status_code == requests.codes.unauthorized
+class Deadline(object):
+    """Point in time by which an operation, and every request made as part of it,
+    must complete.
 
-    def handle(self, response):
-        payload = response.json()
-        err, code = _extract_auth_error_from_payload(payload)
+    This class is thread safe.
 
-        raise warthog.exceptions.WarthogInvalidSessionError(
-            'Invalid session or token "{0}"'.format(self._token),
-            api_msg=err, api_code=code
-        )
+    .. versionadded:: 2.1.0
+    """
 
+    def __init__(self, timeout, clock=None):
+        """Start the deadline, ``timeout`` seconds from now.
 
-class _PermissionErrorHandler(object):
-    def __init__(self, server):
-        self._server = server
+        :param float timeout: Number of seconds until the deadline.
+        :param callable clock: Callable that returns the current time in seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        self.timeout = timeout
+        self._clock = clock if clock is not None else monotonic
+        self._expires = self._clock() + timeout
 
-    # pylint: disable=no-self-use
-    def can_handle(self, response):
-        # pylint: disable=no-member
-        if response.status_code != requests.codes.bad_request:
-            return False
+    def remaining(self):
+        """Get the number of seconds left until the deadline, never less than zero."""
+        return max(0.0, self._expires - self._clock())
 
-        payload = response.json()
-        _, code = _extract_other_error_from_payload(payload)
-        return code == ERROR_CODE_BAD_PERMISSION
+    def expired(self):
+        """Return ``True`` if the deadline has passed."""
+        return self.remaining() <= 0
 
-    def handle(self, response):
-        payload = response.json()
-        err, code = _extract_other_error_from_payload(payload)
+    def error(self, phase=None):
+        """Get an exception describing an operation that missed this deadline.
 
-        raise warthog.exceptions.WarthogPermissionError(
-            'Insufficient permissions to complete operation on {0}'.format(self._server),
-            api_msg=err, api_code=code, server=self._server
-        )
+        :param basestring|None phase: Phase of the operation that was running.
+        :return: Exception to raise.
+        :rtype: warthog.exceptions.WarthogTimeoutError
+        """
+        return warthog.exceptions.WarthogTimeoutError(
+            'Operation did not complete within {0} seconds'.format(self.timeout),
+            phase=phase, timeout=self.timeout)
 
+    def check(self, phase=None):
+        """Raise an exception if the deadline has passed.
 
-class _NoSuchServerErrorHandler(object):
-    def __init__(self, server):
-        self._server = server
+        :param basestring|None phase: Phase of the operation that is running.
+        :raises warthog.exceptions.WarthogTimeoutError: If the deadline has passed.
+        """
+        if self.expired():
+            raise self.error(phase)
 
-    # pylint: disable=no-self-use
-    def can_handle(self, response):
-        # pylint: disable=no-member
-        if response.status_code != requests.codes.not_found:
-            return False
 
-        payload = response.json()
-        _, code = _extract_other_error_from_payload(payload)
-        return code == ERROR_CODE_NO_SUCH_SERVER
+def get_deadline():
+    """Get the deadline that requests made by the current thread must complete by.
 
-    def handle(self, response):
-        payload = response.json()
-        err, code = _extract_other_error_from_payload(payload)
+    .. versionadded:: 2.1.0
 
-        raise warthog.exceptions.WarthogNoSuchNodeError(
-            'No such node {0}'.format(self._server),
-            api_msg=err, api_code=code, server=self._server
-        )
+    :return: The current deadline or ``None`` if there isn't one.
+    :rtype: Deadline|None
+    """
+    current = getattr(_deadlines, 'current', None)
+    return current[0] if current is not None else None
 
 
-class _OtherErrorHandler(object):
-    # pylint: disable=no-self-use
-    def can_handle(self, response):
-        return not response.ok
+@contextlib.contextmanager
+def deadline_context(deadline, phase=PHASE_ACTION):
+    """Context manager that makes every request by commands in the current thread
+    complete by the given deadline, or raise a :class:`warthog.exceptions.WarthogTimeoutError`.
 
-    # pylint: disable=no-self-use
-    def handle(self, response):
-        payload = response.json()
-        err, code = _extract_other_error_from_payload(payload)
+    Each request is given the time remaining before the deadline as its timeout (if that
+    is shorter than the timeouts of the transport). Deadlines only apply to the thread that
+    set them, operations that make requests from other threads must set the deadline in
+    each thread.
 
-        raise warthog.exceptions.WarthogApiError(
-            'Unexpected API error, HTTP code {0}'.format(response.status_code),
-            api_msg=err, api_code=code
-        )
+    .. versionadded:: 2.1.0
 
+    :param Deadline|None deadline: Deadline for requests, ``None`` to leave any current
+        deadline as it is.
+    :param basestring phase: Phase of the operation the requests are part of, used to
+        describe which part of an operation ran out of time.
+    """
+    if deadline is None:
+        yield
+        return
 
-class _SuccessHandler(object):
-    # pylint: disable=no-self-use
-    def can_handle(self, _):
-        return True
+    previous = getattr(_deadlines, 'current', None)
+    _deadlines.current = (deadline, phase)
+    try:
+        yield
+    finally:
+        _deadlines.current = previous
 
-    # pylint: disable=no-self-use
-    def handle(self, response):
+
+# pylint: disable=invalid-name,missing-docstring
+def _extract_auth_error_from_payload(payload):
+    err = payload['authorizationschema']['error'].strip()
+    code = payload['authorizationschema']['code']
+    return err, code
+
+
+# pylint: disable=invalid-name,missing-docstring
+def _extract_other_error_from_payload(payload):
+    err = payload['response']['err']['msg'].strip()
+    code = payload['response']['err']['code']
+    return err, code
+
+
+def _get_api_code(payload):
+    """Get the A10 error code from the payload of an error response, if it has one."""
+    try:
+        return payload['response']['err']['code']
+    except (KeyError, TypeError):
+        pass
+
+    try:
+        return payload['authorizationschema']['code']
+    except (KeyError, TypeError):
+        return None
+
+
+# Information about the command that received an error response, passed to
+# error handlers so that they can construct a meaningful exception.
+ResponseContext = collections.namedtuple(
+    'ResponseContext', ['scheme_host', 'username', 'session_id', 'server'])
+
+
+# pylint: disable=unused-argument
+def _handle_auth_error(response, payload, context):
+    err, code = _extract_auth_error_from_payload(payload)
+    raise warthog.exceptions.WarthogAuthFailureError(
+        'Authentication failure using user "{0}" with {1}'.format(
+            context.username, context.scheme_host),
+        api_msg=err, api_code=code
+    )
+
+
+# pylint: disable=unused-argument
+def _handle_session_error(response, payload, context):
+    err, code = _extract_auth_error_from_payload(payload)
+    raise warthog.exceptions.WarthogInvalidSessionError(
+        'Invalid session or token "{0}"'.format(context.session_id),
+        api_msg=err, api_code=code
+    )
+
+
+# pylint: disable=unused-argument
+def _handle_permission_error(response, payload, context):
+    err, code = _extract_other_error_from_payload(payload)
+    raise warthog.exceptions.WarthogPermissionError(
+        'Insufficient permissions to complete operation on {0}'.format(context.server),
+        api_msg=err, api_code=code, server=context.server
+    )
+
+
+# pylint: disable=unused-argument
+def _handle_no_such_server_error(response, payload, context):
+    err, code = _extract_other_error_from_payload(payload)
+    raise warthog.exceptions.WarthogNoSuchNodeError(
+        'No such node {0}'.format(context.server),
+        api_msg=err, api_code=code, server=context.server
+    )
+
+
+# pylint: disable=unused-argument
+def _handle_other_error(response, payload, context):
+    err, code = _extract_other_error_from_payload(payload)
+    raise warthog.exceptions.WarthogApiError(
+        'Unexpected API error, HTTP code {0}'.format(response.status_code),
+        api_msg=err, api_code=code
+    )
+
+
+# Handlers for error responses keyed by HTTP status code and A10 error code. An
+# error code of None matches any error code with that status code. The map is
+# replaced, never modified, when handlers are registered so lookups need no lock.
+# pylint: disable=no-member
+_error_handlers = {
+    (requests.codes.forbidden, None): _handle_auth_error,
+    (requests.codes.unauthorized, None): _handle_session_error,
+    (requests.codes.not_found, ERROR_CODE_NO_SUCH_SERVER): _handle_no_such_server_error,
+    (requests.codes.bad_request, ERROR_CODE_BAD_PERMISSION): _handle_permission_error,
+}
+_error_handlers_lock = threading.Lock()
+
+
+def register_error_handler(status_code, api_code, handler):
+    """Register a handler for error responses from the load balancer with the given
+    HTTP status code and A10 error code, replacing any existing handler for them.
+
+    Handlers are called with the response, its decoded JSON payload, and a
+    :class:`ResponseContext` describing the command that received it. Handlers
+    typically raise an exception. If a handler returns instead, the value it returns
+    is used as the payload of a successful response.
+
+    Handlers registered for a specific error code take precedence over handlers
+    registered for any error code (``None``) with the same HTTP status code. Error
+    responses without a matching handler raise a
+    :class:`warthog.exceptions.WarthogApiError`.
+
+    .. versionadded:: 2.1.0
+
+    :param int status_code: HTTP status code of responses to handle.
+    :param int|None api_code: A10 error code of responses to handle, ``None`` to handle
+        any error code with the given HTTP status code.
+    :param callable handler: Callable that accepts a response, payload, and context.
+    """
+    global _error_handlers  # pylint: disable=global-statement
+    with _error_handlers_lock:
+        handlers = dict(_error_handlers)
+        handlers[(status_code, api_code)] = handler
+        _error_handlers = handlers
+
+
+def _decode_payload(response):
+    """Decode the JSON body of a response with the configured codec."""
+    content = getattr(response, 'content', None)
+    if not isinstance(content, six.binary_type):
+        # Not a response we know how to get the raw body of, let it decode itself.
         return response.json()
+    return warthog.codec.get_codec().loads(content)
+
+
+def _encode_payload(kwargs):
+    """Encode the JSON body of a request (given as ``json``) with the configured codec."""
+    if kwargs.get('json') is None:
+        return kwargs
+
+    kwargs = dict(kwargs)
+    headers = dict(kwargs.get('headers') or {})
+    headers['Content-Type'] = 'application/json'
+    kwargs['headers'] = headers
+    kwargs['data'] = warthog.codec.get_codec().dumps(kwargs.pop('json'))
+    return kwargs
 
 
 class _ResponseHandlerMixin(object):
     """Mixin class for translating error responses to WarthogApiError instances."""
 
     def _extract_payload(self, response):
-        server = getattr(self, '_server', None)
-        host = getattr(self, '_scheme_host', None)
-        user = getattr(self, '_username', None)
-        auth = getattr(self, '_auth_token', None)
-
-        handlers = [
-            _AuthErrorHandler(host, user),
-            _SessionErrorHandler(auth),
-            _NoSuchServerErrorHandler(server),
-            _PermissionErrorHandler(server),
-            _OtherErrorHandler(),
-            _SuccessHandler()
-        ]
-
-        for handler in handlers:
-            if handler.can_handle(response):
-                return handler.handle(response)
-
-        raise RuntimeError(
-            "At least one configured handler should be able to handle the "
-            "response (code {code}) but none did. This most likely indicates "
-            "a bug in the Warthog library. Response {response}".format(
-                code=response.status_code, response=response.text
-            )
-        )
+        payload = _decode_payload(response)
+        if response.ok:
+            return payload
+
+        status = response.status_code
+        handlers = _error_handlers
+        handler = handlers.get((status, _get_api_code(payload))) or \
+            handlers.get((status, None), _handle_other_error)
+
+        return handler(response, payload, self._get_response_context())
+
+    def _get_response_context(self):
+        return ResponseContext(
+            scheme_host=getattr(self, '_scheme_host', None),
+            username=getattr(self, '_username', None),
+            session_id=getattr(self, '_auth_token', None),
+            server=getattr(self, '_server', None))
+
+
+class _RequestMixin(_ResponseHandlerMixin):
+    """Mixin class for making requests to the load balancer, extracting the payload
+    of responses, and notifying registered hooks about each request.
+    """
+    # Phase of an operation that requests made by this command are always part of,
+    # None if that depends on what the command is being used for.
+    _phase = None
+
+    def _request(self, method, url, **kwargs):
+        """Make a GET or POST request and return the payload of the response."""
+        send = self._transport.get if method == 'GET' else self._transport.post
+        kwargs = _encode_payload(kwargs)
+
+        current = getattr(_deadlines, 'current', None)
+        if current is not None:
+            send = functools.partial(
+                self._send_within, send, current[0], self._phase or current[1])
+
+        hooks = warthog.hooks.get_hooks()
+        if not hooks:
+            return self._handle_response(send(url, **kwargs))
+
+        # Forget the queue wait of any earlier request that wasn't reported to hooks.
+        warthog.ratelimit.pop_queue_wait()
+        start = monotonic()
+        response = error = None
+        try:
+            response = send(url, **kwargs)
+            return self._handle_response(response)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            hooks.emit(self._get_event(method, url, response, error, monotonic() - start))
+
+    # pylint: disable=no-self-use
+    def _send_within(self, send, deadline, phase, url, **kwargs):
+        """Make a request that must complete by the given deadline."""
+        deadline.check(phase)
+        kwargs['timeout'] = deadline.remaining()
+        try:
+            return send(url, **kwargs)
+        except warthog.exceptions.WarthogTimeoutError as e:
+            # Raised by the rate limiter when a request couldn't be made before the
+            # deadline, which doesn't know which phase of the operation is running.
+            if e.phase is None:
+                raise deadline.error(phase)
+            raise
+        except requests.exceptions.Timeout:
+            # The transport's own timeouts may also have expired, only blame the
+            # deadline if it was actually what stopped the request.
+            if deadline.expired():
+                raise deadline.error(phase)
+            raise
+
+    def _handle_response(self, response):
+        self._log_response(response)
+        return self._extract_payload(response)
+
+    def _log_response(self, response):
+        """Log the status and body of a response if debug logging is enabled.
+
+        The body is only decoded when the message is formatted. It is also included
+        (along with the command and status code) as fields of the log record so that
+        structured log handlers don't need to parse the message.
+        """
+        if not self._logger.isEnabledFor(logging.DEBUG):
+            return
+
+        command = type(self).__name__
+        body = _LazyBody(response, _log_body_limit)
+        self._logger.debug(
+            '%s response (HTTP %s): %s', command, response.status_code, body,
+            extra={
+                'warthog_command': command,
+                'warthog_server': getattr(self, '_server', None),
+                'warthog_status': response.status_code,
+                'warthog_body': body,
+            })
+
+    def _get_event(self, method, url, response, error, elapsed):
+        """Describe a request that was made for hooks."""
+        status_code = size = server_time = None
+        retries = 0
+        if response is not None:
+            status_code = response.status_code
+            size = _get_response_size(response)
+            server_time = _get_server_time(response)
+            retries = _get_retries(response)
+
+        return warthog.hooks.RequestEvent(
+            command=type(self).__name__,
+            server=getattr(self, '_server', None),
+            method=method,
+            path=urllib.parse.urlparse(url).path,
+            status_code=status_code,
+            bytes=size,
+            elapsed=elapsed,
+            server_time=server_time,
+            retries=retries,
+            error=type(error).__name__ if error is not None else None,
+            queue_wait=warthog.ratelimit.pop_queue_wait())
+
+
+def _get_response_size(response):
+    content = getattr(response, 'content', None)
+    return len(content) if isinstance(content, six.binary_type) else None
+
+
+def _get_server_time(response):
+    elapsed = getattr(response, 'elapsed', None)
+    return elapsed.total_seconds() if isinstance(elapsed, datetime.timedelta) else None
+
+
+def _get_retries(response):
+    # Retries are only tracked by urllib3 responses, other transports report none.
+    retries = getattr(getattr(response, 'raw', None), 'retries', None)
+    history = getattr(retries, 'history', None)
+    return len(history) if isinstance(history, tuple) else 0
 
 
 def _get_endpoint_url(scheme_host, path):
     return urllib.parse.urljoin(scheme_host, path)
 
 
-class SessionStartCommand(_ResponseHandlerMixin):
+def _parse_status(server, status):
+    """Convert the operational state of a server in an API response to one of
+    the ``STATUS_*`` constants.
+    """
+    if status == 'Disabled':
+        return STATUS_DISABLED
+    if status == 'Up':
+        return STATUS_ENABLED
+    if status == 'Down':
+        return STATUS_DOWN
+
+    raise warthog.exceptions.WarthogNodeStatusError(
+        'Unknown status of {0}: status={1}'.format(server, status), server=server)
+
+
+class SessionStartCommand(_RequestMixin):
     """Command to authenticate with the load balancer and start a new session
     to be used by subsequent commands.
 
     This class is thread safe.
     """
     _logger = get_log()
+    _phase = PHASE_AUTH
 
     def __init__(self, transport, scheme_host, username, password):
         """Set the transport layer and necessary credentials to authenticate with
@@ -250,19 +581,26 @@ class SessionStartCommand(_ResponseHandlerMixin):
             error code that provides more detail about the failure. Common reasons
             for this error include using invalid username or password.
         """
-        url = _get_endpoint_url(self._scheme_host, _PATH_AUTH)
-        params = {
+        url = self._url()
+
+        self._logger.debug('Making session start POST request to %s', url)
+        payload = self._request('POST', url, json=self._params())
+
+        return self._parse(payload)
+
+    def _url(self):
+        return _get_endpoint_url(self._scheme_host, _PATH_AUTH)
+
+    def _params(self):
+        return {
             'credentials': {
                 'username': self._username,
                 'password': self._password
             }
         }
 
-        self._logger.debug('Making session start POST request to %s', url)
-        response = self._transport.post(url, json=params)
-        self._logger.debug(response.text)
-
-        payload = self._extract_payload(response)
+    # pylint: disable=no-self-use
+    def _parse(self, payload):
         return payload['authresponse']['signature']
 
 
@@ -301,11 +639,12 @@ class _AuthenticatedCommand(object):
         raise NotImplementedError()
 
 
-class SessionEndCommand(_AuthenticatedCommand, _ResponseHandlerMixin):
+class SessionEndCommand(_AuthenticatedCommand, _RequestMixin):
     """Command for ending a previously authenticated session with the load balancer.
 
     This class is thread safe.
     """
+    _phase = PHASE_LOGOFF
 
     def send(self):
         """Close an existing session and return ``True`` if closing it was successful.
@@ -316,17 +655,22 @@ class SessionEndCommand(_AuthenticatedCommand, _ResponseHandlerMixin):
             closed. This is usually the result of the session ID being invalid or the
             session already being closed before this command is run.
         """
-        url = _get_endpoint_url(self._scheme_host, _PATH_LOGOFF)
+        url = self._url()
 
         self._logger.debug('Making session close POST request to %s', url)
-        response = self._transport.post(url, headers=self._auth_header())
-        self._logger.debug(response.text)
-        payload = self._extract_payload(response)
+        payload = self._request('POST', url, headers=self._auth_header())
+
+        return self._parse(payload)
+
+    def _url(self):
+        return _get_endpoint_url(self._scheme_host, _PATH_LOGOFF)
 
+    # pylint: disable=no-self-use
+    def _parse(self, payload):
         return payload['response']['status'] == 'OK'
 
 
-class NodeEnableCommand(_AuthenticatedCommand, _ResponseHandlerMixin):
+class NodeEnableCommand(_AuthenticatedCommand, _RequestMixin):
     """Command to mark a particular server as enabled.
 
     This class is thread safe.
@@ -363,19 +707,26 @@ class NodeEnableCommand(_AuthenticatedCommand, _ResponseHandlerMixin):
         :raises warthog.exceptions.WarthogApiError: If the server could not be
             enabled for any other reason.
         """
+        self._logger.debug('Making node enable POST request for %s', self._server)
+        payload = self._request(
+            'POST', self._url(), headers=self._auth_header(), json=self._params())
+
+        return self._parse(payload)
+
+    def _url(self):
         url = _get_endpoint_url(self._scheme_host, _PATH_ENABLE)
-        url = url.format(server=self._server)
-        params = {'server': {'action': 'enable'}}
+        return url.format(server=self._server)
 
-        self._logger.debug('Making node enable POST request for %s', self._server)
-        response = self._transport.post(url, headers=self._auth_header(), json=params)
-        self._logger.debug(response.text)
-        payload = self._extract_payload(response)
+    # pylint: disable=no-self-use
+    def _params(self):
+        return {'server': {'action': 'enable'}}
 
+    # pylint: disable=no-self-use
+    def _parse(self, payload):
         return payload['server']['action'] == 'enable'
 
 
-class NodeDisableCommand(_AuthenticatedCommand, _ResponseHandlerMixin):
+class NodeDisableCommand(_AuthenticatedCommand, _RequestMixin):
     """Command to mark a particular server as disabled.
 
     This class is thread safe.
@@ -412,19 +763,26 @@ class NodeDisableCommand(_AuthenticatedCommand, _ResponseHandlerMixin):
         :raises warthog.exceptions.WarthogApiError: If the server could not be
             disabled for any other reason.
         """
+        self._logger.debug('Making node disable POST request for %s', self._server)
+        payload = self._request(
+            'POST', self._url(), headers=self._auth_header(), json=self._params())
+
+        return self._parse(payload)
+
+    def _url(self):
         url = _get_endpoint_url(self._scheme_host, _PATH_DISABLE)
-        url = url.format(server=self._server)
-        params = {'server': {'action': 'disable'}}
+        return url.format(server=self._server)
 
-        self._logger.debug('Making node disable POST request for %s', self._server)
-        response = self._transport.post(url, headers=self._auth_header(), json=params)
-        self._logger.debug(response.text)
-        payload = self._extract_payload(response)
+    # pylint: disable=no-self-use
+    def _params(self):
+        return {'server': {'action': 'disable'}}
 
+    # pylint: disable=no-self-use
+    def _parse(self, payload):
         return payload['server']['action'] == 'disable'
 
 
-class NodeStatusCommand(_AuthenticatedCommand, _ResponseHandlerMixin):
+class NodeStatusCommand(_AuthenticatedCommand, _RequestMixin):
     """Command to get the current status ('enabled', 'disabled', 'down') of a particular
     server.
 
@@ -462,27 +820,20 @@ class NodeStatusCommand(_AuthenticatedCommand, _ResponseHandlerMixin):
         :raises warthog.exceptions.WarthogApiError: If there are any other problems
             getting the status of the server.
         """
-        url = _get_endpoint_url(self._scheme_host, _PATH_STATUS)
-        url = url.format(server=self._server)
-
         self._logger.debug('Making node status GET request for %s', self._server)
-        response = self._transport.get(url, headers=self._auth_header())
-        self._logger.debug(response.text)
-        payload = self._extract_payload(response)
+        payload = self._request('GET', self._url(), headers=self._auth_header())
 
-        status = payload['server']['oper']['state']
-        if status == 'Disabled':
-            return STATUS_DISABLED
-        if status == 'Up':
-            return STATUS_ENABLED
-        if status == 'Down':
-            return STATUS_DOWN
+        return self._parse(payload)
 
-        raise warthog.exceptions.WarthogNodeStatusError(
-            'Unknown status of {0}: status={1}'.format(self._server, status))
+    def _url(self):
+        url = _get_endpoint_url(self._scheme_host, _PATH_STATUS)
+        return url.format(server=self._server)
 
+    def _parse(self, payload):
+        return _parse_status(self._server, payload['server']['oper']['state'])
 
-class NodeActiveConnectionsCommand(_AuthenticatedCommand, _ResponseHandlerMixin):
+
+class NodeActiveConnectionsCommand(_AuthenticatedCommand, _RequestMixin):
     """Command to get the number of active connections to a particular server.
 
     This class is thread safe.
@@ -516,12 +867,88 @@ class NodeActiveConnectionsCommand(_AuthenticatedCommand, _ResponseHandlerMixin)
         :raises warthog.exceptions.WarthogApiError: If the number of active
             connections to the server could not be determined for any other reason.
         """
-        url = _get_endpoint_url(self._scheme_host, _PATH_CONNS)
-        url = url.format(server=self._server)
-
         self._logger.debug('Making active connection count GET request for %s', self._server)
-        response = self._transport.get(url, headers=self._auth_header())
-        self._logger.debug(response.text)
-        payload = self._extract_payload(response)
+        payload = self._request('GET', self._url(), headers=self._auth_header())
+
+        return self._parse(payload)
+
+    def _url(self):
+        url = _get_endpoint_url(self._scheme_host, _PATH_CONNS)
+        return url.format(server=self._server)
 
+    # pylint: disable=no-self-use
+    def _parse(self, payload):
         return payload['server']['stats']['curr-conn']
+
+
+class NodeStatusListCommand(_AuthenticatedCommand, _RequestMixin):
+    """Command to get the current status ('enabled', 'disabled', 'down') of every server
+    known to the load balancer with a single request.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def send(self):
+        """Get the current status of every server at the node level as a map of server
+        name to one of the ``STATUS_ENABLED``, ``STATUS_DISABLED``, ``STATUS_DOWN`` constants.
+
+        :return: Map of server name to the status of the server as a constant string
+        :rtype: dict
+        :raises warthog.exceptions.WarthogInvalidSessionError: If the load balancer
+            did not recognize the session this command is being run as part of.
+        :raises warthog.exceptions.WarthogNodeStatusError: If the status of any server
+            was not a recognized status.
+        :raises warthog.exceptions.WarthogApiError: If there are any other problems
+            getting the status of the servers.
+        """
+        self._logger.debug('Making status GET request for all nodes')
+        payload = self._request('GET', self._url(), headers=self._auth_header())
+
+        return self._parse(payload)
+
+    def _url(self):
+        return _get_endpoint_url(self._scheme_host, _PATH_STATUS_ALL)
+
+    # pylint: disable=no-self-use
+    def _parse(self, payload):
+        return dict(
+            (server['name'], _parse_status(server['name'], server['oper']['state']))
+            for server in payload.get('server-list', []))
+
+
+class NodeActiveConnectionsListCommand(_AuthenticatedCommand, _RequestMixin):
+    """Command to get the number of active connections to every server known to the
+    load balancer with a single request.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def send(self):
+        """Get the current number of active connections for every node as a map of
+        server name to number of connections.
+
+        :return: Map of server name to the number of active connections for the node
+            across all ports
+        :rtype: dict
+        :raises warthog.exceptions.WarthogInvalidSessionError: If the load balancer
+            did not recognize the session this command is being run as part of.
+        :raises warthog.exceptions.WarthogApiError: If the number of active connections
+            to the servers could not be determined for any other reason.
+        """
+        self._logger.debug('Making active connection count GET request for all nodes')
+        payload = self._request('GET', self._url(), headers=self._auth_header())
+
+        return self._parse(payload)
+
+    def _url(self):
+        return _get_endpoint_url(self._scheme_host, _PATH_CONNS_ALL)
+
+    # pylint: disable=no-self-use
+    def _parse(self, payload):
+        return dict(
+            (server['name'], server['stats']['curr-conn'])
+            for server in payload.get('server-list', []))
@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.daemon
+~~~~~~~~~~~~~~
+
+Long running process that holds a warm client (pooled connections and a live
+session) and serves requests from the CLI over a Unix domain socket.
+
+Requests and responses are single lines of JSON. A request names an operation
+(``ping``, ``status``, ``connections``, ``enable``, or ``disable``) and the servers
+to run it for. The response holds the result or error for each server.
+
+This module deliberately doesn't import the client so that the CLI can check for a
+running daemon without paying for importing ``requests``.
+"""
+
+import json
+import logging
+import os
+import os.path
+import socket
+import sys
+import threading
+
+import warthog.concurrency
+import warthog.exceptions
+
+# pylint: disable=import-error
+from .packages.six.moves import socketserver
+
+# Environment variable that may be used to override the default socket path.
+SOCKET_ENV_VAR = 'WARTHOG_SOCKET'
+
+# Default location of the socket the daemon listens on. This is next to the default
+# per-user configuration file location since the daemon holds credentials for the user.
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser('~'), '.warthog.sock')
+
+# Number of seconds to wait while connecting to the daemon and checking that it is
+# using the same configuration before falling back to talking to the load balancer.
+DEFAULT_CONNECT_TIMEOUT = 2.0
+
+OP_PING = 'ping'
+OP_STATUS = 'status'
+OP_CONNECTIONS = 'connections'
+OP_ENABLE = 'enable'
+OP_DISABLE = 'disable'
+
+
+def get_socket_path(path=None):
+    """Get the path of the daemon socket to use.
+
+    .. versionadded:: 2.1.0
+
+    :param basestring|None path: Explicit path to use, ``None`` to use the
+        ``WARTHOG_SOCKET`` environment variable if set or the default path otherwise.
+    :return: Path of the socket.
+    :rtype: basestring
+    """
+    if path:
+        return path
+    return os.environ.get(SOCKET_ENV_VAR) or DEFAULT_SOCKET_PATH
+
+
+def _config_key(config):
+    """Normalize the path of a config file so that daemon and CLI can compare them."""
+    return os.path.abspath(config) if config else None
+
+
+def _encode_error(error):
+    return {
+        'type': type(error).__name__,
+        'msg': str(error),
+        'server': getattr(error, 'server', None),
+    }
+
+
+def _decode_error(data):
+    """Convert an encoded error back into the library exception it came from, or a
+    :class:`warthog.exceptions.WarthogDaemonError` if it wasn't a library exception.
+    """
+    cls = getattr(warthog.exceptions, data['type'], None)
+    if not isinstance(cls, type) or not issubclass(cls, warthog.exceptions.WarthogError):
+        return warthog.exceptions.WarthogDaemonError(data['msg'], error_type=data['type'])
+    if issubclass(cls, warthog.exceptions.WarthogNodeError):
+        return cls(data['msg'], server=data['server'])
+    return cls(data['msg'])
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Handle each line sent over a connection as a separate request."""
+
+    def handle(self):
+        for line in iter(self.rfile.readline, b''):
+            if not line.strip():
+                continue
+            response = self.server.warthog_daemon.handle_request(line)
+            self.wfile.write(response + b'\n')
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class WarthogDaemon(object):
+    """Server that runs operations requested over a Unix domain socket with a single,
+    long lived client.
+
+    The client should be created with ``pooled=True`` and ``session_reuse=True`` so that
+    connections and the authenticated session are kept warm between requests. The socket
+    is only accessible by the user running the daemon.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    # Not using warthog.core.get_log() to avoid importing requests for the CLI.
+    _logger = logging.getLogger('warthog')
+
+    def __init__(self, client, path=None, config=None, max_workers=None):
+        """Set the client used to run operations and where to listen for requests.
+
+        :param warthog.client.WarthogClient client: Client used for every operation.
+        :param basestring|None path: Path of the socket to listen on, ``None`` to use the
+            default path.
+        :param basestring|None config: Path of the configuration file the client was
+            created from. Requests from the CLI using any other configuration file are
+            rejected so that the CLI talks to the load balancer directly instead.
+        :param int|None max_workers: Maximum number of requests to make to the load
+            balancer at the same time for a single operation, ``None`` to use the library
+            default.
+        """
+        self._client = client
+        self._path = get_socket_path(path)
+        self._config = _config_key(config)
+        self._max_workers = max_workers
+        self._server = None
+        self._thread = None
+        self._ops = {
+            OP_STATUS: client.get_status_many,
+            OP_CONNECTIONS: client.get_connections_many,
+            OP_ENABLE: client.enable_servers,
+            OP_DISABLE: client.disable_servers,
+        }
+
+    @property
+    def path(self):
+        """Path of the socket the daemon listens on."""
+        return self._path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _bind(self):
+        """Create the server, replacing a socket left behind by a daemon that is gone."""
+        if os.path.exists(self._path):
+            if _is_listening(self._path):
+                raise RuntimeError('A daemon is already listening on {0}'.format(self._path))
+            os.unlink(self._path)
+
+        # Make sure the socket is never accessible by other users, even briefly.
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(self._path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.warthog_daemon = self
+
+    def start(self):
+        """Start serving requests in a background thread.
+
+        :return: This daemon.
+        :rtype: WarthogDaemon
+        :raises RuntimeError: If another daemon is already listening on the socket.
+        """
+        self._bind()
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests in the current thread until interrupted, then clean up.
+
+        :raises RuntimeError: If another daemon is already listening on the socket.
+        """
+        try:
+            self._bind()
+            self._server.serve_forever()
+        finally:
+            self._cleanup()
+
+    def stop(self):
+        """Stop serving requests started with :meth:`start`, remove the socket, and
+        close the client.
+        """
+        if self._server is not None and self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+        self._cleanup()
+
+    def _cleanup(self):
+        try:
+            if self._server is not None:
+                self._server.server_close()
+                self._server = None
+                if os.path.exists(self._path):
+                    os.unlink(self._path)
+        finally:
+            self._client.close()
+
+    def handle_request(self, line):
+        """Run the operation in a single encoded request.
+
+        :param bytes line: JSON encoded request.
+        :return: JSON encoded response.
+        :rtype: bytes
+        """
+        try:
+            request = json.loads(line.decode('utf-8'))
+            response = self._dispatch(request)
+        except Exception:  # pylint: disable=broad-except
+            error = sys.exc_info()[1]
+            self._logger.warning('Daemon request failed: %s', error)
+            response = {'error': _encode_error(error)}
+        return json.dumps(response).encode('utf-8')
+
+    def _dispatch(self, request):
+        op = request.get('op')
+        if op == OP_PING:
+            return {'config': self._config}
+
+        if _config_key(request.get('config')) != self._config:
+            raise ValueError('Daemon is using a different configuration file')
+
+        try:
+            operation = self._ops[op]
+        except KeyError:
+            raise ValueError('Unknown operation {0}'.format(op))
+
+        servers = list(request.get('servers', []))
+        max_workers = request.get('max_workers') or self._max_workers
+        results = operation(servers, max_workers=max_workers)
+
+        return {'results': [{
+            'server': server,
+            'value': results[server].value,
+            'error': _encode_error(results[server].error) if not results[server].ok else None,
+        } for server in warthog.concurrency.unique(servers)]}
+
+
+def _is_listening(path):
+    """Determine if something is accepting connections on the given socket path."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except socket.error:
+        return False
+    finally:
+        sock.close()
+
+
+class DaemonClient(object):
+    """Client for sending requests to a running :class:`WarthogDaemon`.
+
+    This class is not thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, sock, config=None):
+        """Set the connected socket to send requests over.
+
+        :param socket.socket sock: Socket connected to the daemon.
+        :param basestring|None config: Path of the configuration file the caller would
+            otherwise use to create a client.
+        """
+        self._sock = sock
+        self._file = sock.makefile('rb')
+        self._config = _config_key(config)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the connection to the daemon."""
+        try:
+            self._file.close()
+        finally:
+            self._sock.close()
+
+    def _send(self, request):
+        self._sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        line = self._file.readline()
+        if not line:
+            raise warthog.exceptions.WarthogDaemonError('Daemon closed the connection')
+
+        response = json.loads(line.decode('utf-8'))
+        if 'error' in response:
+            raise _decode_error(response['error'])
+        return response
+
+    def ping(self):
+        """Get the configuration file the daemon is using.
+
+        :return: Absolute path of the configuration file, ``None`` if the daemon is
+            using the default locations.
+        """
+        return self._send({'op': OP_PING})['config']
+
+    def request(self, op, servers, max_workers=None):
+        """Run an operation for each of the given servers using the daemon.
+
+        :param basestring op: One of ``status``, ``connections``, ``enable``, or ``disable``.
+        :param list servers: Hostnames of servers to run the operation for.
+        :param int|None max_workers: Maximum number of requests the daemon may make to the
+            load balancer at the same time, ``None`` to use the daemon default.
+        :return: Map of server hostname to :class:`warthog.concurrency.OperationResult`.
+        :rtype: dict
+        :raises warthog.exceptions.WarthogError: If the operation failed as a whole, such
+            as when authentication with the load balancer failed.
+        """
+        response = self._send({
+            'op': op, 'servers': list(servers), 'config': self._config,
+            'max_workers': max_workers})
+
+        return dict(
+            (res['server'], warthog.concurrency.OperationResult(
+                res['value'], _decode_error(res['error']) if res['error'] else None))
+            for res in response['results'])
+
+
+def get_daemon_client(path=None, config=None, timeout=None):
+    """Connect to a running daemon that is using the same configuration file, if there is one.
+
+    .. versionadded:: 2.1.0
+
+    :param basestring|None path: Path of the daemon socket, ``None`` to use the default.
+    :param basestring|None config: Path of the configuration file the caller would
+        otherwise use, ``None`` for the default locations.
+    :param float|None timeout: Seconds to wait while connecting and checking the daemon,
+        ``None`` to use the default.
+    :return: Connected client or ``None`` if there is no usable daemon.
+    :rtype: DaemonClient|None
+    """
+    path = get_socket_path(path)
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout if timeout is not None else DEFAULT_CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except socket.error:
+        # Most likely a socket left behind by a daemon that is no longer running.
+        sock.close()
+        return None
+
+    client = DaemonClient(sock, config=config)
+    try:
+        matches = client.ping() == _config_key(config)
+    except (socket.error, ValueError, warthog.exceptions.WarthogError):
+        matches = False
+
+    if not matches:
+        client.close()
+        return None
+
+    # Operations like disabling a server may take a long time, don't time out.
+    sock.settimeout(None)
+    return client
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.drain
+~~~~~~~~~~~~~
+
+Disable and drain many servers at once, polling all of them from a single loop.
+"""
+
+import time
+
+import warthog.concurrency
+import warthog.core
+import warthog.wait
+
+
+class DrainScheduler(object):
+    """Disable a group of servers and wait for the number of active connections to each
+    of them to reach zero, checking all servers that are still draining in a single loop
+    instead of waiting for each server in turn.
+
+    Servers are disabled in waves of ``wave_size`` servers (or all at once if no wave size
+    is given). Once a wave has been disabled, the number of active connections to each
+    server in the wave that is still draining is checked repeatedly, as decided by the
+    ``wait`` strategy. As each server finishes draining (or the wait runs out) its final
+    status is checked and the result is yielded immediately.
+
+    This class is not thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    _logger = warthog.core.get_log()
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, disable, connections, status, wait=None, wave_size=None,
+                 max_workers=None, sleep=None):
+        """Set the operations used to disable servers and check on them as well as how
+        often and how many times to check on them.
+
+        :param callable disable: Callable that accepts a server hostname and disables it.
+        :param callable connections: Callable that accepts a server hostname and returns the
+            number of active connections to it.
+        :param callable status: Callable that accepts a server hostname and returns its status.
+        :param warthog.wait.WaitStrategy|None wait: Strategy for deciding how long to wait
+            between checks of the number of active connections to servers and when to give
+            up, ``None`` to check every two seconds up to five times.
+        :param int|None wave_size: Maximum number of servers to disable and drain at the same
+            time, ``None`` to disable and drain all servers at the same time.
+        :param int|None max_workers: Maximum number of requests to make to the load balancer
+            at the same time, ``None`` to use the library default.
+        :param callable sleep: Callable that accepts a number of seconds to sleep for. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        self._disable = disable
+        self._connections = connections
+        self._status = status
+        self._wait = wait if wait is not None else warthog.wait.FixedIntervalWait(
+            interval=2.0, max_retries=5)
+        self._wave_size = wave_size
+        self._max_workers = max_workers
+        self._sleep = sleep if sleep is not None else time.sleep
+
+    def _run(self, func, servers):
+        return warthog.concurrency.run_concurrently(func, servers, max_workers=self._max_workers)
+
+    def _is_disabled(self, server):
+        return warthog.core.STATUS_DISABLED == self._status(server)
+
+    def _finish(self, servers):
+        """Check the final status of each of the given servers."""
+        return zip(servers, self._run(self._is_disabled, servers))
+
+    def _waves(self, servers):
+        size = self._wave_size if self._wave_size else len(servers)
+        for i in range(0, len(servers), size):
+            yield servers[i:i + size]
+
+    def drain(self, servers):
+        """Disable and drain each of the given servers, yielding the result for each
+        server as soon as it has finished draining.
+
+        :param iterable servers: Hostnames of servers to disable and drain.
+        :return: Generator of ``(server, result)`` tuples where ``result`` is an
+            :class:`warthog.concurrency.OperationResult` with ``True`` as the value if the
+            server ended up disabled, ``False`` otherwise.
+        """
+        servers = warthog.concurrency.unique(servers)
+        if not servers:
+            return
+
+        for wave in self._waves(servers):
+            for result in self._drain_wave(wave):
+                yield result
+
+    def _drain_wave(self, wave):
+        """Disable and drain a single wave of servers."""
+        pending = []
+        for server, result in zip(wave, self._run(self._disable, wave)):
+            if result.ok:
+                pending.append(server)
+            else:
+                yield server, result
+
+        waiter = self._wait.start()
+        while pending and not waiter.expired():
+            draining = []
+            done = []
+            conns = {}
+
+            for server, result in zip(pending, self._run(self._connections, pending)):
+                if not result.ok:
+                    yield server, result
+                elif result.value == 0:
+                    done.append(server)
+                else:
+                    draining.append(server)
+                    conns[server] = result.value
+
+            for result in self._finish(done):
+                yield result
+
+            pending = draining
+            if pending:
+                # Base the delay on the server that looks closest to finishing so that
+                # we report it as soon as possible.
+                interval = waiter.next_delay(min(conns.values()))
+                self._logger.debug(
+                    "Connections still active for %s servers, sleeping for %s seconds...",
+                    len(pending), interval)
+                self._sleep(interval)
+
+        # Anything left has run out of retries, report whatever status it ended up with.
+        for result in self._finish(pending):
+            yield result
@@ -108,3 +108,95 @@ class WarthogPermissionError(WarthogNodeError):
 
 class WarthogNodeStatusError(WarthogNodeError):
     """There was some error while getting the status of a node."""
+
+
+class WarthogTimeoutError(WarthogError):
+    """An operation did not complete before its deadline.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, msg, phase=None, timeout=None):
+        super(WarthogTimeoutError, self).__init__(msg)
+        self.phase = phase
+        self.timeout = timeout
+
+    def __str__(self):
+        out = [self.msg]
+        if self.phase is not None:
+            out.append('Phase: {0}'.format(self.phase))
+        if self.timeout is not None:
+            out.append('Timeout: {0}s'.format(self.timeout))
+        return '. '.join(out)
+
+
+class WarthogCircuitOpenError(WarthogError):
+    """Requests to a load balancer are not being made because too many recent requests
+    to it failed.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, msg, scheme_host=None, retry_after=None):
+        super(WarthogCircuitOpenError, self).__init__(msg)
+        self.scheme_host = scheme_host
+        self.retry_after = retry_after
+
+    def __str__(self):
+        out = [self.msg]
+        if self.retry_after is not None:
+            out.append('Retry-after: {0:.1f}s'.format(self.retry_after))
+        return '. '.join(out)
+
+
+class WarthogSessionPoolExhaustedError(WarthogError):
+    """Every session in a pool was in use and none became available in time.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, msg, max_sessions=None, waited=None):
+        super(WarthogSessionPoolExhaustedError, self).__init__(msg)
+        self.max_sessions = max_sessions
+        self.waited = waited
+
+    def __str__(self):
+        out = [self.msg]
+        if self.max_sessions is not None:
+            out.append('Max sessions: {0}'.format(self.max_sessions))
+        if self.waited is not None:
+            out.append('Waited: {0:.1f}s'.format(self.waited))
+        return '. '.join(out)
+
+
+class WarthogClusterError(WarthogError):
+    """Not enough load balancers in a cluster completed an operation to satisfy the
+    policy of the cluster client.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, msg, results=None):
+        super(WarthogClusterError, self).__init__(msg)
+        self.results = results if results is not None else {}
+
+    def __str__(self):
+        out = [self.msg]
+        for name, res in self.results.items():
+            if res.error is not None:
+                out.append('{0}: {1}'.format(name, res.error))
+            elif res.value is False:
+                out.append('{0}: incomplete'.format(name))
+        return '. '.join(out)
+
+
+class WarthogDaemonError(WarthogError):
+    """An error was reported by the daemon process that isn't one of the errors
+    raised by the Warthog library, or the daemon could not be talked to.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, msg, error_type=None):
+        super(WarthogDaemonError, self).__init__(msg)
+        self.error_type = error_type
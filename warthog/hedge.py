@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.hedge
+~~~~~~~~~~~~~
+
+Client for reading from one member of a high availability pair of load balancers
+that sends the same read to the other member when the first is slow to answer.
+"""
+
+import collections
+import sys
+import threading
+import time
+
+import warthog.client
+import warthog.core
+
+# pylint: disable=import-error
+from .packages.six.moves import queue
+
+# Default percentile of recent read latencies from the primary load balancer to wait
+# for before sending the same read to the secondary load balancer. With the 95th
+# percentile, about one in twenty reads is hedged.
+DEFAULT_HEDGE_PERCENTILE = 95.0
+
+# Default number of seconds to wait before hedging a read until enough latencies
+# from the primary load balancer have been recorded to compute a percentile.
+DEFAULT_HEDGE_DELAY = 0.5
+
+# Default number of the most recent read latencies from the primary load balancer
+# to compute the percentile from.
+DEFAULT_HEDGE_WINDOW = 100
+
+# Number of read latencies from the primary load balancer that must be recorded
+# before the percentile is used instead of the initial delay.
+MIN_HEDGE_SAMPLES = 10
+
+_PRIMARY = 'primary'
+_SECONDARY = 'secondary'
+
+# Result of a read from one of the load balancers.
+_Answer = collections.namedtuple('_Answer', ['source', 'value', 'error'])
+
+
+class HedgeDelay(object):
+    """Number of seconds to wait for the primary load balancer to answer a read before
+    hedging it, based on a percentile of recent read latencies from the primary.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, percentile=None, initial=None, window=None):
+        """Set the percentile of recent latencies to use and the delay to use until
+        enough latencies have been recorded.
+
+        :param float|None percentile: Percentile of recent latencies, between 0 and 100,
+            ``None`` to use the default of 95.
+        :param float|None initial: Number of seconds to wait before hedging until enough
+            latencies have been recorded, ``None`` to use the default of 0.5 seconds.
+        :param int|None window: Number of the most recent latencies to keep, ``None`` to
+            use the default of 100.
+        """
+        self._percentile = percentile if percentile is not None else DEFAULT_HEDGE_PERCENTILE
+        self._initial = initial if initial is not None else DEFAULT_HEDGE_DELAY
+        self._latencies = collections.deque(
+            maxlen=window if window is not None else DEFAULT_HEDGE_WINDOW)
+        self._lock = threading.Lock()
+
+        if not 0 < self._percentile <= 100:
+            raise ValueError('Percentile must be between 0 and 100, got {0}'.format(percentile))
+
+    def record(self, elapsed):
+        """Record how long (in seconds) a read from the primary load balancer took."""
+        with self._lock:
+            self._latencies.append(elapsed)
+
+    def get(self):
+        """Get the number of seconds to wait before hedging the next read.
+
+        :return: Number of seconds to wait.
+        :rtype: float
+        """
+        with self._lock:
+            if len(self._latencies) < MIN_HEDGE_SAMPLES:
+                return self._initial
+            return warthog.core.percentile(self._latencies, self._percentile)
+
+
+class HedgedWarthogClient(object):
+    """Client for a high availability pair of load balancers that reads the status of and
+    active connections to servers from the primary load balancer, sending the same read to
+    the secondary load balancer if the primary hasn't answered in time.
+
+    A read is hedged when the primary hasn't answered within a delay computed from a
+    percentile of its recent latencies (see :class:`HedgeDelay`). Whichever load balancer
+    answers first wins. If the primary answers before the delay the read is never sent to
+    the secondary. Otherwise the answer from the slower load balancer is discarded when it
+    arrives. If the first answer is an error, the other answer is used instead (if the
+    read was hedged).
+
+    Only reads are ever hedged. Enabling or disabling servers always uses only the primary
+    load balancer.
+
+    Each load balancer has its own sessions, so both clients should be created with
+    ``session_reuse=True`` to keep a session with the secondary warm for hedged reads.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    _logger = warthog.core.get_log()
+
+    def __init__(self, primary, secondary, delay=None):
+        """Set the clients for each load balancer and the delay before hedging reads.
+
+        :param warthog.client.WarthogClient primary: Client for the load balancer that all
+            operations are sent to.
+        :param warthog.client.WarthogClient secondary: Client for the load balancer that slow
+            reads are also sent to.
+        :param HedgeDelay|None delay: Delay before hedging reads, ``None`` to use the 95th
+            percentile of recent latencies.
+        """
+        self._primary = primary
+        self._secondary = secondary
+        self._delay = delay if delay is not None else HedgeDelay()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the client for each load balancer."""
+        try:
+            self._primary.close()
+        finally:
+            self._secondary.close()
+
+    def _read(self, name, *args):
+        """Run a read-only client method against the primary, hedging it with the secondary
+        if the primary is slow to answer.
+        """
+        answers = queue.Queue()
+        self._start(_PRIMARY, self._primary, answers, name, args)
+
+        try:
+            first = answers.get(timeout=self._delay.get())
+        except queue.Empty:
+            self._logger.debug('Hedging %s%s with the secondary load balancer', name, args)
+            self._start(_SECONDARY, self._secondary, answers, name, args)
+            first = answers.get()
+
+            if first.error is not None:
+                self._logger.warning(
+                    'Hedged %s failed on the %s load balancer: %s', name, first.source,
+                    first.error)
+                # Use the other answer if it succeeded, otherwise report the primary's error.
+                second = answers.get()
+                if second.error is None or second.source == _PRIMARY:
+                    first = second
+
+        if first.error is not None:
+            raise first.error
+        self._logger.debug('Answer for %s%s from the %s load balancer', name, args, first.source)
+        return first.value
+
+    def _start(self, source, client, answers, name, args):
+        """Run a client method in a new thread, putting its answer in the queue."""
+        thread = threading.Thread(target=self._run, args=(source, client, answers, name, args))
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, source, client, answers, name, args):
+        start = warthog.core.monotonic()
+        try:
+            value = getattr(client, name)(*args)
+        except Exception:  # pylint: disable=broad-except
+            answers.put(_Answer(source, None, sys.exc_info()[1]))
+            return
+
+        if source == _PRIMARY:
+            # Latencies are recorded even when the primary loses so that slow reads
+            # keep the delay before hedging high enough to not hedge every read.
+            self._delay.record(warthog.core.monotonic() - start)
+        answers.put(_Answer(source, value, None))
+
+    def get_status(self, server):
+        """Get the current status of the given server, at the node level, from whichever
+        load balancer answers first.
+
+        See :meth:`warthog.client.WarthogClient.get_status`.
+
+        :param basestring server: Hostname of the server to get the status of.
+        :return: The current status of the server, enabled, disabled, or down.
+        :rtype: basestring
+        """
+        return self._read('get_status', server)
+
+    def get_connections(self, server):
+        """Get the current number of active connections to a server, at the node level, from
+        whichever load balancer answers first.
+
+        See :meth:`warthog.client.WarthogClient.get_connections`.
+
+        :param basestring server: Hostname of the server to get the number of active
+            connections for.
+        :return: The number of active connections total for the node.
+        :rtype: int
+        """
+        return self._read('get_connections', server)
+
+    def get_snapshot(self, servers=None):
+        """Get the current status of and number of active connections to every server (or
+        only the given servers) from whichever load balancer answers first.
+
+        See :meth:`warthog.client.WarthogClient.get_snapshot`.
+
+        :param iterable|None servers: Hostnames of servers to include, ``None`` to include
+            every server known to the load balancer.
+        :return: Map of server hostname to :class:`warthog.client.NodeSnapshot`.
+        :rtype: dict
+        """
+        return self._read('get_snapshot', list(servers) if servers is not None else None)
+
+    def disable_server(self, server, *args, **kwargs):
+        """Disable a server using only the primary load balancer.
+
+        See :meth:`warthog.client.WarthogClient.disable_server`.
+        """
+        return self._primary.disable_server(server, *args, **kwargs)
+
+    def enable_server(self, server, *args, **kwargs):
+        """Enable a server using only the primary load balancer.
+
+        See :meth:`warthog.client.WarthogClient.enable_server`.
+        """
+        return self._primary.enable_server(server, *args, **kwargs)
+
+
+# pylint: disable=too-many-arguments
+def get_hedged_client(scheme_host, secondary_scheme_host, username, password, percentile=None,
+                      initial_delay=None, **kwargs):
+    """Get a new hedged client for a high availability pair of load balancers that share
+    the same credentials.
+
+    .. versionadded:: 2.1.0
+
+    :param basestring scheme_host: Scheme, host, and port combination of the primary
+        load balancer.
+    :param basestring secondary_scheme_host: Scheme, host, and port combination of the
+        secondary load balancer.
+    :param basestring username: Name of the user to authenticate with.
+    :param basestring password: Password for the user to authenticate with.
+    :param float|None percentile: Percentile of recent read latencies from the primary to
+        wait for before hedging reads, ``None`` to use the default.
+    :param float|None initial_delay: Number of seconds to wait before hedging reads until
+        enough latencies have been recorded, ``None`` to use the default.
+    :param kwargs: Additional keyword arguments for each
+        :class:`warthog.client.WarthogClient`. Sessions are reused unless
+        ``session_reuse=False`` is given.
+    :return: New hedged client.
+    :rtype: HedgedWarthogClient
+    """
+    kwargs.setdefault('session_reuse', True)
+    return HedgedWarthogClient(
+        warthog.client.WarthogClient(scheme_host, username, password, **kwargs),
+        warthog.client.WarthogClient(secondary_scheme_host, username, password, **kwargs),
+        delay=HedgeDelay(percentile=percentile, initial=initial_delay))
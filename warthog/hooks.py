@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.hooks
+~~~~~~~~~~~~~
+
+Hooks for observing every request made to the load balancer, along with adapters
+for sending timing information about those requests to StatsD or Prometheus.
+
+Hooks are callables that accept a single :class:`RequestEvent`. They are registered
+with the process-wide registry returned by :func:`get_hooks`. For example:
+
+.. code-block:: python
+
+    import warthog.hooks
+
+    warthog.hooks.get_hooks().register(warthog.hooks.StatsdHook('statsd.example.com'))
+"""
+
+import collections
+import logging
+import socket
+import threading
+
+
+class RequestEvent(collections.namedtuple('RequestEvent', [
+        'command', 'server', 'method', 'path', 'status_code', 'bytes',
+        'elapsed', 'server_time', 'retries', 'error', 'queue_wait'])):
+    """Information about a single request made to the load balancer by a command.
+
+    Fields are:
+
+    * ``command`` - Name of the command class that made the request.
+    * ``server`` - Hostname of the server the request was about, if any.
+    * ``method`` - HTTP method of the request.
+    * ``path`` - Path of the API endpoint the request was made to.
+    * ``status_code`` - HTTP status code of the response, ``None`` if there wasn't one.
+    * ``bytes`` - Size of the response body in bytes, ``None`` if there wasn't one.
+    * ``elapsed`` - Total number of seconds the request took, including connecting,
+      any retries, reading the response and handling it.
+    * ``server_time`` - Number of seconds between sending the request and receiving
+      the response headers, if known.
+    * ``retries`` - Number of times the request was retried after network errors.
+    * ``error`` - Name of the exception class raised by the request, if any.
+    * ``queue_wait`` - Number of seconds the request spent queued by the rate limiter
+      for the load balancer before being made (included in ``elapsed``).
+
+    .. versionadded:: 2.1.0
+    """
+    __slots__ = ()
+
+
+class HookRegistry(object):
+    """Collection of hooks to be called with every request made to the load balancer.
+
+    Hooks are called in the thread that made the request, in the order they were
+    registered. Exceptions raised by hooks are logged and otherwise ignored.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    _logger = logging.getLogger('warthog')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Replaced instead of modified so that emitting events doesn't need the lock.
+        self._hooks = ()
+
+    def register(self, hook):
+        """Add a hook to be called with every :class:`RequestEvent`.
+
+        :param callable hook: Callable that accepts a single :class:`RequestEvent`.
+        :return: The hook, to allow use as a decorator.
+        """
+        with self._lock:
+            self._hooks = self._hooks + (hook,)
+        return hook
+
+    def unregister(self, hook):
+        """Remove a previously registered hook, if it is registered.
+
+        :param callable hook: Hook to remove.
+        """
+        with self._lock:
+            self._hooks = tuple(h for h in self._hooks if h is not hook)
+
+    def clear(self):
+        """Remove all registered hooks."""
+        with self._lock:
+            self._hooks = ()
+
+    def emit(self, event):
+        """Call every registered hook with the given event.
+
+        :param RequestEvent event: Event to pass to each hook.
+        """
+        for hook in self._hooks:
+            try:
+                hook(event)
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception('Hook %r failed for %s request', hook, event.command)
+
+    def __len__(self):
+        return len(self._hooks)
+
+
+_registry = HookRegistry()
+
+
+def get_hooks():
+    """Get the registry of hooks called for every request made by any command.
+
+    .. versionadded:: 2.1.0
+
+    :return: The process-wide hook registry.
+    :rtype: HookRegistry
+    """
+    return _registry
+
+
+def _outcome(event):
+    """Get the HTTP status code of an event or the error raised if there was no response."""
+    if event.status_code is not None:
+        return str(event.status_code)
+    return event.error or 'unknown'
+
+
+class StatsdHook(object):
+    """Hook that sends the time taken by each request to a StatsD server over UDP.
+
+    For each request, a timer named ``<prefix>.<command>.time`` and a counter named
+    ``<prefix>.<command>.status.<status>`` are sent, where ``status`` is the HTTP status
+    code of the response or the name of the error raised if there was no response. For
+    requests that were queued by a rate limiter, a timer named
+    ``<prefix>.<command>.queue_wait`` is also sent.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, host='localhost', port=8125, prefix='warthog', sock=None):
+        """Set the address of the StatsD server and the prefix of all metrics.
+
+        :param basestring host: Hostname of the StatsD server.
+        :param int port: Port of the StatsD server.
+        :param basestring prefix: Prefix for the name of every metric sent.
+        :param socket.socket sock: UDP socket to send metrics with. It is typically only
+            necessary to set this parameter for unit testing purposes.
+        """
+        self._address = (host, port)
+        self._prefix = prefix
+        self._sock = sock if sock is not None else socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def __call__(self, event):
+        name = '{0}.{1}'.format(self._prefix, event.command)
+        lines = [
+            '{0}.time:{1:.3f}|ms'.format(name, event.elapsed * 1000.0),
+            '{0}.status.{1}:1|c'.format(name, _outcome(event)),
+        ]
+        if event.queue_wait:
+            lines.append('{0}.queue_wait:{1:.3f}|ms'.format(name, event.queue_wait * 1000.0))
+
+        try:
+            self._sock.sendto('\n'.join(lines).encode('utf-8'), self._address)
+        except socket.error:
+            # Metrics are best effort, never fail a request because of them.
+            pass
+
+    def close(self):
+        """Close the socket used to send metrics."""
+        self._sock.close()
+
+
+# Default histogram buckets, in seconds. These are biased toward the latencies
+# expected of a load balancer management API on a local network.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PrometheusHook(object):
+    """Hook that records the time taken by each request in a Prometheus histogram.
+
+    The histogram is named ``<namespace>_request_duration_seconds`` and is labeled
+    by ``command``, ``method``, and ``status``, where ``status`` is the HTTP status
+    code of the response or the name of the error raised if there was no response.
+    Time spent queued by a rate limiter is recorded in a second histogram named
+    ``<namespace>_request_queue_wait_seconds``, labeled by ``command``, for requests
+    that had to wait.
+
+    This hook requires the optional ``prometheus_client`` library.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, namespace='warthog', buckets=None, registry=None):
+        """Create the histograms that requests are recorded in.
+
+        :param basestring namespace: Prefix for the name of the histogram.
+        :param tuple|None buckets: Upper bounds of histogram buckets in seconds, ``None``
+            to use the default buckets.
+        :param prometheus_client.CollectorRegistry registry: Registry to register the
+            histograms with, ``None`` to use the default registry.
+        :raises ImportError: If the ``prometheus_client`` library is not installed.
+        """
+        # Imported here so that every import of warthog (which imports this module)
+        # doesn't pay for trying to import an optional library.
+        try:
+            import prometheus_client  # pylint: disable=import-error
+        except ImportError:
+            raise ImportError(
+                "The prometheus_client library is required for the Prometheus hook. "
+                "Install it with 'pip install warthog[prometheus]'")
+
+        kwargs = {'registry': registry} if registry is not None else {}
+        buckets = buckets if buckets is not None else DEFAULT_BUCKETS
+        self.histogram = prometheus_client.Histogram(
+            'request_duration_seconds',
+            'Time taken by requests to the load balancer API.',
+            ['command', 'method', 'status'],
+            namespace=namespace,
+            buckets=buckets,
+            **kwargs)
+        self.queue_wait = prometheus_client.Histogram(
+            'request_queue_wait_seconds',
+            'Time requests to the load balancer API spent queued by a rate limiter.',
+            ['command'],
+            namespace=namespace,
+            buckets=buckets,
+            **kwargs)
+
+    def __call__(self, event):
+        self.histogram.labels(event.command, event.method, _outcome(event)).observe(event.elapsed)
+        # Requests that were made right away (or not rate limited at all) would swamp
+        # the histogram with zeros and hide how long queued requests actually wait.
+        if event.queue_wait:
+            self.queue_wait.labels(event.command).observe(event.queue_wait)
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.ratelimit
+~~~~~~~~~~~~~~~~~
+
+Token bucket rate limiters that keep the number of requests made to a load balancer
+each second below what its management plane can handle. Requests over the limit are
+queued (the thread making them waits) instead of being rejected.
+"""
+
+import logging
+import threading
+import time
+
+import warthog.core
+import warthog.exceptions
+
+# pylint: disable=import-error,no-name-in-module
+from .packages.six.moves import urllib
+
+# Requests that start a new session. These are the most expensive requests for the
+# load balancer to handle so they are limited separately from everything else.
+KIND_AUTH = 'auth'
+
+# Requests that only read the state of the load balancer.
+KIND_READ = 'read'
+
+# Requests that change the state of the load balancer (or end a session).
+KIND_WRITE = 'write'
+
+# Default number of requests per second that may be made to a load balancer.
+DEFAULT_RATE = 20.0
+
+# Default number of requests that may be made to a load balancer at once, after it
+# has gone unused for a while, before requests start being queued.
+DEFAULT_BURST = 20
+
+# Default number of requests per second that may start a new session.
+DEFAULT_AUTH_RATE = 2.0
+
+# Default number of requests that may start a new session at once.
+DEFAULT_AUTH_BURST = 4
+
+_AUTH_PATH = '/axapi/v3/auth'
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# Number of seconds the most recent request made by each thread spent queued.
+_waits = threading.local()
+
+
+def get_request_kind(method, url):
+    """Get the kind of request being made, which determines which limits apply to it.
+
+    .. versionadded:: 2.1.0
+
+    :param basestring method: HTTP method of the request.
+    :param basestring url: URL the request is being made to.
+    :return: One of ``auth``, ``read``, or ``write``.
+    :rtype: basestring
+    """
+    if urllib.parse.urlsplit(url).path.rstrip('/') == _AUTH_PATH:
+        return KIND_AUTH
+    if method.upper() in ('GET', 'HEAD'):
+        return KIND_READ
+    return KIND_WRITE
+
+
+def get_rate_limiter(scheme_host, **kwargs):
+    """Get the rate limiter for a load balancer, shared by every client in this process
+    that makes requests to it, creating it if it doesn't exist yet.
+
+    Settings given are only used when the limiter is created. To use settings other than
+    the defaults for a load balancer, call this before making any requests to it.
+
+    .. versionadded:: 2.1.0
+
+    :param basestring scheme_host: Scheme, host, and port combination of the load balancer.
+    :param kwargs: Keyword arguments for :class:`RateLimiter`.
+    :return: The rate limiter for the load balancer.
+    :rtype: RateLimiter
+    """
+    key = _get_key(scheme_host)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = RateLimiter(key, **kwargs)
+        return limiter
+
+
+def set_rate_limiter(limiter):
+    """Use the given rate limiter for every client in this process that makes requests
+    to the load balancer it is for, replacing any existing rate limiter for it.
+
+    .. versionadded:: 2.1.0
+
+    :param RateLimiter limiter: Rate limiter to use for its load balancer.
+    """
+    with _limiters_lock:
+        _limiters[_get_key(limiter.scheme_host)] = limiter
+
+
+def _get_key(scheme_host):
+    # Same normalization as warthog.breaker.get_scheme_host, not imported from there so
+    # that this module can be used by warthog.core.
+    parts = urllib.parse.urlsplit(scheme_host)
+    return '{0}://{1}'.format(parts.scheme.lower(), parts.netloc.lower())
+
+
+def reset_rate_limiters():
+    """Discard the rate limiter for every load balancer.
+
+    .. versionadded:: 2.1.0
+    """
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def set_queue_wait(waited):
+    """Record how long the request being made by the current thread spent queued.
+
+    .. versionadded:: 2.1.0
+
+    :param float waited: Number of seconds spent queued.
+    """
+    _waits.last = waited
+
+
+def pop_queue_wait():
+    """Get (and forget) how long the most recent request made by the current thread
+    spent queued.
+
+    .. versionadded:: 2.1.0
+
+    :return: Number of seconds spent queued, zero if the request wasn't rate limited.
+    :rtype: float
+    """
+    waited = getattr(_waits, 'last', 0.0)
+    _waits.last = 0.0
+    return waited
+
+
+class TokenBucket(object):
+    """Token bucket that allows ``rate`` requests per second on average with bursts of
+    up to ``burst`` requests.
+
+    Tokens are reserved instead of being waited for so that callers are served in the
+    order they arrive: a caller that finds the bucket empty takes a token that will only
+    exist in the future and is told how long to wait for it.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, rate, burst, clock=None):
+        """Set the rate tokens are added at and the most tokens the bucket may hold.
+
+        :param float rate: Number of tokens added to the bucket per second.
+        :param int burst: Maximum number of tokens the bucket may hold. The bucket
+            starts full.
+        :param callable clock: Callable that returns the current time in seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        if rate <= 0:
+            raise ValueError('Rate must be greater than zero, got {0}'.format(rate))
+        if burst < 1:
+            raise ValueError('Burst must be at least one, got {0}'.format(burst))
+
+        self._rate = float(rate)
+        self._burst = float(burst)
+        self._clock = clock if clock is not None else warthog.core.monotonic
+        self._lock = threading.Lock()
+        self._tokens = self._burst
+        self._updated = self._clock()
+
+    def reserve(self):
+        """Take a token from the bucket.
+
+        :return: Number of seconds the caller must wait before the token may be used.
+        :rtype: float
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self._rate)
+
+    def release(self):
+        """Give back a token taken by :meth:`reserve` that won't be used."""
+        with self._lock:
+            self._tokens = min(self._burst, self._tokens + 1)
+
+
+class RateLimiter(object):
+    """Limit the rate of requests made to a load balancer, both overall and for each
+    kind of request (see :func:`get_request_kind`).
+
+    Every request takes a token from the overall bucket for the load balancer and from
+    the bucket for its kind, if there is one. By default only requests that start a new
+    session have a bucket of their own. Requests are only rejected when they would have
+    to wait longer than their timeout, otherwise the thread making a request over the
+    limit waits until it may be made.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    # Not using warthog.core.get_log() since warthog.core imports this module.
+    _logger = logging.getLogger('warthog')
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, scheme_host, rate=None, burst=None, limits=None, clock=None, sleep=None):
+        """Set the load balancer the limiter is for and how many requests may be made.
+
+        :param basestring scheme_host: Scheme, host, and port combination of the load balancer.
+        :param float|None rate: Number of requests per second that may be made to the load
+            balancer, ``None`` to use the default of 20.
+        :param int|None burst: Number of requests that may be made at once before requests
+            are queued, ``None`` to use the default of 20.
+        :param dict|None limits: Map of request kind (``auth``, ``read``, or ``write``) to
+            a ``(rate, burst)`` tuple limiting that kind of request in addition to the
+            overall limit, ``None`` to limit requests that start a session to 2 per second
+            with bursts of 4.
+        :param callable clock: Callable that returns the current time in seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        :param callable sleep: Callable that waits for a number of seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        self.scheme_host = scheme_host
+        clock = clock if clock is not None else warthog.core.monotonic
+        limits = limits if limits is not None else \
+            {KIND_AUTH: (DEFAULT_AUTH_RATE, DEFAULT_AUTH_BURST)}
+
+        self._sleep = sleep if sleep is not None else time.sleep
+        self._overall = TokenBucket(
+            rate if rate is not None else DEFAULT_RATE,
+            burst if burst is not None else DEFAULT_BURST,
+            clock=clock)
+        self._buckets = dict(
+            (kind, TokenBucket(kind_rate, kind_burst, clock=clock))
+            for kind, (kind_rate, kind_burst) in limits.items())
+
+    def acquire(self, kind, timeout=None):
+        """Wait until a request of the given kind may be made.
+
+        :param basestring kind: Kind of request being made.
+        :param float|None timeout: Maximum number of seconds to wait (such as the time
+            remaining before the operation making the request must complete), ``None``
+            to wait as long as it takes.
+        :return: Number of seconds spent waiting.
+        :rtype: float
+        :raises warthog.exceptions.WarthogTimeoutError: If the request would have to wait
+            longer than ``timeout``. The request is not counted against any limits.
+        """
+        buckets = [self._overall]
+        bucket = self._buckets.get(kind)
+        if bucket is not None:
+            buckets.append(bucket)
+
+        wait = max([b.reserve() for b in buckets])
+        if timeout is not None and wait > timeout:
+            # Give the tokens back so that requests queued after this one don't wait
+            # for a request that is never made.
+            for reserved in buckets:
+                reserved.release()
+            raise warthog.exceptions.WarthogTimeoutError(
+                'Request to {0} would be queued for {1:.3f} seconds, more than the {2:.3f} '
+                'seconds left'.format(self.scheme_host, wait, timeout), timeout=timeout)
+
+        if wait > 0:
+            self._logger.debug(
+                'Queueing %s request to %s for %.3f seconds', kind, self.scheme_host, wait)
+            self._sleep(wait)
+        return wait
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.rolling
+~~~~~~~~~~~~~~~
+
+Rolling operations (such as restarts) across a group of servers: disable and drain a
+batch of servers, run a hook for each of them, enable them and wait for them to be
+healthy, then move on to the next batch.
+"""
+
+import collections
+import os
+import subprocess
+import sys
+import threading
+
+import warthog.concurrency
+import warthog.core
+from .packages import six
+
+# pylint: disable=import-error
+from .packages.six.moves import queue, shlex_quote
+
+# Stage of a rolling operation that a server stopped at. Servers that made it
+# through every stage end up as "done", servers that were never started because
+# an earlier server failed end up as "skipped".
+STAGE_DISABLE = 'disable'
+STAGE_HOOK = 'hook'
+STAGE_ENABLE = 'enable'
+STAGE_DONE = 'done'
+STAGE_SKIPPED = 'skipped'
+
+
+class RollResult(collections.namedtuple('RollResult', ['server', 'stage', 'error'])):
+    """Outcome of a rolling operation for a single server.
+
+    ``stage`` is :data:`STAGE_DONE` if the server was disabled, had its hook run, and
+    was enabled again successfully. Otherwise it is the stage that failed (or
+    :data:`STAGE_SKIPPED`) and ``error`` is the exception raised, if any.
+
+    .. versionadded:: 2.1.0
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """``True`` if the server made it through every stage."""
+        return self.stage == STAGE_DONE
+
+
+def resolve_count(value, total):
+    """Convert a number of servers or a percentage of servers into a number of servers.
+
+    .. versionadded:: 2.1.0
+
+    :param int|basestring value: Number of servers or a percentage of the total number
+        of servers such as ``"25%"``.
+    :param int total: Total number of servers.
+    :return: Number of servers, at least one.
+    :rtype: int
+    :raises ValueError: If the value is not a positive number or percentage.
+    """
+    if isinstance(value, six.string_types) and value.strip().endswith('%'):
+        pct = float(value.strip()[:-1])
+        if pct <= 0:
+            raise ValueError('Percentage of servers must be positive, got {0}'.format(value))
+        return max(1, int(total * pct / 100.0))
+
+    count = int(value)
+    if count <= 0:
+        raise ValueError('Number of servers must be positive, got {0}'.format(value))
+    return count
+
+
+def command_hook(command):
+    """Get a hook that runs a shell command for each server.
+
+    Any ``{server}`` in the command is replaced with the (shell quoted) hostname of the
+    server. The hostname is also available to the command as the ``WARTHOG_SERVER``
+    environment variable. The hook fails if the command exits with a non-zero code.
+
+    .. versionadded:: 2.1.0
+
+    :param basestring command: Shell command to run.
+    :return: Hook that accepts a server hostname.
+    :rtype: callable
+    """
+
+    # pylint: disable=missing-docstring
+    def hook(server):
+        env = dict(os.environ)
+        env['WARTHOG_SERVER'] = server
+        return subprocess.call(
+            command.replace('{server}', shlex_quote(server)), shell=True, env=env) == 0
+
+    return hook
+
+
+class _Capacity(object):
+    """Count of servers that are currently unavailable, limited to a maximum."""
+
+    def __init__(self, limit):
+        self._limit = limit
+        self._in_use = 0
+        self._aborted = False
+        self._cond = threading.Condition()
+
+    def acquire(self, count):
+        """Wait until ``count`` more servers can be unavailable, return ``False`` if
+        the operation was aborted while waiting.
+        """
+        with self._cond:
+            while not self._aborted and self._in_use + count > self._limit:
+                self._cond.wait()
+            if self._aborted:
+                return False
+            self._in_use += count
+            return True
+
+    def release(self, count):
+        """Mark ``count`` servers as available again."""
+        with self._cond:
+            self._in_use -= count
+            self._cond.notify_all()
+
+    def abort(self):
+        """Wake up anything waiting for capacity and make it give up."""
+        with self._cond:
+            self._aborted = True
+            self._cond.notify_all()
+
+
+class RollingOperation(object):
+    """Disable, drain, run a hook for, and enable a group of servers in batches so
+    that only a limited number of servers are out of service at any time.
+
+    For each batch, every server in the batch is disabled and drained, then the hook
+    is run for each server, then each server is enabled and waited on until it is
+    healthy. Work is pipelined: as soon as a batch has drained, the next batch starts
+    draining while the hooks for the current batch run, as long as doing so would not
+    put more than ``max_unavailable`` servers out of service.
+
+    If any server fails at any stage, no further batches are started. Batches that
+    have already started are finished. A server that fails is left as it is so that
+    it can be investigated.
+
+    Since work is pipelined by default (``max_unavailable`` defaults to twice the batch
+    size), the batch after one whose hook fails may already be disabled and draining.
+    That batch is finished (its hooks are run and its servers enabled again) before the
+    operation stops. Set ``max_unavailable`` to the batch size to never touch another
+    batch once a hook has failed.
+
+    Example usage:
+
+    .. code-block:: python
+
+        op = RollingOperation(
+            client, servers, hook=command_hook('ssh {server} sudo service app restart'),
+            batch_size=2, max_unavailable=4)
+
+        for result in op.run():
+            print(result.server, result.stage)
+
+    This class is not thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    _logger = warthog.core.get_log()
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, client, servers, hook=None, batch_size=None, max_unavailable=None,
+                 disable_wait=None, enable_wait=None, max_workers=None):
+        """Set the client, servers, and hook to use along with how many servers to
+        operate on at once.
+
+        :param warthog.client.WarthogClient client: Client for the load balancer.
+        :param iterable servers: Hostnames of servers to operate on, in order.
+        :param callable|None hook: Callable that accepts a server hostname and is called
+            for each server once it has drained. It fails the server by raising an exception
+            or returning ``False``. ``None`` to not run anything.
+        :param int|basestring|None batch_size: Number or percentage (e.g. ``"25%"``) of
+            servers to operate on at once, ``None`` for a single server at a time.
+        :param int|basestring|None max_unavailable: Maximum number or percentage of servers
+            that may be disabled at the same time, ``None`` for twice the batch size (but no
+            more than the number of servers). This must be at least twice the batch size for
+            draining to be pipelined with hooks, set it to the batch size to only ever have a
+            single batch out of service.
+        :param warthog.wait.WaitStrategy|None disable_wait: Strategy for waiting for servers
+            to drain, ``None`` to use the client default.
+        :param warthog.wait.WaitStrategy|None enable_wait: Strategy for waiting for servers
+            to become enabled, ``None`` to use the client default.
+        :param int|None max_workers: Maximum number of requests to make to the load balancer
+            or hooks to run at the same time, ``None`` to use the library default.
+        :raises ValueError: If the batch size or maximum unavailable servers are invalid.
+        """
+        self._client = client
+        self._servers = warthog.concurrency.unique(servers)
+        self._hook = hook
+        self._batch_size = resolve_count(
+            batch_size if batch_size is not None else 1, len(self._servers))
+        # Default to enough room for the next batch to drain while hooks for the current
+        # batch run, without exceeding the number of servers there are.
+        self._max_unavailable = resolve_count(
+            max_unavailable if max_unavailable is not None else
+            max(self._batch_size, min(2 * self._batch_size, len(self._servers))),
+            len(self._servers))
+        self._disable_wait = disable_wait
+        self._enable_wait = enable_wait
+        self._max_workers = max_workers
+
+        if self._max_unavailable < self._batch_size:
+            raise ValueError(
+                'Maximum unavailable servers ({0}) must be at least the batch size ({1})'.format(
+                    self._max_unavailable, self._batch_size))
+
+    def _batches(self):
+        size = self._batch_size
+        return [self._servers[i:i + size] for i in range(0, len(self._servers), size)]
+
+    def run(self):
+        """Run the operation, yielding the result for each server as soon as it is known.
+
+        Results are yielded for every server, including those skipped because an
+        earlier server failed.
+
+        :return: Generator of :class:`RollResult` instances.
+        """
+        results = queue.Queue()
+        capacity = _Capacity(self._max_unavailable)
+
+        launcher = threading.Thread(target=self._launch, args=(capacity, results))
+        launcher.daemon = True
+        launcher.start()
+
+        for _ in range(len(self._servers)):
+            yield results.get()
+
+        launcher.join()
+
+    def _launch(self, capacity, results):
+        """Start each batch once the previous batch has drained and there is room
+        for the batch to be unavailable.
+        """
+        threads = []
+        drained = None
+        batches = self._batches()
+
+        for index, batch in enumerate(batches):
+            if drained is not None:
+                drained.wait()
+            if not capacity.acquire(len(batch)):
+                for skipped in batches[index:]:
+                    for server in skipped:
+                        results.put(RollResult(server, STAGE_SKIPPED, None))
+                break
+
+            drained = threading.Event()
+            thread = threading.Thread(
+                target=self._roll_batch, args=(batch, drained, capacity, results))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+    def _fail(self, capacity, results, server, stage, error):
+        self._logger.warning('Rolling operation failed for %s at %s: %s', server, stage, error)
+        capacity.abort()
+        results.put(RollResult(server, stage, error))
+
+    def _roll_batch(self, batch, drained, capacity, results):
+        """Drain, run hooks for, and enable a single batch of servers."""
+        try:
+            pending = self._drain(batch, capacity, results)
+        finally:
+            # Let the next batch start draining while hooks for this one run.
+            drained.set()
+
+        hooked = []
+        for server, res in zip(pending, warthog.concurrency.run_concurrently(
+                self._run_hook, pending, max_workers=self._max_workers)):
+            if res.ok and res.value is not False:
+                hooked.append(server)
+            else:
+                self._fail(capacity, results, server, STAGE_HOOK, res.error)
+
+        if not hooked:
+            return
+
+        try:
+            enabled = self._client.enable_servers(
+                hooked, wait=self._enable_wait, max_workers=self._max_workers)
+        except Exception:  # pylint: disable=broad-except
+            error = sys.exc_info()[1]
+            for server in hooked:
+                self._fail(capacity, results, server, STAGE_ENABLE, error)
+            return
+
+        for server in hooked:
+            res = enabled[server]
+            if res.ok and res.value:
+                capacity.release(1)
+                results.put(RollResult(server, STAGE_DONE, None))
+            else:
+                self._fail(capacity, results, server, STAGE_ENABLE, res.error)
+
+    def _drain(self, batch, capacity, results):
+        """Disable and drain a batch of servers, returning those that drained."""
+        drained = []
+        reported = set()
+
+        try:
+            for server, res in self._client.drain_servers(
+                    batch, wait=self._disable_wait, max_workers=self._max_workers):
+                reported.add(server)
+                if res.ok and res.value:
+                    drained.append(server)
+                else:
+                    self._fail(capacity, results, server, STAGE_DISABLE, res.error)
+        except Exception:  # pylint: disable=broad-except
+            error = sys.exc_info()[1]
+            for server in batch:
+                if server not in reported:
+                    self._fail(capacity, results, server, STAGE_DISABLE, error)
+
+        return drained
+
+    def _run_hook(self, server):
+        if self._hook is None:
+            return True
+        return self._hook(server)
@@ -0,0 +1,463 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.session
+~~~~~~~~~~~~~~~
+
+Management of authenticated sessions with the load balancer that are reused
+between operations.
+"""
+
+import collections
+import threading
+
+import warthog.core
+import warthog.exceptions
+
+# Default number of seconds a cached session may go unused before it is
+# replaced by a new one. This is intentionally well under the default A10
+# admin session idle timeout (ten minutes) so that we replace sessions before
+# the load balancer expires them out from under us.
+DEFAULT_SESSION_MAX_IDLE = 300.0
+
+# Default maximum number of sessions a pool keeps open with the load balancer. A10
+# load balancers limit the number of concurrent admin sessions per user, so this is
+# kept well under that limit to leave room for other clients using the same account.
+DEFAULT_POOL_MAX_SESSIONS = 4
+
+
+class CachedSession(object):
+    """Single authenticated session with the load balancer that is shared by all
+    operations run with it instead of starting and ending a session per operation.
+
+    The session is started lazily, the first time an operation is run. If the load
+    balancer indicates that the session is no longer valid, a new session is started
+    and the operation is retried once. Sessions that have gone unused for longer than
+    ``max_idle`` seconds are ended and replaced before the next operation is run. A
+    session is never considered unused while any operation is still using it.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    _logger = warthog.core.get_log()
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, commands, scheme_host, username, password, max_idle=None, clock=None):
+        """Set the command factory, load balancer, and credentials used to start sessions.
+
+        :param warthog.client.CommandFactory commands: Factory instance for creating new
+            commands for starting and ending sessions with the load balancer.
+        :param basestring scheme_host: Scheme, host, and port combination of the load balancer.
+        :param basestring username: Name of the user to authenticate with.
+        :param basestring password: Password for the user to authenticate with.
+        :param float|None max_idle: Number of seconds a session may go unused before it is
+            replaced. Default is 300 seconds.
+        :param callable clock: Callable that returns the current time in seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        self._commands = commands
+        self._scheme_host = scheme_host
+        self._username = username
+        self._password = password
+        self._max_idle = max_idle if max_idle is not None else DEFAULT_SESSION_MAX_IDLE
+        self._clock = clock if clock is not None else warthog.core.monotonic
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._last_used = None
+        # Number of operations currently using the session.
+        self._active = 0
+
+    def _start(self):
+        self._logger.debug('Starting new cached session for %s', self._scheme_host)
+        cmd = self._commands.get_session_start(self._scheme_host, self._username, self._password)
+        return cmd.send()
+
+    def _end(self, session):
+        self._logger.debug('Ending cached session for %s', self._scheme_host)
+        cmd = self._commands.get_session_end(self._scheme_host, session)
+        try:
+            cmd.send()
+        except Exception as e:  # pylint: disable=broad-except
+            # The load balancer may have already expired the session on its side or may
+            # not be reachable, there's nothing useful we can do about that and it must not
+            # fail the operation that is about to use a new session, so just make a note of it.
+            self._logger.debug('Unable to end cached session for %s: %s', self._scheme_host, e)
+
+    def _acquire(self):
+        """Get the current session, starting a new one if there isn't one or if the
+        existing session has been idle for too long.
+        """
+        with self._lock:
+            stale = None
+            # A session being used by an operation is never idle, however long it runs.
+            if (self._session is not None and not self._active and
+                    self._clock() - self._last_used > self._max_idle):
+                stale, self._session = self._session, None
+
+        # Ending the stale session is a request to the load balancer, don't make every
+        # other operation wait for it.
+        if stale is not None:
+            self._end(stale)
+
+        with self._lock:
+            if self._session is None:
+                self._session = self._start()
+                self._active = 0
+
+            self._active += 1
+            self._last_used = self._clock()
+            return self._session
+
+    def _release(self, session):
+        """Mark the given session as no longer being used by an operation, as of now."""
+        with self._lock:
+            if self._session == session:
+                self._active -= 1
+                self._last_used = self._clock()
+
+    def _invalidate(self, session):
+        """Discard the given session if it is still the current session."""
+        with self._lock:
+            if self._session == session:
+                self._session = None
+                self._active = 0
+
+    def run(self, operation, *args):
+        """Run the given operation with the cached session, starting a new session if
+        required and retrying the operation once if the session turned out to be invalid.
+
+        :param callable operation: Callable that accepts a session ID as its first argument
+            followed by ``args``.
+        :param args: Additional positional arguments to pass to the operation.
+        :return: The result of the operation.
+        :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
+            the load balancer failed when trying to establish a new session.
+        """
+        session = self._acquire()
+        try:
+            return operation(session, *args)
+        except warthog.exceptions.WarthogInvalidSessionError:
+            self._logger.debug(
+                'Cached session for %s is no longer valid, re-authenticating', self._scheme_host)
+            self._invalidate(session)
+        finally:
+            self._release(session)
+
+        session = self._acquire()
+        try:
+            return operation(session, *args)
+        finally:
+            self._release(session)
+
+    def close(self):
+        """End the cached session, if there is one."""
+        with self._lock:
+            session, self._session = self._session, None
+
+        if session is not None:
+            self._end(session)
+
+
+class SessionPoolStats(collections.namedtuple('SessionPoolStats', [
+        'max_sessions', 'open', 'leased', 'idle', 'waiting', 'leases', 'waits',
+        'wait_time', 'max_wait', 'exhausted'])):
+    """Occupancy of a :class:`SessionPool` and how long operations waited for sessions.
+
+    Fields are:
+
+    * ``max_sessions`` - Maximum number of sessions the pool keeps open.
+    * ``open`` - Number of sessions currently open (or being started).
+    * ``leased`` - Number of sessions currently being used by operations.
+    * ``idle`` - Number of open sessions not being used by any operation.
+    * ``waiting`` - Number of operations currently waiting for a session.
+    * ``leases`` - Total number of sessions leased to operations.
+    * ``waits`` - Total number of leases that had to wait for a session.
+    * ``wait_time`` - Total number of seconds spent waiting for sessions.
+    * ``max_wait`` - Longest number of seconds spent waiting for a session.
+    * ``exhausted`` - Total number of operations that gave up waiting for a session.
+
+    .. versionadded:: 2.1.0
+    """
+    __slots__ = ()
+
+
+class SessionPool(object):
+    """Pool of up to ``max_sessions`` authenticated sessions with the load balancer that
+    are leased to operations run concurrently, instead of each operation starting (and
+    ending) its own session.
+
+    Sessions are started lazily, only when an operation needs one and every open session
+    is in use. When ``max_sessions`` sessions are all in use, operations wait for one to be
+    returned, for at most ``lease_timeout`` seconds (and no longer than the deadline of the
+    operation, if any) before failing with a
+    :class:`warthog.exceptions.WarthogSessionPoolExhaustedError`. A ``lease_timeout`` of
+    zero fails immediately instead of waiting.
+
+    If the load balancer indicates that a session is no longer valid, it is dropped from
+    the pool and the operation is retried once with another session. Sessions that have
+    gone unused for longer than ``max_idle`` seconds are ended instead of being leased.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+    _logger = warthog.core.get_log()
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(self, commands, scheme_host, username, password, max_sessions=None,
+                 lease_timeout=None, max_idle=None, clock=None):
+        """Set the command factory, load balancer, and credentials used to start sessions
+        and how many sessions may be open at once.
+
+        :param warthog.client.CommandFactory commands: Factory instance for creating new
+            commands for starting and ending sessions with the load balancer.
+        :param basestring scheme_host: Scheme, host, and port combination of the load balancer.
+        :param basestring username: Name of the user to authenticate with.
+        :param basestring password: Password for the user to authenticate with.
+        :param int|None max_sessions: Maximum number of sessions to keep open. Default is 4.
+        :param float|None lease_timeout: Number of seconds to wait for a session when all of
+            them are in use, zero to fail immediately, ``None`` to wait as long as it takes.
+        :param float|None max_idle: Number of seconds a session may go unused before it is
+            ended instead of being leased. Default is 300 seconds.
+        :param callable clock: Callable that returns the current time in seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        self._commands = commands
+        self._scheme_host = scheme_host
+        self._username = username
+        self._password = password
+        self._max_sessions = max_sessions if max_sessions is not None else \
+            DEFAULT_POOL_MAX_SESSIONS
+        self._lease_timeout = lease_timeout
+        self._max_idle = max_idle if max_idle is not None else DEFAULT_SESSION_MAX_IDLE
+        self._clock = clock if clock is not None else warthog.core.monotonic
+
+        if self._max_sessions < 1:
+            raise ValueError('Pool must allow at least one session, got {0}'.format(max_sessions))
+
+        self._cond = threading.Condition(threading.Lock())
+        # Tuples of (session, last used), most recently used last.
+        self._idle = []
+        self._open = 0
+        self._leased = 0
+        self._waiting = 0
+        self._leases = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._exhausted = 0
+
+    def _start(self):
+        self._logger.debug('Starting new pooled session for %s', self._scheme_host)
+        cmd = self._commands.get_session_start(self._scheme_host, self._username, self._password)
+        return cmd.send()
+
+    def _end(self, session):
+        self._logger.debug('Ending pooled session for %s', self._scheme_host)
+        cmd = self._commands.get_session_end(self._scheme_host, session)
+        try:
+            cmd.send()
+        except Exception as e:  # pylint: disable=broad-except
+            # The session is already out of the pool and will expire on the load balancer
+            # eventually. Failing to end it must never fail the operation leasing a session.
+            self._logger.debug('Unable to end pooled session for %s: %s', self._scheme_host, e)
+
+    def _lease(self):
+        """Get an idle session, starting a new one if there is room for one in the pool or
+        waiting for one to be returned otherwise.
+        """
+        # Waiting is always measured with the real clock since it uses a condition variable.
+        started = warthog.core.monotonic()
+        deadline = warthog.core.get_deadline()
+        stale = []
+        queued = False
+        session = None
+        try:
+            with self._cond:
+                while True:
+                    session = self._take_idle(stale)
+                    if session is not None:
+                        self._record_lease(queued, warthog.core.monotonic() - started)
+                        break
+
+                    if self._open < self._max_sessions:
+                        # Reserve room for the new session, it's started without the lock.
+                        self._open += 1
+                        waited = warthog.core.monotonic() - started
+                        break
+
+                    timeout = self._get_wait_timeout(started, deadline)
+                    queued = True
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(timeout)
+                    finally:
+                        self._waiting -= 1
+        except Exception:
+            self._end_all(stale)
+            raise
+
+        try:
+            self._end_all(stale)
+        except BaseException:
+            # Don't lose the room held by the session leased (or reserved) above.
+            if session is not None:
+                self._release(session, True)
+            else:
+                self._unreserve()
+            raise
+
+        if session is not None:
+            return session
+
+        try:
+            session = self._start()
+        except Exception:
+            self._unreserve()
+            raise
+
+        with self._cond:
+            self._record_lease(queued, waited)
+        return session
+
+    def _end_all(self, sessions):
+        """End sessions that were removed from the pool, without holding the lock."""
+        for session in sessions:
+            self._end(session)
+
+    def _unreserve(self):
+        """Give back room reserved for a session that was never started."""
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _take_idle(self, stale):
+        """Get the most recently used idle session that hasn't been idle for too long,
+        adding any that have to ``stale`` to be ended.
+        """
+        now = self._clock()
+        while self._idle:
+            session, last_used = self._idle.pop()
+            if now - last_used <= self._max_idle:
+                return session
+            self._open -= 1
+            stale.append(session)
+        return None
+
+    def _get_wait_timeout(self, started, deadline):
+        """Get how long to wait for a session to be returned, raising an error if the
+        operation may not wait any longer.
+        """
+        waited = warthog.core.monotonic() - started
+        timeout = None
+        if self._lease_timeout is not None:
+            timeout = self._lease_timeout - waited
+            if timeout <= 0:
+                self._exhausted += 1
+                self._logger.warning(
+                    'No pooled session for %s available after %.3f seconds',
+                    self._scheme_host, waited)
+                raise warthog.exceptions.WarthogSessionPoolExhaustedError(
+                    'All sessions with {0} are in use'.format(self._scheme_host),
+                    max_sessions=self._max_sessions, waited=waited)
+
+        if deadline is not None:
+            deadline.check(warthog.core.PHASE_AUTH)
+            timeout = deadline.remaining() if timeout is None else \
+                min(timeout, deadline.remaining())
+        return timeout
+
+    def _record_lease(self, queued, waited):
+        self._leased += 1
+        self._leases += 1
+        if queued:
+            self._waits += 1
+            self._wait_time += waited
+            self._max_wait = max(self._max_wait, waited)
+            self._logger.debug(
+                'Waited %.3f seconds for a pooled session for %s', waited, self._scheme_host)
+
+    def _release(self, session, valid):
+        """Return a session to the pool, or drop it if it is no longer valid."""
+        with self._cond:
+            self._leased -= 1
+            if valid:
+                self._idle.append((session, self._clock()))
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+    def run(self, operation, *args):
+        """Run the given operation with a session leased from the pool, retrying the
+        operation once with another session if the first turned out to be invalid.
+
+        :param callable operation: Callable that accepts a session ID as its first argument
+            followed by ``args``.
+        :param args: Additional positional arguments to pass to the operation.
+        :return: The result of the operation.
+        :raises warthog.exceptions.WarthogAuthFailureError: If authentication with
+            the load balancer failed when trying to establish a new session.
+        :raises warthog.exceptions.WarthogSessionPoolExhaustedError: If every session was
+            in use and none became available within the lease timeout.
+        """
+        session = self._lease()
+        valid = True
+        try:
+            return operation(session, *args)
+        except warthog.exceptions.WarthogInvalidSessionError:
+            self._logger.debug(
+                'Pooled session for %s is no longer valid, re-authenticating', self._scheme_host)
+            valid = False
+        finally:
+            self._release(session, valid)
+
+        session = self._lease()
+        valid = True
+        try:
+            return operation(session, *args)
+        except warthog.exceptions.WarthogInvalidSessionError:
+            valid = False
+            raise
+        finally:
+            self._release(session, valid)
+
+    def stats(self):
+        """Get the current occupancy of the pool and how long operations have waited for
+        sessions from it.
+
+        :return: Snapshot of the state of the pool.
+        :rtype: SessionPoolStats
+        """
+        with self._cond:
+            return SessionPoolStats(
+                max_sessions=self._max_sessions,
+                open=self._open,
+                leased=self._leased,
+                idle=len(self._idle),
+                waiting=self._waiting,
+                leases=self._leases,
+                waits=self._waits,
+                wait_time=self._wait_time,
+                max_wait=self._max_wait,
+                exhausted=self._exhausted)
+
+    def close(self):
+        """End every idle session in the pool. Sessions in use by operations are returned
+        to the pool as usual and may be ended by closing the pool again.
+        """
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+
+        for session, _ in idle:
+            self._end(session)
@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.testing
+~~~~~~~~~~~~~~~
+
+Simulated A10 load balancer for testing and benchmarking without a real load balancer.
+
+The simulator speaks the subset of the AXAPI v3 that Warthog uses over HTTP (or HTTPS,
+if given an SSL context) on a local port. For example:
+
+.. code-block:: python
+
+    import warthog.api
+    import warthog.testing
+
+    with warthog.testing.LoadBalancerSimulator() as sim:
+        sim.add_server('app1.example.com', connections=20, drain_rate=10.0)
+
+        client = warthog.api.WarthogClient(sim.scheme_host, sim.username, sim.password)
+        client.disable_server('app1.example.com')
+"""
+
+import collections
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+
+import warthog.core
+
+# pylint: disable=import-error
+from .packages.six.moves import BaseHTTPServer
+from .packages.six.moves import socketserver
+from .packages.six.moves import urllib
+
+# Default number of connections per second that are closed on a server that
+# has been disabled, used when a server isn't given an explicit drain rate.
+DEFAULT_DRAIN_RATE = 5.0
+
+# Default credentials accepted by the simulator.
+DEFAULT_USERNAME = 'admin'
+DEFAULT_PASSWORD = 'a10'
+
+# pylint: disable=protected-access
+_PATH_AUTH = warthog.core._PATH_AUTH
+_PATH_LOGOFF = warthog.core._PATH_LOGOFF
+_PATH_STATUS_ALL = warthog.core._PATH_STATUS_ALL
+_PATH_CONNS_ALL = warthog.core._PATH_CONNS_ALL
+# pylint: enable=protected-access
+
+_SERVER_PATH = re.compile(r'^/axapi/v3/slb/server/(?P<server>[^/]+)(?P<kind>/oper|/stats)?$')
+
+_ERROR_CODE_NOT_FOUND = 1023410176
+_ERROR_CODE_INTERNAL = 1023475712
+
+
+def _error(status_code, code, msg):
+    return status_code, {'response': {'status': 'fail', 'err': {'code': code, 'msg': msg}}}
+
+
+def _auth_error(status_code, msg):
+    return status_code, {
+        'authorizationschema': {
+            'code': status_code,
+            'error': msg,
+            'auth_uri': _PATH_AUTH,
+            'logoff_uri': _PATH_LOGOFF,
+            'username': 'required',
+            'password': 'required'
+        }
+    }
+
+
+class SimulatedServer(object):
+    """State of a single server managed by the simulated load balancer.
+
+    While a server is disabled, its active connections decline by ``drain_rate``
+    connections per second until they reach zero. Connections are not added
+    automatically while a server is enabled but may be set via :meth:`set_connections`.
+
+    This class is not thread safe, it is protected by the lock of the simulator.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, name, connections=0, enabled=True, healthy=True, drain_rate=None,
+                 clock=None):
+        """Set the initial state of the server.
+
+        :param basestring name: Hostname of the server.
+        :param int connections: Number of active connections to the server.
+        :param bool enabled: ``True`` if the server is enabled, ``False`` if disabled.
+        :param bool healthy: ``False`` to report an enabled server as down.
+        :param float|None drain_rate: Number of connections per second closed while the
+            server is disabled, ``None`` to use the default.
+        :param callable clock: Callable that returns the current time in seconds.
+        """
+        self.name = name
+        self.enabled = enabled
+        self.healthy = healthy
+        self.drain_rate = drain_rate if drain_rate is not None else DEFAULT_DRAIN_RATE
+        self._clock = clock if clock is not None else warthog.core.monotonic
+        self._connections = float(connections)
+        self._updated = self._clock()
+
+    def _decay(self):
+        now = self._clock()
+        if not self.enabled:
+            elapsed = now - self._updated
+            self._connections = max(0.0, self._connections - self.drain_rate * elapsed)
+        self._updated = now
+
+    @property
+    def connections(self):
+        """Current number of active connections to the server."""
+        self._decay()
+        return int(math.ceil(self._connections))
+
+    def set_connections(self, connections):
+        """Set the current number of active connections to the server."""
+        self._decay()
+        self._connections = float(connections)
+
+    def set_enabled(self, enabled):
+        """Enable or disable the server, starting or stopping connections draining."""
+        self._decay()
+        self.enabled = enabled
+
+    @property
+    def state(self):
+        """Operational state of the server as reported by the AXAPI."""
+        if not self.enabled:
+            return 'Disabled'
+        return 'Up' if self.healthy else 'Down'
+
+
+# Error to return for the next matching request. A path of None matches any request.
+_Fault = collections.namedtuple('_Fault', ['status_code', 'code', 'msg', 'path'])
+
+
+class LoadBalancerSimulator(object):
+    """Local HTTP server that simulates the parts of the A10 AXAPI v3 used by Warthog.
+
+    The simulator keeps track of the state of each server added to it, authenticated
+    sessions, and the number of requests made to each endpoint. Latency may be added to
+    every request and errors may be injected randomly (via ``error_rate``) or for a
+    specific number of upcoming requests (via :meth:`fail_next`). Sessions expire after
+    going unused for ``session_ttl`` seconds or when :meth:`expire_sessions` is called.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(self, username=None, password=None, host='127.0.0.1', port=0, latency=0.0,
+                 error_rate=0.0, session_ttl=None, ssl_context=None, clock=None, rand=None):
+        """Set the credentials accepted by the simulator and how it behaves.
+
+        :param basestring|None username: Username to accept, ``None`` to use the default.
+        :param basestring|None password: Password to accept, ``None`` to use the default.
+        :param basestring host: Address to listen on.
+        :param int port: Port to listen on, ``0`` to pick any free port.
+        :param float latency: Number of seconds to delay each response by.
+        :param float error_rate: Fraction (between 0 and 1) of requests that should fail
+            with an internal error.
+        :param float|None session_ttl: Number of seconds a session may go unused before
+            it expires, ``None`` for sessions to never expire on their own.
+        :param ssl.SSLContext ssl_context: Server side SSL context to serve HTTPS with,
+            ``None`` to serve plain HTTP.
+        :param callable clock: Callable that returns the current time in seconds.
+        :param random.Random rand: Source of randomness for error injection.
+        """
+        self.username = username if username is not None else DEFAULT_USERNAME
+        self.password = password if password is not None else DEFAULT_PASSWORD
+        self.latency = latency
+        self.error_rate = error_rate
+        self.session_ttl = session_ttl
+
+        self._host = host
+        self._port = port
+        self._ssl_context = ssl_context
+        self._clock = clock if clock is not None else warthog.core.monotonic
+        self._rand = rand if rand is not None else random.Random()
+
+        self._lock = threading.Lock()
+        self._servers = {}
+        self._sessions = {}
+        self._faults = []
+        self._httpd = None
+        self._thread = None
+        self.requests = collections.Counter()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def scheme_host(self):
+        """Scheme, host, and port combination that the simulator is listening on."""
+        if self._httpd is None:
+            raise RuntimeError('Simulator has not been started')
+        scheme = 'https' if self._ssl_context is not None else 'http'
+        host, port = self._httpd.server_address[:2]
+        return '{0}://{1}:{2}'.format(scheme, host, port)
+
+    def start(self):
+        """Start listening for requests in a background thread."""
+        if self._httpd is not None:
+            return
+
+        httpd = _HTTPServer((self._host, self._port), _RequestHandler)
+        httpd.simulator = self
+        if self._ssl_context is not None:
+            httpd.socket = self._ssl_context.wrap_socket(httpd.socket, server_side=True)
+
+        self._httpd = httpd
+        self._thread = threading.Thread(target=httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop listening for requests and wait for the background thread to finish."""
+        if self._httpd is None:
+            return
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._httpd = None
+        self._thread = None
+
+    def add_server(self, name, connections=0, enabled=True, healthy=True, drain_rate=None):
+        """Add a server to the simulated load balancer, replacing any existing server
+        with the same name.
+
+        :param basestring name: Hostname of the server.
+        :param int connections: Number of active connections to the server.
+        :param bool enabled: ``True`` if the server is enabled, ``False`` if disabled.
+        :param bool healthy: ``False`` to report an enabled server as down.
+        :param float|None drain_rate: Number of connections per second closed while the
+            server is disabled, ``None`` to use the default.
+        :return: The newly added server.
+        :rtype: SimulatedServer
+        """
+        server = SimulatedServer(
+            name, connections=connections, enabled=enabled, healthy=healthy,
+            drain_rate=drain_rate, clock=self._clock)
+        with self._lock:
+            self._servers[name] = server
+        return server
+
+    def get_server(self, name):
+        """Get a server added to the simulator by name.
+
+        :param basestring name: Hostname of the server.
+        :rtype: SimulatedServer
+        :raises KeyError: If there is no server with the given name.
+        """
+        with self._lock:
+            return self._servers[name]
+
+    def fail_next(self, count=1, status_code=500, code=None, msg=None, path=None):
+        """Fail the next ``count`` requests (or only those whose path contains ``path``)
+        with the given HTTP status and AXAPI error code.
+
+        :param int count: Number of requests to fail.
+        :param int status_code: HTTP status code of the failed responses.
+        :param int|None code: AXAPI error code of the failed responses, ``None`` for a
+            generic internal error code.
+        :param basestring|None msg: Error message of the failed responses.
+        :param basestring|None path: Only fail requests whose path contains this string,
+            ``None`` to fail any request.
+        """
+        fault = _Fault(
+            status_code,
+            code if code is not None else _ERROR_CODE_INTERNAL,
+            msg if msg is not None else 'Simulated failure',
+            path)
+        with self._lock:
+            self._faults.extend([fault] * count)
+
+    def expire_sessions(self):
+        """Expire every active session, as if the load balancer had been restarted."""
+        with self._lock:
+            self._sessions.clear()
+
+    @property
+    def session_count(self):
+        """Number of sessions that are currently active."""
+        with self._lock:
+            self._expire_idle(self._clock())
+            return len(self._sessions)
+
+    def handle_request(self, method, path, auth=None, body=None):
+        """Handle a single AXAPI request, without any added latency.
+
+        This is used by the HTTP server but may also be called directly to exercise the
+        simulated API without making network requests.
+
+        :param basestring method: HTTP method of the request.
+        :param basestring path: Path of the request.
+        :param basestring|None auth: Value of the ``Authorization`` header, if any.
+        :param dict|None body: Decoded JSON body of the request, if any.
+        :return: Tuple of HTTP status code and JSON payload to return.
+        :rtype: tuple
+        """
+        path = urllib.parse.urlparse(path).path
+        with self._lock:
+            self.requests[path] += 1
+            fault = self._take_fault(path)
+            if fault is not None:
+                return _error(fault.status_code, fault.code, fault.msg)
+
+            if method == 'POST' and path == _PATH_AUTH:
+                return self._auth(body or {})
+
+            if not self._check_session(auth):
+                return _auth_error(401, 'Invalid admin session.')
+
+            return self._route(method, path, auth, body or {})
+
+    def _take_fault(self, path):
+        for index, fault in enumerate(self._faults):
+            if fault.path is None or fault.path in path:
+                del self._faults[index]
+                return fault
+
+        if self.error_rate and self._rand.random() < self.error_rate:
+            return _Fault(500, _ERROR_CODE_INTERNAL, 'Simulated failure', None)
+        return None
+
+    def _expire_idle(self, now):
+        if self.session_ttl is None:
+            return
+        for sig, last_used in list(self._sessions.items()):
+            if now - last_used >= self.session_ttl:
+                del self._sessions[sig]
+
+    def _auth(self, body):
+        creds = body.get('credentials', {})
+        if creds.get('username') != self.username or creds.get('password') != self.password:
+            return _auth_error(403, 'Incorrect user name or password')
+
+        sig = uuid.uuid4().hex
+        self._sessions[sig] = self._clock()
+        return 200, {
+            'authresponse': {
+                'signature': sig,
+                'description': 'the signature should be set in Authorization header '
+                               'for following request.'
+            }
+        }
+
+    def _check_session(self, auth):
+        now = self._clock()
+        self._expire_idle(now)
+
+        sig = auth[len('A10 '):] if auth and auth.startswith('A10 ') else None
+        if sig not in self._sessions:
+            return False
+
+        self._sessions[sig] = now
+        return True
+
+    # pylint: disable=too-many-return-statements
+    def _route(self, method, path, auth, body):
+        if method == 'POST' and path == _PATH_LOGOFF:
+            del self._sessions[auth[len('A10 '):]]
+            return 200, {'response': {'status': 'OK'}}
+
+        if method == 'GET' and path == _PATH_STATUS_ALL:
+            return 200, {'server-list': [
+                {'name': s.name, 'oper': {'state': s.state}}
+                for s in sorted(self._servers.values(), key=lambda s: s.name)]}
+
+        if method == 'GET' and path == _PATH_CONNS_ALL:
+            return 200, {'server-list': [
+                {'name': s.name, 'stats': {'curr-conn': s.connections}}
+                for s in sorted(self._servers.values(), key=lambda s: s.name)]}
+
+        match = _SERVER_PATH.match(path)
+        if match is None:
+            return _error(404, _ERROR_CODE_NOT_FOUND, 'No such URI: {0}'.format(path))
+
+        server = self._servers.get(urllib.parse.unquote(match.group('server')))
+        if server is None:
+            return _error(404, warthog.core.ERROR_CODE_NO_SUCH_SERVER,
+                          'Object specified does not exist')
+
+        kind = match.group('kind')
+        if method == 'GET' and kind == '/oper':
+            return 200, {'server': {'name': server.name, 'oper': {'state': server.state}}}
+        if method == 'GET' and kind == '/stats':
+            return 200, {'server': {'name': server.name,
+                                    'stats': {'curr-conn': server.connections}}}
+        if method == 'POST' and kind is None:
+            return self._alter(server, body)
+
+        return _error(404, _ERROR_CODE_NOT_FOUND, 'No such URI: {0}'.format(path))
+
+    # pylint: disable=no-self-use
+    def _alter(self, server, body):
+        action = body.get('server', {}).get('action')
+        if action not in ('enable', 'disable'):
+            return _error(400, _ERROR_CODE_INTERNAL, 'Invalid action: {0}'.format(action))
+
+        server.set_enabled(action == 'enable')
+        return 200, {'server': {'name': server.name, 'action': action}}
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Translate HTTP requests into calls to the simulator that owns the server."""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, avoid waiting on delayed ACKs from
+    # clients between the two when connections are kept alive.
+    disable_nagle_algorithm = True
+    _logger = warthog.core.get_log()
+
+    # pylint: disable=invalid-name,missing-docstring
+    def do_GET(self):
+        self._dispatch('GET')
+
+    # pylint: disable=invalid-name,missing-docstring
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        simulator = self.server.simulator
+
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        body = json.loads(raw.decode('utf-8')) if raw else None
+
+        if simulator.latency:
+            time.sleep(simulator.latency)
+
+        status, payload = simulator.handle_request(
+            method, self.path, self.headers.get('Authorization'), body)
+        data = json.dumps(payload).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        self._logger.debug('Simulator: ' + format, *args)
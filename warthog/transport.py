@@ -14,6 +14,7 @@ warthog.transport
 Methods to configure how to interact with the load balancer API over HTTP or HTTPS.
 """
 
+import threading
 import warnings
 
 import requests
@@ -25,6 +26,9 @@ from requests.adapters import (
 from urllib3.exceptions import InsecureRequestWarning
 from urllib3.poolmanager import PoolManager
 
+import warthog.breaker
+import warthog.core
+import warthog.ratelimit
 import warthog.ssl
 
 # Default to using the SSL/TLS version that the A10 requires instead of
@@ -39,8 +43,36 @@ DEFAULT_CERT_VERIFY = True
 # timeouts or DNS timeouts.
 DEFAULT_RETRIES = 5
 
+# Default maximum number of connections to keep open to the load balancer
+# for each HTTP or HTTPS connection pool.
+DEFAULT_POOL_SIZE = DEFAULT_POOLSIZE
 
-def get_transport_factory(verify=None, ssl_version=None, retries=None):
+# Default number of seconds a shared transport may go unused before it is
+# discarded (along with any idle connections it holds) and replaced.
+DEFAULT_POOL_IDLE_TIMEOUT = 30.0
+
+# Default number of seconds a shared transport may be used before it is
+# discarded and replaced, regardless of how recently it was used.
+DEFAULT_POOL_MAX_LIFETIME = 300.0
+
+# Default number of seconds to wait for a connection to the load balancer to be
+# established before giving up.
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+# Default number of seconds to wait for the load balancer to send any part of a
+# response before giving up. This is a limit on time between bytes received, not
+# on the time taken for the entire response.
+DEFAULT_READ_TIMEOUT = 60.0
+
+# Smallest timeout given to a request whose time allowed was used up waiting for the
+# rate limiter, so that it fails with a timeout right away instead of never timing out.
+_MIN_TIMEOUT = 0.001
+
+
+# pylint: disable=too-many-arguments
+def get_transport_factory(verify=None, ssl_version=None, retries=None, pool_size=None,
+                          connect_timeout=None, read_timeout=None, circuit_breaker=False,
+                          rate_limit=False):
     """Get a new callable that returns :class:`requests.Session` instances that
     have been configured according to the given parameters.
 
@@ -54,6 +86,19 @@ def get_transport_factory(verify=None, ssl_version=None, retries=None):
     .. versionchanged:: 2.0.0
         Added the ``retries`` parameter and default it to a number greater than zero.
 
+    .. versionchanged:: 2.1.0
+        Added the ``pool_size`` parameter.
+
+    .. versionchanged:: 2.1.0
+        Added the ``connect_timeout`` and ``read_timeout`` parameters. Requests now time
+        out by default instead of waiting forever for an unresponsive load balancer.
+
+    .. versionchanged:: 2.1.0
+        Added the ``circuit_breaker`` parameter.
+
+    .. versionchanged:: 2.1.0
+        Added the ``rate_limit`` parameter.
+
     :param bool|None verify: Should SSL certificates by verified when connecting
         over HTTPS? Default is ``True``. If you have chosen not to verify certificates
         warnings about this emitted by the requests library will be suppressed.
@@ -63,6 +108,24 @@ def get_transport_factory(verify=None, ssl_version=None, retries=None):
     :param int|None retries: The maximum number of times to retry operations on transient
         network errors. Note this only applies to cases where we haven't yet sent any
         data to the server (e.g. connection errors, DNS errors, etc.)
+    :param int|None pool_size: The maximum number of connections to keep open to the
+        load balancer per session. Default is 10.
+    :param float|None connect_timeout: The maximum number of seconds to wait for a
+        connection to the load balancer to be established. Default is 10 seconds.
+    :param float|None read_timeout: The maximum number of seconds to wait for the load
+        balancer to send a response (or any part of one). Default is 60 seconds.
+    :param bool circuit_breaker: ``True`` to stop making requests to a load balancer when
+        too many recent requests to it have failed, using the circuit breaker shared by
+        every session in this process (see :func:`warthog.breaker.get_circuit_breaker`).
+        Default is ``False``.
+    :param bool|dict|warthog.ratelimit.RateLimiter rate_limit: ``True`` to queue requests to
+        a load balancer that would exceed the rate limits for it, using the rate limiter shared
+        by every session in this process (see :func:`warthog.ratelimit.get_rate_limiter`). A
+        dictionary of keyword arguments for :class:`warthog.ratelimit.RateLimiter` (such as
+        ``rate``, ``burst``, and ``limits``) to use when the shared rate limiter for a load
+        balancer is created. Or a rate limiter to use for every request made by sessions from
+        this factory instead of the shared one, which leaves the rate limiter shared by other
+        clients untouched. Default is ``False``.
     :return: A callable to return new configured session instances for making HTTP(S)
         requests
     :rtype: callable
@@ -73,20 +136,35 @@ def get_transport_factory(verify=None, ssl_version=None, retries=None):
     verify = verify if verify is not None else DEFAULT_CERT_VERIFY
     ssl_version = ssl_version if ssl_version is not None else DEFAULT_SSL_VERSION
     retries = retries if retries is not None else DEFAULT_RETRIES
+    pool_size = pool_size if pool_size is not None else DEFAULT_POOL_SIZE
+    timeout = (
+        connect_timeout if connect_timeout is not None else DEFAULT_CONNECT_TIMEOUT,
+        read_timeout if read_timeout is not None else DEFAULT_READ_TIMEOUT)
 
     # pylint: disable=missing-docstring
     def factory():
         transport = requests.Session()
-        transport.mount('https://', VersionedSSLAdapter(ssl_version, max_retries=retries))
+        transport.mount('https://', VersionedSSLAdapter(
+            ssl_version,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retries,
+            timeout=timeout,
+            circuit_breaker=circuit_breaker,
+            rate_limit=rate_limit
+        ))
 
         if not verify:
             transport.verify = False
 
-        transport.mount('http://', HTTPAdapter(
+        transport.mount('http://', TimeoutHTTPAdapter(
             max_retries=retries,
-            pool_connections=DEFAULT_POOLSIZE,
-            pool_maxsize=DEFAULT_POOLSIZE,
-            pool_block=DEFAULT_POOLBLOCK
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=DEFAULT_POOLBLOCK,
+            timeout=timeout,
+            circuit_breaker=circuit_breaker,
+            rate_limit=rate_limit
         ))
 
         return transport
@@ -100,20 +178,316 @@ def get_transport_factory(verify=None, ssl_version=None, retries=None):
     return factory
 
 
-class VersionedSSLAdapter(HTTPAdapter):
-    """"Transport adapter that requires the use of a specific version of SSL."""
+# pylint: disable=too-many-arguments
+def get_pooled_transport_factory(verify=None, ssl_version=None, retries=None, pool_size=None,
+                                 idle_timeout=None, max_lifetime=None, connect_timeout=None,
+                                 read_timeout=None, circuit_breaker=False, rate_limit=False):
+    """Get a new callable that returns the same, shared :class:`requests.Session` instance
+    each time it is called so that connections to the load balancer are kept alive and
+    reused by every command instead of paying for a new TCP and TLS handshake per request.
+
+    The shared session is replaced with a new one when it has gone unused for longer than
+    ``idle_timeout`` seconds or has been in use for longer than ``max_lifetime`` seconds.
+
+    .. versionadded:: 2.1.0
+
+    :param bool|None verify: Should SSL certificates by verified when connecting
+        over HTTPS? Default is ``True``.
+    :param int|None ssl_version: Explicit version of SSL to use for HTTPS connections
+        to an A10 load balancer. The default is TLSv1.2.
+    :param int|None retries: The maximum number of times to retry operations on transient
+        network errors.
+    :param int|None pool_size: The maximum number of connections to keep open to the
+        load balancer. Default is 10.
+    :param float|None idle_timeout: Number of seconds the shared session may go unused
+        before it is replaced. Default is 30 seconds.
+    :param float|None max_lifetime: Number of seconds the shared session may be used
+        before it is replaced. Default is 300 seconds.
+    :param float|None connect_timeout: The maximum number of seconds to wait for a
+        connection to the load balancer to be established. Default is 10 seconds.
+    :param float|None read_timeout: The maximum number of seconds to wait for the load
+        balancer to send a response (or any part of one). Default is 60 seconds.
+    :param bool circuit_breaker: ``True`` to stop making requests to a load balancer when
+        too many recent requests to it have failed. Default is ``False``.
+    :param bool|dict|warthog.ratelimit.RateLimiter rate_limit: ``True``, settings for, or a
+        rate limiter to queue requests to a load balancer that would exceed the rate limits
+        for it. See :func:`get_transport_factory`. Default is ``False``.
+    :return: A callable to return a shared, configured session instance for making HTTP(S)
+        requests. The callable also has a ``.close()`` method to release any connections
+        held by the shared session.
+    :rtype: SharedTransportFactory
+    """
+    factory = get_transport_factory(
+        verify=verify, ssl_version=ssl_version, retries=retries, pool_size=pool_size,
+        connect_timeout=connect_timeout, read_timeout=read_timeout,
+        circuit_breaker=circuit_breaker, rate_limit=rate_limit)
+    return SharedTransportFactory(factory, idle_timeout=idle_timeout, max_lifetime=max_lifetime)
+
+
+class SharedTransportFactory(object):
+    """Callable that returns the same :class:`requests.Session` instance to every caller,
+    replacing it when it has been idle or alive for too long.
+
+    Sessions are replaced (instead of being kept forever) so that connections the load
+    balancer has silently dropped are not reused and so that DNS changes are eventually
+    picked up. A session that has been replaced is only closed once every request that
+    was using it has finished.
+
+    This class is thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, factory, idle_timeout=None, max_lifetime=None, clock=None):
+        """Set the factory for creating new sessions and when they should be replaced.
+
+        :param callable factory: Callable for creating new Session instances.
+        :param float|None idle_timeout: Number of seconds a session may go unused before
+            it is replaced. Default is 30 seconds.
+        :param float|None max_lifetime: Number of seconds a session may be used before
+            it is replaced. Default is 300 seconds.
+        :param callable clock: Callable that returns the current time in seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        self._factory = factory
+        self._idle_timeout = idle_timeout if idle_timeout is not None else \
+            DEFAULT_POOL_IDLE_TIMEOUT
+        self._max_lifetime = max_lifetime if max_lifetime is not None else \
+            DEFAULT_POOL_MAX_LIFETIME
+        self._clock = clock if clock is not None else warthog.core.monotonic
+
+        self._lock = threading.Lock()
+        self._transport = None
+        self._created = None
+        self._last_used = None
+
+    def _is_expired(self, now):
+        return (now - self._last_used > self._idle_timeout or
+                now - self._created > self._max_lifetime)
+
+    def __call__(self):
+        """Get the shared session, creating a new one if there isn't one yet or the
+        existing one is due to be replaced.
+
+        :return: The shared session
+        :rtype: requests.Session
+        """
+        with self._lock:
+            now = self._clock()
+
+            if self._transport is not None and self._is_expired(now):
+                self._transport.retire()
+                self._transport = None
+
+            if self._transport is None:
+                self._transport = _SharedSession(self._factory())
+                self._created = now
+
+            self._last_used = now
+            return self._transport
+
+    def close(self):
+        """Close the shared session, if any, and release all connections held by it
+        once any requests using it have finished.
+        """
+        with self._lock:
+            if self._transport is not None:
+                self._transport.retire()
+                self._transport = None
+
+
+class _SharedSession(object):
+    """Session handed out by :class:`SharedTransportFactory` that keeps count of the
+    requests using it so that it is only closed once none are.
+
+    Everything other than making requests is done by the wrapped session.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self._lock = threading.Lock()
+        self._active = 0
+        self._retired = False
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def request(self, method, url, **kwargs):
+        """Make a request with the wrapped session. See :meth:`requests.Session.request`."""
+        with self._lock:
+            self._active += 1
+        try:
+            return self._session.request(method, url, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                close = self._retired and not self._active
+            # A session that was retired while this request was being made (or
+            # that was still held by a command) is closed by its last request.
+            if close:
+                self._session.close()
+
+    def get(self, url, **kwargs):
+        """Make a GET request. See :meth:`requests.Session.get`."""
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        """Make a POST request. See :meth:`requests.Session.post`."""
+        return self.request('POST', url, data=data, json=json, **kwargs)
+
+    def retire(self):
+        """Close the wrapped session once no requests are using it."""
+        with self._lock:
+            self._retired = True
+            close = not self._active
+        if close:
+            self._session.close()
+
+
+def _limit_timeout(timeout, limit):
+    """Get a ``(connect, read)`` timeout where neither part is longer than ``limit``."""
+    if limit is None:
+        return timeout
+    if isinstance(limit, tuple):
+        # A caller asking for specific connect and read timeouts knows what it wants.
+        return limit
+    if timeout is None:
+        return limit
+
+    connect, read = timeout
+    return (
+        min(connect, limit) if connect is not None else limit,
+        min(read, limit) if read is not None else limit)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """Transport adapter that applies connect and read timeouts to every request and,
+    optionally, stops making requests to load balancers that are failing or limits the
+    rate requests are made to them.
+
+    A single number of seconds given as the ``timeout`` of a request (such as the time
+    remaining before an operation must complete) can only shorten these timeouts, never
+    lengthen them.
+
+    When ``circuit_breaker`` is ``True``, the outcome of each request is recorded by the
+    :class:`warthog.breaker.CircuitBreaker` for the load balancer it was sent to. Requests
+    that raise an exception, receive a server error (5xx) response, or are too slow count
+    as failures. Retries of a request on transient network errors are part of the request.
+    Requests that time out only because a single number of seconds given as the ``timeout``
+    of the request was shorter than the configured timeouts are not recorded, the load
+    balancer may have been fine.
+
+    When ``rate_limit`` is ``True`` (or a dictionary of settings for rate limiters), each
+    request waits until the :class:`warthog.ratelimit.RateLimiter` for the load balancer it
+    is being sent to, shared by the whole process, allows it to be made. When it is a rate
+    limiter, that limiter is used for every request instead. Time spent waiting counts against a single number of seconds given as
+    the ``timeout`` of the request, but not against the circuit breaker's limit on how
+    long a request may take. Requests that would have to wait longer than that ``timeout``
+    raise a :class:`warthog.exceptions.WarthogTimeoutError` without waiting.
+
+    .. versionadded:: 2.1.0
+    """
+    __attrs__ = HTTPAdapter.__attrs__ + ['timeout', 'circuit_breaker', 'rate_limit']
+
+    def __init__(self, timeout=None, circuit_breaker=False, rate_limit=False, **kwargs):
+        """Set the timeouts for requests and any arguments for :class:`HTTPAdapter`.
+
+        :param tuple|None timeout: Tuple of ``(connect, read)`` timeouts in seconds,
+            either of which may be ``None`` to wait forever, or ``None`` to not apply
+            any timeouts.
+        :param bool circuit_breaker: ``True`` to use the circuit breaker for each load
+            balancer, ``False`` to always make requests.
+        :param bool|dict|warthog.ratelimit.RateLimiter rate_limit: ``True`` to use the rate
+            limiter for each load balancer, a dictionary of keyword arguments for
+            :class:`warthog.ratelimit.RateLimiter` to use when a rate limiter for a load
+            balancer is created, a rate limiter to use for every request, or ``False`` to make
+            requests as soon as they are sent.
+        :param kwargs: Keyword arguments for :class:`requests.adapters.HTTPAdapter`.
+        """
+        self.timeout = timeout
+        self.circuit_breaker = circuit_breaker
+        self.rate_limit = rate_limit
+        super(TimeoutHTTPAdapter, self).__init__(**kwargs)
+
+    # pylint: disable=arguments-differ
+    def send(self, request, **kwargs):
+        # Queue before checking the circuit breaker so that a trial request for a
+        # half-open breaker is never held (or lost) while waiting.
+        limit = kwargs.get('timeout')
+        if self.rate_limit:
+            limit = self._queue(request, limit)
+        kwargs['timeout'] = _limit_timeout(self.timeout, limit)
+        # Whether the time left for the operation making this request, rather than the
+        # timeouts configured for load balancers, is what the request may time out at.
+        shortened = limit is not None and not isinstance(limit, tuple) and \
+            kwargs['timeout'] != self.timeout
+
+        breaker = None
+        if self.circuit_breaker:
+            breaker = warthog.breaker.get_circuit_breaker(request.url)
+            breaker.before_request()
+
+        if breaker is None:
+            return super(TimeoutHTTPAdapter, self).send(request, **kwargs)
+
+        start = warthog.core.monotonic()
+        failed = True
+        try:
+            response = super(TimeoutHTTPAdapter, self).send(request, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        except requests.exceptions.Timeout:
+            if shortened:
+                breaker.cancel_request()
+                failed = None
+            raise
+        finally:
+            if failed is not None:
+                breaker.after_request(warthog.core.monotonic() - start, failed)
+
+    # pylint: disable=no-self-use
+    def _queue(self, request, limit):
+        """Wait until the rate limiter allows the request to be made, returning what is
+        left of the timeout given for the request.
+        """
+        limiter = self.rate_limit
+        if not isinstance(limiter, warthog.ratelimit.RateLimiter):
+            settings = limiter if isinstance(limiter, dict) else {}
+            limiter = warthog.ratelimit.get_rate_limiter(request.url, **settings)
+        single = limit is not None and not isinstance(limit, tuple)
+        waited = limiter.acquire(
+            warthog.ratelimit.get_request_kind(request.method, request.url),
+            timeout=limit if single else None)
+        warthog.ratelimit.set_queue_wait(waited)
+
+        if not waited or not single:
+            return limit
+        return max(limit - waited, _MIN_TIMEOUT)
+
+
+class VersionedSSLAdapter(TimeoutHTTPAdapter):
+    """"Transport adapter that requires the use of a specific version of SSL.
+
+    .. versionchanged:: 2.1.0
+        Added the ``timeout``, ``circuit_breaker``, and ``rate_limit`` parameters.
+    """
 
     # pylint: disable=too-many-arguments
     def __init__(self, ssl_version, pool_connections=DEFAULT_POOLSIZE,
                  pool_maxsize=DEFAULT_POOLSIZE, max_retries=DEFAULT_RETRIES,
-                 pool_block=DEFAULT_POOLBLOCK):
+                 pool_block=DEFAULT_POOLBLOCK, timeout=None, circuit_breaker=False,
+                 rate_limit=False):
         self.ssl_version = ssl_version
 
         super(VersionedSSLAdapter, self).__init__(
             pool_connections=pool_connections,
             pool_maxsize=pool_maxsize,
             max_retries=max_retries,
-            pool_block=pool_block
+            pool_block=pool_block,
+            timeout=timeout,
+            circuit_breaker=circuit_breaker,
+            rate_limit=rate_limit
         )
 
     def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
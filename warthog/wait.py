@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+#
+# Warthog - Simple client for A10 load balancers
+#
+# Copyright 2014-2016 Smarter Travel
+#
+# Available under the MIT license. See LICENSE for details.
+#
+
+"""
+warthog.wait
+~~~~~~~~~~~~
+
+Strategies for deciding how long to wait between checks of a server while waiting
+for it to drain or become enabled.
+"""
+
+import numbers
+import random
+import time
+
+import warthog.core
+
+# Default number of seconds to keep waiting for if a strategy is given neither
+# a maximum number of retries or a deadline. This matches the default behavior
+# of the client (five retries, two seconds apart).
+DEFAULT_WAIT_DEADLINE = 10.0
+
+
+def get_wait_strategy(wait, max_retries, interval):
+    """Get the given wait strategy or, if one wasn't given, a strategy that waits
+    a fixed interval between checks up to a maximum number of times.
+
+    :param WaitStrategy|None wait: Explicit strategy to use, if any.
+    :param int max_retries: Maximum number of times to wait and check again when
+        no explicit strategy is given.
+    :param float interval: Number of seconds to wait between checks when no explicit
+        strategy is given.
+    :return: The strategy to use for waiting.
+    :rtype: WaitStrategy
+    """
+    if wait is not None:
+        return wait
+    return FixedIntervalWait(interval=interval, max_retries=max_retries)
+
+
+class WaitStrategy(object):
+    """Base for strategies that decide how long to wait between checks of a server
+    and when to give up waiting.
+
+    Strategies limit how long to wait by a maximum number of retries, an overall
+    deadline (in seconds, measured from the start of the wait), or both. Whichever
+    limit is reached first ends the wait. If neither is given, a deadline of
+    :data:`DEFAULT_WAIT_DEADLINE` seconds is used.
+
+    Strategy instances only hold configuration and may be shared between threads and
+    reused for any number of waits. State for a single wait is kept by the :class:`Waiter`
+    returned by :meth:`start`.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, max_retries=None, deadline=None, clock=None):
+        """Set the limits for how long to keep waiting.
+
+        :param int|None max_retries: Maximum number of times to wait and check again.
+        :param float|None deadline: Maximum number of seconds to keep waiting for.
+        :param callable clock: Callable that returns the current time in seconds. It is
+            typically only necessary to set this parameter for unit testing purposes.
+        """
+        if max_retries is None and deadline is None:
+            deadline = DEFAULT_WAIT_DEADLINE
+
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self._clock = clock if clock is not None else warthog.core.monotonic
+
+    def start(self):
+        """Start a new wait.
+
+        :return: New waiter to track the state of a single wait.
+        :rtype: Waiter
+        """
+        return Waiter(self, self._clock)
+
+    def delay(self, state, observation):
+        """Get the number of seconds to wait before the next check.
+
+        :param WaitState state: State of the current wait.
+        :param observation: The most recent value observed while waiting (for example, the
+            number of active connections to a server or the status of a server).
+        :return: Number of seconds to wait before checking again.
+        :rtype: float
+        """
+        raise NotImplementedError()
+
+
+class WaitState(object):
+    """Mutable state of a single wait that strategies may use to compute delays."""
+
+    def __init__(self, started):
+        self.started = started
+        self.retries = 0
+        self.last_delay = None
+        self.last_time = None
+        self.last_observation = None
+        self.rate = None
+
+
+class Waiter(object):
+    """Tracks the state of a single wait using a :class:`WaitStrategy`.
+
+    This class is not thread safe.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, strategy, clock):
+        self._strategy = strategy
+        self._clock = clock
+        self._state = WaitState(clock())
+
+    def _remaining(self):
+        if self._strategy.deadline is None:
+            return None
+        return self._strategy.deadline - (self._clock() - self._state.started)
+
+    def expired(self):
+        """Return ``True`` if the wait has run out of retries or time."""
+        max_retries = self._strategy.max_retries
+        if max_retries is not None and self._state.retries >= max_retries:
+            return True
+
+        remaining = self._remaining()
+        return remaining is not None and remaining <= 0
+
+    def next_delay(self, observation):
+        """Record the most recent observation and get the number of seconds to wait
+        before checking again, never waiting past the deadline.
+
+        :param observation: The most recent value observed while waiting.
+        :return: Number of seconds to wait before checking again.
+        :rtype: float
+        """
+        state = self._state
+        delay = max(0.0, self._strategy.delay(state, observation))
+
+        remaining = self._remaining()
+        if remaining is not None:
+            delay = max(0.0, min(delay, remaining))
+
+        state.retries += 1
+        state.last_delay = delay
+        state.last_time = self._clock()
+        state.last_observation = observation
+        return delay
+
+
+class FixedIntervalWait(WaitStrategy):
+    """Wait the same amount of time between each check.
+
+    This is the default strategy used by the client, with five retries two seconds apart.
+
+    .. versionadded:: 2.1.0
+    """
+
+    def __init__(self, interval=2.0, max_retries=None, deadline=None, clock=None):
+        """Set how long to wait between checks and the limits on waiting.
+
+        :param float interval: Number of seconds to wait between checks.
+        :param int|None max_retries: Maximum number of times to wait and check again.
+        :param float|None deadline: Maximum number of seconds to keep waiting for.
+        :param callable clock: Callable that returns the current time in seconds.
+        """
+        super(FixedIntervalWait, self).__init__(
+            max_retries=max_retries, deadline=deadline, clock=clock)
+        self.interval = interval
+
+    def delay(self, state, observation):
+        return self.interval
+
+
+class ExponentialBackoffWait(WaitStrategy):
+    """Wait an exponentially increasing amount of time between each check, with a random
+    amount of jitter, so that short waits are detected quickly without checking long waits
+    too frequently.
+
+    .. versionadded:: 2.1.0
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, initial=0.25, maximum=5.0, multiplier=2.0, jitter=0.5,
+                 max_retries=None, deadline=None, clock=None, rand=None):
+        """Set how the time between checks grows and the limits on waiting.
+
+        :param float initial: Number of seconds to wait before the first retry.
+        :param float maximum: Maximum number of seconds to wait between any two checks.
+        :param float multiplier: Factor to increase the time between checks by each retry.
+        :param float jitter: Fraction (between 0 and 1) of each delay that is randomized.
+            For example, with a jitter of 0.5, a delay of two seconds becomes a random delay
+            of between one and two seconds.
+        :param int|None max_retries: Maximum number of times to wait and check again.
+        :param float|None deadline: Maximum number of seconds to keep waiting for.
+        :param callable clock: Callable that returns the current time in seconds.
+        :param random.Random rand: Source of randomness for jitter. It is typically only
+            necessary to set this parameter for unit testing purposes.
+        """
+        super(ExponentialBackoffWait, self).__init__(
+            max_retries=max_retries, deadline=deadline, clock=clock)
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._rand = rand if rand is not None else random.Random()
+
+    def delay(self, state, observation):
+        delay = min(self.maximum, self.initial * (self.multiplier ** state.retries))
+        return delay * (1.0 - self.jitter * self._rand.random())
+
+
+def _is_count(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+class ConnectionRateWait(WaitStrategy):
+    """Estimate when the number of active connections to a server will reach zero based
+    on how quickly it has been declining, and wait until then before checking again.
+
+    The rate of decline is smoothed across checks. Until a decline has been observed
+    (or when the value being waited on isn't a number of connections, such as when
+    waiting for a server to become enabled) ``initial`` seconds are waited between checks.
+
+    .. versionadded:: 2.1.0
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, initial=1.0, minimum=0.1, maximum=10.0, smoothing=0.5,
+                 max_retries=None, deadline=None, clock=None):
+        """Set the bounds on how long to wait between checks and the limits on waiting.
+
+        :param float initial: Number of seconds to wait when there isn't enough
+            information to estimate the rate that connections are declining.
+        :param float minimum: Minimum number of seconds to wait between checks.
+        :param float maximum: Maximum number of seconds to wait between checks.
+        :param float smoothing: Weight (between 0 and 1) given to the most recently observed
+            rate of decline versus the previous estimate.
+        :param int|None max_retries: Maximum number of times to wait and check again.
+        :param float|None deadline: Maximum number of seconds to keep waiting for.
+        :param callable clock: Callable that returns the current time in seconds.
+        """
+        super(ConnectionRateWait, self).__init__(
+            max_retries=max_retries, deadline=deadline, clock=clock)
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.smoothing = smoothing
+
+    def _update_rate(self, state, observation):
+        """Update the smoothed rate of decline (connections per second) in the state."""
+        previous = state.last_observation
+        if not _is_count(previous) or not _is_count(observation) or observation > previous:
+            # Connections went up or we can't tell, start over with the estimate.
+            state.rate = None
+            return
+
+        elapsed = self._clock() - state.last_time
+        if elapsed <= 0:
+            return
+
+        rate = (previous - observation) / float(elapsed)
+        state.rate = rate if state.rate is None else \
+            self.smoothing * rate + (1.0 - self.smoothing) * state.rate
+
+    def delay(self, state, observation):
+        if state.last_time is not None:
+            self._update_rate(state, observation)
+
+        if not _is_count(observation) or not state.rate:
+            return self.initial
+
+        return max(self.minimum, min(self.maximum, observation / state.rate))